@@ -0,0 +1,100 @@
+"""Benchmark das estatísticas da turma: AnaliseTurma (NumPy) x MotorRelatorio.
+
+    python -m backend.benchmarks.analise_turma --estudantes 10000,100000,1000000
+
+Não usa o banco: gera notas de duas casas e frequências com semente fixa
+direto nas matrizes. MotorRelatorio (Python puro, sobre modelos Estudante) é
+medido só até --limite-motor estudantes e conferido contra AnaliseTurma.
+
+- agregados: média da turma, médias por disciplina e aprovação
+- relatório: gerar(), que devolve uma linha por estudante
+- estatísticas: estatisticas(), com histogramas, percentis e ranking
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from backend.model.estudante import Estudante
+from backend.service.analiseTurma import AnaliseTurma
+from backend.service.relatorioService import MotorRelatorio
+
+TOTAL_DISCIPLINAS = 5
+
+
+def gerar_analise(quantidade: int, semente: int = 42) -> AnaliseTurma:
+    gerador = np.random.default_rng(semente)
+    notas = gerador.integers(0, 1001, size=(quantidade, TOTAL_DISCIPLINAS)) / 100
+    frequencias = gerador.integers(4000, 10001, size=quantidade) / 100
+    ids = [f"{indice:08d}-0000-0000-0000-000000000000" for indice in range(quantidade)]
+    nomes = [f"Aluno {indice:07d}" for indice in range(quantidade)]
+    return AnaliseTurma(ids, nomes, notas, frequencias, TOTAL_DISCIPLINAS)
+
+
+def _agregados(analise) -> None:
+    analise._medias = analise._media_turma = None
+    analise.media_turma()
+    analise.medias_por_disciplina()
+    if isinstance(analise, AnaliseTurma):
+        analise.aprovacao()
+
+
+def _medir(funcao, repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--estudantes", default="10000,100000,1000000")
+    parser.add_argument("--limite-motor", type=int, default=100000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"mediana de {args.repeticoes} execuções")
+    print(f"{'estudantes':>12}{'':>10}{'agregados':>14}{'relatório':>14}{'estatísticas':>14}")
+    for quantidade in (int(valor) for valor in args.estudantes.split(",")):
+        analise = gerar_analise(quantidade, args.semente)
+        tempos = {
+            "numpy": (
+                _medir(lambda: _agregados(analise), args.repeticoes),
+                _medir(lambda: analise.gerar(), args.repeticoes),
+                _medir(lambda: analise.estatisticas(), args.repeticoes),
+            )
+        }
+
+        if quantidade <= args.limite_motor:
+            estudantes = [
+                Estudante.model_construct(
+                    id=estudante_id, nome=nome, notas=notas, frequencia=frequencia
+                )
+                for estudante_id, nome, notas, frequencia in zip(
+                    analise.ids, analise.nomes, analise.notas.tolist(),
+                    analise.frequencias.tolist(),
+                )
+            ]
+            motor = MotorRelatorio(estudantes, TOTAL_DISCIPLINAS)
+            assert motor.gerar() == analise.gerar()
+            tempos["python"] = (
+                _medir(lambda: _agregados(motor), args.repeticoes),
+                _medir(lambda: MotorRelatorio(estudantes, TOTAL_DISCIPLINAS).gerar(), args.repeticoes),
+                None,  # sem equivalente em MotorRelatorio
+            )
+
+        for nome, valores in tempos.items():
+            celulas = "".join(
+                f"{valor * 1000:>11.1f} ms" if valor is not None else f"{'-':>14}"
+                for valor in valores
+            )
+            print(f"{quantidade:>12}{nome:>10}{celulas}")
+
+
+if __name__ == "__main__":
+    main()
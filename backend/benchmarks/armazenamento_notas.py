@@ -0,0 +1,129 @@
+"""Benchmark dos armazenamentos de notas: tabela notas x coluna REAL[].
+
+    python -m backend.benchmarks.armazenamento_notas --estudantes 20000
+
+Importa os mesmos N estudantes (gerados com semente fixa) em uma turma
+temporária para cada armazenamento, no banco de DATABASE_URL, e mede as
+leituras do serviço com o cache de relatórios desligado. As turmas são
+removidas no final.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from uuid import uuid4
+
+from backend.benchmarks.importacao import gerar_linhas
+from backend.database.armazenamentoNotas import ARMAZENAMENTOS
+from backend.database.db import get_cursor
+from backend.database.repositorioPostgres import RepositorioPostgres
+from backend.model.turma import TURMA_PADRAO, CriarTurma
+from backend.service.estudanteService import EstudanteService
+from backend.service.turmaService import TurmaService
+
+# Bytes ocupados pelas notas dos estudantes da turma em cada layout
+TAMANHO_NOTAS = {
+    "linhas": """
+        SELECT COALESCE(SUM(pg_column_size(n.*)), 0) AS bytes
+        FROM notas n
+        JOIN estudantes e ON e.id = n.estudante_id
+        WHERE e.turma_id = %s
+    """,
+    "compacto": """
+        SELECT COALESCE(SUM(pg_column_size(e.notas)), 0) AS bytes
+        FROM estudantes e
+        WHERE e.turma_id = %s
+    """,
+}
+
+
+def _medir(funcao, repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos)
+
+
+def executar_armazenamento(nome: str, linhas, args) -> dict:
+    turma_service = TurmaService()
+    turma = turma_service.criar_turma(
+        CriarTurma(periodo_id=TURMA_PADRAO, nome=f"Benchmark {nome} {uuid4().hex[:8]}")
+    )
+    service = EstudanteService(RepositorioPostgres(ARMAZENAMENTOS[nome]()))
+    try:
+        inicio = time.perf_counter()
+        resultado = service.importar_estudantes(linhas, turma.id)
+        importacao = time.perf_counter() - inicio
+        ids = [r["id"] for r in resultado["resultados"] if r["status"] == "importado"]
+        sorteados = random.Random(args.semente).sample(ids, min(args.leituras, len(ids)))
+
+        with get_cursor() as cursor:
+            cursor.execute("ANALYZE estudantes")
+            cursor.execute("ANALYZE notas")
+            cursor.execute(TAMANHO_NOTAS[nome], (turma.id,))
+            bytes_notas = cursor.fetchone()["bytes"]
+
+        def ler_por_id():
+            for estudante_id in sorteados:
+                service.obter_estudante_por_id(estudante_id, turma.id)
+
+        return {
+            "importação": importacao,
+            "listar turma": _medir(
+                lambda: service.listar_estudantes(como_dict=True, turma_id=turma.id),
+                args.repeticoes,
+            ),
+            f"{len(sorteados)} leituras por id": _medir(ler_por_id, args.repeticoes),
+            "página de 50": _medir(
+                lambda: service.listar_estudantes_paginado(
+                    50, como_dict=True, turma_id=turma.id, ordenar="media"
+                ),
+                args.repeticoes,
+            ),
+            "relatório": _medir(
+                lambda: service.gerar_relatorio(usar_cache=False, turma_id=turma.id),
+                args.repeticoes,
+            ),
+            "médias por disciplina": _medir(
+                lambda: service.calcular_media_turma_por_disciplina(
+                    usar_cache=False, turma_id=turma.id
+                ),
+                args.repeticoes,
+            ),
+            "exportação": _medir(
+                lambda: sum(1 for _ in service.exportar_estudantes(turma_id=turma.id)),
+                args.repeticoes,
+            ),
+            "bytes das notas": bytes_notas,
+        }
+    finally:
+        turma_service.remover_turma(turma.id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--estudantes", type=int, default=20000)
+    parser.add_argument("--leituras", type=int, default=200)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    linhas = gerar_linhas(args.estudantes, args.semente)
+    resultados = {nome: executar_armazenamento(nome, linhas, args) for nome in ARMAZENAMENTOS}
+
+    print(f"{args.estudantes} estudantes, mediana de {args.repeticoes} execuções")
+    print(f"{'':>24}" + "".join(f"{nome:>12}" for nome in resultados))
+    for medida in next(iter(resultados.values())):
+        valores = [resultado[medida] for resultado in resultados.values()]
+        if medida.startswith("bytes"):
+            celulas = "".join(f"{valor / 1024:>9.0f} kB" for valor in valores)
+        else:
+            celulas = "".join(f"{valor * 1000:>9.1f} ms" for valor in valores)
+        print(f"{medida:>24}{celulas}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Benchmark de carga HTTP: latência e vazão de cada rota da API.
+
+    python -m backend.benchmarks.carga_http --estudantes 100000 --concorrencia 1,10,50
+    python -m backend.benchmarks.carga_http --url http://127.0.0.1:8000 --turma <turma_id>
+
+Gera a turma com backend.benchmarks.dados (ou usa --turma) no banco de
+DATABASE_URL e sobe um uvicorn com o ambiente atual (DB_MODO,
+ARMAZENAMENTO_NOTAS...), a menos que --url aponte para uma API já no ar e
+ligada ao mesmo banco. Para cada rota e cada concorrência, dispara
+--requisicoes requisições depois de um aquecimento e informa p50/p95/p99 e
+requisições por segundo. Os relatórios usam o cache da API, como em
+produção; --sem-cache mede o cálculo (usar_cache=false).
+
+Com --saida grava o JSON; com --base, compara e sai com código 1 se alguma
+rota piorou mais que --limite (ver backend.benchmarks.resultados).
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Sequence
+
+import httpx
+
+from backend.benchmarks import resultados
+from backend.benchmarks.dados import turma_gerada
+
+ROTAS = {
+    "listar": "/api/estudantes?limite=50&ordenar=media&turma_id={turma}",
+    "obter": "/api/estudantes/{estudante}?turma_id={turma}",
+    "relatorio": "/api/relatorios?turma_id={turma}",
+    "media_turma": "/api/relatorios/media-turma?turma_id={turma}",
+    "medias_disciplina": "/api/relatorios/medias-por-disciplina?turma_id={turma}",
+    "acima_media": "/api/relatorios/estudantes-acima-da-media?turma_id={turma}",
+    "baixa_frequencia": "/api/relatorios/estudantes-com-baixa-frequencia?turma_id={turma}",
+    "estatisticas": "/api/relatorios/estatisticas?turma_id={turma}",
+    "painel": "/api/painel?turma_id={turma}",
+}
+# Rotas sem usar_cache
+ROTAS_SEM_CACHE = ("listar", "obter")
+
+
+async def aguardar_servidor(url_base: str, tentativas: int = 100) -> None:
+    async with httpx.AsyncClient() as cliente:
+        for _ in range(tentativas):
+            try:
+                await cliente.get(f"{url_base}/")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError(f"Servidor em {url_base} não respondeu")
+
+
+async def disparar(urls: Sequence[str], requisicoes: int, concorrencia: int):
+    """`requisicoes` GETs em `concorrencia` conexões, alternando entre `urls`.
+    Devolve as latências (s), os erros (status diferente de 200) e a duração"""
+    latencias = []
+    erros = 0
+    fila = zip(range(requisicoes), itertools.cycle(urls))
+    limites = httpx.Limits(max_connections=concorrencia)
+
+    async with httpx.AsyncClient(limits=limites, timeout=60) as cliente:
+        async def trabalhador():
+            nonlocal erros
+            for _, url in fila:
+                inicio = time.perf_counter()
+                resposta = await cliente.get(url)
+                latencias.append(time.perf_counter() - inicio)
+                if resposta.status_code != 200:
+                    erros += 1
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+        duracao = time.perf_counter() - inicio
+
+    return latencias, erros, duracao
+
+
+@contextmanager
+def servidor_uvicorn(porta: int, **ambiente: str):
+    """Sobe main:app em um uvicorn com o ambiente atual mais `ambiente`"""
+    url_base = f"http://127.0.0.1:{porta}"
+    servidor = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(porta),
+         "--log-level", "warning"],
+        env={**os.environ, **ambiente},
+    )
+    try:
+        asyncio.run(aguardar_servidor(url_base))
+        yield url_base
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+
+def medir_rota(urls: Sequence[str], requisicoes: int, concorrencia: int) -> Dict[str, float]:
+    # Aquecimento: abre as conexões dos pools e enche os caches antes de medir
+    asyncio.run(disparar(urls, concorrencia, concorrencia))
+    latencias, erros, duracao = asyncio.run(disparar(urls, requisicoes, concorrencia))
+    return {
+        **resultados.resumir_latencias(latencias),
+        "requisicoes_por_segundo": round(len(latencias) / duracao, 1),
+        "erros": erros,
+    }
+
+
+def urls_da_rota(url_base: str, rota: str, turma_id: str, ids: List[str],
+                 sem_cache: bool, semente: int = 42) -> List[str]:
+    caminho = ROTAS[rota]
+    if sem_cache and rota not in ROTAS_SEM_CACHE:
+        caminho += "&usar_cache=false"
+    if "{estudante}" not in caminho:
+        return [url_base + caminho.format(turma=turma_id)]
+    sorteados = random.Random(semente).sample(ids, min(len(ids), 1000))
+    return [url_base + caminho.format(turma=turma_id, estudante=i) for i in sorteados]
+
+
+def executar(url_base: str, turma_id: str, ids: List[str], rotas: Sequence[str],
+             concorrencias: Sequence[int], requisicoes: int, sem_cache: bool = False,
+             semente: int = 42) -> Dict[str, Dict[str, float]]:
+    medidas = {}
+    for rota in rotas:
+        urls = urls_da_rota(url_base, rota, turma_id, ids, sem_cache, semente)
+        for concorrencia in concorrencias:
+            medidas[f"{rota} c={concorrencia}"] = medir_rota(urls, requisicoes, concorrencia)
+    return medidas
+
+
+def _ids_da_turma(url_base: str, turma_id: str) -> List[str]:
+    resposta = httpx.get(f"{url_base}/api/estudantes/exportar?turma_id={turma_id}", timeout=None)
+    resposta.raise_for_status()
+    return [json.loads(linha)["id"] for linha in resposta.text.splitlines() if linha]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--estudantes", type=int, default=10000)
+    parser.add_argument("--turma", help="turma já gerada (ver backend.benchmarks.dados)")
+    parser.add_argument("--url", help="API já no ar; sem ela, sobe um uvicorn em --porta")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--rotas", default=",".join(ROTAS), help=f"entre {', '.join(ROTAS)}")
+    parser.add_argument("--concorrencia", default="1,10,50")
+    parser.add_argument("--requisicoes", type=int, default=1000)
+    parser.add_argument("--sem-cache", action="store_true")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", help="arquivo JSON do resultado")
+    parser.add_argument("--base", help="resultado anterior para comparar")
+    parser.add_argument("--limite", type=float, default=0.1)
+    args = parser.parse_args()
+
+    rotas = args.rotas.split(",")
+    desconhecidas = set(rotas) - set(ROTAS)
+    if desconhecidas:
+        parser.error(f"rotas desconhecidas: {', '.join(sorted(desconhecidas))}")
+    concorrencias = [int(valor) for valor in args.concorrencia.split(",")]
+
+    dados = nullcontext() if args.turma else turma_gerada(args.estudantes, args.semente)
+    api = nullcontext(args.url) if args.url else servidor_uvicorn(args.porta)
+    with dados as gerada, api as url_base:
+        turma_id = args.turma or gerada.turma_id
+        ids = _ids_da_turma(url_base, turma_id) if args.turma else gerada.ids
+        medidas = executar(
+            url_base, turma_id, ids, rotas, concorrencias, args.requisicoes,
+            args.sem_cache, args.semente,
+        )
+
+    parametros = {
+        "estudantes": len(ids),
+        "requisicoes": args.requisicoes,
+        "concorrencia": concorrencias,
+        "sem_cache": args.sem_cache,
+        "semente": args.semente,
+    }
+    print(f"{len(ids)} estudantes, {args.requisicoes} requisições por rota e concorrência")
+    print(f"{'':>26}{'req/s':>10}{'p50':>11}{'p95':>11}{'p99':>11}{'erros':>7}")
+    for nome, medida in medidas.items():
+        print(
+            f"{nome:>26}{medida['requisicoes_por_segundo']:>10}"
+            f"{medida['p50_ms']:>8.2f} ms{medida['p95_ms']:>8.2f} ms"
+            f"{medida['p99_ms']:>8.2f} ms{medida['erros']:>7}"
+        )
+
+    atual = {"benchmark": "carga_http", "parametros": parametros, "medidas": medidas}
+    if args.saida:
+        atual = resultados.salvar(args.saida, "carga_http", parametros, medidas)
+    if args.base:
+        resultados.conferir_base(args.base, atual, args.limite)
+
+
+if __name__ == "__main__":
+    main()
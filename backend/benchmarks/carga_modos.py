@@ -0,0 +1,38 @@
+"""Benchmark de carga: compara o modo síncrono e o assíncrono da API.
+
+Sobe um uvicorn para cada valor de DB_MODO contra o PostgreSQL de
+DATABASE_URL e dispara requisições concorrentes na mesma rota.
+
+    python -m backend.benchmarks.carga_modos --requisicoes 2000 --concorrencia 100
+"""
+
+import argparse
+
+from backend.benchmarks.carga_http import medir_rota, servidor_uvicorn
+
+
+def executar_modo(modo: str, args) -> dict:
+    with servidor_uvicorn(args.porta, DB_MODO=modo) as url_base:
+        medida = medir_rota([f"{url_base}{args.rota}"], args.requisicoes, args.concorrencia)
+    return {"modo": modo, **medida}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rota", default="/api/relatorios/estudantes-com-baixa-frequencia?usar_cache=false")
+    parser.add_argument("--requisicoes", type=int, default=2000)
+    parser.add_argument("--concorrencia", type=int, default=100)
+    parser.add_argument("--porta", type=int, default=8765)
+    args = parser.parse_args()
+
+    for modo in ("sync", "async"):
+        resultado = executar_modo(modo, args)
+        print(
+            f"{resultado['modo']:>5}: {resultado['requisicoes_por_segundo']} req/s  "
+            f"p50={resultado['p50_ms']}ms p95={resultado['p95_ms']}ms "
+            f"p99={resultado['p99_ms']}ms erros={resultado['erros']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
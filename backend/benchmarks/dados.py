@@ -0,0 +1,98 @@
+"""Gerador de dados dos benchmarks: uma turma com N estudantes, semente fixa.
+
+    python -m backend.benchmarks.dados --estudantes 100000
+    python -m backend.benchmarks.dados --remover <turma_id>
+
+Cria uma turma nova no banco de DATABASE_URL e a preenche com as linhas de
+importacao.iterar_linhas (mesma semente, mesmos nomes, notas e frequências),
+importadas em lotes via COPY. De 1 mil a 1 milhão de estudantes: a memória
+fica limitada a um lote. Imprime o id da turma, que os outros benchmarks
+aceitam em --turma; a turma fica no banco até ser removida.
+"""
+
+import argparse
+import itertools
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from backend.benchmarks.importacao import iterar_linhas
+from backend.model.turma import TURMA_PADRAO, CriarTurma
+from backend.service.estudanteService import EstudanteService
+from backend.service.turmaService import TurmaService
+
+TAMANHO_LOTE = 50000
+
+
+@dataclass
+class TurmaGerada:
+    turma_id: str
+    estudantes: int
+    semente: int
+    segundos: float
+    ids: List[str] = field(repr=False, default_factory=list)
+
+
+def popular_turma(
+    estudantes: int, semente: int = 42, tamanho_lote: int = TAMANHO_LOTE,
+    service: Optional[EstudanteService] = None,
+) -> TurmaGerada:
+    """Cria uma turma com `estudantes` estudantes gerados com `semente`"""
+    turma = TurmaService().criar_turma(
+        CriarTurma(periodo_id=TURMA_PADRAO, nome=f"Benchmark {semente}-{estudantes}-{time.time_ns()}")
+    )
+    service = service or EstudanteService()
+    linhas = iterar_linhas(estudantes, semente)
+    ids = []
+
+    inicio = time.perf_counter()
+    while True:
+        lote = list(itertools.islice(linhas, tamanho_lote))
+        if not lote:
+            break
+        resultado = service.importar_estudantes(lote, turma.id)
+        if resultado["erros"]:
+            erro = next(r for r in resultado["resultados"] if r["status"] == "erro")
+            raise RuntimeError(f"Linha {erro['linha']} recusada: {erro['erro']}")
+        ids.extend(r["id"] for r in resultado["resultados"])
+
+    return TurmaGerada(turma.id, estudantes, semente, time.perf_counter() - inicio, ids)
+
+
+def remover_turma(turma_id: str) -> None:
+    TurmaService().remover_turma(turma_id)
+
+
+@contextmanager
+def turma_gerada(estudantes: int, semente: int = 42, tamanho_lote: int = TAMANHO_LOTE):
+    """popular_turma, com a turma removida na saída"""
+    gerada = popular_turma(estudantes, semente, tamanho_lote)
+    try:
+        yield gerada
+    finally:
+        remover_turma(gerada.turma_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--estudantes", type=int, default=100000)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE)
+    parser.add_argument("--remover", metavar="TURMA_ID")
+    args = parser.parse_args()
+
+    if args.remover:
+        remover_turma(args.remover)
+        print(f"turma {args.remover} removida")
+        return
+
+    gerada = popular_turma(args.estudantes, args.semente, args.lote)
+    print(
+        f"turma {gerada.turma_id}: {gerada.estudantes} estudantes em {gerada.segundos:.2f}s "
+        f"({gerada.estudantes / gerada.segundos:.0f} estudantes/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark da importação em lote: N estudantes gerados com semente fixa.
+
+    python -m backend.benchmarks.importacao --estudantes 10000
+
+Grava no banco de DATABASE_URL; os estudantes importados são removidos no
+final, a menos que --manter seja usado.
+"""
+
+import argparse
+import random
+import time
+
+from backend.database.db import get_cursor
+from backend.service.estudanteService import EstudanteService
+
+
+def iterar_linhas(quantidade: int, semente: int = 42):
+    """As linhas de gerar_linhas, uma a uma (para gerar em lotes)"""
+    gerador = random.Random(semente)
+    for i in range(quantidade):
+        yield {
+            "nome": f"Benchmark {semente}-{i:07d}",
+            "notas": [round(gerador.uniform(0, 10), 2) for _ in range(5)],
+            "frequencia": round(gerador.uniform(0, 100), 2),
+        }
+
+
+def gerar_linhas(quantidade: int, semente: int = 42):
+    return list(iterar_linhas(quantidade, semente))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--estudantes", type=int, default=10000)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--manter", action="store_true")
+    args = parser.parse_args()
+
+    linhas = gerar_linhas(args.estudantes, args.semente)
+    service = EstudanteService()
+
+    inicio = time.perf_counter()
+    resultado = service.importar_estudantes(linhas)
+    duracao = time.perf_counter() - inicio
+
+    print(
+        f"{resultado['importados']} importados, {resultado['erros']} erros "
+        f"em {duracao:.2f}s ({resultado['importados'] / duracao:.0f} estudantes/s)"
+    )
+
+    if not args.manter:
+        ids = [r["id"] for r in resultado["resultados"] if r["status"] == "importado"]
+        with get_cursor() as cursor:
+            cursor.execute("DELETE FROM estudantes WHERE id = ANY(%s)", (ids,))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Resultados dos benchmarks em JSON e a comparação entre duas execuções.
+
+    python -m backend.benchmarks.resultados base.json atual.json --limite 0.1
+
+Cada arquivo guarda o benchmark, os parâmetros, o ambiente (commit, DB_MODO,
+ARMAZENAMENTO_NOTAS, BANCO_DADOS) e as medidas: nome -> {métrica: valor}.
+Latências (_ms) pioram quando sobem; a vazão (requisicoes_por_segundo)
+quando desce. A comparação sai com código 1 se alguma das --metricas piorou
+mais que --limite (fração: 0.1 = 10%) em relação à base; p99 e média são
+gravados, mas ficam fora por padrão (poucas amostras, muito ruído).
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Sequence
+
+# Métricas em que um valor maior é melhor; as demais (_ms) pioram ao subir
+METRICAS_VAZAO = ("requisicoes_por_segundo",)
+METRICAS_COMPARADAS = ("p50_ms", "p95_ms", "requisicoes_por_segundo")
+# Abaixo disso a variação entre execuções é ruído, não regressão
+MINIMO_MS = 0.5
+
+
+def percentil(valores: Sequence[float], fracao: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * fracao))]
+
+
+def resumir_latencias(latencias: Sequence[float]) -> Dict[str, float]:
+    """p50/p95/p99 e média, em milissegundos, de latências em segundos"""
+    return {
+        "amostras": len(latencias),
+        "p50_ms": round(statistics.median(latencias) * 1000, 3),
+        "p95_ms": round(percentil(latencias, 0.95) * 1000, 3),
+        "p99_ms": round(percentil(latencias, 0.99) * 1000, 3),
+        "media_ms": round(statistics.fmean(latencias) * 1000, 3),
+    }
+
+
+def medir(funcao, repeticoes: int, aquecimento: int = 1) -> Dict[str, float]:
+    for _ in range(aquecimento):
+        funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return resumir_latencias(tempos)
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def ambiente() -> Dict[str, str]:
+    return {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "maquina": platform.node(),
+        **{
+            nome: os.getenv(nome, "")
+            for nome in ("DB_MODO", "ARMAZENAMENTO_NOTAS", "BANCO_DADOS")
+        },
+    }
+
+
+def salvar(
+    caminho: str, benchmark: str, parametros: Dict[str, Any],
+    medidas: Dict[str, Dict[str, float]],
+) -> Dict[str, Any]:
+    resultado = {
+        "benchmark": benchmark,
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "parametros": parametros,
+        "ambiente": ambiente(),
+        "medidas": medidas,
+    }
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+    return resultado
+
+
+def carregar(caminho: str) -> Dict[str, Any]:
+    with open(caminho, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def comparar(
+    base: Dict[str, Any], atual: Dict[str, Any], limite: float = 0.1,
+    metricas_comparadas: Sequence[str] = METRICAS_COMPARADAS,
+) -> List[Dict[str, Any]]:
+    """Uma linha por métrica comparada presente nas duas execuções, com a
+    variação e se é uma regressão (piorou mais que `limite`)"""
+    linhas = []
+    for medida, metricas in atual["medidas"].items():
+        anteriores = base["medidas"].get(medida, {})
+        for metrica, valor in metricas.items():
+            anterior = anteriores.get(metrica)
+            if anterior is None or metrica not in metricas_comparadas:
+                continue
+            vazao = metrica in METRICAS_VAZAO
+            variacao = (valor - anterior) / anterior if anterior else 0.0
+            if vazao:
+                regressao = variacao < -limite
+            else:
+                regressao = variacao > limite and valor - anterior >= MINIMO_MS
+            linhas.append({
+                "medida": medida,
+                "metrica": metrica,
+                "base": anterior,
+                "atual": valor,
+                "variacao": round(variacao, 4),
+                "regressao": regressao,
+            })
+    return linhas
+
+
+def imprimir_comparacao(linhas: List[Dict[str, Any]], limite: float) -> bool:
+    """Imprime a comparação; devolve se houve regressão"""
+    regressoes = [linha for linha in linhas if linha["regressao"]]
+    for linha in linhas:
+        marca = "  REGRESSÃO" if linha["regressao"] else ""
+        print(
+            f"{linha['medida']:>52} {linha['metrica']:>24} "
+            f"{linha['base']:>12} -> {linha['atual']:<12} {linha['variacao']:+8.1%}{marca}"
+        )
+    print(f"{len(regressoes)} regressões acima de {limite:.0%} em {len(linhas)} métricas")
+    return bool(regressoes)
+
+
+def conferir_base(
+    caminho_base: str, atual: Dict[str, Any], limite: float,
+    metricas_comparadas: Sequence[str] = METRICAS_COMPARADAS,
+) -> None:
+    """Compara com a base e sai com código 1 se houve regressão (usado pelo
+    --base dos benchmarks)"""
+    base = carregar(caminho_base)
+    if base["benchmark"] != atual["benchmark"]:
+        raise ValueError(
+            f"A base é do benchmark {base['benchmark']}, não de {atual['benchmark']}"
+        )
+    if imprimir_comparacao(comparar(base, atual, limite, metricas_comparadas), limite):
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("atual")
+    parser.add_argument("--limite", type=float, default=0.1)
+    parser.add_argument("--metricas", default=",".join(METRICAS_COMPARADAS))
+    args = parser.parse_args()
+
+    conferir_base(args.base, carregar(args.atual), args.limite, args.metricas.split(","))
+
+
+if __name__ == "__main__":
+    main()
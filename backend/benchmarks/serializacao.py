@@ -0,0 +1,111 @@
+"""Benchmark da serialização da listagem: validação completa x caminho rápido.
+
+    python -m backend.benchmarks.serializacao --estudantes 10000
+
+Não usa o banco: parte de linhas no formato que a query devolve (NUMERIC
+como Decimal) e mede a conversão das linhas e a geração do corpo da resposta.
+
+- antes (e VALIDACAO_ESTRITA): row_para_estudante por linha, depois
+  response_model (validação + jsonable_encoder) e json.dumps
+- depois: row_para_dict por linha e RespostaJSON (orjson)
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from backend.benchmarks.importacao import gerar_linhas
+from backend.controller.respostaJson import RespostaJSON
+from backend.model.estudante import Estudante
+from backend.service.estudanteService import row_para_dict, row_para_estudante
+
+
+def gerar_rows(quantidade: int, semente: int = 42):
+    return [
+        {
+            "id": f"{i:08d}-0000-0000-0000-000000000000",
+            "nome": linha["nome"],
+            "notas": [Decimal(str(nota)) for nota in linha["notas"]],
+            "frequencia": Decimal(str(linha["frequencia"])),
+        }
+        for i, linha in enumerate(gerar_linhas(quantidade, semente))
+    ]
+
+
+def _construir_antes(rows) -> List[Estudante]:
+    return [row_para_estudante(row) for row in rows]
+
+
+def _serializar_antes(estudantes, campo) -> bytes:
+    conteudo = asyncio.run(
+        serialize_response(field=campo, response_content=estudantes, is_coroutine=True)
+    )
+    return JSONResponse(conteudo).body
+
+
+def _construir_depois(rows) -> List[Dict[str, Any]]:
+    return [row_para_dict(row) for row in rows]
+
+
+def _serializar_depois(estudantes) -> bytes:
+    return RespostaJSON(estudantes).body
+
+
+def _medir(funcao, repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--estudantes", type=int, default=10000)
+    parser.add_argument("--repeticoes", type=int, default=10)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    rows = gerar_rows(args.estudantes, args.semente)
+    campo = create_response_field(name="estudantes", type_=List[Estudante])
+
+    validados = _construir_antes(rows)
+    construidos = _construir_depois(rows)
+    # Os dois caminhos precisam gerar o mesmo JSON (a menos de espaços)
+    assert json.loads(_serializar_antes(validados, campo)) == json.loads(
+        _serializar_depois(construidos)
+    )
+
+    resultados = {
+        "antes": (
+            _medir(lambda: _construir_antes(rows), args.repeticoes),
+            _medir(lambda: _serializar_antes(validados, campo), args.repeticoes),
+        ),
+        "depois": (
+            _medir(lambda: _construir_depois(rows), args.repeticoes),
+            _medir(lambda: _serializar_depois(construidos), args.repeticoes),
+        ),
+    }
+
+    print(f"{args.estudantes} estudantes, mediana de {args.repeticoes} execuções")
+    for nome, (construcao, serializacao) in resultados.items():
+        print(
+            f"{nome:>6}: linhas {construcao * 1000:7.1f} ms  "
+            f"serialização {serializacao * 1000:7.1f} ms  "
+            f"total {(construcao + serializacao) * 1000:7.1f} ms"
+        )
+    total_antes, total_depois = (sum(tempos) for tempos in resultados.values())
+    print(f"ganho: {total_antes / total_depois:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Microbenchmarks do EstudanteService: latência de cada método público.
+
+    python -m backend.benchmarks.servico --estudantes 10000 --saida servico.json
+    python -m backend.benchmarks.servico --turma <turma_id> --base servico.json
+
+Gera a turma com backend.benchmarks.dados (ou usa --turma) no banco de
+DATABASE_URL e mede cada método --repeticoes vezes, depois de uma execução
+de aquecimento: p50/p95/p99 e média em ms. Os relatórios são medidos com
+usar_cache=False e obter_estudante_por_id sem o cache de estudantes, para
+medir o cálculo e as consultas, não o cache. As leituras vêm antes das
+escritas, que acrescentam estudantes próprios à turma, removidos no final.
+
+Com --base, compara com um resultado anterior e sai com código 1 se algum
+método piorou mais que --limite (ver backend.benchmarks.resultados).
+"""
+
+import argparse
+import itertools
+import random
+from contextlib import nullcontext
+from typing import Callable, Dict, List
+from uuid import uuid4
+
+from backend.benchmarks import resultados
+from backend.benchmarks.dados import turma_gerada
+from backend.database.db import get_cursor
+from backend.model.estudante import AtualizarEstudante, CriarEstudante
+from backend.service.cacheEstudantes import CacheEstudantes
+from backend.service.estudanteService import EstudanteService
+from backend.service.relatorioService import CacheRelatorios
+
+TAMANHO_IMPORTACAO = 1000
+
+
+def metodos(service: EstudanteService, turma_id: str, ids: List[str], prefixo: str,
+            semente: int = 42) -> Dict[str, Callable[[], object]]:
+    """Método -> chamada medida, na ordem de execução. Os estudantes escritos
+    têm nomes começando com `prefixo`"""
+    sorteados = itertools.cycle(random.Random(semente).sample(ids, min(len(ids), 1000)))
+    estudante = service.obter_estudante_por_id(ids[0], turma_id)
+    novos = itertools.count()
+    criados: List[str] = []
+
+    def criar():
+        criados.append(service.criar_estudante(CriarEstudante(
+            nome=f"{prefixo} criado {next(novos)}", notas=[7.5] * 5, frequencia=80.0,
+        ), turma_id).id)
+
+    def atualizar():
+        service.atualizar_estudante(criados[-1], AtualizarEstudante(
+            nome=f"{prefixo} atualizado {next(novos)}", notas=[6.0] * 5, frequencia=70.0,
+        ), turma_id)
+
+    def importar():
+        lote = next(novos)
+        service.importar_estudantes([
+            {"nome": f"{prefixo} importado {lote}-{i}", "notas": [8.0] * 5, "frequencia": 90.0}
+            for i in range(TAMANHO_IMPORTACAO)
+        ], turma_id)
+
+    return {
+        "listar_estudantes": lambda: service.listar_estudantes(turma_id=turma_id),
+        "listar_estudantes(como_dict)": lambda: service.listar_estudantes(
+            como_dict=True, turma_id=turma_id
+        ),
+        "listar_estudantes_paginado": lambda: service.listar_estudantes_paginado(
+            50, turma_id=turma_id, ordenar="media", decrescente=True
+        ),
+        "obter_estudante_por_id": lambda: service.obter_estudante_por_id(
+            next(sorteados), turma_id
+        ),
+        "listar_disciplinas": lambda: service.listar_disciplinas(turma_id),
+        "exportar_estudantes": lambda: sum(
+            len(lote) for lote in service.exportar_estudantes(turma_id=turma_id)
+        ),
+        "calcular_media_estudante": lambda: service.calcular_media_estudante(estudante),
+        "calcular_media_turma_por_disciplina": lambda: (
+            service.calcular_media_turma_por_disciplina(usar_cache=False, turma_id=turma_id)
+        ),
+        "calcular_media_turma": lambda: service.calcular_media_turma(
+            usar_cache=False, turma_id=turma_id
+        ),
+        "obter_estudantes_acima_da_media": lambda: service.obter_estudantes_acima_da_media(
+            usar_cache=False, turma_id=turma_id
+        ),
+        "obter_estudantes_com_baixa_frequencia": lambda: (
+            service.obter_estudantes_com_baixa_frequencia(usar_cache=False, turma_id=turma_id)
+        ),
+        "gerar_relatorio": lambda: service.gerar_relatorio(usar_cache=False, turma_id=turma_id),
+        "gerar_painel": lambda: service.gerar_painel(usar_cache=False, turma_id=turma_id),
+        "gerar_estatisticas": lambda: service.gerar_estatisticas(
+            usar_cache=False, turma_id=turma_id
+        ),
+        "criar_estudante": criar,
+        "atualizar_estudante": atualizar,
+        "remover_estudante": lambda: service.remover_estudante(criados.pop(), turma_id),
+        f"importar_estudantes({TAMANHO_IMPORTACAO})": importar,
+    }
+
+
+def executar(turma_id: str, ids: List[str], repeticoes: int, semente: int = 42,
+             filtro: str = "") -> Dict[str, Dict[str, float]]:
+    service = EstudanteService(cache=CacheRelatorios(CacheEstudantes(tamanho=0)))
+    prefixo = f"Benchmark {uuid4().hex[:8]}"
+    medidas = {}
+    try:
+        for nome, funcao in metodos(service, turma_id, ids, prefixo, semente).items():
+            if filtro in nome:
+                medidas[f"EstudanteService.{nome}"] = resultados.medir(funcao, repeticoes)
+    finally:
+        # A turma volta a ter só os estudantes gerados
+        with get_cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM estudantes WHERE turma_id = %s AND nome LIKE %s",
+                (turma_id, f"{prefixo} %"),
+            )
+    return medidas
+
+
+def _ids_da_turma(turma_id: str) -> List[str]:
+    with get_cursor() as cursor:
+        cursor.execute("SELECT id FROM estudantes WHERE turma_id = %s", (turma_id,))
+        return [row["id"] for row in cursor.fetchall()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--estudantes", type=int, default=10000)
+    parser.add_argument("--turma", help="turma já gerada (ver backend.benchmarks.dados)")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--metodos", default="", help="só os métodos que contêm o texto")
+    parser.add_argument("--saida", help="arquivo JSON do resultado")
+    parser.add_argument("--base", help="resultado anterior para comparar")
+    parser.add_argument("--limite", type=float, default=0.1)
+    args = parser.parse_args()
+
+    contexto = nullcontext() if args.turma else turma_gerada(args.estudantes, args.semente)
+    with contexto as gerada:
+        turma_id = args.turma or gerada.turma_id
+        ids = _ids_da_turma(turma_id) if args.turma else gerada.ids
+        medidas = executar(turma_id, ids, args.repeticoes, args.semente, args.metodos)
+
+    parametros = {
+        "estudantes": len(ids),
+        "repeticoes": args.repeticoes,
+        "semente": args.semente,
+    }
+    print(f"{parametros['estudantes']} estudantes, {args.repeticoes} execuções por método")
+    print(f"{'':>52}{'p50':>11}{'p95':>11}{'p99':>11}")
+    for nome, medida in medidas.items():
+        print(
+            f"{nome:>52}{medida['p50_ms']:>8.2f} ms{medida['p95_ms']:>8.2f} ms"
+            f"{medida['p99_ms']:>8.2f} ms"
+        )
+
+    atual = {"benchmark": "servico", "parametros": parametros, "medidas": medidas}
+    if args.saida:
+        atual = resultados.salvar(args.saida, "servico", parametros, medidas)
+    if args.base:
+        resultados.conferir_base(args.base, atual, args.limite)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# Leituras no primário por requisição (ver backend/database/replicas.py)
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from backend.database.replicas import encerrar_leitura_no_primario, ler_do_primario
+
+CABECALHO_CONSISTENCIA = b"x-consistencia-leitura"
+
+
+class MiddlewareConsistencia:
+    """Com o cabeçalho `X-Consistencia-Leitura: primario`, as leituras da
+    requisição vão para o primário em vez de uma réplica.
+
+    É a opção de ler as próprias escritas por requisição: o cliente que
+    acabou de escrever (talvez em outro processo da API, cuja escrita este
+    não viu) não recebe uma réplica atrasada. Sem o cabeçalho, a escolha
+    fica com get_cursor_leitura.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._primario(scope):
+            await self.app(scope, receive, send)
+            return
+
+        token = ler_do_primario()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            encerrar_leitura_no_primario(token)
+
+    @staticmethod
+    def _primario(scope: Scope) -> bool:
+        for nome, valor in scope["headers"]:
+            if nome == CABECALHO_CONSISTENCIA:
+                return valor.strip().lower() == b"primario"
+        return False
@@ -1,43 +1,307 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+import hashlib
+import json
+import os
 
-from backend.model.estudante import AtualizarEstudante, CriarEstudante, Estudante
-from backend.service.estudanteService import estudante_service
+import orjson
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Any, List, Optional, Union
+
+from backend.controller.respostaJson import RespostaJSON
+from backend.model.estudante import (
+    AtualizarEstudante,
+    CriarEstudante,
+    Estudante,
+    PaginaEstudantes,
+)
+from backend.model.turma import TURMA_PADRAO
+from backend.service.estudanteService import (
+    ERRO_TURMA_INEXISTENTE,
+    LIMITE_PADRAO,
+    TAMANHO_LOTE_EXPORTACAO,
+    VALIDACAO_ESTRITA,
+    QuantidadeNotasInvalida,
+    escrever_csv_estudantes,
+    ler_csv_estudantes,
+)
+from backend.service.estudanteServiceAsync import (
+    ServicoEmThreadpool,
+    estudante_service_async,
+)
+from backend.service.relatorioService import secoes_painel
+from backend.service.servicos import BANCO_DADOS, estudante_service
+from backend.service.snapshotService import snapshots_relatorios
+
+# "async": driver assíncrono, concorrência limitada pelo pool de conexões
+# "sync": psycopg2 no threadpool do Starlette (comportamento original). Com
+# os bancos embutidos (BANCO_DADOS=memoria ou sqlite), sempre "sync"
+DB_MODO = os.getenv("DB_MODO", "sync").lower()
+if DB_MODO == "async" and BANCO_DADOS != "postgres":
+    raise ValueError("DB_MODO=async só pode ser usado com BANCO_DADOS=postgres.")
+
+servico = (
+    estudante_service_async
+    if DB_MODO == "async"
+    else ServicoEmThreadpool(estudante_service)
+)
 
 router = APIRouter()
 
 
+async def _resposta_condicional(
+    request: Request, response: Response, revalidar: bool = True
+) -> Optional[Response]:
+    """ETag forte derivado da versão dos dados da turma no banco (turmas.versao);
+    responde 304 se o cliente já tem essa versão, com uma consulta pela chave
+    primária e antes de qualquer cálculo no serviço. Como a versão vem do
+    banco, todos os processos da API dão o mesmo ETag para os mesmos dados, e
+    uma escrita feita em qualquer um deles muda o ETag em todos.
+
+    A versão é lida antes do cálculo: se uma escrita acontecer no meio, o ETag
+    enviado fica desatualizado e a próxima requisição recebe 200, nunca um 304
+    com dados velhos.
+
+    revalidar=False (pedidos que forçam o recálculo, como usar_cache=false)
+    nunca responde 304, mas envia o ETag do resultado.
+    """
+    turma_id = request.query_params.get("turma_id", TURMA_PADRAO)
+    versao = await servico.versao_dados(turma_id)
+    chave = f"{versao}:{request.url.path}?{request.url.query}"
+    etag = f'"{hashlib.sha1(chave.encode("utf-8")).hexdigest()}"'
+    cabecalhos = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    enviados = {valor.strip() for valor in if_none_match.split(",")}
+    if revalidar and (etag in enviados or if_none_match == "*"):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabecalhos)
+
+    response.headers.update(cabecalhos)
+    return None
+
+
+def _json(conteudo: Any, response: Response) -> Any:
+    """Resposta das leituras: orjson direto, sem revalidar pelo response_model.
+    Com VALIDACAO_ESTRITA devolve o conteúdo para o caminho padrão do FastAPI.
+    """
+    if VALIDACAO_ESTRITA:
+        return conteudo
+    # Os cabeçalhos de `response` (ETag) não se aplicam a uma Response retornada
+    return RespostaJSON(conteudo, headers=dict(response.headers))
+
+
+# Todas as rotas de estudantes e relatórios recebem ?turma_id= (padrão: a
+# turma criada por schema.sql) e só leem ou alteram dados dessa turma
+
 @router.post("/estudantes", response_model=Estudante, status_code=status.HTTP_201_CREATED)
-def criar_estudante(estudante: CriarEstudante):
+async def criar_estudante(estudante: CriarEstudante, turma_id: str = TURMA_PADRAO):
+    try:
+        return await servico.criar_estudante(estudante, turma_id=turma_id)
+    except QuantidadeNotasInvalida as erro:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(erro),
+        ) from erro
+    except ValueError as erro:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(erro),
+        ) from erro
+    except LookupError as erro:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(erro),
+        ) from erro
+
+
+@router.post("/estudantes/importar")
+async def importar_estudantes(request: Request, turma_id: str = TURMA_PADRAO):
+    """Importa uma turma: array JSON de estudantes ou CSV (Content-Type: text/csv)
+    com cabeçalho nome,nota1,...,notaN,frequencia (uma nota por disciplina da turma)"""
+    bruto = await request.body()
     try:
-        return estudante_service.criar_estudante(estudante)
+        # UnicodeDecodeError é um ValueError: corpo fora de UTF-8 também é 400
+        corpo = bruto.decode("utf-8-sig")
+        if request.headers.get("content-type", "").startswith("text/csv"):
+            linhas = ler_csv_estudantes(corpo)
+        else:
+            linhas = json.loads(corpo)
+    except (ValueError, KeyError) as erro:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Conteúdo inválido para importação: {erro}",
+        ) from erro
+
+    if not isinstance(linhas, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A importação espera uma lista de estudantes.",
+        )
+
+    # COPY só existe no driver síncrono; roda no threadpool nos dois modos
+    try:
+        return await run_in_threadpool(
+            estudante_service.importar_estudantes, linhas, turma_id
+        )
     except ValueError as erro:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=str(erro),
         ) from erro
+    except LookupError as erro:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(erro),
+        ) from erro
 
 
-@router.get("/estudantes", response_model=List[Estudante])
-def listar_estudantes():
-    return estudante_service.listar_estudantes()
+@router.get("/estudantes", response_model=Union[PaginaEstudantes, List[Estudante]])
+async def listar_estudantes(
+    request: Request,
+    response: Response,
+    limite: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    nome_prefixo: Optional[str] = None,
+    frequencia_min: Optional[float] = None,
+    frequencia_max: Optional[float] = None,
+    media_min: Optional[float] = None,
+    media_max: Optional[float] = None,
+    ordenar: str = Query("nome", pattern="^(nome|media|frequencia)$"),
+    decrescente: bool = False,
+    turma_id: str = TURMA_PADRAO,
+):
+    nao_modificado = await _resposta_condicional(request, response)
+    if nao_modificado:
+        return nao_modificado
+
+    filtros = {
+        "cursor": cursor,
+        "nome_prefixo": nome_prefixo,
+        "frequencia_min": frequencia_min,
+        "frequencia_max": frequencia_max,
+        "media_min": media_min,
+        "media_max": media_max,
+    }
+    # Sem parâmetros: lista completa, como antes da paginação
+    if limite is None and ordenar == "nome" and not decrescente and all(
+        valor is None for valor in filtros.values()
+    ):
+        return _json(
+            await servico.listar_estudantes(
+                como_dict=not VALIDACAO_ESTRITA, turma_id=turma_id
+            ),
+            response,
+        )
+
+    try:
+        pagina = await servico.listar_estudantes_paginado(
+            limite or LIMITE_PADRAO,
+            como_dict=not VALIDACAO_ESTRITA,
+            turma_id=turma_id,
+            ordenar=ordenar,
+            decrescente=decrescente,
+            **filtros,
+        )
+    except ValueError as erro:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(erro),
+        ) from erro
+    return _json(pagina, response)
+
+
+def _formatar_lote(lote, formato: str) -> bytes:
+    if formato == "csv":
+        return escrever_csv_estudantes(lote).encode("utf-8")
+    return b"".join(orjson.dumps(linha) + b"\n" for linha in lote)
+
+
+@router.get("/estudantes/exportar")
+async def exportar_estudantes(
+    formato: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    lote: int = Query(TAMANHO_LOTE_EXPORTACAO, ge=1, le=10000),
+    turma_id: str = TURMA_PADRAO,
+):
+    """Todos os estudantes com a média, em fluxo (NDJSON ou CSV).
+
+    Lê de um cursor no servidor, um lote por vez, e envia cada lote assim que
+    chega: a memória não depende do número de estudantes.
+    """
+    # Turma inexistente (catálogo vazio) é 404 antes de a resposta começar,
+    # como nas outras rotas da turma
+    disciplinas = await servico.listar_disciplinas(turma_id)
+    if not disciplinas:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERRO_TURMA_INEXISTENTE,
+        )
+
+    # O cabeçalho do CSV (uma coluna por disciplina da turma) sai antes da
+    # consulta, como primeiro byte da resposta
+    cabecalho = (
+        escrever_csv_estudantes([], total_notas=len(disciplinas)).encode("utf-8")
+        if formato == "csv"
+        else b""
+    )
+
+    # A exportação é um gerador, então não passa pelo ServicoEmThreadpool:
+    # no modo síncrono o StreamingResponse já consome cada lote no threadpool
+    if DB_MODO == "async":
+        lotes = estudante_service_async.exportar_estudantes(lote, turma_id)
+
+        async def conteudo():
+            if cabecalho:
+                yield cabecalho
+            async for linhas in lotes:
+                yield _formatar_lote(linhas, formato)
+    else:
+        lotes = estudante_service.exportar_estudantes(lote, turma_id)
+
+        def conteudo():
+            if cabecalho:
+                yield cabecalho
+            for linhas in lotes:
+                yield _formatar_lote(linhas, formato)
+
+    tipo = "text/csv" if formato == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        conteudo(),
+        media_type=tipo,
+        headers={"Content-Disposition": f'attachment; filename="estudantes.{formato}"'},
+    )
 
 
 @router.get("/estudantes/{estudante_id}", response_model=Estudante)
-def obter_estudante(estudante_id: str):
-    estudante = estudante_service.obter_estudante_por_id(estudante_id)
+async def obter_estudante(
+    estudante_id: str, request: Request, response: Response, turma_id: str = TURMA_PADRAO
+):
+    nao_modificado = await _resposta_condicional(request, response)
+    if nao_modificado:
+        return nao_modificado
+
+    estudante = await servico.obter_estudante_por_id(estudante_id, turma_id=turma_id)
     if not estudante:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Aluno não encontrado",
         )
-    return estudante
+    return _json(estudante, response)
 
 
 @router.put("/estudantes/{estudante_id}", response_model=Estudante)
-def atualizar_estudante(estudante_id: str, dados_estudante: AtualizarEstudante):
+async def atualizar_estudante(
+    estudante_id: str, dados_estudante: AtualizarEstudante, turma_id: str = TURMA_PADRAO
+):
     try:
-        estudante = estudante_service.atualizar_estudante(estudante_id, dados_estudante)
+        estudante = await servico.atualizar_estudante(
+            estudante_id, dados_estudante, turma_id=turma_id
+        )
+    except QuantidadeNotasInvalida as erro:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(erro),
+        ) from erro
     except ValueError as erro:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -52,8 +316,8 @@ def atualizar_estudante(estudante_id: str, dados_estudante: AtualizarEstudante):
 
 
 @router.delete("/estudantes/{estudante_id}", status_code=status.HTTP_204_NO_CONTENT)
-def remover_estudante(estudante_id: str):
-    if not estudante_service.remover_estudante(estudante_id):
+async def remover_estudante(estudante_id: str, turma_id: str = TURMA_PADRAO):
+    if not await servico.remover_estudante(estudante_id, turma_id=turma_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Aluno não encontrado",
@@ -61,28 +325,189 @@ def remover_estudante(estudante_id: str):
     return None
 
 
+# usar_cache=false ignora o cache de relatórios e recalcula a partir do banco
 @router.get("/relatorios")
-def gerar_relatorio():
-    return estudante_service.gerar_relatorio()
+async def gerar_relatorio(
+    request: Request,
+    response: Response,
+    usar_cache: bool = True,
+    turma_id: str = TURMA_PADRAO,
+):
+    nao_modificado = await _resposta_condicional(request, response, revalidar=usar_cache)
+    if nao_modificado:
+        return nao_modificado
+
+    return _json(
+        await servico.gerar_relatorio(usar_cache=usar_cache, turma_id=turma_id), response
+    )
 
 
 @router.get("/relatorios/media-turma")
-def obter_media_turma():
-    return {"media_turma": estudante_service.calcular_media_turma()}
+async def obter_media_turma(
+    request: Request,
+    response: Response,
+    usar_cache: bool = True,
+    turma_id: str = TURMA_PADRAO,
+):
+    nao_modificado = await _resposta_condicional(request, response, revalidar=usar_cache)
+    if nao_modificado:
+        return nao_modificado
+
+    return _json(
+        {
+            "media_turma": await servico.calcular_media_turma(
+                usar_cache=usar_cache, turma_id=turma_id
+            )
+        },
+        response,
+    )
 
 
 @router.get("/relatorios/medias-por-disciplina")
-def obter_medias_por_disciplina():
-    return {"medias_por_disciplina": estudante_service.calcular_media_turma_por_disciplina()}
+async def obter_medias_por_disciplina(
+    request: Request,
+    response: Response,
+    usar_cache: bool = True,
+    turma_id: str = TURMA_PADRAO,
+):
+    nao_modificado = await _resposta_condicional(request, response, revalidar=usar_cache)
+    if nao_modificado:
+        return nao_modificado
+
+    return _json(
+        {
+            "medias_por_disciplina": await servico.calcular_media_turma_por_disciplina(
+                usar_cache=usar_cache, turma_id=turma_id
+            )
+        },
+        response,
+    )
 
 
 @router.get("/relatorios/estudantes-acima-da-media")
-def obter_estudantes_acima_da_media():
-    return {"estudantes": estudante_service.obter_estudantes_acima_da_media()}
+async def obter_estudantes_acima_da_media(
+    request: Request,
+    response: Response,
+    usar_cache: bool = True,
+    turma_id: str = TURMA_PADRAO,
+):
+    nao_modificado = await _resposta_condicional(request, response, revalidar=usar_cache)
+    if nao_modificado:
+        return nao_modificado
+
+    return _json(
+        {
+            "estudantes": await servico.obter_estudantes_acima_da_media(
+                usar_cache=usar_cache, turma_id=turma_id
+            )
+        },
+        response,
+    )
 
 
 @router.get("/relatorios/estudantes-com-baixa-frequencia")
-def obter_estudantes_com_baixa_frequencia():
-    return {
-        "estudantes": estudante_service.obter_estudantes_com_baixa_frequencia()
-    }
\ No newline at end of file
+async def obter_estudantes_com_baixa_frequencia(
+    request: Request,
+    response: Response,
+    usar_cache: bool = True,
+    turma_id: str = TURMA_PADRAO,
+):
+    nao_modificado = await _resposta_condicional(request, response, revalidar=usar_cache)
+    if nao_modificado:
+        return nao_modificado
+
+    return _json(
+        {
+            "estudantes": await servico.obter_estudantes_com_baixa_frequencia(
+                usar_cache=usar_cache, turma_id=turma_id
+            )
+        },
+        response,
+    )
+
+
+@router.get("/relatorios/snapshot")
+async def obter_relatorio_snapshot(
+    request: Request,
+    response: Response,
+    recalcular: bool = False,
+    turma_id: str = TURMA_PADRAO,
+):
+    """Último relatório pré-calculado da turma (ver snapshotService), com
+    gerado_em, idade_segundos e se houve escrita depois dele (atualizado).
+    recalcular=true gera um novo na hora. O primeiro pedido de uma turma
+    também calcula na hora; os seguintes só leem a versão dos dados (ETag).
+
+    Só um snapshot atualizado leva o ETag: um de antes da última escrita é
+    trocado pelo recálculo sem que a versão dos dados mude, e um 304 manteria
+    o cliente com o antigo."""
+    nao_modificado = await _resposta_condicional(request, response, revalidar=not recalcular)
+    if nao_modificado:
+        return nao_modificado
+
+    snapshot = None if recalcular else snapshots_relatorios.em_memoria(turma_id)
+    if snapshot is None:
+        try:
+            snapshot = await run_in_threadpool(snapshots_relatorios.obter, turma_id, recalcular)
+        except LookupError as erro:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=str(erro),
+            ) from erro
+
+    cabecalhos = dict(response.headers)
+    if not snapshots_relatorios.atualizado(snapshot):
+        cabecalhos.pop("etag", None)
+    return Response(
+        snapshots_relatorios.corpo(snapshot),
+        media_type="application/json",
+        headers=cabecalhos,
+    )
+
+
+@router.get("/relatorios/estatisticas")
+async def obter_estatisticas(
+    request: Request,
+    response: Response,
+    usar_cache: bool = True,
+    turma_id: str = TURMA_PADRAO,
+):
+    """Mediana, desvio padrão e percentis das médias e da frequência,
+    histograma e aprovação por disciplina, aprovados/reprovados e ranking"""
+    nao_modificado = await _resposta_condicional(request, response, revalidar=usar_cache)
+    if nao_modificado:
+        return nao_modificado
+
+    return _json(
+        await servico.gerar_estatisticas(usar_cache=usar_cache, turma_id=turma_id), response
+    )
+
+
+@router.get("/painel")
+async def obter_painel(
+    request: Request,
+    response: Response,
+    include: Optional[str] = None,
+    usar_cache: bool = True,
+    turma_id: str = TURMA_PADRAO,
+):
+    """Seções do painel em uma só resposta, calculadas de uma única leitura.
+    include: lista separada por vírgulas (estudantes, total_estudantes,
+    media_turma, medias_por_disciplina, acima_da_media, baixa_frequencia);
+    ausente retorna todas."""
+    try:
+        secoes = secoes_painel(include)
+    except ValueError as erro:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(erro),
+        ) from erro
+
+    nao_modificado = await _resposta_condicional(request, response, revalidar=usar_cache)
+    if nao_modificado:
+        return nao_modificado
+
+    return _json(
+        await servico.gerar_painel(secoes, usar_cache=usar_cache, turma_id=turma_id),
+        response,
+    )
@@ -0,0 +1,120 @@
+# Métricas por requisição (ver backend/database/metricas.py)
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.database.db import metricas_pool, metricas_replicas
+from backend.database.dbAsync import metricas_pool_async, metricas_replicas_async
+from backend.database.metricas import (
+    HTTP_BYTES,
+    HTTP_CONSULTAS,
+    HTTP_DURACAO,
+    HTTP_ESPERA_POOL,
+    HTTP_REQUISICOES,
+    HTTP_TEMPO_DB,
+    Medidor,
+    encerrar_medicao,
+    iniciar_medicao,
+    medicao_atual,
+    registro,
+)
+from backend.service.estudanteService import cache_relatorios
+
+# Requisições que não casaram com nenhuma rota (404) ficam juntas, para não
+# criar uma série por caminho
+ROTA_DESCONHECIDA = "desconhecida"
+
+
+def _conexoes_pools():
+    sync = metricas_pool()
+    async_ = metricas_pool_async()
+    valores = {}
+    if sync:
+        valores[("sync", "em_uso")] = sync["em_uso"]
+        valores[("sync", "ociosas")] = sync["ociosas"]
+    if async_:
+        valores[("async", "em_uso")] = async_["pool_size"] - async_["pool_available"]
+        valores[("async", "ociosas")] = async_["pool_available"]
+    for indice, replica in enumerate(metricas_replicas().get("pools", [])):
+        valores[(f"sync_replica_{indice}", "em_uso")] = replica["em_uso"]
+        valores[(f"sync_replica_{indice}", "ociosas")] = replica["ociosas"]
+    for indice, replica in enumerate(metricas_replicas_async().get("pools", [])):
+        em_uso = replica.get("pool_size", 0) - replica.get("pool_available", 0)
+        valores[(f"async_replica_{indice}", "em_uso")] = em_uso
+        valores[(f"async_replica_{indice}", "ociosas")] = replica.get("pool_available", 0)
+    return valores
+
+
+registro.registrar(Medidor(
+    "db_pool_conexoes", "Conexões abertas em cada pool", ("pool", "estado"), _conexoes_pools,
+))
+
+
+def _cache_estudantes():
+    metricas = cache_relatorios.estudantes.metricas()
+    return {
+        (evento,): metricas[evento]
+        for evento in ("acertos", "faltas", "despejos", "expirados", "invalidacoes")
+    }
+
+
+registro.registrar(Medidor(
+    "cache_estudantes_eventos",
+    "Leituras e descartes do cache de estudantes por id, desde o início do processo",
+    ("evento",),
+    _cache_estudantes,
+))
+registro.registrar(Medidor(
+    "cache_estudantes_guardados", "Estudantes no cache de estudantes por id", (),
+    lambda: {(): cache_relatorios.estudantes.metricas()["estudantes"]},
+))
+
+
+class MiddlewareMetricas:
+    """Mede cada requisição HTTP: duração (até o último byte do corpo, o que
+    inclui as respostas em fluxo), comandos SQL e tempo no banco, espera pelo
+    pool e bytes do corpo. Os rótulos usam o modelo da rota
+    (/api/estudantes/{estudante_id}), não o caminho.
+
+    Middleware ASGI puro: não passa o corpo por uma fila como o
+    BaseHTTPMiddleware, só conta os bytes enviados.
+    """
+
+    def __init__(self, app: ASGIApp, ignorar: tuple = ("/metrics",)):
+        self.app = app
+        self.ignorar = ignorar
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.ignorar:
+            await self.app(scope, receive, send)
+            return
+
+        token = iniciar_medicao(f"{scope['method']} {scope['path']}")
+        medicao = medicao_atual()
+        inicio = time.perf_counter()
+        status = 500
+        total_bytes = 0
+
+        async def enviar(mensagem: Message) -> None:
+            nonlocal status, total_bytes
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+            elif mensagem["type"] == "http.response.body":
+                total_bytes += len(mensagem.get("body", b""))
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracao = time.perf_counter() - inicio
+            encerrar_medicao(token)
+            # O FastAPI guarda a rota que atendeu a requisição no scope
+            rota = getattr(scope.get("route"), "path", ROTA_DESCONHECIDA)
+            rotulos = {"metodo": scope["method"], "rota": rota}
+            HTTP_REQUISICOES.incrementar(status=str(status), **rotulos)
+            HTTP_DURACAO.observar(duracao, **rotulos)
+            HTTP_CONSULTAS.observar(medicao.consultas, **rotulos)
+            HTTP_TEMPO_DB.observar(medicao.tempo_db, **rotulos)
+            HTTP_ESPERA_POOL.observar(medicao.espera_pool, **rotulos)
+            HTTP_BYTES.observar(total_bytes, **rotulos)
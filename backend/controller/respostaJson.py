@@ -0,0 +1,26 @@
+# Respostas JSON serializadas com orjson
+
+from typing import Any, Dict
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+
+def _campos_modelo(objeto: Any) -> Dict[str, Any]:
+    # Chamado pelo orjson para o que ele não sabe serializar (modelos Pydantic,
+    # inclusive os aninhados, como os estudantes de PaginaEstudantes)
+    if isinstance(objeto, BaseModel):
+        return objeto.__dict__
+    raise TypeError(f"Tipo não serializável: {type(objeto).__name__}")
+
+
+class RespostaJSON(JSONResponse):
+    """Serializa o conteúdo direto com orjson.
+
+    Retornada pela rota, faz o FastAPI pular a validação e o jsonable_encoder
+    do response_model, que nas listas grandes custam mais que a consulta.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_campos_modelo)
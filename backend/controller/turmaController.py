@@ -0,0 +1,77 @@
+from fastapi import APIRouter, HTTPException, status
+from typing import List, Optional
+
+from backend.model.turma import CriarPeriodo, CriarTurma, Periodo, Turma
+from backend.service.estudanteServiceAsync import ServicoEmThreadpool
+from backend.service.servicos import turma_service
+
+# Cadastro de turmas e períodos é pouco frequente: roda no driver síncrono
+# (threadpool) nos dois valores de DB_MODO
+servico = ServicoEmThreadpool(turma_service)
+
+router = APIRouter()
+
+
+@router.post("/periodos", response_model=Periodo, status_code=status.HTTP_201_CREATED)
+async def criar_periodo(periodo: CriarPeriodo):
+    try:
+        return await servico.criar_periodo(periodo)
+    except ValueError as erro:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(erro),
+        ) from erro
+
+
+@router.get("/periodos", response_model=List[Periodo])
+async def listar_periodos():
+    return await servico.listar_periodos()
+
+
+@router.post("/turmas", response_model=Turma, status_code=status.HTTP_201_CREATED)
+async def criar_turma(turma: CriarTurma):
+    try:
+        return await servico.criar_turma(turma)
+    except ValueError as erro:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(erro),
+        ) from erro
+    except LookupError as erro:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(erro),
+        ) from erro
+
+
+@router.get("/turmas", response_model=List[Turma])
+async def listar_turmas(periodo_id: Optional[str] = None):
+    return await servico.listar_turmas(periodo_id)
+
+
+@router.get("/turmas/{turma_id}", response_model=Turma)
+async def obter_turma(turma_id: str):
+    turma = await servico.obter_turma(turma_id)
+    if not turma:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Turma não encontrada",
+        )
+    return turma
+
+
+@router.delete("/turmas/{turma_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def remover_turma(turma_id: str):
+    try:
+        removida = await servico.remover_turma(turma_id)
+    except ValueError as erro:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(erro),
+        ) from erro
+    if not removida:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Turma não encontrada",
+        )
+    return None
@@ -0,0 +1,188 @@
+# Formas de guardar as notas dos estudantes no banco
+
+import os
+from decimal import ROUND_HALF_UP, Decimal
+from typing import List, Optional, Tuple
+
+
+def arredondar_nota(nota: float) -> float:
+    """Nota com duas casas, arredondada como o NUMERIC(4, 2) da tabela notas"""
+    return float(Decimal(str(nota)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+
+
+class ArmazenamentoNotas:
+    """Layout das notas no banco, usado pelos repositórios PostgreSQL para montar as queries.
+
+    Só produz SQL e parâmetros (não executa nada), então serve tanto ao
+    repositório síncrono quanto ao assíncrono. As consultas usam o alias `e` para
+    estudantes.
+    """
+
+    nome = ""
+    # Colunas de estudantes gravadas junto com o estudante (INSERT, UPDATE e COPY)
+    colunas: Tuple[str, ...] = ()
+    # Média de cada disciplina de uma turma (parâmetro: turma_id)
+    sql_medias_por_disciplina = ""
+    # Copia as notas guardadas no outro layout para este, sem apagar nada;
+    # pode rodar mais de uma vez (ver migracaoNotas)
+    sql_migracao = ""
+    # Estudantes com notas no outro layout que este não tem (ou tem em outra
+    # quantidade): enquanto houver algum, o outro layout não pode ser apagado
+    sql_divergentes = ""
+    # Apaga as notas do outro layout, depois da migração
+    sql_limpeza = ""
+
+    def expressao_notas(self, alias: str = "e") -> str:
+        """Expressão SQL com o array de notas do estudante, em ordem de disciplina"""
+        raise NotImplementedError
+
+    def valores(self, notas: List[float]) -> tuple:
+        """Valores das `colunas` para execute()"""
+        return ()
+
+    def valores_copia(self, notas: List[float]) -> tuple:
+        """Valores das `colunas` no formato do COPY (CSV)"""
+        return ()
+
+    def comando_notas(
+        self, estudante_id: str, notas: List[float]
+    ) -> Optional[Tuple[str, tuple]]:
+        """Comando que grava as notas fora da linha do estudante, se houver"""
+        return None
+
+    def linhas_notas(self, estudante_id: str, notas: List[float]) -> List[tuple]:
+        """Linhas do COPY da tabela notas"""
+        return []
+
+
+class ArmazenamentoLinhas(ArmazenamentoNotas):
+    nome = "linhas"
+
+    # Grava todas as notas de um estudante em um único comando. O WHERE do
+    # DO UPDATE pula as disciplinas cuja nota não mudou, então elas não geram
+    # nova versão da linha (nem WAL)
+    UPSERT_NOTAS = """
+        INSERT INTO notas (estudante_id, disciplina, nota)
+        SELECT %s, novas.disciplina, novas.nota
+        FROM UNNEST(%s::integer[], %s::numeric[]) AS novas (disciplina, nota)
+        ON CONFLICT (estudante_id, disciplina)
+        DO UPDATE SET nota = EXCLUDED.nota
+        WHERE notas.nota IS DISTINCT FROM EXCLUDED.nota
+    """
+
+    sql_medias_por_disciplina = """
+        SELECT n.disciplina, AVG(n.nota) AS media
+        FROM notas n
+        JOIN estudantes e ON e.id = n.estudante_id
+        WHERE e.turma_id = %s
+        GROUP BY n.disciplina
+    """
+
+    sql_migracao = """
+        INSERT INTO notas (estudante_id, disciplina, nota)
+        SELECT e.id, d.disciplina, d.nota
+        FROM estudantes e, UNNEST(e.notas) WITH ORDINALITY AS d (nota, disciplina)
+        WHERE e.notas IS NOT NULL
+        ON CONFLICT (estudante_id, disciplina) DO NOTHING
+    """
+
+    sql_divergentes = """
+        SELECT COUNT(*) AS total
+        FROM estudantes e
+        WHERE e.notas IS NOT NULL
+          AND cardinality(e.notas) <> (
+              SELECT COUNT(*) FROM notas n WHERE n.estudante_id = e.id
+          )
+    """
+
+    sql_limpeza = "UPDATE estudantes SET notas = NULL WHERE notas IS NOT NULL"
+
+    def expressao_notas(self, alias: str = "e") -> str:
+        # Subconsulta pela PK de notas: um index scan por estudante lido, sem
+        # GROUP BY, então vale igual para uma página e para a turma inteira
+        return f"""ARRAY(
+            SELECT n.nota
+            FROM notas n
+            WHERE n.estudante_id = {alias}.id
+            ORDER BY n.disciplina
+        )"""
+
+    def comando_notas(
+        self, estudante_id: str, notas: List[float]
+    ) -> Optional[Tuple[str, tuple]]:
+        return self.UPSERT_NOTAS, (estudante_id, list(range(1, len(notas) + 1)), notas)
+
+    def linhas_notas(self, estudante_id: str, notas: List[float]) -> List[tuple]:
+        return [
+            (estudante_id, disciplina, nota)
+            for disciplina, nota in enumerate(notas, start=1)
+        ]
+
+
+class ArmazenamentoCompacto(ArmazenamentoNotas):
+    """Notas em estudantes.notas: a leitura de um estudante é uma linha só,
+    sem junção, e a escrita não toca outra tabela"""
+
+    nome = "compacto"
+    colunas = ("notas",)
+
+    # AVG sobre NUMERIC, como no modo linhas (o REAL volta como 7.3, não 7.30000019)
+    sql_medias_por_disciplina = """
+        SELECT d.disciplina, AVG(d.nota::numeric) AS media
+        FROM estudantes e, UNNEST(e.notas) WITH ORDINALITY AS d (nota, disciplina)
+        WHERE e.turma_id = %s
+        GROUP BY d.disciplina
+    """
+
+    sql_migracao = """
+        UPDATE estudantes e
+        SET notas = ARRAY(
+            SELECT n.nota
+            FROM notas n
+            WHERE n.estudante_id = e.id
+            ORDER BY n.disciplina
+        )
+        WHERE e.notas IS NULL
+    """
+
+    sql_divergentes = """
+        SELECT COUNT(*) AS total
+        FROM estudantes e
+        WHERE e.notas IS NULL
+           OR cardinality(e.notas) <> (
+              SELECT COUNT(*) FROM notas n WHERE n.estudante_id = e.id
+          )
+    """
+
+    sql_limpeza = "TRUNCATE notas"
+
+    def expressao_notas(self, alias: str = "e") -> str:
+        return f"{alias}.notas"
+
+    def valores(self, notas: List[float]) -> tuple:
+        return ([arredondar_nota(nota) for nota in notas],)
+
+    def valores_copia(self, notas: List[float]) -> tuple:
+        return ("{" + ",".join(str(nota) for nota in self.valores(notas)[0]) + "}",)
+
+
+ARMAZENAMENTOS = {
+    armazenamento.nome: armazenamento
+    for armazenamento in (ArmazenamentoLinhas, ArmazenamentoCompacto)
+}
+
+
+def armazenamento_configurado() -> ArmazenamentoNotas:
+    """Armazenamento escolhido pela variável ARMAZENAMENTO_NOTAS
+
+    "linhas" (padrão): tabela notas, uma linha por estudante e disciplina.
+    "compacto": coluna estudantes.notas (REAL[]), lida junto com o estudante.
+    Lida na chamada, depois que db.py carregou o .env.
+    """
+    nome = os.getenv("ARMAZENAMENTO_NOTAS", "linhas").lower()
+    if nome not in ARMAZENAMENTOS:
+        raise ValueError(
+            f"ARMAZENAMENTO_NOTAS inválido: {nome}. "
+            f"Aceitos: {', '.join(ARMAZENAMENTOS)}."
+        )
+    return ARMAZENAMENTOS[nome]()
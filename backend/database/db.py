@@ -1,56 +1,472 @@
 import os
-from typing import Optional
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+from uuid import uuid4
 import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
 from psycopg2.extras import RealDictCursor
-from psycopg2.pool import SimpleConnectionPool
+from psycopg2.pool import PoolError
 from contextlib import contextmanager
 from dotenv import load_dotenv
 
+from backend.database.metricas import DB_LEITURAS, registrar_consulta, registrar_espera_pool
+from backend.database.replicas import SeletorReplicas, leitura_no_primario
+
 load_dotenv()
 
 # Configuração do pool de conexões
 DATABASE_URL = os.getenv("DATABASE_URL")
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+# Tempo máximo (s) esperando uma conexão livre antes de desistir
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Idade máxima (s) de uma conexão antes de ser reciclada
+DB_POOL_MAX_IDADE = float(os.getenv("DB_POOL_MAX_IDADE", "1800"))
+# Conexões ociosas há mais tempo que isso (s) são testadas antes do uso
+DB_POOL_VALIDAR_APOS = float(os.getenv("DB_POOL_VALIDAR_APOS", "30"))
+
+# Réplicas de leitura (opcional): URLs separadas por vírgula. As leituras que
+# aceitam atraso de replicação (get_cursor_leitura) vão para elas; as
+# escritas e as demais leituras continuam em DATABASE_URL
+DATABASE_REPLICA_URLS = [
+    url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+# "rodizio" ou "menos_ocupada" (ver replicas.SeletorReplicas)
+DB_REPLICA_SELECAO = os.getenv("DB_REPLICA_SELECAO", "rodizio").lower()
+# Espera máxima (s) por uma conexão de réplica antes de passar para a próxima
+# (ou para o primário)
+DB_REPLICA_TIMEOUT = float(os.getenv("DB_REPLICA_TIMEOUT", "2"))
+# Tempo (s) que uma réplica que falhou fica fora da escolha
+DB_REPLICA_PAUSA = float(os.getenv("DB_REPLICA_PAUSA", "30"))
+# Depois de uma escrita numa turma, as leituras dela ficam no primário por
+# esse tempo (s), que deve cobrir o atraso das réplicas: quem escreveu lê a
+# própria escrita e os caches não guardam um resultado anterior a ela
+DB_REPLICA_JANELA_ESCRITA = float(os.getenv("DB_REPLICA_JANELA_ESCRITA", "5"))
+
+
+class CursorInstrumentado(RealDictCursor):
+    """RealDictCursor que mede cada comando (ver metricas.registrar_consulta)"""
+
+    def execute(self, query, vars=None):
+        inicio = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            registrar_consulta("psycopg2", query, time.perf_counter() - inicio)
+
+    def executemany(self, query, vars_list):
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            registrar_consulta("psycopg2", query, time.perf_counter() - inicio)
+
+    def copy_expert(self, sql, file, size=8192):
+        inicio = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            registrar_consulta("psycopg2", sql, time.perf_counter() - inicio)
+
+
+class PoolEsgotado(PoolError):
+    """Nenhuma conexão ficou livre dentro do tempo limite"""
+
+
+class PoolConexoes:
+    """Pool de conexões thread-safe para psycopg2.
+
+    Diferente do SimpleConnectionPool, pode ser usado por várias threads ao
+    mesmo tempo: quando todas as conexões estão em uso, getconn() espera até
+    `timeout` segundos por uma devolução em vez de falhar na hora. Conexões
+    fechadas, ociosas há muito tempo sem responder ou mais velhas que
+    `max_idade` são descartadas e substituídas.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        minconn: int = DB_POOL_MIN,
+        maxconn: int = DB_POOL_MAX,
+        timeout: float = DB_POOL_TIMEOUT,
+        max_idade: float = DB_POOL_MAX_IDADE,
+        validar_apos: float = DB_POOL_VALIDAR_APOS,
+    ):
+        if minconn < 0 or maxconn < max(minconn, 1):
+            raise ValueError("Tamanhos do pool inválidos: exige 0 <= min <= max e max >= 1")
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_idade = max_idade
+        self.validar_apos = validar_apos
+
+        # (conexão, instante da devolução), usada como pilha (LIFO)
+        self._ociosas: Deque[Tuple[Any, float]] = deque()
+        self._criada_em: Dict[int, float] = {}
+        self._total = 0
+        self._fechado = False
+        self._cond = threading.Condition()
+        self._contadores = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "conexoes_criadas": 0,
+            "conexoes_descartadas": 0,
+            "conexoes_recicladas": 0,
+            "tempo_espera_total_s": 0.0,
+            "tempo_espera_max_s": 0.0,
+        }
+
+    def _conectar(self):
+        conn = psycopg2.connect(self.dsn)
+        with self._cond:
+            self._criada_em[id(conn)] = time.monotonic()
+            self._contadores["conexoes_criadas"] += 1
+        return conn
+
+    def _descartar(self, conn, motivo: str = "conexoes_descartadas") -> None:
+        with self._cond:
+            self._criada_em.pop(id(conn), None)
+            self._contadores[motivo] += 1
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def _expirada(self, conn) -> bool:
+        criada_em = self._criada_em.get(id(conn), 0.0)
+        return time.monotonic() - criada_em > self.max_idade
+
+    def _valida(self, conn, devolvida_em: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - devolvida_em < self.validar_apos:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _liberar_vaga(self) -> None:
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+
+    @property
+    def em_uso(self) -> int:
+        with self._cond:
+            return self._total - len(self._ociosas)
+
+    def aquecer(self) -> None:
+        """Abre as conexões mínimas de uma vez, antes das primeiras requisições"""
+        while True:
+            with self._cond:
+                if self._fechado or self._total >= self.minconn:
+                    return
+                self._total += 1
+            try:
+                conn = self._conectar()
+            except Exception:
+                self._liberar_vaga()
+                raise
+            with self._cond:
+                self._ociosas.append((conn, time.monotonic()))
+                self._cond.notify()
+
+    def getconn(self):
+        inicio = time.monotonic()
+        prazo = inicio + self.timeout
+        conn = None
+
+        with self._cond:
+            while True:
+                if self._fechado:
+                    raise PoolError("pool de conexões fechado")
+                if self._ociosas:
+                    conn, devolvida_em = self._ociosas.pop()
+                    break
+                if self._total < self.maxconn:
+                    self._total += 1
+                    break
+                restante = prazo - time.monotonic()
+                if restante <= 0:
+                    self._contadores["timeouts"] += 1
+                    raise PoolEsgotado(
+                        f"Nenhuma conexão livre em {self.timeout}s "
+                        f"(máximo de {self.maxconn} conexões)"
+                    )
+                self._cond.wait(restante)
+
+            espera = time.monotonic() - inicio
+            self._contadores["checkouts"] += 1
+            self._contadores["tempo_espera_total_s"] += espera
+            self._contadores["tempo_espera_max_s"] = max(
+                self._contadores["tempo_espera_max_s"], espera
+            )
+
+        # Validação e criação acontecem fora do lock; a vaga já está reservada
+        if conn is not None:
+            if self._expirada(conn):
+                self._descartar(conn, "conexoes_recicladas")
+                conn = None
+            elif not self._valida(conn, devolvida_em):
+                self._descartar(conn)
+                conn = None
+
+        if conn is None:
+            try:
+                conn = self._conectar()
+            except Exception:
+                self._liberar_vaga()
+                raise
+        return conn
+
+    def putconn(self, conn, close: bool = False) -> None:
+        reutilizavel = (
+            not close
+            and not self._fechado
+            and not conn.closed
+            and conn.get_transaction_status() == TRANSACTION_STATUS_IDLE
+        )
+        if reutilizavel and self._expirada(conn):
+            self._descartar(conn, "conexoes_recicladas")
+            reutilizavel = False
+        elif not reutilizavel:
+            self._descartar(conn)
+
+        with self._cond:
+            if reutilizavel:
+                self._ociosas.append((conn, time.monotonic()))
+            else:
+                self._total -= 1
+            self._cond.notify()
+
+    def closeall(self) -> None:
+        with self._cond:
+            self._fechado = True
+            ociosas = list(self._ociosas)
+            self._ociosas.clear()
+            self._total -= len(ociosas)
+            self._cond.notify_all()
+        for conn, _ in ociosas:
+            self._descartar(conn)
+
+    def metricas(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                **self._contadores,
+                "em_uso": self._total - len(self._ociosas),
+                "ociosas": len(self._ociosas),
+                "minimo": self.minconn,
+                "maximo": self.maxconn,
+            }
+
 
 # Pool de conexões (reutiliza conexões)
-_pool: Optional[SimpleConnectionPool] = None
+_pool: Optional[PoolConexoes] = None
+_pool_lock = threading.Lock()
 
 
-def get_pool():
+def get_pool() -> PoolConexoes:
     """Obtém ou cria o pool de conexões"""
     global _pool
     if _pool is None:
-        if not DATABASE_URL:
-            raise ValueError(
-                "DATABASE_URL não encontrada. Configure a variável de ambiente."
-            )
-        _pool = SimpleConnectionPool(
-            minconn=1,
-            maxconn=10,
-            dsn=DATABASE_URL,
-        )
+        with _pool_lock:
+            if _pool is None:
+                if not DATABASE_URL:
+                    raise ValueError(
+                        "DATABASE_URL não encontrada. Configure a variável de ambiente."
+                    )
+                _pool = PoolConexoes(dsn=DATABASE_URL)
     return _pool
 
 
+# Pools das réplicas de leitura, criados no primeiro uso (sem conectar: cada
+# um abre conexões quando a primeira leitura chega)
+_replicas: Optional[List[PoolConexoes]] = None
+_seletor: Optional[SeletorReplicas] = None
+
+
+def configurar_replicas(
+    urls: Sequence[str],
+    selecao: str = DB_REPLICA_SELECAO,
+    pausa: float = DB_REPLICA_PAUSA,
+    timeout: float = DB_REPLICA_TIMEOUT,
+) -> None:
+    """(Re)cria os pools das réplicas; sem URLs, todas as leituras vão para o
+    primário. Chamado no primeiro uso com DATABASE_REPLICA_URLS"""
+    global _replicas, _seletor
+    with _pool_lock:
+        antigas = _replicas or []
+        _seletor = SeletorReplicas(len(urls), selecao, pausa)
+        _replicas = [PoolConexoes(dsn=url, timeout=timeout) for url in urls]
+    for pool in antigas:
+        pool.closeall()
+
+
+def get_replicas() -> Tuple[List[PoolConexoes], Optional[SeletorReplicas]]:
+    if _replicas is None:
+        configurar_replicas(DATABASE_REPLICA_URLS)
+    return _replicas, _seletor
+
+
+def aquecer_pool() -> None:
+    """Abre as conexões mínimas do pool na inicialização da aplicação"""
+    try:
+        get_pool().aquecer()
+    except Exception as e:
+        print(f"ERROR: Erro ao aquecer o pool de conexões: {e}")
+
+    replicas, seletor = get_replicas()
+    for indice, pool in enumerate(replicas):
+        try:
+            pool.aquecer()
+        except Exception as e:
+            seletor.falhou(indice)
+            print(f"ERROR: Erro ao aquecer a réplica {indice}: {e}")
+
+
+def metricas_pool() -> Dict[str, Any]:
+    """Contadores do pool de conexões (vazio se ainda não foi criado)"""
+    return _pool.metricas() if _pool is not None else {}
+
+
+def metricas_replicas() -> Dict[str, Any]:
+    """Contadores do pool de cada réplica (vazio sem réplicas)"""
+    if not _replicas:
+        return {}
+    return {**_seletor.metricas(), "pools": [pool.metricas() for pool in _replicas]}
+
+
+SET_SNAPSHOT = "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY"
+
+
 @contextmanager
-def get_connection():
-    """Context manager para obter uma conexão do pool"""
-    pool = get_pool()
-    conn = pool.getconn()
+def _transacao(pool: PoolConexoes, conn):
+    # Commit no fim do bloco, rollback em caso de erro; a conexão volta ao pool
     try:
         yield conn
         conn.commit()
     except Exception:
-        conn.rollback()
+        # Conexão perdida: mantém o erro original (o pool descarta a conexão)
+        if not conn.closed:
+            conn.rollback()
         raise
     finally:
         pool.putconn(conn)
 
 
+@contextmanager
+def _cursor(conn, snapshot: bool = False):
+    cursor = conn.cursor(cursor_factory=CursorInstrumentado)
+    try:
+        if snapshot:
+            cursor.execute(SET_SNAPSHOT)
+        yield cursor
+    finally:
+        cursor.close()
+
+
+@contextmanager
+def get_connection():
+    """Context manager para obter uma conexão do pool"""
+    pool = get_pool()
+    inicio = time.perf_counter()
+    conn = pool.getconn()
+    registrar_espera_pool("sync", time.perf_counter() - inicio)
+    with _transacao(pool, conn):
+        yield conn
+
+
 @contextmanager
 def get_cursor():
-    """Context manager para obter um cursor com RealDictCursor"""
+    """Context manager para obter um cursor com RealDictCursor (instrumentado)"""
+    with get_connection() as conn, _cursor(conn) as cursor:
+        yield cursor
+
+
+@contextmanager
+def get_cursor_snapshot():
+    """Context manager para leituras consistentes em uma única transação
+
+    Todas as queries executadas no cursor enxergam o mesmo snapshot do banco
+    (REPEATABLE READ, somente leitura).
+    """
+    with get_connection() as conn, _cursor(conn, snapshot=True) as cursor:
+        yield cursor
+
+
+def _conexao_replica() -> Optional[Tuple[int, PoolConexoes, Any]]:
+    """Conexão da primeira réplica que responder, na ordem do seletor"""
+    replicas, seletor = get_replicas()
+    em_uso = [pool.em_uso for pool in replicas] if seletor.selecao == "menos_ocupada" else ()
+    for indice in seletor.ordem(em_uso):
+        pool = replicas[indice]
+        inicio = time.perf_counter()
+        try:
+            conn = pool.getconn()
+        except (psycopg2.Error, PoolError):
+            # Fora do ar ou sem conexão livre a tempo: tenta a próxima
+            seletor.falhou(indice)
+            continue
+        registrar_espera_pool("sync_replica", time.perf_counter() - inicio)
+        seletor.funcionou(indice)
+        return indice, pool, conn
+    return None
+
+
+@contextmanager
+def get_cursor_leitura(primario: bool = False, snapshot: bool = False):
+    """Cursor para leituras que aceitam o atraso de replicação.
+
+    Com DATABASE_REPLICA_URLS, a leitura vai para uma réplica (ver
+    SeletorReplicas); sem réplica disponível, ou com primario=True ou
+    ler_do_primario() ativo na requisição, vai para o primário como
+    get_cursor (ou get_cursor_snapshot, com snapshot=True). Uma réplica
+    (hot standby) recusa qualquer escrita.
+    """
+    replicas, seletor = get_replicas()
+    if not replicas or primario or leitura_no_primario():
+        DB_LEITURAS.incrementar(destino="primario")
+        with get_connection() as conn, _cursor(conn, snapshot) as cursor:
+            yield cursor
+        return
+
+    replica = _conexao_replica()
+    if replica is None:
+        DB_LEITURAS.incrementar(destino="reserva")
+        with get_connection() as conn, _cursor(conn, snapshot) as cursor:
+            yield cursor
+        return
+
+    indice, pool, conn = replica
+    DB_LEITURAS.incrementar(destino="replica")
+    try:
+        with _transacao(pool, conn), _cursor(conn, snapshot) as cursor:
+            yield cursor
+    except psycopg2.OperationalError:
+        # A réplica caiu durante a leitura: as próximas vão para as outras
+        if conn.closed:
+            seletor.falhou(indice)
+        raise
+
+
+@contextmanager
+def get_cursor_servidor(tamanho_lote: int = 1000):
+    """Context manager para um cursor nomeado (server-side) com RealDictCursor
+
+    O resultado fica no servidor e chega em lotes de `tamanho_lote` linhas
+    (fetchmany / iteração), então a memória do processo não cresce com o
+    tamanho da consulta. A conexão fica presa ao cursor até ele ser fechado.
+    """
     with get_connection() as conn:
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor = conn.cursor(name=f"cursor_{uuid4().hex}", cursor_factory=CursorInstrumentado)
+        cursor.itersize = tamanho_lote
         try:
             yield cursor
         finally:
@@ -73,6 +489,9 @@ def init_db():
             
             # Executar o schema
             cursor.execute(schema_sql)
+            # A migração entre layouts de notas não roda aqui: apagaria as
+            # notas que instâncias no outro ARMAZENAMENTO_NOTAS ainda leem
+            # (ver backend.database.migracaoNotas)
             conn.commit()
             cursor.close()
             
@@ -0,0 +1,253 @@
+# Módulo de banco de dados assíncrono (psycopg 3)
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import uuid4
+
+import psycopg
+from psycopg import AsyncCursor, AsyncServerCursor
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool, PoolTimeout
+
+from backend.database.db import (
+    DATABASE_REPLICA_URLS,
+    DATABASE_URL,
+    DB_POOL_MAX,
+    DB_POOL_MAX_IDADE,
+    DB_POOL_MIN,
+    DB_POOL_TIMEOUT,
+    DB_REPLICA_PAUSA,
+    DB_REPLICA_SELECAO,
+    DB_REPLICA_TIMEOUT,
+    SET_SNAPSHOT,
+)
+from backend.database.metricas import DB_LEITURAS, registrar_consulta, registrar_espera_pool
+from backend.database.replicas import SeletorReplicas, leitura_no_primario
+
+
+class CursorInstrumentadoAsync(AsyncCursor):
+    """Versão assíncrona de db.CursorInstrumentado"""
+
+    async def execute(self, query, params=None, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return await super().execute(query, params, **kwargs)
+        finally:
+            registrar_consulta("psycopg", query, time.perf_counter() - inicio)
+
+    async def executemany(self, query, params_seq, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return await super().executemany(query, params_seq, **kwargs)
+        finally:
+            registrar_consulta("psycopg", query, time.perf_counter() - inicio)
+
+
+class CursorServidorInstrumentadoAsync(AsyncServerCursor):
+    """Cursor nomeado instrumentado (mede o DECLARE; os lotes são lidos depois)"""
+
+    async def execute(self, query, params=None, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return await super().execute(query, params, **kwargs)
+        finally:
+            registrar_consulta("psycopg", query, time.perf_counter() - inicio)
+
+
+# Pool assíncrono: cada requisição em espera libera o event loop em vez de
+# prender uma thread do threadpool do Starlette
+_pool_async: Optional[AsyncConnectionPool] = None
+_pool_lock = asyncio.Lock()
+
+
+async def get_pool_async() -> AsyncConnectionPool:
+    """Obtém ou cria (e abre) o pool de conexões assíncrono"""
+    global _pool_async
+    if _pool_async is None:
+        async with _pool_lock:
+            if _pool_async is None:
+                if not DATABASE_URL:
+                    raise ValueError(
+                        "DATABASE_URL não encontrada. Configure a variável de ambiente."
+                    )
+                pool = AsyncConnectionPool(
+                    conninfo=DATABASE_URL,
+                    min_size=DB_POOL_MIN,
+                    max_size=DB_POOL_MAX,
+                    timeout=DB_POOL_TIMEOUT,
+                    max_lifetime=DB_POOL_MAX_IDADE,
+                    kwargs={"cursor_factory": CursorInstrumentadoAsync},
+                    open=False,
+                )
+                await pool.open()
+                _pool_async = pool
+    return _pool_async
+
+
+# Pools das réplicas de leitura (ver db.get_cursor_leitura)
+_replicas_async: Optional[List[AsyncConnectionPool]] = None
+_seletor_async: Optional[SeletorReplicas] = None
+
+
+async def configurar_replicas_async(
+    urls: Sequence[str],
+    selecao: str = DB_REPLICA_SELECAO,
+    pausa: float = DB_REPLICA_PAUSA,
+    timeout: float = DB_REPLICA_TIMEOUT,
+) -> None:
+    """Versão assíncrona de db.configurar_replicas. Os pools abrem sem
+    esperar: uma réplica fora do ar só é percebida na primeira leitura"""
+    global _replicas_async, _seletor_async
+    antigas = _replicas_async or []
+    pools = []
+    for url in urls:
+        pool = AsyncConnectionPool(
+            conninfo=url,
+            min_size=DB_POOL_MIN,
+            max_size=DB_POOL_MAX,
+            timeout=timeout,
+            max_lifetime=DB_POOL_MAX_IDADE,
+            kwargs={"cursor_factory": CursorInstrumentadoAsync},
+            open=False,
+        )
+        await pool.open(wait=False)
+        pools.append(pool)
+    _seletor_async = SeletorReplicas(len(pools), selecao, pausa)
+    _replicas_async = pools
+    for pool in antigas:
+        await pool.close()
+
+
+async def get_replicas_async() -> Tuple[List[AsyncConnectionPool], Optional[SeletorReplicas]]:
+    if _replicas_async is None:
+        async with _pool_lock:
+            if _replicas_async is None:
+                await configurar_replicas_async(DATABASE_REPLICA_URLS)
+    return _replicas_async, _seletor_async
+
+
+def metricas_pool_async() -> Dict[str, Any]:
+    """Contadores do pool assíncrono (vazio se ainda não foi criado)"""
+    return _pool_async.get_stats() if _pool_async is not None else {}
+
+
+def metricas_replicas_async() -> Dict[str, Any]:
+    """Contadores do pool assíncrono de cada réplica (vazio sem réplicas)"""
+    if not _replicas_async:
+        return {}
+    return {
+        **_seletor_async.metricas(),
+        "pools": [pool.get_stats() for pool in _replicas_async],
+    }
+
+
+async def fechar_pool_async() -> None:
+    """Fecha o pool assíncrono e os das réplicas, se tiverem sido abertos"""
+    global _pool_async, _replicas_async
+    if _pool_async is not None:
+        await _pool_async.close()
+        _pool_async = None
+    if _replicas_async is not None:
+        for pool in _replicas_async:
+            await pool.close()
+        _replicas_async = None
+
+
+@asynccontextmanager
+async def get_connection_async():
+    """Context manager assíncrono para obter uma conexão do pool"""
+    pool = await get_pool_async()
+    inicio = time.perf_counter()
+    async with pool.connection() as conn:
+        registrar_espera_pool("async", time.perf_counter() - inicio)
+        # pool.connection() faz commit na saída e rollback em caso de erro
+        yield conn
+
+
+@asynccontextmanager
+async def get_cursor_async():
+    """Context manager assíncrono para obter um cursor que retorna dicts"""
+    async with get_connection_async() as conn:
+        async with conn.cursor(row_factory=dict_row) as cursor:
+            yield cursor
+
+
+@asynccontextmanager
+async def get_cursor_snapshot_async():
+    """Versão assíncrona de get_cursor_snapshot (REPEATABLE READ, somente leitura)"""
+    async with get_cursor_async() as cursor:
+        await cursor.execute(SET_SNAPSHOT)
+        yield cursor
+
+
+def _em_uso(pool: AsyncConnectionPool) -> int:
+    estatisticas = pool.get_stats()
+    return estatisticas.get("pool_size", 0) - estatisticas.get("pool_available", 0)
+
+
+async def _conexao_replica_async():
+    """Versão assíncrona de db._conexao_replica"""
+    replicas, seletor = await get_replicas_async()
+    em_uso = [_em_uso(pool) for pool in replicas] if seletor.selecao == "menos_ocupada" else ()
+    for indice in seletor.ordem(em_uso):
+        pool = replicas[indice]
+        inicio = time.perf_counter()
+        try:
+            conn = await pool.getconn()
+        except (psycopg.Error, PoolTimeout):
+            seletor.falhou(indice)
+            continue
+        registrar_espera_pool("async_replica", time.perf_counter() - inicio)
+        seletor.funcionou(indice)
+        return indice, pool, conn
+    return None
+
+
+@asynccontextmanager
+async def get_cursor_leitura_async(primario: bool = False, snapshot: bool = False):
+    """Versão assíncrona de db.get_cursor_leitura"""
+    replicas, seletor = await get_replicas_async()
+    replica = None
+    if replicas and not primario and not leitura_no_primario():
+        replica = await _conexao_replica_async()
+        if replica is None:
+            DB_LEITURAS.incrementar(destino="reserva")
+    else:
+        DB_LEITURAS.incrementar(destino="primario")
+
+    if replica is None:
+        async with get_cursor_async() as cursor:
+            if snapshot:
+                await cursor.execute(SET_SNAPSHOT)
+            yield cursor
+        return
+
+    indice, pool, conn = replica
+    DB_LEITURAS.incrementar(destino="replica")
+    try:
+        async with conn.cursor(row_factory=dict_row) as cursor:
+            if snapshot:
+                await cursor.execute(SET_SNAPSHOT)
+            yield cursor
+        await conn.commit()
+    except Exception as erro:
+        if not conn.closed:
+            await conn.rollback()
+        if isinstance(erro, psycopg.OperationalError) and conn.closed:
+            seletor.falhou(indice)
+        raise
+    finally:
+        await pool.putconn(conn)
+
+
+@asynccontextmanager
+async def get_cursor_servidor_async(tamanho_lote: int = 1000):
+    """Versão assíncrona de get_cursor_servidor (cursor nomeado, em lotes)"""
+    async with get_connection_async() as conn:
+        async with CursorServidorInstrumentadoAsync(
+            conn, f"cursor_{uuid4().hex}", row_factory=dict_row
+        ) as cursor:
+            cursor.itersize = tamanho_lote
+            yield cursor
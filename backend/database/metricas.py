@@ -0,0 +1,291 @@
+# Métricas do processo (requisições, SQL e pools) no formato de texto do Prometheus
+
+import logging
+import os
+import re
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Consultas mais lentas que isso (ms) vão para o log "backend.sql_lenta";
+# 0 desliga o log
+SQL_LENTA_MS = float(os.getenv("SQL_LENTA_MS", "0"))
+
+logger_sql_lenta = logging.getLogger("backend.sql_lenta")
+
+BALDES_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BALDES_CONSULTAS = (0, 1, 2, 3, 5, 10, 25, 50, 100, 250, 1000)
+BALDES_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+Rotulos = Tuple[str, ...]
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatar_rotulos(nomes: Sequence[str], valores: Sequence[str]) -> str:
+    if not nomes:
+        return ""
+    pares = ",".join(f'{nome}="{_escapar(str(valor))}"' for nome, valor in zip(nomes, valores))
+    return "{" + pares + "}"
+
+
+def _formatar_numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Metrica:
+    """Base dos tipos de métrica: nome, texto de ajuda e nomes dos rótulos.
+
+    Os valores ficam em um dict indexado pela tupla de valores dos rótulos,
+    protegido por um lock (as observações vêm do event loop e do threadpool).
+    """
+
+    tipo = ""
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._lock = threading.Lock()
+
+    def _chave(self, rotulos: Dict[str, str]) -> Rotulos:
+        return tuple(str(rotulos[nome]) for nome in self.rotulos)
+
+    def amostras(self) -> List[str]:
+        raise NotImplementedError
+
+    def exportar(self) -> List[str]:
+        return [
+            f"# HELP {self.nome} {self.ajuda}",
+            f"# TYPE {self.nome} {self.tipo}",
+            *self.amostras(),
+        ]
+
+
+class Contador(Metrica):
+    tipo = "counter"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Sequence[str] = ()):
+        super().__init__(nome, ajuda, rotulos)
+        self._valores: Dict[Rotulos, float] = {}
+
+    def incrementar(self, valor: float = 1, **rotulos: str) -> None:
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def valor(self, **rotulos: str) -> float:
+        with self._lock:
+            return self._valores.get(self._chave(rotulos), 0)
+
+    def amostras(self) -> List[str]:
+        with self._lock:
+            valores = sorted(self._valores.items())
+        return [
+            f"{self.nome}{_formatar_rotulos(self.rotulos, chave)} {_formatar_numero(valor)}"
+            for chave, valor in valores
+        ]
+
+
+class Histograma(Metrica):
+    """Contagem por faixa (baldes cumulativos, como o Prometheus espera),
+    soma e total das observações"""
+
+    tipo = "histogram"
+
+    def __init__(
+        self, nome: str, ajuda: str, rotulos: Sequence[str] = (),
+        baldes: Sequence[float] = BALDES_SEGUNDOS,
+    ):
+        super().__init__(nome, ajuda, rotulos)
+        self.baldes = tuple(baldes)
+        # chave -> [contagem por balde (+ o +Inf), soma]
+        self._valores: Dict[Rotulos, List] = {}
+
+    def observar(self, valor: float, **rotulos: str) -> None:
+        chave = self._chave(rotulos)
+        indice = bisect_left(self.baldes, valor)
+        with self._lock:
+            serie = self._valores.get(chave)
+            if serie is None:
+                serie = self._valores[chave] = [[0] * (len(self.baldes) + 1), 0.0]
+            serie[0][indice] += 1
+            serie[1] += valor
+
+    def total(self, **rotulos: str) -> int:
+        with self._lock:
+            serie = self._valores.get(self._chave(rotulos))
+            return sum(serie[0]) if serie else 0
+
+    def soma(self, **rotulos: str) -> float:
+        with self._lock:
+            serie = self._valores.get(self._chave(rotulos))
+            return serie[1] if serie else 0.0
+
+    def amostras(self) -> List[str]:
+        with self._lock:
+            valores = sorted(
+                (chave, list(contagens), soma)
+                for chave, (contagens, soma) in self._valores.items()
+            )
+        linhas = []
+        nomes = self.rotulos + ("le",)
+        for chave, contagens, soma in valores:
+            acumulado = 0
+            for limite, contagem in zip(self.baldes + (float("inf"),), contagens):
+                acumulado += contagem
+                rotulos = _formatar_rotulos(nomes, chave + (_formatar_numero(limite),))
+                linhas.append(f"{self.nome}_bucket{rotulos} {acumulado}")
+            rotulos = _formatar_rotulos(self.rotulos, chave)
+            linhas.append(f"{self.nome}_sum{rotulos} {_formatar_numero(soma)}")
+            linhas.append(f"{self.nome}_count{rotulos} {acumulado}")
+        return linhas
+
+
+class Medidor(Metrica):
+    """Valor lido na hora da exportação (ex.: conexões em uso no pool)"""
+
+    tipo = "gauge"
+
+    def __init__(
+        self, nome: str, ajuda: str, rotulos: Sequence[str],
+        ler: Callable[[], Dict[Rotulos, float]],
+    ):
+        super().__init__(nome, ajuda, rotulos)
+        self._ler = ler
+
+    def amostras(self) -> List[str]:
+        return [
+            f"{self.nome}{_formatar_rotulos(self.rotulos, chave)} {_formatar_numero(valor)}"
+            for chave, valor in sorted(self._ler().items())
+        ]
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self.metricas: List[Metrica] = []
+
+    def registrar(self, metrica: Metrica) -> Metrica:
+        self.metricas.append(metrica)
+        return metrica
+
+    def exportar(self) -> str:
+        """Todas as métricas no formato de texto do Prometheus (versão 0.0.4)"""
+        linhas = []
+        for metrica in self.metricas:
+            linhas.extend(metrica.exportar())
+        return "\n".join(linhas) + "\n"
+
+
+registro = RegistroMetricas()
+
+HTTP_REQUISICOES = registro.registrar(Contador(
+    "http_requisicoes_total", "Requisições atendidas", ("metodo", "rota", "status"),
+))
+HTTP_DURACAO = registro.registrar(Histograma(
+    "http_requisicao_duracao_segundos", "Tempo de cada requisição, até o fim do corpo",
+    ("metodo", "rota"),
+))
+HTTP_CONSULTAS = registro.registrar(Histograma(
+    "http_requisicao_consultas_sql", "Comandos SQL executados por requisição",
+    ("metodo", "rota"), BALDES_CONSULTAS,
+))
+HTTP_TEMPO_DB = registro.registrar(Histograma(
+    "http_requisicao_tempo_db_segundos", "Tempo gasto em SQL por requisição",
+    ("metodo", "rota"),
+))
+HTTP_ESPERA_POOL = registro.registrar(Histograma(
+    "http_requisicao_espera_pool_segundos", "Tempo esperando conexões do pool por requisição",
+    ("metodo", "rota"),
+))
+HTTP_BYTES = registro.registrar(Histograma(
+    "http_resposta_bytes", "Tamanho do corpo serializado de cada resposta",
+    ("metodo", "rota"), BALDES_BYTES,
+))
+DB_CONSULTAS = registro.registrar(Histograma(
+    "db_consulta_duracao_segundos", "Tempo de cada comando SQL", ("driver",),
+))
+DB_CONSULTAS_LENTAS = registro.registrar(Contador(
+    "db_consultas_lentas_total", "Comandos SQL acima de SQL_LENTA_MS", ("driver",),
+))
+DB_ESPERA_POOL = registro.registrar(Histograma(
+    "db_pool_espera_segundos", "Tempo para obter uma conexão do pool", ("pool",),
+))
+DB_LEITURAS = registro.registrar(Contador(
+    "db_leituras_total",
+    "Leituras roteáveis por destino (reserva: primário por falta de réplica disponível)",
+    ("destino",),
+))
+
+
+class MedicaoRequisicao:
+    """SQL executado durante uma requisição, acumulado pela instrumentação do banco"""
+
+    __slots__ = ("rota", "consultas", "tempo_db", "espera_pool")
+
+    def __init__(self):
+        # Método e caminho da requisição, para o log de SQL lenta
+        self.rota = ""
+        self.consultas = 0
+        self.tempo_db = 0.0
+        self.espera_pool = 0.0
+
+
+# Medição da requisição em andamento. O threadpool do Starlette copia o
+# contexto, então as consultas feitas pelo serviço síncrono também caem aqui
+_medicao_atual: ContextVar[Optional[MedicaoRequisicao]] = ContextVar(
+    "medicao_requisicao", default=None
+)
+
+
+def iniciar_medicao(rota: str = ""):
+    """Começa a medir a requisição atual; devolve o token para encerrar_medicao"""
+    medicao = MedicaoRequisicao()
+    medicao.rota = rota
+    return _medicao_atual.set(medicao)
+
+
+def medicao_atual() -> Optional[MedicaoRequisicao]:
+    return _medicao_atual.get()
+
+
+def encerrar_medicao(token) -> None:
+    _medicao_atual.reset(token)
+
+
+def _resumir_sql(sql) -> str:
+    # Sem os valores dos parâmetros (só o texto do comando), em uma linha
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", "replace")
+    elif not isinstance(sql, str):
+        sql = repr(sql)
+    return re.sub(r"\s+", " ", sql).strip()[:500]
+
+
+def registrar_consulta(driver: str, sql, duracao: float) -> None:
+    """Chamado pelos cursores instrumentados depois de cada comando"""
+    DB_CONSULTAS.observar(duracao, driver=driver)
+    medicao = _medicao_atual.get()
+    if medicao is not None:
+        medicao.consultas += 1
+        medicao.tempo_db += duracao
+    if SQL_LENTA_MS and duracao * 1000 >= SQL_LENTA_MS:
+        DB_CONSULTAS_LENTAS.incrementar(driver=driver)
+        logger_sql_lenta.warning(
+            "SQL lenta (%.1f ms, %s): %s",
+            duracao * 1000,
+            medicao.rota if medicao is not None and medicao.rota else "fora de requisição",
+            _resumir_sql(sql),
+        )
+
+
+def registrar_espera_pool(pool: str, duracao: float) -> None:
+    DB_ESPERA_POOL.observar(duracao, pool=pool)
+    medicao = _medicao_atual.get()
+    if medicao is not None:
+        medicao.espera_pool += duracao
@@ -0,0 +1,64 @@
+"""Migração das notas entre os layouts de ARMAZENAMENTO_NOTAS, como comando único.
+
+    python -m backend.database.migracaoNotas compacto
+    python -m backend.database.migracaoNotas compacto --limpar
+
+Copia para o layout indicado as notas guardadas no outro (linhas: tabela
+notas; compacto: coluna estudantes.notas), sem apagar nada: as instâncias
+que ainda usam o layout antigo continuam lendo as suas notas. Pode rodar
+mais de uma vez, por exemplo no meio de uma troca gradual.
+
+Não roda na inicialização da API. --limpar apaga as notas do layout antigo
+e só deve ser usado depois que todas as instâncias passaram para o novo;
+mesmo assim, se algum estudante tem notas no layout antigo que o novo não
+tem (uma escrita de uma instância antiga depois da cópia), nada é apagado e
+o comando sai com código 1.
+"""
+
+import argparse
+import sys
+
+from backend.database.armazenamentoNotas import ARMAZENAMENTOS, ArmazenamentoNotas
+from backend.database.db import get_cursor
+
+
+def migrar(armazenamento: ArmazenamentoNotas, limpar: bool = False) -> int:
+    """Copia as notas para `armazenamento` e, com `limpar`, apaga as do outro
+    layout, tudo em uma transação. Devolve quantos estudantes ficaram com
+    notas divergentes entre os dois; com `limpar` e divergências, levanta
+    RuntimeError sem apagar nada"""
+    with get_cursor() as cursor:
+        cursor.execute(armazenamento.sql_migracao)
+        cursor.execute(armazenamento.sql_divergentes)
+        divergentes = cursor.fetchone()["total"]
+        if limpar:
+            if divergentes:
+                raise RuntimeError(
+                    f"{divergentes} estudantes com notas diferentes entre os layouts; "
+                    "nada foi apagado"
+                )
+            cursor.execute(armazenamento.sql_limpeza)
+    return divergentes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("destino", choices=list(ARMAZENAMENTOS))
+    parser.add_argument(
+        "--limpar", action="store_true",
+        help="apaga as notas do outro layout (só com todas as instâncias no destino)",
+    )
+    args = parser.parse_args()
+
+    try:
+        divergentes = migrar(ARMAZENAMENTOS[args.destino](), args.limpar)
+    except RuntimeError as erro:
+        print(f"ERROR: {erro}")
+        sys.exit(1)
+    print(f"notas copiadas para o layout {args.destino} ({divergentes} estudantes divergentes)")
+    if args.limpar:
+        print("notas do outro layout apagadas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# Réplicas de leitura: escolha da réplica, réplicas fora do ar e leituras
+# que precisam do primário. Usado pelos pools de db.py e dbAsync.py
+
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Sequence
+
+SELECOES_REPLICA = ("rodizio", "menos_ocupada")
+
+
+class SeletorReplicas:
+    """Ordem em que as réplicas são tentadas a cada leitura.
+
+    "rodizio" começa cada leitura pela réplica seguinte à da leitura
+    anterior; "menos_ocupada" começa pela que tem menos conexões em uso. As
+    demais vêm depois, como reserva. Uma réplica que falha (sem conexão
+    dentro do tempo limite) sai da ordem por `pausa` segundos e depois volta
+    a ser tentada; se todas estão fora, a leitura vai para o primário.
+    """
+
+    def __init__(
+        self,
+        quantidade: int,
+        selecao: str = "rodizio",
+        pausa: float = 30.0,
+        relogio: Callable[[], float] = time.monotonic,
+    ):
+        if selecao not in SELECOES_REPLICA:
+            raise ValueError(
+                f"DB_REPLICA_SELECAO inválida: {selecao}. "
+                f"Aceitas: {', '.join(SELECOES_REPLICA)}."
+            )
+        self.quantidade = quantidade
+        self.selecao = selecao
+        self.pausa = pausa
+        self._relogio = relogio
+        self._proxima = 0
+        # réplica -> instante (relógio) em que volta a ser tentada
+        self._fora_ate: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def ordem(self, em_uso: Sequence[int] = ()) -> List[int]:
+        """Réplicas disponíveis na ordem de tentativa (`em_uso`: conexões em
+        uso em cada uma, para "menos_ocupada")"""
+        with self._lock:
+            agora = self._relogio()
+            disponiveis = [
+                indice for indice in range(self.quantidade)
+                if self._fora_ate.get(indice, 0.0) <= agora
+            ]
+            if self.selecao == "menos_ocupada" and em_uso:
+                return sorted(disponiveis, key=lambda indice: em_uso[indice])
+            inicio = self._proxima
+            self._proxima = (self._proxima + 1) % max(self.quantidade, 1)
+        return sorted(disponiveis, key=lambda indice: (indice - inicio) % self.quantidade)
+
+    def falhou(self, indice: int) -> None:
+        with self._lock:
+            self._fora_ate[indice] = self._relogio() + self.pausa
+
+    def funcionou(self, indice: int) -> None:
+        with self._lock:
+            self._fora_ate.pop(indice, None)
+
+    def fora_do_ar(self) -> List[int]:
+        with self._lock:
+            agora = self._relogio()
+            return sorted(
+                indice for indice, ate in self._fora_ate.items() if ate > agora
+            )
+
+    def metricas(self) -> Dict[str, Any]:
+        return {
+            "replicas": self.quantidade,
+            "selecao": self.selecao,
+            "fora_do_ar": self.fora_do_ar(),
+        }
+
+
+# Leituras da requisição atual que precisam ver as escritas já confirmadas
+# (ver MiddlewareConsistencia). O threadpool do Starlette copia o contexto,
+# então o serviço síncrono também enxerga
+_leitura_no_primario: ContextVar[bool] = ContextVar("leitura_no_primario", default=False)
+
+
+def ler_do_primario(ativo: bool = True):
+    """Manda as leituras do contexto atual para o primário; devolve o token
+    para encerrar_leitura_no_primario"""
+    return _leitura_no_primario.set(ativo)
+
+
+def leitura_no_primario() -> bool:
+    return _leitura_no_primario.get()
+
+
+def encerrar_leitura_no_primario(token) -> None:
+    _leitura_no_primario.reset(token)
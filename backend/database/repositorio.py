@@ -0,0 +1,246 @@
+# Bancos de dados dos serviços: PostgreSQL (padrão) ou um dos repositórios
+# embutidos (em memória ou SQLite), escolhido por BANCO_DADOS
+
+import os
+from contextlib import nullcontext
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from backend.model.turma import Periodo, Turma
+
+# Restrições criadas em schema.sql. Os repositórios embutidos aplicam as
+# mesmas regras e todos informam a violação com o mesmo nome (o do
+# PostgreSQL traduz as exceções do driver), para que os serviços as traduzam
+# em um lugar só
+INDICE_NOME_UNICO = "idx_estudantes_turma_nome_unico"
+FK_TURMA = "estudantes_turma_id_fkey"
+INDICE_PERIODO_UNICO = "periodos_nome_key"
+INDICE_TURMA_UNICA = "idx_turmas_periodo_nome_unico"
+FK_PERIODO = "turmas_periodo_id_fkey"
+FK_SNAPSHOT_TURMA = "relatorios_snapshot_turma_id_fkey"
+
+BANCOS = ("postgres", "memoria", "sqlite")
+
+
+class ViolacaoRestricao(Exception):
+    """Escrita recusada por uma restrição"""
+
+    def __init__(self, restricao: str):
+        super().__init__(restricao)
+        self.restricao = restricao
+
+
+class ViolacaoUnicidade(ViolacaoRestricao):
+    pass
+
+
+class ViolacaoChaveEstrangeira(ViolacaoRestricao):
+    pass
+
+
+def normalizar_nome(nome: str) -> str:
+    """Chave dos índices de nome únicos: LOWER(TRIM(nome))"""
+    return nome.strip().lower()
+
+
+def arredondar_frequencia(frequencia: float) -> Decimal:
+    """Frequência com duas casas, arredondada como o NUMERIC(5, 2) de estudantes"""
+    return Decimal(str(frequencia)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+class Repositorio:
+    """Turmas, períodos e estudantes guardados em um banco.
+
+    Usado por EstudanteService e TurmaService, que mantêm as regras
+    (validação, cache, relatórios) iguais em todos os bancos; o repositório
+    só guarda e consulta. Cada método é atômico e pode ser chamado de várias
+    threads.
+
+    Os estudantes saem como dicts com id, nome, notas (floats, em ordem de
+    disciplina), frequencia e media (valor usado na ordenação por média e no
+    cursor da paginação).
+
+    Cada turma tem uma versão dos dados, incrementada junto com cada escrita
+    nos estudantes dela e devolvida pelos métodos que escrevem: é a mesma
+    para todos os processos que usam o banco (ver versao).
+    """
+
+    nome = ""
+
+    # Operações: os serviços fazem as chamadas de uma escrita dentro de
+    # transacao() e as de uma leitura dentro de leitura(), no repositório
+    # devolvido. Os embutidos não têm réplicas e gravam cada chamada de uma
+    # vez, então devolvem a si mesmos
+
+    def transacao(self):
+        """As chamadas feitas no repositório devolvido são gravadas juntas"""
+        return nullcontext(self)
+
+    def leitura(self, primario: bool = False, snapshot: bool = False):
+        """Para leituras que aceitam o atraso de replicação (primario=False);
+        com snapshot=True, as chamadas veem o mesmo estado do banco"""
+        return nullcontext(self)
+
+    def limpar(self) -> None:
+        """Apaga todos os dados, deixando só a turma padrão (como um banco novo)"""
+        raise NotImplementedError
+
+    # Períodos e turmas
+
+    def criar_periodo(self, periodo: Periodo) -> None:
+        raise NotImplementedError
+
+    def listar_periodos(self) -> List[Periodo]:
+        """Em ordem de nome"""
+        raise NotImplementedError
+
+    def criar_turma(self, turma: Turma) -> None:
+        """Grava a turma com o catálogo de disciplinas (que não muda depois)"""
+        raise NotImplementedError
+
+    def listar_turmas(self, periodo_id: Optional[str] = None) -> List[Turma]:
+        """Em ordem de nome"""
+        raise NotImplementedError
+
+    def obter_turma(self, turma_id: str) -> Optional[Turma]:
+        raise NotImplementedError
+
+    def remover_turma(self, turma_id: str) -> bool:
+        """Remove a turma com os estudantes dela"""
+        raise NotImplementedError
+
+    def disciplinas(self, turma_id: str) -> Tuple[str, ...]:
+        """Catálogo da turma (vazio se ela não existe)"""
+        raise NotImplementedError
+
+    def versao(self, turma_id: str) -> Optional[int]:
+        """Versão atual dos dados da turma (None se ela não existe)"""
+        raise NotImplementedError
+
+    # Estudantes
+
+    def inserir(self, turma_id: str, estudantes: Sequence[Dict[str, Any]]) -> int:
+        """Grava os estudantes (id, nome, notas, frequencia) de uma vez: se um
+        deles viola uma restrição, nenhum é gravado. Devolve a nova versão da turma"""
+        raise NotImplementedError
+
+    def nomes_existentes(self, turma_id: str, nomes: Sequence[str]) -> Set[str]:
+        """Quais dos nomes normalizados já existem na turma"""
+        raise NotImplementedError
+
+    def obter(self, estudante_id: str, turma_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def listar(self, turma_id: str) -> List[Dict[str, Any]]:
+        """Estudantes da turma em ordem de nome"""
+        raise NotImplementedError
+
+    def pagina(
+        self,
+        turma_id: str,
+        limite: int,
+        ordenar: str = "nome",
+        decrescente: bool = False,
+        apos: Optional[Tuple[str, str]] = None,
+        nome_prefixo: Optional[str] = None,
+        frequencia_min: Optional[float] = None,
+        frequencia_max: Optional[float] = None,
+        media_min: Optional[float] = None,
+        media_max: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Até `limite` estudantes em ordem de (coluna, id), depois de `apos`
+        (valor da coluna como texto e id, lidos do cursor da paginação)"""
+        raise NotImplementedError
+
+    def atualizar(
+        self, estudante_id: str, turma_id: str, estudante: Dict[str, Any]
+    ) -> Optional[int]:
+        """Troca nome, notas e frequência; devolve a nova versão da turma, ou
+        None se o estudante não existe nela"""
+        raise NotImplementedError
+
+    def remover(self, estudante_id: str, turma_id: str) -> Optional[int]:
+        """Nova versão da turma, ou None se o estudante não existe nela"""
+        raise NotImplementedError
+
+    def exportar(self, turma_id: str, tamanho_lote: int) -> Iterator[List[Dict[str, Any]]]:
+        """Estudantes em ordem de (nome, id), em lotes"""
+        raise NotImplementedError
+
+    # Agregados, calculados pelo repositório sem devolver a turma inteira
+
+    def medias_por_disciplina(self, turma_id: str) -> List[Optional[Decimal]]:
+        """Média exata de cada disciplina, em ordem de catálogo (None sem notas)"""
+        raise NotImplementedError
+
+    def media_turma(self, turma_id: str) -> Optional[Decimal]:
+        """Média exata das médias dos estudantes (None sem estudantes)"""
+        raise NotImplementedError
+
+    def acima_da_media(self, turma_id: str, media: float) -> List[Dict[str, Any]]:
+        """id, nome e media dos estudantes com média maior que `media`, por nome"""
+        raise NotImplementedError
+
+    def baixa_frequencia(self, turma_id: str, limite: float) -> List[Dict[str, Any]]:
+        """id, nome e frequencia abaixo do limite, da menor para a maior"""
+        raise NotImplementedError
+
+    # Snapshots de relatório (ver snapshotService): o relatório da turma já
+    # serializado, com o instante e a versão dos dados em que foi gerado
+
+    def gravar_snapshot(
+        self, turma_id: str, conteudo: str, gerado_em: datetime, versao: int
+    ) -> None:
+        """Substitui o snapshot da turma, a menos que o gravado seja mais novo
+        (um cálculo mais lento não sobrescreve um mais recente)"""
+        raise NotImplementedError
+
+    def obter_snapshot(self, turma_id: str) -> Optional[Dict[str, Any]]:
+        """conteudo, gerado_em e versao do snapshot da turma, se houver"""
+        raise NotImplementedError
+
+    def snapshots_vencidos(self, idade: float) -> List[str]:
+        """Turmas com snapshot gerado há mais de `idade` segundos"""
+        raise NotImplementedError
+
+
+def banco_configurado() -> str:
+    """Banco escolhido pela variável BANCO_DADOS
+
+    "postgres" (padrão): DATABASE_URL (ver RepositorioPostgres).
+    "memoria": dicts no processo, indexados por id e por nome; os dados somem
+    quando o processo termina.
+    "sqlite": arquivo SQLITE_CAMINHO (":memory:" por padrão).
+    """
+    nome = os.getenv("BANCO_DADOS", "postgres").lower()
+    if nome not in BANCOS:
+        raise ValueError(f"BANCO_DADOS inválido: {nome}. Aceitos: {', '.join(BANCOS)}.")
+    return nome
+
+
+_repositorio: Optional[Repositorio] = None
+
+
+def repositorio_configurado() -> Repositorio:
+    """Repositório do processo para BANCO_DADOS.
+
+    Criado no primeiro uso e compartilhado: os serviços de estudantes e de
+    turmas (e os criados pelos testes) enxergam os mesmos dados.
+    """
+    global _repositorio
+    if _repositorio is None:
+        nome = banco_configurado()
+        if nome == "memoria":
+            from backend.database.repositorioMemoria import RepositorioMemoria
+
+            _repositorio = RepositorioMemoria()
+        elif nome == "sqlite":
+            from backend.database.repositorioSqlite import RepositorioSqlite
+
+            _repositorio = RepositorioSqlite(os.getenv("SQLITE_CAMINHO", ":memory:"))
+        else:
+            from backend.database.repositorioPostgres import RepositorioPostgres
+
+            _repositorio = RepositorioPostgres()
+    return _repositorio
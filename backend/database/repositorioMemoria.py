@@ -0,0 +1,403 @@
+# Repositório em memória (BANCO_DADOS=memoria)
+
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from backend.database.armazenamentoNotas import arredondar_nota
+from backend.database.repositorio import (
+    FK_PERIODO,
+    FK_SNAPSHOT_TURMA,
+    FK_TURMA,
+    INDICE_NOME_UNICO,
+    INDICE_PERIODO_UNICO,
+    INDICE_TURMA_UNICA,
+    Repositorio,
+    ViolacaoChaveEstrangeira,
+    ViolacaoUnicidade,
+    arredondar_frequencia,
+    normalizar_nome,
+)
+from backend.model.turma import DISCIPLINAS_PADRAO, TURMA_PADRAO, Periodo, Turma
+
+ORDENACOES = ("nome", "media", "frequencia")
+
+
+class _TurmaMemoria:
+    """Estudantes de uma turma com os índices que o PostgreSQL manteria:
+    por id, por nome normalizado (o índice único) e uma lista ordenada de
+    (valor, id) por ordenação da listagem. As somas de cada disciplina e das
+    médias são atualizadas a cada escrita, então médias e relatórios
+    agregados não percorrem a turma.
+    """
+
+    __slots__ = (
+        "turma", "versao", "estudantes", "nomes", "indices",
+        "somas", "contagens", "soma_medias",
+    )
+
+    def __init__(self, turma: Turma):
+        self.turma = turma
+        self.versao = 0
+        self.estudantes: Dict[str, Dict[str, Any]] = {}
+        self.nomes: Dict[str, str] = {}
+        self.indices: Dict[str, List[Tuple[Any, str]]] = {ordem: [] for ordem in ORDENACOES}
+        self.somas = [Decimal(0)] * len(turma.disciplinas)
+        self.contagens = [0] * len(turma.disciplinas)
+        self.soma_medias = Decimal(0)
+
+    def adicionar(self, estudante: Dict[str, Any]) -> None:
+        self.estudantes[estudante["id"]] = estudante
+        self.nomes[normalizar_nome(estudante["nome"])] = estudante["id"]
+        for ordem in ORDENACOES:
+            insort(self.indices[ordem], (estudante[ordem], estudante["id"]))
+        self._somar(estudante, 1)
+
+    def retirar(self, estudante: Dict[str, Any]) -> None:
+        del self.estudantes[estudante["id"]]
+        del self.nomes[normalizar_nome(estudante["nome"])]
+        for ordem in ORDENACOES:
+            indice = self.indices[ordem]
+            del indice[bisect_left(indice, (estudante[ordem], estudante["id"]))]
+        self._somar(estudante, -1)
+
+    def _somar(self, estudante: Dict[str, Any], sinal: int) -> None:
+        for posicao, nota in enumerate(estudante["notas_decimais"]):
+            self.somas[posicao] += sinal * nota
+            self.contagens[posicao] += sinal
+        self.soma_medias += sinal * estudante["media"]
+
+
+def _novo_estudante(dados: Dict[str, Any]) -> Dict[str, Any]:
+    """Estudante como fica guardado: valores arredondados como nas colunas
+    NUMERIC e a média exata (ver media_para_gravar)"""
+    notas = [arredondar_nota(nota) for nota in dados["notas"]]
+    notas_decimais = [Decimal(str(nota)) for nota in notas]
+    return {
+        "id": dados["id"],
+        "nome": dados["nome"],
+        "notas": notas,
+        "notas_decimais": notas_decimais,
+        "frequencia": arredondar_frequencia(dados["frequencia"]),
+        "media": sum(notas_decimais) / len(notas_decimais) if notas_decimais else Decimal(0),
+    }
+
+
+def _linha(estudante: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": estudante["id"],
+        "nome": estudante["nome"],
+        "notas": list(estudante["notas"]),
+        "frequencia": estudante["frequencia"],
+        "media": estudante["media"],
+    }
+
+
+class RepositorioMemoria(Repositorio):
+    """Tudo em dicts do processo, protegidos por um lock. Para testes e
+    demonstrações: rápido, sem servidor, e os dados somem com o processo."""
+
+    nome = "memoria"
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.limpar()
+
+    def limpar(self) -> None:
+        with self._lock:
+            # A turma padrão volta vazia, mas a versão dela continua crescendo:
+            # os dados antigos não podem reaparecer com a mesma versão
+            padrao = getattr(self, "_turmas", {}).get(TURMA_PADRAO)
+            self._periodos: Dict[str, Periodo] = {}
+            self._turmas: Dict[str, _TurmaMemoria] = {}
+            self._snapshots: Dict[str, Dict[str, Any]] = {}
+            self.criar_periodo(Periodo(id=TURMA_PADRAO, nome="Padrão"))
+            self.criar_turma(Turma(
+                id=TURMA_PADRAO,
+                periodo_id=TURMA_PADRAO,
+                nome="Turma padrão",
+                disciplinas=list(DISCIPLINAS_PADRAO),
+            ))
+            if padrao is not None:
+                self._turmas[TURMA_PADRAO].versao = padrao.versao + 1
+
+    def _turma(self, turma_id: str) -> Optional[_TurmaMemoria]:
+        return self._turmas.get(turma_id)
+
+    # Períodos e turmas
+
+    def criar_periodo(self, periodo: Periodo) -> None:
+        with self._lock:
+            if any(outro.nome == periodo.nome for outro in self._periodos.values()):
+                raise ViolacaoUnicidade(INDICE_PERIODO_UNICO)
+            self._periodos[periodo.id] = periodo
+
+    def listar_periodos(self) -> List[Periodo]:
+        with self._lock:
+            return sorted(self._periodos.values(), key=lambda periodo: periodo.nome)
+
+    def criar_turma(self, turma: Turma) -> None:
+        with self._lock:
+            if turma.periodo_id not in self._periodos:
+                raise ViolacaoChaveEstrangeira(FK_PERIODO)
+            nome = normalizar_nome(turma.nome)
+            if any(
+                outra.turma.periodo_id == turma.periodo_id
+                and normalizar_nome(outra.turma.nome) == nome
+                for outra in self._turmas.values()
+            ):
+                raise ViolacaoUnicidade(INDICE_TURMA_UNICA)
+            self._turmas[turma.id] = _TurmaMemoria(turma.model_copy(deep=True))
+
+    def listar_turmas(self, periodo_id: Optional[str] = None) -> List[Turma]:
+        with self._lock:
+            turmas = [
+                dados.turma.model_copy(deep=True)
+                for dados in self._turmas.values()
+                if periodo_id is None or dados.turma.periodo_id == periodo_id
+            ]
+        return sorted(turmas, key=lambda turma: turma.nome)
+
+    def obter_turma(self, turma_id: str) -> Optional[Turma]:
+        with self._lock:
+            dados = self._turma(turma_id)
+            return dados.turma.model_copy(deep=True) if dados else None
+
+    def remover_turma(self, turma_id: str) -> bool:
+        with self._lock:
+            self._snapshots.pop(turma_id, None)
+            return self._turmas.pop(turma_id, None) is not None
+
+    def disciplinas(self, turma_id: str) -> Tuple[str, ...]:
+        with self._lock:
+            dados = self._turma(turma_id)
+            return tuple(dados.turma.disciplinas) if dados else ()
+
+    def versao(self, turma_id: str) -> Optional[int]:
+        with self._lock:
+            dados = self._turma(turma_id)
+            return dados.versao if dados else None
+
+    # Estudantes
+
+    def inserir(self, turma_id: str, estudantes: Sequence[Dict[str, Any]]) -> int:
+        with self._lock:
+            dados = self._turma(turma_id)
+            if dados is None:
+                raise ViolacaoChaveEstrangeira(FK_TURMA)
+            # Confere o lote inteiro antes de gravar o primeiro
+            novos = [_novo_estudante(estudante) for estudante in estudantes]
+            nomes = [normalizar_nome(novo["nome"]) for novo in novos]
+            if len(set(nomes)) != len(nomes) or any(nome in dados.nomes for nome in nomes):
+                raise ViolacaoUnicidade(INDICE_NOME_UNICO)
+            for novo in novos:
+                dados.adicionar(novo)
+            dados.versao += 1
+            return dados.versao
+
+    def nomes_existentes(self, turma_id: str, nomes: Sequence[str]) -> Set[str]:
+        with self._lock:
+            dados = self._turma(turma_id)
+            return {nome for nome in nomes if dados and nome in dados.nomes}
+
+    def obter(self, estudante_id: str, turma_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            dados = self._turma(turma_id)
+            estudante = dados.estudantes.get(estudante_id) if dados else None
+            return _linha(estudante) if estudante else None
+
+    def listar(self, turma_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            dados = self._turma(turma_id)
+            if dados is None:
+                return []
+            return [
+                _linha(dados.estudantes[estudante_id])
+                for _, estudante_id in dados.indices["nome"]
+            ]
+
+    def pagina(
+        self,
+        turma_id: str,
+        limite: int,
+        ordenar: str = "nome",
+        decrescente: bool = False,
+        apos: Optional[Tuple[str, str]] = None,
+        nome_prefixo: Optional[str] = None,
+        frequencia_min: Optional[float] = None,
+        frequencia_max: Optional[float] = None,
+        media_min: Optional[float] = None,
+        media_max: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        prefixo = nome_prefixo.lower() if nome_prefixo else None
+        faixas = [
+            (campo, Decimal(str(minimo)) if minimo is not None else None,
+             Decimal(str(maximo)) if maximo is not None else None)
+            for campo, minimo, maximo in (
+                ("frequencia", frequencia_min, frequencia_max),
+                ("media", media_min, media_max),
+            )
+            if minimo is not None or maximo is not None
+        ]
+
+        def aceito(estudante: Dict[str, Any]) -> bool:
+            if prefixo and not estudante["nome"].lower().startswith(prefixo):
+                return False
+            for campo, minimo, maximo in faixas:
+                if minimo is not None and estudante[campo] < minimo:
+                    return False
+                if maximo is not None and estudante[campo] > maximo:
+                    return False
+            return True
+
+        with self._lock:
+            dados = self._turma(turma_id)
+            if dados is None:
+                return []
+            indice = dados.indices[ordenar]
+            # Mesmo keyset do PostgreSQL: posiciona na lista ordenada e segue
+            # até completar a página
+            if apos is not None:
+                valor, ultimo_id = apos
+                chave = (valor if ordenar == "nome" else Decimal(valor), ultimo_id)
+            if decrescente:
+                fim = bisect_left(indice, chave) if apos is not None else len(indice)
+                posicoes = range(fim - 1, -1, -1)
+            else:
+                inicio = bisect_right(indice, chave) if apos is not None else 0
+                posicoes = range(inicio, len(indice))
+
+            rows = []
+            for posicao in posicoes:
+                estudante = dados.estudantes[indice[posicao][1]]
+                if aceito(estudante):
+                    rows.append(_linha(estudante))
+                    if len(rows) == limite:
+                        break
+            return rows
+
+    def atualizar(
+        self, estudante_id: str, turma_id: str, estudante: Dict[str, Any]
+    ) -> Optional[int]:
+        with self._lock:
+            dados = self._turma(turma_id)
+            antigo = dados.estudantes.get(estudante_id) if dados else None
+            if antigo is None:
+                return None
+            novo = _novo_estudante({**estudante, "id": estudante_id})
+            dono = dados.nomes.get(normalizar_nome(novo["nome"]))
+            if dono is not None and dono != estudante_id:
+                raise ViolacaoUnicidade(INDICE_NOME_UNICO)
+            dados.retirar(antigo)
+            dados.adicionar(novo)
+            dados.versao += 1
+            return dados.versao
+
+    def remover(self, estudante_id: str, turma_id: str) -> Optional[int]:
+        with self._lock:
+            dados = self._turma(turma_id)
+            estudante = dados.estudantes.get(estudante_id) if dados else None
+            if estudante is None:
+                return None
+            dados.retirar(estudante)
+            dados.versao += 1
+            return dados.versao
+
+    def exportar(self, turma_id: str, tamanho_lote: int) -> Iterator[List[Dict[str, Any]]]:
+        # Cópia dos ids na hora da chamada: escritas durante a exportação não
+        # mudam a ordem dos lotes seguintes
+        with self._lock:
+            dados = self._turma(turma_id)
+            ids = [estudante_id for _, estudante_id in dados.indices["nome"]] if dados else []
+
+        for inicio in range(0, len(ids), tamanho_lote):
+            with self._lock:
+                lote = [
+                    _linha(dados.estudantes[estudante_id])
+                    for estudante_id in ids[inicio:inicio + tamanho_lote]
+                    if estudante_id in dados.estudantes
+                ]
+            if lote:
+                yield lote
+
+    # Agregados, a partir das somas mantidas por _TurmaMemoria
+
+    def medias_por_disciplina(self, turma_id: str) -> List[Optional[Decimal]]:
+        with self._lock:
+            dados = self._turma(turma_id)
+            if dados is None:
+                return []
+            return [
+                soma / contagem if contagem else None
+                for soma, contagem in zip(dados.somas, dados.contagens)
+            ]
+
+    def media_turma(self, turma_id: str) -> Optional[Decimal]:
+        with self._lock:
+            dados = self._turma(turma_id)
+            if not dados or not dados.estudantes:
+                return None
+            return dados.soma_medias / len(dados.estudantes)
+
+    def acima_da_media(self, turma_id: str, media: float) -> List[Dict[str, Any]]:
+        limite = Decimal(str(media))
+        with self._lock:
+            dados = self._turma(turma_id)
+            if dados is None:
+                return []
+            indice = dados.indices["media"]
+            acima = [
+                dados.estudantes[estudante_id]
+                for valor, estudante_id in indice[bisect_left(indice, (limite,)):]
+                if valor > limite
+            ]
+        return [
+            {"id": estudante["id"], "nome": estudante["nome"], "media": estudante["media"]}
+            for estudante in sorted(acima, key=lambda e: (e["nome"], e["id"]))
+        ]
+
+    def baixa_frequencia(self, turma_id: str, limite: float) -> List[Dict[str, Any]]:
+        limite_decimal = Decimal(str(limite))
+        with self._lock:
+            dados = self._turma(turma_id)
+            if dados is None:
+                return []
+            indice = dados.indices["frequencia"]
+            fim = bisect_left(indice, (limite_decimal,))
+            return [
+                {
+                    "id": estudante_id,
+                    "nome": dados.estudantes[estudante_id]["nome"],
+                    "frequencia": frequencia,
+                }
+                for frequencia, estudante_id in indice[:fim]
+            ]
+
+    # Snapshots de relatório
+
+    def gravar_snapshot(
+        self, turma_id: str, conteudo: str, gerado_em: datetime, versao: int
+    ) -> None:
+        with self._lock:
+            if turma_id not in self._turmas:
+                raise ViolacaoChaveEstrangeira(FK_SNAPSHOT_TURMA)
+            atual = self._snapshots.get(turma_id)
+            if atual is None or atual["gerado_em"] < gerado_em:
+                self._snapshots[turma_id] = {
+                    "conteudo": conteudo, "gerado_em": gerado_em, "versao": versao,
+                }
+
+    def obter_snapshot(self, turma_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            snapshot = self._snapshots.get(turma_id)
+            return dict(snapshot) if snapshot else None
+
+    def snapshots_vencidos(self, idade: float) -> List[str]:
+        limite = datetime.now(timezone.utc) - timedelta(seconds=idade)
+        with self._lock:
+            return [
+                turma_id for turma_id, snapshot in self._snapshots.items()
+                if snapshot["gerado_em"] < limite
+            ]
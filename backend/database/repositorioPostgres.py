@@ -0,0 +1,561 @@
+# Repositório PostgreSQL (BANCO_DADOS=postgres, o padrão)
+
+import copy
+import csv
+import io
+from contextlib import contextmanager
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from psycopg2.errors import ForeignKeyViolation, UniqueViolation
+
+from backend.database.armazenamentoNotas import (
+    ArmazenamentoNotas,
+    armazenamento_configurado,
+    arredondar_nota,
+)
+from backend.database.db import get_cursor, get_cursor_leitura, get_cursor_servidor
+from backend.database.repositorio import (
+    Repositorio,
+    ViolacaoChaveEstrangeira,
+    ViolacaoUnicidade,
+)
+from backend.model.turma import TURMA_PADRAO, Periodo, Turma
+
+# As queries que leem ou gravam notas são montadas a partir do armazenamento
+# das notas (ver armazenamentoNotas); as demais não dependem dele. Também são
+# usadas por RepositorioPostgresAsync, com os mesmos parâmetros
+
+def select_estudantes(armazenamento: ArmazenamentoNotas) -> str:
+    """Estudantes com as notas em ordem de disciplina, em uma única query (sem
+    uma ida ao banco por estudante); quem chama completa com WHERE e ORDER BY"""
+    return f"""
+        SELECT e.id, e.nome, e.frequencia, e.media, {armazenamento.expressao_notas()} AS notas
+        FROM estudantes e
+    """
+
+
+def select_exportacao(armazenamento: ArmazenamentoNotas) -> str:
+    """Exportação em fluxo: a ordem segue idx_estudantes_turma_nome_id e as notas
+    saem por estudante, então o plano não agrega a turma antes da primeira linha"""
+    return select_estudantes(armazenamento) + """
+        WHERE e.turma_id = %s
+        ORDER BY e.nome, e.id
+    """
+
+
+def sql_medias_por_disciplina(armazenamento: ArmazenamentoNotas) -> str:
+    """Média de cada disciplina do catálogo, em ordem (NULL sem notas).
+    Parâmetros: turma_id duas vezes"""
+    return f"""
+        SELECT medias.media
+        FROM disciplinas d
+        LEFT JOIN ({armazenamento.sql_medias_por_disciplina}) AS medias
+            ON medias.disciplina = d.posicao
+        WHERE d.turma_id = %s
+        ORDER BY d.posicao
+    """
+
+
+def com_nova_versao(escrita: str) -> str:
+    """`escrita` (INSERT, UPDATE ou DELETE em estudantes) e o incremento de
+    turmas.versao em um comando só: devolve a nova versão da turma, ou nenhuma
+    linha se nenhum estudante foi gravado"""
+    return f"""
+        WITH gravados AS ({escrita} RETURNING turma_id)
+        UPDATE turmas
+        SET versao = versao + 1
+        WHERE id IN (SELECT turma_id FROM gravados)
+        RETURNING versao
+    """
+
+
+def sql_inserir_estudante(armazenamento: ArmazenamentoNotas) -> str:
+    colunas = ["id", "turma_id", "nome", "frequencia", "media", *armazenamento.colunas]
+    return com_nova_versao(f"""
+        INSERT INTO estudantes ({', '.join(colunas)})
+        VALUES ({', '.join(['%s'] * len(colunas))})
+    """)
+
+
+def sql_atualizar_estudante(armazenamento: ArmazenamentoNotas) -> str:
+    """Sem versão devolvida, o estudante não existe na turma"""
+    colunas = ["nome", "frequencia", "media", *armazenamento.colunas]
+    return com_nova_versao(f"""
+        UPDATE estudantes
+        SET {', '.join(f"{coluna} = %s" for coluna in colunas)}
+        WHERE id = %s AND turma_id = %s
+    """)
+
+
+SELECT_DISCIPLINAS = """
+    SELECT nome
+    FROM disciplinas
+    WHERE turma_id = %s
+    ORDER BY posicao
+"""
+
+SELECT_NOMES_EXISTENTES = """
+    SELECT DISTINCT LOWER(TRIM(nome)) AS nome
+    FROM estudantes
+    WHERE turma_id = %s AND LOWER(TRIM(nome)) = ANY(%s)
+"""
+
+DELETE_ESTUDANTE = com_nova_versao("DELETE FROM estudantes WHERE id = %s AND turma_id = %s")
+
+SELECT_VERSAO = "SELECT versao FROM turmas WHERE id = %s"
+
+# Para as escritas em lote (COPY), que não podem ficar em um WITH
+INCREMENTAR_VERSAO = "UPDATE turmas SET versao = versao + 1 WHERE id = %s RETURNING versao"
+
+# Média exata das médias individuais (gravadas em estudantes.media)
+SELECT_MEDIA_TURMA = """
+    SELECT AVG(media) AS media_turma
+    FROM estudantes
+    WHERE turma_id = %s
+"""
+
+# NUMERIC contra NUMERIC: a média exata de cada estudante contra a informada
+SELECT_ACIMA_DA_MEDIA = """
+    SELECT id, nome, media
+    FROM estudantes
+    WHERE turma_id = %s AND media > %s
+    ORDER BY nome
+"""
+
+SELECT_BAIXA_FREQUENCIA = """
+    SELECT id, nome, frequencia
+    FROM estudantes
+    WHERE turma_id = %s AND frequencia < %s::numeric
+    ORDER BY frequencia ASC
+"""
+
+# Turmas com o catálogo de disciplinas em ordem de posição
+SELECT_TURMAS = """
+    SELECT
+        t.id,
+        t.periodo_id,
+        t.nome,
+        ARRAY(
+            SELECT d.nome
+            FROM disciplinas d
+            WHERE d.turma_id = t.id
+            ORDER BY d.posicao
+        ) AS disciplinas
+    FROM turmas t
+"""
+
+# O WHERE evita que um cálculo mais lento sobrescreva um snapshot mais novo
+UPSERT_SNAPSHOT = """
+    INSERT INTO relatorios_snapshot (turma_id, conteudo, gerado_em, versao)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (turma_id) DO UPDATE
+    SET conteudo = EXCLUDED.conteudo,
+        gerado_em = EXCLUDED.gerado_em,
+        versao = EXCLUDED.versao
+    WHERE relatorios_snapshot.gerado_em < EXCLUDED.gerado_em
+"""
+
+SELECT_SNAPSHOT = """
+    SELECT conteudo, gerado_em, versao
+    FROM relatorios_snapshot
+    WHERE turma_id = %s
+"""
+
+SELECT_SNAPSHOTS_VENCIDOS = """
+    SELECT turma_id
+    FROM relatorios_snapshot
+    WHERE gerado_em < NOW() - make_interval(secs => %s)
+"""
+
+# Colunas das ordenações da listagem (cada uma com índice (turma_id, coluna, id))
+COLUNAS_ORDENACAO = {"nome": "nome", "media": "media", "frequencia": "frequencia"}
+
+
+def media_para_gravar(notas: List[float]) -> Decimal:
+    """Média exata das notas como ficam gravadas (duas casas), em estudantes.media"""
+    if not notas:
+        return Decimal(0)
+    return sum(Decimal(str(arredondar_nota(nota))) for nota in notas) / len(notas)
+
+
+def valores_estudante(
+    armazenamento: ArmazenamentoNotas, turma_id: str, estudante: Dict[str, Any]
+) -> tuple:
+    """Parâmetros de sql_inserir_estudante"""
+    return (
+        estudante["id"],
+        turma_id,
+        estudante["nome"],
+        estudante["frequencia"],
+        media_para_gravar(estudante["notas"]),
+        *armazenamento.valores(estudante["notas"]),
+    )
+
+
+def valores_atualizacao(
+    armazenamento: ArmazenamentoNotas, estudante_id: str, turma_id: str,
+    estudante: Dict[str, Any],
+) -> tuple:
+    """Parâmetros de sql_atualizar_estudante"""
+    return (
+        estudante["nome"],
+        estudante["frequencia"],
+        media_para_gravar(estudante["notas"]),
+        *armazenamento.valores(estudante["notas"]),
+        estudante_id,
+        turma_id,
+    )
+
+
+def montar_consulta_pagina(
+    armazenamento: ArmazenamentoNotas,
+    turma_id: str,
+    limite: int,
+    ordenar: str = "nome",
+    decrescente: bool = False,
+    apos: Optional[Tuple[str, str]] = None,
+    nome_prefixo: Optional[str] = None,
+    frequencia_min: Optional[float] = None,
+    frequencia_max: Optional[float] = None,
+    media_min: Optional[float] = None,
+    media_max: Optional[float] = None,
+) -> Tuple[str, List[Any]]:
+    """Monta a query de Repositorio.pagina (keyset em (coluna, id))"""
+    coluna = COLUNAS_ORDENACAO[ordenar]
+
+    condicoes: List[str] = ["e.turma_id = %s"]
+    parametros: List[Any] = [turma_id]
+    if nome_prefixo:
+        prefixo = (
+            nome_prefixo.lower()
+            .replace("\\", "\\\\")
+            .replace("%", "\\%")
+            .replace("_", "\\_")
+        )
+        condicoes.append("LOWER(e.nome) LIKE %s")
+        parametros.append(prefixo + "%")
+    for expressao, valor in (
+        ("e.frequencia >= %s::numeric", frequencia_min),
+        ("e.frequencia <= %s::numeric", frequencia_max),
+        ("e.media >= %s::numeric", media_min),
+        ("e.media <= %s::numeric", media_max),
+    ):
+        if valor is not None:
+            condicoes.append(expressao)
+            parametros.append(valor)
+
+    if apos:
+        valor, ultimo_id = apos
+        comparacao = "<" if decrescente else ">"
+        tipo = "" if ordenar == "nome" else "::numeric"
+        condicoes.append(f"(e.{coluna}, e.id) {comparacao} (%s{tipo}, %s)")
+        parametros.extend([valor, ultimo_id])
+
+    direcao = "DESC" if decrescente else "ASC"
+    filtro = f"WHERE {' AND '.join(condicoes)}"
+    parametros.append(limite)
+
+    # As notas são lidas só para as linhas da página (a expressão é avaliada
+    # depois do LIMIT)
+    sql = f"""
+        SELECT
+            e.id,
+            e.nome,
+            e.frequencia,
+            e.media,
+            {armazenamento.expressao_notas()} AS notas
+        FROM estudantes e
+        {filtro}
+        ORDER BY e.{coluna} {direcao}, e.id {direcao}
+        LIMIT %s
+    """
+    return sql, parametros
+
+
+@contextmanager
+def violacoes_do_repositorio():
+    """Traduz as violações de restrição do psycopg2 para as de Repositorio"""
+    try:
+        yield
+    except UniqueViolation as erro:
+        raise ViolacaoUnicidade(erro.diag.constraint_name) from erro
+    except ForeignKeyViolation as erro:
+        raise ViolacaoChaveEstrangeira(erro.diag.constraint_name) from erro
+
+
+class RepositorioPostgres(Repositorio):
+    """Banco de DATABASE_URL (psycopg2), com as notas no layout de `armazenamento`.
+
+    Fora de transacao() e leitura(), cada método roda na sua transação no
+    primário. Dentro delas, os métodos chamados no repositório devolvido usam
+    a mesma conexão: uma escrita é gravada de uma vez, e uma leitura pode ir
+    para uma réplica (ver get_cursor_leitura) e ver um snapshot só.
+    """
+
+    nome = "postgres"
+
+    def __init__(self, armazenamento: Optional[ArmazenamentoNotas] = None):
+        # Layout das notas no banco (ARMAZENAMENTO_NOTAS, se não informado)
+        self.armazenamento = armazenamento or armazenamento_configurado()
+        self._select_estudantes = select_estudantes(self.armazenamento)
+        self._sql_inserir = sql_inserir_estudante(self.armazenamento)
+        self._sql_atualizar = sql_atualizar_estudante(self.armazenamento)
+        # Cursor da transação ou leitura em andamento (só nas cópias devolvidas
+        # por transacao() e leitura())
+        self._cursor_operacao = None
+
+    def _na_operacao(self, cursor) -> "RepositorioPostgres":
+        repositorio = copy.copy(self)
+        repositorio._cursor_operacao = cursor
+        return repositorio
+
+    @contextmanager
+    def _cursor(self):
+        if self._cursor_operacao is not None:
+            yield self._cursor_operacao
+            return
+        with violacoes_do_repositorio(), get_cursor() as cursor:
+            yield cursor
+
+    @contextmanager
+    def transacao(self):
+        with violacoes_do_repositorio(), get_cursor() as cursor:
+            yield self._na_operacao(cursor)
+
+    @contextmanager
+    def leitura(self, primario: bool = False, snapshot: bool = False):
+        with get_cursor_leitura(primario=primario, snapshot=snapshot) as cursor:
+            yield self._na_operacao(cursor)
+
+    def limpar(self) -> None:
+        with self._cursor() as cursor:
+            cursor.execute("TRUNCATE estudantes, relatorios_snapshot CASCADE")
+            cursor.execute("DELETE FROM turmas WHERE id <> %s", (TURMA_PADRAO,))
+            cursor.execute("DELETE FROM periodos WHERE id <> %s", (TURMA_PADRAO,))
+            # Os dados antigos da turma padrão não podem reaparecer com a mesma versão
+            cursor.execute("UPDATE turmas SET versao = versao + 1")
+
+    # Períodos e turmas
+
+    def criar_periodo(self, periodo: Periodo) -> None:
+        with self._cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO periodos (id, nome) VALUES (%s, %s)",
+                (periodo.id, periodo.nome)
+            )
+
+    def listar_periodos(self) -> List[Periodo]:
+        with self._cursor() as cursor:
+            cursor.execute("SELECT id, nome FROM periodos ORDER BY nome")
+            return [Periodo(**row) for row in cursor.fetchall()]
+
+    def criar_turma(self, turma: Turma) -> None:
+        with self._cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO turmas (id, periodo_id, nome) VALUES (%s, %s, %s)",
+                (turma.id, turma.periodo_id, turma.nome)
+            )
+            # O catálogo não muda depois de criado: as notas já gravadas
+            # dependem da posição de cada disciplina
+            cursor.execute(
+                """
+                INSERT INTO disciplinas (turma_id, posicao, nome)
+                SELECT %s, d.posicao, d.nome
+                FROM UNNEST(%s::varchar[]) WITH ORDINALITY AS d (nome, posicao)
+                """,
+                (turma.id, turma.disciplinas)
+            )
+
+    def listar_turmas(self, periodo_id: Optional[str] = None) -> List[Turma]:
+        with self._cursor() as cursor:
+            cursor.execute(
+                SELECT_TURMAS
+                + """
+                WHERE %(periodo_id)s::varchar IS NULL OR t.periodo_id = %(periodo_id)s
+                ORDER BY t.nome
+                """,
+                {"periodo_id": periodo_id}
+            )
+            return [Turma(**row) for row in cursor.fetchall()]
+
+    def obter_turma(self, turma_id: str) -> Optional[Turma]:
+        with self._cursor() as cursor:
+            cursor.execute(SELECT_TURMAS + " WHERE t.id = %s", (turma_id,))
+            row = cursor.fetchone()
+            return Turma(**row) if row else None
+
+    def remover_turma(self, turma_id: str) -> bool:
+        """Com os estudantes e as notas (ON DELETE CASCADE)"""
+        with self._cursor() as cursor:
+            cursor.execute("DELETE FROM turmas WHERE id = %s", (turma_id,))
+            return cursor.rowcount > 0
+
+    def disciplinas(self, turma_id: str) -> Tuple[str, ...]:
+        with self._cursor() as cursor:
+            cursor.execute(SELECT_DISCIPLINAS, (turma_id,))
+            return tuple(row["nome"] for row in cursor.fetchall())
+
+    def versao(self, turma_id: str) -> Optional[int]:
+        with self._cursor() as cursor:
+            cursor.execute(SELECT_VERSAO, (turma_id,))
+            row = cursor.fetchone()
+            return row["versao"] if row else None
+
+    # Estudantes
+
+    def _gravar_notas(self, cursor, estudante_id: str, notas: List[float]) -> None:
+        comando = self.armazenamento.comando_notas(estudante_id, notas)
+        if comando:
+            cursor.execute(*comando)
+
+    def _copiar(self, cursor, tabela: str, colunas: List[str], linhas: List[tuple]) -> None:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(linhas)
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY {tabela} ({', '.join(colunas)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+    def inserir(self, turma_id: str, estudantes: Sequence[Dict[str, Any]]) -> int:
+        """Um estudante com INSERT (mais as notas, no modo linhas); um lote com
+        um COPY por tabela, nenhum comando por linha, e o incremento da versão"""
+        with self._cursor() as cursor:
+            if len(estudantes) == 1:
+                estudante = estudantes[0]
+                cursor.execute(
+                    self._sql_inserir, valores_estudante(self.armazenamento, turma_id, estudante)
+                )
+                versao = cursor.fetchone()["versao"]
+                self._gravar_notas(cursor, estudante["id"], estudante["notas"])
+                return versao
+
+            linhas_estudantes = []
+            linhas_notas = []
+            for estudante in estudantes:
+                linhas_estudantes.append((
+                    estudante["id"],
+                    turma_id,
+                    estudante["nome"],
+                    estudante["frequencia"],
+                    media_para_gravar(estudante["notas"]),
+                    *self.armazenamento.valores_copia(estudante["notas"]),
+                ))
+                linhas_notas.extend(
+                    self.armazenamento.linhas_notas(estudante["id"], estudante["notas"])
+                )
+
+            if linhas_estudantes:
+                self._copiar(
+                    cursor,
+                    "estudantes",
+                    ["id", "turma_id", "nome", "frequencia", "media", *self.armazenamento.colunas],
+                    linhas_estudantes,
+                )
+            if linhas_notas:
+                self._copiar(cursor, "notas", ["estudante_id", "disciplina", "nota"], linhas_notas)
+            cursor.execute(INCREMENTAR_VERSAO, (turma_id,))
+            return cursor.fetchone()["versao"]
+
+    def nomes_existentes(self, turma_id: str, nomes: Sequence[str]) -> Set[str]:
+        with self._cursor() as cursor:
+            cursor.execute(SELECT_NOMES_EXISTENTES, (turma_id, list(nomes)))
+            return {row["nome"] for row in cursor.fetchall()}
+
+    def obter(self, estudante_id: str, turma_id: str) -> Optional[Dict[str, Any]]:
+        with self._cursor() as cursor:
+            cursor.execute(
+                self._select_estudantes + " WHERE e.id = %s AND e.turma_id = %s",
+                (estudante_id, turma_id)
+            )
+            return cursor.fetchone()
+
+    def listar(self, turma_id: str) -> List[Dict[str, Any]]:
+        with self._cursor() as cursor:
+            cursor.execute(
+                self._select_estudantes + " WHERE e.turma_id = %s ORDER BY e.nome",
+                (turma_id,)
+            )
+            return cursor.fetchall()
+
+    def pagina(self, turma_id: str, limite: int, **opcoes: Any) -> List[Dict[str, Any]]:
+        sql, parametros = montar_consulta_pagina(self.armazenamento, turma_id, limite, **opcoes)
+        with self._cursor() as cursor:
+            cursor.execute(sql, parametros)
+            return cursor.fetchall()
+
+    def atualizar(
+        self, estudante_id: str, turma_id: str, estudante: Dict[str, Any]
+    ) -> Optional[int]:
+        """Um UPDATE (mais as notas, no modo linhas): a existência do estudante
+        vem da própria escrita"""
+        with self._cursor() as cursor:
+            cursor.execute(
+                self._sql_atualizar,
+                valores_atualizacao(self.armazenamento, estudante_id, turma_id, estudante),
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            self._gravar_notas(cursor, estudante_id, estudante["notas"])
+            return row["versao"]
+
+    def remover(self, estudante_id: str, turma_id: str) -> Optional[int]:
+        with self._cursor() as cursor:
+            cursor.execute(DELETE_ESTUDANTE, (estudante_id, turma_id))
+            row = cursor.fetchone()
+            return row["versao"] if row else None
+
+    def exportar(self, turma_id: str, tamanho_lote: int) -> Iterator[List[Dict[str, Any]]]:
+        """Lotes lidos de um cursor no servidor: a memória fica limitada a um
+        lote e o primeiro sai antes de a consulta terminar. A conexão fica
+        ocupada até o gerador ser esgotado ou fechado."""
+        with get_cursor_servidor(tamanho_lote) as cursor:
+            cursor.execute(select_exportacao(self.armazenamento), (turma_id,))
+            while True:
+                rows = cursor.fetchmany(tamanho_lote)
+                if not rows:
+                    return
+                yield rows
+
+    # Agregados, calculados no banco
+
+    def medias_por_disciplina(self, turma_id: str) -> List[Optional[Decimal]]:
+        with self._cursor() as cursor:
+            cursor.execute(sql_medias_por_disciplina(self.armazenamento), (turma_id, turma_id))
+            return [row["media"] for row in cursor.fetchall()]
+
+    def media_turma(self, turma_id: str) -> Optional[Decimal]:
+        with self._cursor() as cursor:
+            cursor.execute(SELECT_MEDIA_TURMA, (turma_id,))
+            return cursor.fetchone()["media_turma"]
+
+    def acima_da_media(self, turma_id: str, media: float) -> List[Dict[str, Any]]:
+        with self._cursor() as cursor:
+            cursor.execute(SELECT_ACIMA_DA_MEDIA, (turma_id, Decimal(str(media))))
+            return cursor.fetchall()
+
+    def baixa_frequencia(self, turma_id: str, limite: float) -> List[Dict[str, Any]]:
+        with self._cursor() as cursor:
+            cursor.execute(SELECT_BAIXA_FREQUENCIA, (turma_id, limite))
+            return cursor.fetchall()
+
+    # Snapshots de relatório
+
+    def gravar_snapshot(
+        self, turma_id: str, conteudo: str, gerado_em: datetime, versao: int
+    ) -> None:
+        with self._cursor() as cursor:
+            cursor.execute(UPSERT_SNAPSHOT, (turma_id, conteudo, gerado_em, versao))
+
+    def obter_snapshot(self, turma_id: str) -> Optional[Dict[str, Any]]:
+        with self._cursor() as cursor:
+            cursor.execute(SELECT_SNAPSHOT, (turma_id,))
+            return cursor.fetchone()
+
+    def snapshots_vencidos(self, idade: float) -> List[str]:
+        with self._cursor() as cursor:
+            cursor.execute(SELECT_SNAPSHOTS_VENCIDOS, (idade,))
+            return [row["turma_id"] for row in cursor.fetchall()]
@@ -0,0 +1,185 @@
+# Repositório PostgreSQL sobre o pool assíncrono (DB_MODO=async)
+
+import copy
+from contextlib import asynccontextmanager, contextmanager
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from psycopg.errors import ForeignKeyViolation, UniqueViolation
+
+from backend.database.armazenamentoNotas import ArmazenamentoNotas, armazenamento_configurado
+from backend.database.dbAsync import (
+    get_cursor_async,
+    get_cursor_leitura_async,
+    get_cursor_servidor_async,
+)
+from backend.database.repositorio import ViolacaoChaveEstrangeira, ViolacaoUnicidade
+from backend.database.repositorioPostgres import (
+    DELETE_ESTUDANTE,
+    SELECT_ACIMA_DA_MEDIA,
+    SELECT_BAIXA_FREQUENCIA,
+    SELECT_DISCIPLINAS,
+    SELECT_MEDIA_TURMA,
+    SELECT_VERSAO,
+    montar_consulta_pagina,
+    select_estudantes,
+    select_exportacao,
+    sql_atualizar_estudante,
+    sql_inserir_estudante,
+    sql_medias_por_disciplina,
+    valores_atualizacao,
+    valores_estudante,
+)
+
+
+@contextmanager
+def violacoes_do_repositorio_async():
+    """Equivalente a violacoes_do_repositorio para as exceções do psycopg 3"""
+    try:
+        yield
+    except UniqueViolation as erro:
+        raise ViolacaoUnicidade(erro.diag.constraint_name) from erro
+    except ForeignKeyViolation as erro:
+        raise ViolacaoChaveEstrangeira(erro.diag.constraint_name) from erro
+
+
+class RepositorioPostgresAsync:
+    """Os métodos de RepositorioPostgres usados por EstudanteServiceAsync, como
+    corrotinas, com as mesmas queries e parâmetros (psycopg 3).
+
+    A importação não tem versão assíncrona: roda no serviço síncrono, então
+    inserir grava um INSERT por estudante, sem COPY.
+    """
+
+    def __init__(self, armazenamento: Optional[ArmazenamentoNotas] = None):
+        self.armazenamento = armazenamento or armazenamento_configurado()
+        self._select_estudantes = select_estudantes(self.armazenamento)
+        self._sql_inserir = sql_inserir_estudante(self.armazenamento)
+        self._sql_atualizar = sql_atualizar_estudante(self.armazenamento)
+        self._cursor_operacao = None
+
+    def _na_operacao(self, cursor) -> "RepositorioPostgresAsync":
+        repositorio = copy.copy(self)
+        repositorio._cursor_operacao = cursor
+        return repositorio
+
+    @asynccontextmanager
+    async def _cursor(self):
+        if self._cursor_operacao is not None:
+            yield self._cursor_operacao
+            return
+        with violacoes_do_repositorio_async():
+            async with get_cursor_async() as cursor:
+                yield cursor
+
+    @asynccontextmanager
+    async def transacao(self):
+        with violacoes_do_repositorio_async():
+            async with get_cursor_async() as cursor:
+                yield self._na_operacao(cursor)
+
+    @asynccontextmanager
+    async def leitura(self, primario: bool = False, snapshot: bool = False):
+        async with get_cursor_leitura_async(primario=primario, snapshot=snapshot) as cursor:
+            yield self._na_operacao(cursor)
+
+    async def disciplinas(self, turma_id: str) -> Tuple[str, ...]:
+        async with self._cursor() as cursor:
+            await cursor.execute(SELECT_DISCIPLINAS, (turma_id,))
+            return tuple(row["nome"] for row in await cursor.fetchall())
+
+    async def versao(self, turma_id: str) -> Optional[int]:
+        async with self._cursor() as cursor:
+            await cursor.execute(SELECT_VERSAO, (turma_id,))
+            row = await cursor.fetchone()
+            return row["versao"] if row else None
+
+    async def _gravar_notas(self, cursor, estudante_id: str, notas: List[float]) -> None:
+        comando = self.armazenamento.comando_notas(estudante_id, notas)
+        if comando:
+            await cursor.execute(*comando)
+
+    async def inserir(self, turma_id: str, estudantes: Sequence[Dict[str, Any]]) -> int:
+        async with self._cursor() as cursor:
+            for estudante in estudantes:
+                await cursor.execute(
+                    self._sql_inserir, valores_estudante(self.armazenamento, turma_id, estudante)
+                )
+                versao = (await cursor.fetchone())["versao"]
+                await self._gravar_notas(cursor, estudante["id"], estudante["notas"])
+            return versao
+
+    async def obter(self, estudante_id: str, turma_id: str) -> Optional[Dict[str, Any]]:
+        async with self._cursor() as cursor:
+            await cursor.execute(
+                self._select_estudantes + " WHERE e.id = %s AND e.turma_id = %s",
+                (estudante_id, turma_id)
+            )
+            return await cursor.fetchone()
+
+    async def listar(self, turma_id: str) -> List[Dict[str, Any]]:
+        async with self._cursor() as cursor:
+            await cursor.execute(
+                self._select_estudantes + " WHERE e.turma_id = %s ORDER BY e.nome",
+                (turma_id,)
+            )
+            return await cursor.fetchall()
+
+    async def pagina(self, turma_id: str, limite: int, **opcoes: Any) -> List[Dict[str, Any]]:
+        sql, parametros = montar_consulta_pagina(self.armazenamento, turma_id, limite, **opcoes)
+        async with self._cursor() as cursor:
+            await cursor.execute(sql, parametros)
+            return await cursor.fetchall()
+
+    async def atualizar(
+        self, estudante_id: str, turma_id: str, estudante: Dict[str, Any]
+    ) -> Optional[int]:
+        async with self._cursor() as cursor:
+            await cursor.execute(
+                self._sql_atualizar,
+                valores_atualizacao(self.armazenamento, estudante_id, turma_id, estudante),
+            )
+            row = await cursor.fetchone()
+            if row is None:
+                return None
+            await self._gravar_notas(cursor, estudante_id, estudante["notas"])
+            return row["versao"]
+
+    async def remover(self, estudante_id: str, turma_id: str) -> Optional[int]:
+        async with self._cursor() as cursor:
+            await cursor.execute(DELETE_ESTUDANTE, (estudante_id, turma_id))
+            row = await cursor.fetchone()
+            return row["versao"] if row else None
+
+    async def exportar(
+        self, turma_id: str, tamanho_lote: int
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        async with get_cursor_servidor_async(tamanho_lote) as cursor:
+            await cursor.execute(select_exportacao(self.armazenamento), (turma_id,))
+            while True:
+                rows = await cursor.fetchmany(tamanho_lote)
+                if not rows:
+                    return
+                yield rows
+
+    async def medias_por_disciplina(self, turma_id: str) -> List[Optional[Decimal]]:
+        async with self._cursor() as cursor:
+            await cursor.execute(
+                sql_medias_por_disciplina(self.armazenamento), (turma_id, turma_id)
+            )
+            return [row["media"] for row in await cursor.fetchall()]
+
+    async def media_turma(self, turma_id: str) -> Optional[Decimal]:
+        async with self._cursor() as cursor:
+            await cursor.execute(SELECT_MEDIA_TURMA, (turma_id,))
+            return (await cursor.fetchone())["media_turma"]
+
+    async def acima_da_media(self, turma_id: str, media: float) -> List[Dict[str, Any]]:
+        async with self._cursor() as cursor:
+            await cursor.execute(SELECT_ACIMA_DA_MEDIA, (turma_id, Decimal(str(media))))
+            return await cursor.fetchall()
+
+    async def baixa_frequencia(self, turma_id: str, limite: float) -> List[Dict[str, Any]]:
+        async with self._cursor() as cursor:
+            await cursor.execute(SELECT_BAIXA_FREQUENCIA, (turma_id, limite))
+            return await cursor.fetchall()
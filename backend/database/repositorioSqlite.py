@@ -0,0 +1,539 @@
+# Repositório SQLite (BANCO_DADOS=sqlite)
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from backend.database.armazenamentoNotas import arredondar_nota
+from backend.database.repositorio import (
+    FK_PERIODO,
+    FK_SNAPSHOT_TURMA,
+    FK_TURMA,
+    INDICE_NOME_UNICO,
+    INDICE_PERIODO_UNICO,
+    INDICE_TURMA_UNICA,
+    Repositorio,
+    ViolacaoChaveEstrangeira,
+    ViolacaoUnicidade,
+    arredondar_frequencia,
+    normalizar_nome,
+)
+from backend.model.turma import DISCIPLINAS_PADRAO, TURMA_PADRAO, Periodo, Turma
+
+# Mesmo modelo de schema.sql, com duas diferenças: as notas ficam em uma
+# coluna JSON com inteiros em centésimos (somas exatas, como o NUMERIC), e o
+# nome normalizado é gravado em uma coluna, porque o LOWER do SQLite só
+# converte ASCII. soma_notas (centésimos) dá as médias exatas; media (REAL) só
+# ordena e filtra a listagem. turmas.versao é a versão dos dados (ver
+# Repositorio), incrementada na mesma transação de cada escrita.
+# relatorios_snapshot.gerado_em é texto ISO 8601 em UTC com microssegundos,
+# que ordena como o instante
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS periodos (
+    id TEXT PRIMARY KEY,
+    nome TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS turmas (
+    id TEXT PRIMARY KEY,
+    periodo_id TEXT NOT NULL REFERENCES periodos (id) ON DELETE CASCADE,
+    nome TEXT NOT NULL,
+    nome_normalizado TEXT NOT NULL,
+    disciplinas TEXT NOT NULL,
+    versao INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_turmas_periodo_nome_unico
+    ON turmas (periodo_id, nome_normalizado);
+
+CREATE TABLE IF NOT EXISTS estudantes (
+    id TEXT PRIMARY KEY,
+    turma_id TEXT NOT NULL REFERENCES turmas (id) ON DELETE CASCADE,
+    nome TEXT NOT NULL,
+    nome_normalizado TEXT NOT NULL,
+    frequencia REAL NOT NULL,
+    notas TEXT NOT NULL,
+    soma_notas INTEGER NOT NULL,
+    media REAL NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_estudantes_turma_nome_unico
+    ON estudantes (turma_id, nome_normalizado);
+CREATE INDEX IF NOT EXISTS idx_estudantes_turma_nome_id ON estudantes (turma_id, nome, id);
+CREATE INDEX IF NOT EXISTS idx_estudantes_turma_media_id ON estudantes (turma_id, media, id);
+CREATE INDEX IF NOT EXISTS idx_estudantes_turma_frequencia_id
+    ON estudantes (turma_id, frequencia, id);
+
+CREATE TABLE IF NOT EXISTS relatorios_snapshot (
+    turma_id TEXT PRIMARY KEY REFERENCES turmas (id) ON DELETE CASCADE,
+    conteudo TEXT NOT NULL,
+    gerado_em TEXT NOT NULL,
+    versao INTEGER NOT NULL
+);
+"""
+
+SELECT_ESTUDANTES = """
+    SELECT id, nome, frequencia, notas, media
+    FROM estudantes
+"""
+
+# Ordenações da listagem: coluna e conversão do valor lido do cursor
+ORDENACOES = {"nome": str, "media": float, "frequencia": float}
+
+
+def _instante(momento: datetime) -> str:
+    return momento.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _linha(row: sqlite3.Row) -> Dict[str, Any]:
+    return {
+        "id": row["id"],
+        "nome": row["nome"],
+        # Divisão correta (IEEE): 755 / 100 é o mesmo float que 7.55
+        "notas": [centesimos / 100 for centesimos in json.loads(row["notas"])],
+        "frequencia": row["frequencia"],
+        "media": row["media"],
+    }
+
+
+def _valores_estudante(dados: Dict[str, Any]) -> Dict[str, Any]:
+    """Colunas gravadas para um estudante, com os arredondamentos do PostgreSQL"""
+    centesimos = [int(Decimal(str(arredondar_nota(nota))) * 100) for nota in dados["notas"]]
+    soma = sum(centesimos)
+    return {
+        "nome": dados["nome"],
+        "nome_normalizado": normalizar_nome(dados["nome"]),
+        "frequencia": float(arredondar_frequencia(dados["frequencia"])),
+        "notas": json.dumps(centesimos),
+        "soma_notas": soma,
+        "media": float(Decimal(soma) / 100 / len(centesimos)) if centesimos else 0.0,
+    }
+
+
+class RepositorioSqlite(Repositorio):
+    """Banco embutido em um arquivo (ou em memória, com ":memory:").
+
+    Uma conexão por repositório, usada por uma thread de cada vez: o SQLite
+    aceita um escritor por vez de qualquer forma, e cada método é uma
+    transação curta.
+    """
+
+    nome = "sqlite"
+
+    def __init__(self, caminho: str = ":memory:"):
+        self._lock = threading.RLock()
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._conexao.row_factory = sqlite3.Row
+        # LOWER do SQLite só converte ASCII; o filtro por prefixo usa o do Python
+        self._conexao.create_function("minusculas", 1, str.lower, deterministic=True)
+        self._conexao.execute("PRAGMA foreign_keys = ON")
+        with self._transacao() as conexao:
+            conexao.executescript(SCHEMA)
+            # Arquivos criados antes da coluna versao (o SQLite não tem
+            # ADD COLUMN IF NOT EXISTS)
+            colunas = {row["name"] for row in conexao.execute("PRAGMA table_info(turmas)")}
+            if "versao" not in colunas:
+                conexao.execute("ALTER TABLE turmas ADD COLUMN versao INTEGER NOT NULL DEFAULT 0")
+        self._criar_turma_padrao()
+
+    @contextmanager
+    def _transacao(self):
+        """A conexão, com COMMIT no fim ou ROLLBACK em caso de erro"""
+        with self._lock, self._conexao:
+            yield self._conexao
+
+    def _criar_turma_padrao(self) -> None:
+        with self._transacao() as conexao:
+            conexao.execute(
+                "INSERT OR IGNORE INTO periodos (id, nome) VALUES (?, ?)",
+                (TURMA_PADRAO, "Padrão"),
+            )
+            conexao.execute(
+                """
+                INSERT OR IGNORE INTO turmas (id, periodo_id, nome, nome_normalizado, disciplinas)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (
+                    TURMA_PADRAO, TURMA_PADRAO, "Turma padrão",
+                    normalizar_nome("Turma padrão"), json.dumps(DISCIPLINAS_PADRAO),
+                ),
+            )
+
+    def limpar(self) -> None:
+        # A turma padrão fica, vazia e com uma versão nova: os dados antigos
+        # não podem reaparecer com a mesma versão
+        with self._transacao() as conexao:
+            conexao.execute("DELETE FROM periodos WHERE id <> ?", (TURMA_PADRAO,))
+            conexao.execute("DELETE FROM turmas WHERE id <> ?", (TURMA_PADRAO,))
+            conexao.execute("DELETE FROM estudantes")
+            conexao.execute("DELETE FROM relatorios_snapshot")
+            conexao.execute(
+                "UPDATE turmas SET versao = versao + 1 WHERE id = ?", (TURMA_PADRAO,)
+            )
+        self._criar_turma_padrao()
+
+    # Períodos e turmas
+
+    def criar_periodo(self, periodo: Periodo) -> None:
+        try:
+            with self._transacao() as conexao:
+                conexao.execute(
+                    "INSERT INTO periodos (id, nome) VALUES (?, ?)", (periodo.id, periodo.nome)
+                )
+        except sqlite3.IntegrityError as erro:
+            raise ViolacaoUnicidade(INDICE_PERIODO_UNICO) from erro
+
+    def listar_periodos(self) -> List[Periodo]:
+        with self._transacao() as conexao:
+            rows = conexao.execute("SELECT id, nome FROM periodos ORDER BY nome").fetchall()
+        return [Periodo(id=row["id"], nome=row["nome"]) for row in rows]
+
+    def criar_turma(self, turma: Turma) -> None:
+        try:
+            with self._transacao() as conexao:
+                conexao.execute(
+                    """
+                    INSERT INTO turmas (id, periodo_id, nome, nome_normalizado, disciplinas)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (
+                        turma.id, turma.periodo_id, turma.nome,
+                        normalizar_nome(turma.nome), json.dumps(turma.disciplinas),
+                    ),
+                )
+        except sqlite3.IntegrityError as erro:
+            if "FOREIGN KEY" in str(erro):
+                raise ViolacaoChaveEstrangeira(FK_PERIODO) from erro
+            raise ViolacaoUnicidade(INDICE_TURMA_UNICA) from erro
+
+    def _turmas(self, where: str, parametros: tuple) -> List[Turma]:
+        with self._transacao() as conexao:
+            rows = conexao.execute(
+                f"SELECT id, periodo_id, nome, disciplinas FROM turmas {where} ORDER BY nome",
+                parametros,
+            ).fetchall()
+        return [
+            Turma(
+                id=row["id"],
+                periodo_id=row["periodo_id"],
+                nome=row["nome"],
+                disciplinas=json.loads(row["disciplinas"]),
+            )
+            for row in rows
+        ]
+
+    def listar_turmas(self, periodo_id: Optional[str] = None) -> List[Turma]:
+        if periodo_id is None:
+            return self._turmas("", ())
+        return self._turmas("WHERE periodo_id = ?", (periodo_id,))
+
+    def obter_turma(self, turma_id: str) -> Optional[Turma]:
+        turmas = self._turmas("WHERE id = ?", (turma_id,))
+        return turmas[0] if turmas else None
+
+    def remover_turma(self, turma_id: str) -> bool:
+        with self._transacao() as conexao:
+            return conexao.execute("DELETE FROM turmas WHERE id = ?", (turma_id,)).rowcount > 0
+
+    def disciplinas(self, turma_id: str) -> Tuple[str, ...]:
+        with self._transacao() as conexao:
+            row = conexao.execute(
+                "SELECT disciplinas FROM turmas WHERE id = ?", (turma_id,)
+            ).fetchone()
+        return tuple(json.loads(row["disciplinas"])) if row else ()
+
+    def versao(self, turma_id: str) -> Optional[int]:
+        with self._transacao() as conexao:
+            row = conexao.execute("SELECT versao FROM turmas WHERE id = ?", (turma_id,)).fetchone()
+        return row["versao"] if row else None
+
+    def _nova_versao(self, conexao: sqlite3.Connection, turma_id: str) -> int:
+        """Incrementa a versão da turma na transação da escrita"""
+        conexao.execute("UPDATE turmas SET versao = versao + 1 WHERE id = ?", (turma_id,))
+        return conexao.execute(
+            "SELECT versao FROM turmas WHERE id = ?", (turma_id,)
+        ).fetchone()["versao"]
+
+    # Estudantes
+
+    def inserir(self, turma_id: str, estudantes: Sequence[Dict[str, Any]]) -> int:
+        linhas = [
+            {**_valores_estudante(estudante), "id": estudante["id"], "turma_id": turma_id}
+            for estudante in estudantes
+        ]
+        try:
+            with self._transacao() as conexao:
+                conexao.executemany(
+                    """
+                    INSERT INTO estudantes
+                        (id, turma_id, nome, nome_normalizado, frequencia, notas, soma_notas, media)
+                    VALUES
+                        (:id, :turma_id, :nome, :nome_normalizado, :frequencia, :notas,
+                         :soma_notas, :media)
+                    """,
+                    linhas,
+                )
+                return self._nova_versao(conexao, turma_id)
+        except sqlite3.IntegrityError as erro:
+            if "FOREIGN KEY" in str(erro):
+                raise ViolacaoChaveEstrangeira(FK_TURMA) from erro
+            raise ViolacaoUnicidade(INDICE_NOME_UNICO) from erro
+
+    def nomes_existentes(self, turma_id: str, nomes: Sequence[str]) -> Set[str]:
+        nomes = list(nomes)
+        existentes: Set[str] = set()
+        # Em blocos, abaixo do limite de parâmetros do SQLite
+        with self._transacao() as conexao:
+            for inicio in range(0, len(nomes), 500):
+                bloco = nomes[inicio:inicio + 500]
+                rows = conexao.execute(
+                    f"""
+                    SELECT nome_normalizado
+                    FROM estudantes
+                    WHERE turma_id = ? AND nome_normalizado IN ({', '.join('?' * len(bloco))})
+                    """,
+                    (turma_id, *bloco),
+                ).fetchall()
+                existentes.update(row["nome_normalizado"] for row in rows)
+        return existentes
+
+    def obter(self, estudante_id: str, turma_id: str) -> Optional[Dict[str, Any]]:
+        with self._transacao() as conexao:
+            row = conexao.execute(
+                SELECT_ESTUDANTES + " WHERE id = ? AND turma_id = ?", (estudante_id, turma_id)
+            ).fetchone()
+        return _linha(row) if row else None
+
+    def listar(self, turma_id: str) -> List[Dict[str, Any]]:
+        with self._transacao() as conexao:
+            rows = conexao.execute(
+                SELECT_ESTUDANTES + " WHERE turma_id = ? ORDER BY nome, id", (turma_id,)
+            ).fetchall()
+        return [_linha(row) for row in rows]
+
+    def pagina(
+        self,
+        turma_id: str,
+        limite: int,
+        ordenar: str = "nome",
+        decrescente: bool = False,
+        apos: Optional[Tuple[str, str]] = None,
+        nome_prefixo: Optional[str] = None,
+        frequencia_min: Optional[float] = None,
+        frequencia_max: Optional[float] = None,
+        media_min: Optional[float] = None,
+        media_max: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        condicoes = ["turma_id = ?"]
+        parametros: List[Any] = [turma_id]
+        if nome_prefixo:
+            prefixo = (
+                nome_prefixo.lower()
+                .replace("\\", "\\\\")
+                .replace("%", "\\%")
+                .replace("_", "\\_")
+            )
+            condicoes.append("minusculas(nome) LIKE ? ESCAPE '\\'")
+            parametros.append(prefixo + "%")
+        for expressao, valor in (
+            ("frequencia >= ?", frequencia_min),
+            ("frequencia <= ?", frequencia_max),
+            ("media >= ?", media_min),
+            ("media <= ?", media_max),
+        ):
+            if valor is not None:
+                condicoes.append(expressao)
+                parametros.append(valor)
+
+        if apos is not None:
+            valor, ultimo_id = apos
+            comparacao = "<" if decrescente else ">"
+            condicoes.append(f"({ordenar}, id) {comparacao} (?, ?)")
+            parametros.extend([ORDENACOES[ordenar](valor), ultimo_id])
+
+        direcao = "DESC" if decrescente else "ASC"
+        parametros.append(limite)
+        with self._transacao() as conexao:
+            rows = conexao.execute(
+                SELECT_ESTUDANTES
+                + f"""
+                WHERE {' AND '.join(condicoes)}
+                ORDER BY {ordenar} {direcao}, id {direcao}
+                LIMIT ?
+                """,
+                parametros,
+            ).fetchall()
+        return [_linha(row) for row in rows]
+
+    def atualizar(
+        self, estudante_id: str, turma_id: str, estudante: Dict[str, Any]
+    ) -> Optional[int]:
+        try:
+            with self._transacao() as conexao:
+                cursor = conexao.execute(
+                    """
+                    UPDATE estudantes
+                    SET nome = :nome, nome_normalizado = :nome_normalizado,
+                        frequencia = :frequencia, notas = :notas,
+                        soma_notas = :soma_notas, media = :media
+                    WHERE id = :id AND turma_id = :turma_id
+                    """,
+                    {**_valores_estudante(estudante), "id": estudante_id, "turma_id": turma_id},
+                )
+                if cursor.rowcount == 0:
+                    return None
+                return self._nova_versao(conexao, turma_id)
+        except sqlite3.IntegrityError as erro:
+            raise ViolacaoUnicidade(INDICE_NOME_UNICO) from erro
+
+    def remover(self, estudante_id: str, turma_id: str) -> Optional[int]:
+        with self._transacao() as conexao:
+            cursor = conexao.execute(
+                "DELETE FROM estudantes WHERE id = ? AND turma_id = ?", (estudante_id, turma_id)
+            )
+            if cursor.rowcount == 0:
+                return None
+            return self._nova_versao(conexao, turma_id)
+
+    def exportar(self, turma_id: str, tamanho_lote: int) -> Iterator[List[Dict[str, Any]]]:
+        # Keyset em (nome, id): cada lote é uma consulta curta, sem prender a
+        # conexão enquanto quem consome o gerador trabalha
+        ultimo: Optional[Tuple[str, str]] = None
+        while True:
+            condicao, parametros = "turma_id = ?", [turma_id]
+            if ultimo is not None:
+                condicao += " AND (nome, id) > (?, ?)"
+                parametros.extend(ultimo)
+            with self._transacao() as conexao:
+                rows = conexao.execute(
+                    SELECT_ESTUDANTES + f" WHERE {condicao} ORDER BY nome, id LIMIT ?",
+                    (*parametros, tamanho_lote),
+                ).fetchall()
+            if not rows:
+                return
+            ultimo = (rows[-1]["nome"], rows[-1]["id"])
+            yield [_linha(row) for row in rows]
+
+    # Agregados em SQL, somando os centésimos (inteiros) para médias exatas
+
+    def medias_por_disciplina(self, turma_id: str) -> List[Optional[Decimal]]:
+        disciplinas = self.disciplinas(turma_id)
+        with self._transacao() as conexao:
+            rows = conexao.execute(
+                """
+                SELECT nota.key AS posicao, SUM(nota.value) AS soma, COUNT(*) AS total
+                FROM estudantes e, json_each(e.notas) AS nota
+                WHERE e.turma_id = ?
+                GROUP BY nota.key
+                """,
+                (turma_id,),
+            ).fetchall()
+        medias: List[Optional[Decimal]] = [None] * len(disciplinas)
+        for row in rows:
+            if row["posicao"] < len(medias):
+                medias[row["posicao"]] = Decimal(row["soma"]) / 100 / row["total"]
+        return medias
+
+    def media_turma(self, turma_id: str) -> Optional[Decimal]:
+        # Média de cada estudante = soma_notas / (100 * quantidade de notas);
+        # agrupar pela quantidade mantém a soma das médias exata
+        with self._transacao() as conexao:
+            rows = conexao.execute(
+                """
+                SELECT json_array_length(notas) AS notas, SUM(soma_notas) AS soma, COUNT(*) AS total
+                FROM estudantes
+                WHERE turma_id = ?
+                GROUP BY json_array_length(notas)
+                """,
+                (turma_id,),
+            ).fetchall()
+        total = sum(row["total"] for row in rows)
+        if not total:
+            return None
+        return sum(
+            Decimal(row["soma"]) / 100 / row["notas"] for row in rows if row["notas"]
+        ) / total
+
+    def acima_da_media(self, turma_id: str, media: float) -> List[Dict[str, Any]]:
+        # media / 100 > limite  <=>  soma_notas > limite * 100 * quantidade de notas
+        limite = Decimal(str(media)) * 100
+        with self._transacao() as conexao:
+            rows = conexao.execute(
+                """
+                SELECT id, nome, soma_notas, json_array_length(notas) AS notas
+                FROM estudantes
+                WHERE turma_id = ? AND soma_notas > ? * json_array_length(notas)
+                ORDER BY nome, id
+                """,
+                (turma_id, float(limite)),
+            ).fetchall()
+        return [
+            {
+                "id": row["id"],
+                "nome": row["nome"],
+                "media": Decimal(row["soma_notas"]) / 100 / row["notas"],
+            }
+            for row in rows
+        ]
+
+    def baixa_frequencia(self, turma_id: str, limite: float) -> List[Dict[str, Any]]:
+        with self._transacao() as conexao:
+            rows = conexao.execute(
+                """
+                SELECT id, nome, frequencia
+                FROM estudantes
+                WHERE turma_id = ? AND frequencia < ?
+                ORDER BY frequencia, id
+                """,
+                (turma_id, limite),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    # Snapshots de relatório
+
+    def gravar_snapshot(
+        self, turma_id: str, conteudo: str, gerado_em: datetime, versao: int
+    ) -> None:
+        try:
+            with self._transacao() as conexao:
+                conexao.execute(
+                    """
+                    INSERT INTO relatorios_snapshot (turma_id, conteudo, gerado_em, versao)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (turma_id) DO UPDATE
+                    SET conteudo = excluded.conteudo,
+                        gerado_em = excluded.gerado_em,
+                        versao = excluded.versao
+                    WHERE relatorios_snapshot.gerado_em < excluded.gerado_em
+                    """,
+                    (turma_id, conteudo, _instante(gerado_em), versao),
+                )
+        except sqlite3.IntegrityError as erro:
+            raise ViolacaoChaveEstrangeira(FK_SNAPSHOT_TURMA) from erro
+
+    def obter_snapshot(self, turma_id: str) -> Optional[Dict[str, Any]]:
+        with self._transacao() as conexao:
+            row = conexao.execute(
+                "SELECT conteudo, gerado_em, versao FROM relatorios_snapshot WHERE turma_id = ?",
+                (turma_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "conteudo": row["conteudo"],
+            "gerado_em": datetime.fromisoformat(row["gerado_em"]),
+            "versao": row["versao"],
+        }
+
+    def snapshots_vencidos(self, idade: float) -> List[str]:
+        limite = datetime.now(timezone.utc) - timedelta(seconds=idade)
+        with self._transacao() as conexao:
+            rows = conexao.execute(
+                "SELECT turma_id FROM relatorios_snapshot WHERE gerado_em < ?",
+                (_instante(limite),),
+            ).fetchall()
+        return [row["turma_id"] for row in rows]
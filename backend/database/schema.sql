@@ -0,0 +1,139 @@
+-- Schema do banco de dados (executado por init_db; pode rodar mais de uma vez)
+
+CREATE TABLE IF NOT EXISTS estudantes (
+    id VARCHAR(36) PRIMARY KEY,
+    nome VARCHAR(100) NOT NULL,
+    frequencia NUMERIC(5, 2) NOT NULL CHECK (frequencia >= 0 AND frequencia <= 100)
+);
+
+CREATE TABLE IF NOT EXISTS notas (
+    estudante_id VARCHAR(36) NOT NULL REFERENCES estudantes (id) ON DELETE CASCADE,
+    disciplina SMALLINT NOT NULL,
+    nota NUMERIC(4, 2) NOT NULL CHECK (nota >= 0 AND nota <= 10),
+    PRIMARY KEY (estudante_id, disciplina)
+);
+
+-- Média das notas do estudante, gravada junto com as notas para permitir
+-- filtrar e ordenar por média usando índice
+ALTER TABLE estudantes ADD COLUMN IF NOT EXISTS media NUMERIC;
+
+UPDATE estudantes e
+SET media = COALESCE(
+    (SELECT AVG(n.nota) FROM notas n WHERE n.estudante_id = e.id), 0
+)
+WHERE e.media IS NULL;
+
+-- Períodos letivos e turmas. Cada estudante (e suas notas) pertence a uma
+-- turma, e toda leitura e relatório é filtrado por ela
+CREATE TABLE IF NOT EXISTS periodos (
+    id VARCHAR(36) PRIMARY KEY,
+    nome VARCHAR(20) NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS turmas (
+    id VARCHAR(36) PRIMARY KEY,
+    periodo_id VARCHAR(36) NOT NULL REFERENCES periodos (id) ON DELETE CASCADE,
+    nome VARCHAR(100) NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_turmas_periodo_nome_unico
+    ON turmas (periodo_id, LOWER(TRIM(nome)));
+
+-- Versão dos dados da turma: incrementada no mesmo comando de cada escrita
+-- em estudantes (ver RepositorioPostgres), então é a mesma para todos os
+-- processos da API e serve de base para os ETags
+ALTER TABLE turmas ADD COLUMN IF NOT EXISTS versao BIGINT NOT NULL DEFAULT 0;
+
+-- Turma padrão: recebe os estudantes cadastrados antes das turmas existirem
+-- e as requisições que não informam turma
+INSERT INTO periodos (id, nome) VALUES ('padrao', 'Padrão') ON CONFLICT DO NOTHING;
+INSERT INTO turmas (id, periodo_id, nome)
+VALUES ('padrao', 'padrao', 'Turma padrão')
+ON CONFLICT DO NOTHING;
+
+-- Catálogo de disciplinas de cada turma. As notas de um estudante seguem a
+-- ordem de posicao (nota 1 = disciplina na posição 1)
+CREATE TABLE IF NOT EXISTS disciplinas (
+    turma_id VARCHAR(36) NOT NULL REFERENCES turmas (id) ON DELETE CASCADE,
+    posicao SMALLINT NOT NULL CHECK (posicao >= 1),
+    nome VARCHAR(100) NOT NULL,
+    PRIMARY KEY (turma_id, posicao)
+);
+
+-- Turmas sem catálogo (a padrão e as criadas antes dele) ficam com as cinco
+-- disciplinas fixas de antes
+INSERT INTO disciplinas (turma_id, posicao, nome)
+SELECT t.id, d.posicao, 'Disciplina ' || d.posicao
+FROM turmas t, generate_series(1, 5) AS d (posicao)
+WHERE NOT EXISTS (SELECT 1 FROM disciplinas WHERE disciplinas.turma_id = t.id);
+
+ALTER TABLE estudantes ADD COLUMN IF NOT EXISTS turma_id VARCHAR(36)
+    REFERENCES turmas (id) ON DELETE CASCADE;
+UPDATE estudantes SET turma_id = 'padrao' WHERE turma_id IS NULL;
+ALTER TABLE estudantes ALTER COLUMN turma_id SET NOT NULL;
+
+-- Todos os índices de estudantes começam pela turma, para que listagens e
+-- relatórios leiam só as linhas da turma (custo proporcional ao tamanho dela,
+-- não ao do banco). As notas são lidas pela PK (estudante_id, disciplina)
+-- a partir dos estudantes da turma
+DROP INDEX IF EXISTS idx_estudantes_nome_id;
+DROP INDEX IF EXISTS idx_estudantes_media_id;
+DROP INDEX IF EXISTS idx_estudantes_frequencia_id;
+DROP INDEX IF EXISTS idx_estudantes_nome_prefixo;
+DROP INDEX IF EXISTS idx_estudantes_nome_unico;
+
+-- Paginação por cursor (keyset) em cada ordenação aceita pela listagem
+CREATE INDEX IF NOT EXISTS idx_estudantes_turma_nome_id ON estudantes (turma_id, nome, id);
+CREATE INDEX IF NOT EXISTS idx_estudantes_turma_media_id ON estudantes (turma_id, media, id);
+CREATE INDEX IF NOT EXISTS idx_estudantes_turma_frequencia_id
+    ON estudantes (turma_id, frequencia, id);
+
+-- Filtro por prefixo do nome, sem diferenciar maiúsculas
+CREATE INDEX IF NOT EXISTS idx_estudantes_turma_nome_prefixo
+    ON estudantes (turma_id, LOWER(nome) text_pattern_ops);
+
+-- Nomes únicos na turma, sem diferenciar maiúsculas nem espaços nas pontas.
+-- Garante a regra de forma atômica (sem corrida entre verificar e inserir) e
+-- substitui a busca por COUNT(*) antes de cada escrita
+CREATE UNIQUE INDEX IF NOT EXISTS idx_estudantes_turma_nome_unico
+    ON estudantes (turma_id, LOWER(TRIM(nome)));
+
+-- Armazenamento compacto das notas (ARMAZENAMENTO_NOTAS=compacto): todas as
+-- notas do estudante na própria linha, na ordem das disciplinas. No modo
+-- padrão fica NULL e as notas ficam na tabela notas. A troca de layout é
+-- feita por backend.database.migracaoNotas, nunca por init_db
+ALTER TABLE estudantes ADD COLUMN IF NOT EXISTS notas REAL[];
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'estudantes_notas_check'
+    ) THEN
+        ALTER TABLE estudantes ADD CONSTRAINT estudantes_notas_check
+            CHECK (0 <= ALL (notas) AND 10 >= ALL (notas));
+    END IF;
+END $$;
+
+-- Último relatório pré-calculado de cada turma (ver snapshotService), já
+-- serializado em JSON para ser servido sem recalcular nem reserializar.
+-- versao é a turmas.versao dos dados em que ele foi gerado
+CREATE TABLE IF NOT EXISTS relatorios_snapshot (
+    turma_id VARCHAR(36) PRIMARY KEY REFERENCES turmas (id) ON DELETE CASCADE,
+    conteudo TEXT NOT NULL,
+    gerado_em TIMESTAMPTZ NOT NULL,
+    versao BIGINT NOT NULL
+);
+
+-- Antes, versao era a etiqueta (texto) do cache do processo que gerou o
+-- snapshot. Os snapshots são recalculáveis: os antigos são descartados
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'relatorios_snapshot' AND column_name = 'versao'
+            AND data_type <> 'bigint'
+    ) THEN
+        DELETE FROM relatorios_snapshot;
+        ALTER TABLE relatorios_snapshot ALTER COLUMN versao TYPE BIGINT USING 0;
+    END IF;
+END $$;
@@ -1,12 +1,15 @@
 from pydantic import BaseModel, Field, validator
-from typing import List
+from typing import List, Optional
 from uuid import uuid4
 
+from backend.model.turma import MAX_DISCIPLINAS
+
 
 class Estudante(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid4()))
     nome: str = Field(..., min_length=1, max_length=100)
-    notas: List[float] = Field(..., min_items=5, max_items=5)
+    # Uma nota por disciplina da turma; a quantidade é conferida pelo serviço
+    notas: List[float] = Field(..., min_items=1, max_items=MAX_DISCIPLINAS)
     frequencia: float = Field(..., ge=0, le=100)
 
     @validator("notas")
@@ -27,7 +30,7 @@ class Estudante(BaseModel):
 
 class CriarEstudante(BaseModel):
     nome: str = Field(..., min_length=1, max_length=100)
-    notas: List[float] = Field(..., min_items=5, max_items=5)
+    notas: List[float] = Field(..., min_items=1, max_items=MAX_DISCIPLINAS)
     frequencia: float = Field(..., ge=0, le=100)
 
     @validator("notas")
@@ -39,11 +42,16 @@ class CriarEstudante(BaseModel):
 
 class AtualizarEstudante(BaseModel):
     nome: str = Field(..., min_length=1, max_length=100)
-    notas: List[float] = Field(..., min_items=5, max_items=5)
+    notas: List[float] = Field(..., min_items=1, max_items=MAX_DISCIPLINAS)
     frequencia: float = Field(..., ge=0, le=100)
 
     @validator("notas")
     def validar_notas(cls, valores):
         if not all(0 <= nota <= 10 for nota in valores):
             raise ValueError("Todas as notas devem estar entre 0 e 10")
-        return valores
\ No newline at end of file
+        return valores
+
+
+class PaginaEstudantes(BaseModel):
+    estudantes: List[Estudante]
+    proximo_cursor: Optional[str] = None
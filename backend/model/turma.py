@@ -0,0 +1,59 @@
+from pydantic import BaseModel, Field, validator
+from typing import List
+from uuid import uuid4
+
+# Turma (e período) criada por schema.sql; usada quando a requisição não
+# informa a turma
+TURMA_PADRAO = "padrao"
+
+# Catálogo da turma padrão e das turmas criadas sem informar as disciplinas
+DISCIPLINAS_PADRAO = tuple(f"Disciplina {i}" for i in range(1, 6))
+MAX_DISCIPLINAS = 20
+
+
+class Periodo(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid4()))
+    nome: str = Field(..., min_length=1, max_length=20)
+
+
+class CriarPeriodo(BaseModel):
+    nome: str = Field(..., min_length=1, max_length=20)
+
+    class Config:
+        json_schema_extra = {"example": {"nome": "2025.1"}}
+
+
+class Turma(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid4()))
+    periodo_id: str
+    nome: str = Field(..., min_length=1, max_length=100)
+    # Na ordem das notas dos estudantes da turma
+    disciplinas: List[str]
+
+
+class CriarTurma(BaseModel):
+    periodo_id: str
+    nome: str = Field(..., min_length=1, max_length=100)
+    disciplinas: List[str] = Field(
+        default_factory=lambda: list(DISCIPLINAS_PADRAO),
+        min_items=1,
+        max_items=MAX_DISCIPLINAS,
+    )
+
+    @validator("disciplinas")
+    def validar_disciplinas(cls, valores):
+        nomes = [valor.strip() for valor in valores]
+        if not all(0 < len(nome) <= 100 for nome in nomes):
+            raise ValueError("Os nomes das disciplinas devem ter de 1 a 100 caracteres")
+        if len({nome.lower() for nome in nomes}) != len(nomes):
+            raise ValueError("As disciplinas da turma devem ter nomes diferentes")
+        return nomes
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "periodo_id": "padrao",
+                "nome": "9º ano A",
+                "disciplinas": ["Português", "Matemática", "Ciências", "História"],
+            }
+        }
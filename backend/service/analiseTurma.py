@@ -0,0 +1,286 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from backend.service.relatorioService import (
+    LIMITE_FREQUENCIA,
+    SECOES_PAINEL,
+    arredondar_media,
+    media_centesimos,
+    media_das_medias,
+    nomes_disciplinas,
+)
+
+# Média (sem arredondar) a partir da qual o estudante é aprovado por nota
+MEDIA_APROVACAO = 6.0
+PERCENTIS = (10, 25, 50, 75, 90)
+# Histograma das notas de cada disciplina: faixas de 1 ponto, a última
+# fechada (9-10 inclui o 10)
+FAIXAS_HISTOGRAMA = tuple(f"{inicio}-{inicio + 1}" for inicio in range(10))
+
+
+def _arredondar(valor: float) -> float:
+    # round() do Python para as estatísticas (np.round arredonda diferente
+    # em alguns casos, como 2.675); as médias usam arredondar_media
+    return round(float(valor), 2)
+
+
+class AnaliseTurma:
+    """Estatísticas da turma calculadas sobre matrizes NumPy.
+
+    Carrega as notas em uma matriz (estudantes x disciplinas) e as frequências
+    em um vetor, e calcula todas as seções de MotorRelatorio, com os mesmos
+    resultados, mais as estatísticas de estatisticas(). Cada seção é
+    vetorizada; só as que devolvem uma linha por estudante percorrem os
+    estudantes em Python.
+
+    Médias, contagens, histogramas e ranking usam as notas em centésimos
+    (inteiros), exatas para notas de até duas casas, como as gravadas no
+    banco; as médias são arredondadas como em MotorRelatorio
+    (arredondar_media), então os valores são iguais.
+    """
+
+    def __init__(
+        self,
+        ids: List[str],
+        nomes: List[str],
+        notas: np.ndarray,
+        frequencias: np.ndarray,
+        disciplinas: Union[int, Sequence[str]],
+        limite_frequencia: float = LIMITE_FREQUENCIA,
+    ):
+        self.disciplinas = nomes_disciplinas(disciplinas)
+        self.ids = ids
+        self.nomes = nomes
+        # Uma coluna por disciplina do catálogo (também quando a turma está vazia)
+        self.notas = np.asarray(notas, dtype=np.float64).reshape(
+            len(ids), len(self.disciplinas)
+        )
+        self.frequencias = np.asarray(frequencias, dtype=np.float64)
+        self.limite_frequencia = limite_frequencia
+        self.centesimos = np.rint(self.notas * 100).astype(np.int64)
+        self._medias: Optional[np.ndarray] = None
+        self._medias_arredondadas: Optional[np.ndarray] = None
+        self._media_turma: Optional[float] = None
+
+    @classmethod
+    def a_partir_de(
+        cls,
+        estudantes: Iterable[Any],
+        disciplinas: Union[int, Sequence[str]],
+        limite_frequencia: float = LIMITE_FREQUENCIA,
+    ) -> "AnaliseTurma":
+        """A partir de linhas do banco ou dicts (id, nome, notas, frequencia)"""
+        ids, nomes, notas, frequencias = [], [], [], []
+        for estudante in estudantes:
+            ids.append(str(estudante["id"]))
+            nomes.append(estudante["nome"])
+            notas.append(estudante["notas"])
+            frequencias.append(estudante["frequencia"])
+        return cls(
+            ids,
+            nomes,
+            np.array(notas, dtype=np.float64),
+            np.array(frequencias, dtype=np.float64),
+            disciplinas,
+            limite_frequencia,
+        )
+
+    # Seções de MotorRelatorio
+
+    def _medias_individuais(self) -> np.ndarray:
+        if self._medias is None:
+            soma = np.zeros(len(self.ids))
+            for coluna in self.notas.T:
+                soma += coluna
+            self._medias = soma / max(self.notas.shape[1], 1)
+        return self._medias
+
+    def _somas(self) -> np.ndarray:
+        """Soma das notas de cada estudante, em centésimos"""
+        return self.centesimos.sum(axis=1)
+
+    def _medias_exibidas(self) -> np.ndarray:
+        # Metade para cima sobre a média exata, em inteiros: o mesmo que
+        # arredondar_media(Fraction(soma, 100 * disciplinas))
+        if self._medias_arredondadas is None:
+            quantidade = max(self.notas.shape[1], 1)
+            self._medias_arredondadas = (
+                (2 * self._somas() + quantidade) // (2 * quantidade)
+            ) / 100
+        return self._medias_arredondadas
+
+    def total_estudantes(self) -> int:
+        return len(self.ids)
+
+    def estudantes(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "id": estudante_id,
+                "nome": nome,
+                "notas": notas,
+                "frequencia": frequencia,
+                "media": media,
+            }
+            for estudante_id, nome, notas, frequencia, media in zip(
+                self.ids,
+                self.nomes,
+                self.notas.tolist(),
+                self.frequencias.tolist(),
+                self._medias_exibidas().tolist(),
+            )
+        ]
+
+    def media_turma(self) -> float:
+        if self._media_turma is None:
+            somas_por_quantidade = {self.notas.shape[1]: int(self._somas().sum())}
+            self._media_turma = arredondar_media(
+                media_das_medias(somas_por_quantidade, len(self.ids))
+            )
+        return self._media_turma
+
+    def medias_por_disciplina(self) -> List[Dict[str, Any]]:
+        somas = self.centesimos.sum(axis=0).tolist()
+        total = len(self.ids)
+        return [
+            {
+                "disciplina": disciplina,
+                "media": arredondar_media(media_centesimos(somas[indice], total)),
+            }
+            for indice, disciplina in enumerate(self.disciplinas)
+        ]
+
+    def estudantes_acima_da_media(self) -> List[Dict[str, Any]]:
+        # Média exata > média da turma, comparada em centésimos inteiros
+        limite = round(self.media_turma() * 100) * self.notas.shape[1]
+        acima = self._somas() > limite
+        return [
+            {
+                "id": self.ids[indice],
+                "nome": self.nomes[indice],
+                "media": media,
+            }
+            for indice, media in zip(
+                np.flatnonzero(acima).tolist(),
+                self._medias_exibidas()[acima].tolist(),
+            )
+        ]
+
+    def estudantes_com_baixa_frequencia(self) -> List[Dict[str, Any]]:
+        abaixo = np.flatnonzero(self.frequencias < self.limite_frequencia)
+        ordem = abaixo[np.argsort(self.frequencias[abaixo], kind="stable")]
+        return [
+            {
+                "id": self.ids[indice],
+                "nome": self.nomes[indice],
+                "frequencia": frequencia,
+            }
+            for indice, frequencia in zip(ordem.tolist(), self.frequencias[ordem].tolist())
+        ]
+
+    def gerar(self) -> Dict[str, Any]:
+        return {
+            "total_estudantes": self.total_estudantes(),
+            "estudantes": self.estudantes(),
+            "media_turma": self.media_turma(),
+            "medias_por_disciplina": self.medias_por_disciplina(),
+            "estudantes_acima_da_media": self.estudantes_acima_da_media(),
+            "estudantes_com_baixa_frequencia": self.estudantes_com_baixa_frequencia(),
+        }
+
+    def gerar_secoes(self, secoes: Iterable[str]) -> Dict[str, Any]:
+        """Só as seções pedidas (nomes de SECOES_PAINEL), como em MotorRelatorio"""
+        return {secao: getattr(self, SECOES_PAINEL[secao])() for secao in secoes}
+
+    # Estatísticas adicionais
+
+    @staticmethod
+    def _resumo(valores: np.ndarray) -> Dict[str, Any]:
+        if not len(valores):
+            return {
+                "mediana": 0.0,
+                "desvio_padrao": 0.0,
+                "minimo": 0.0,
+                "maximo": 0.0,
+                "percentis": {f"p{percentil}": 0.0 for percentil in PERCENTIS},
+            }
+        return {
+            "mediana": _arredondar(np.median(valores)),
+            "desvio_padrao": _arredondar(np.std(valores)),
+            "minimo": _arredondar(valores.min()),
+            "maximo": _arredondar(valores.max()),
+            "percentis": {
+                f"p{percentil}": _arredondar(valor)
+                for percentil, valor in zip(PERCENTIS, np.percentile(valores, PERCENTIS))
+            },
+        }
+
+    def _aprovados_por_nota(self) -> np.ndarray:
+        # Média >= MEDIA_APROVACAO comparada em centésimos, sem erro de arredondamento
+        minimo = round(MEDIA_APROVACAO * 100) * self.notas.shape[1]
+        return self._somas() >= minimo
+
+    def aprovacao(self) -> Dict[str, int]:
+        por_nota = self._aprovados_por_nota()
+        por_frequencia = self.frequencias >= self.limite_frequencia
+        aprovados = int(np.count_nonzero(por_nota & por_frequencia))
+        return {
+            "aprovados": aprovados,
+            "reprovados": len(self.ids) - aprovados,
+            "reprovados_por_nota": int(np.count_nonzero(~por_nota)),
+            "reprovados_por_frequencia": int(np.count_nonzero(~por_frequencia)),
+        }
+
+    def disciplinas_detalhadas(self) -> List[Dict[str, Any]]:
+        medias = self.medias_por_disciplina()
+        aprovados = np.count_nonzero(
+            self.centesimos >= round(MEDIA_APROVACAO * 100), axis=0
+        ).tolist()
+        # Faixa de cada nota (0..9), com o 10 na última
+        faixas = np.minimum(self.centesimos // 100, len(FAIXAS_HISTOGRAMA) - 1)
+        return [
+            {
+                **medias[indice],
+                **self._resumo(self.notas[:, indice]),
+                "aprovados": aprovados[indice],
+                "reprovados": len(self.ids) - aprovados[indice],
+                "histograma": np.bincount(
+                    faixas[:, indice], minlength=len(FAIXAS_HISTOGRAMA)
+                ).tolist(),
+            }
+            for indice in range(len(self.disciplinas))
+        ]
+
+    def ranking(self) -> List[Dict[str, Any]]:
+        """Estudantes da maior para a menor média; empatados dividem a posição
+        (1, 2, 2, 4) e ficam na ordem de nome"""
+        somas = self._somas()
+        ordem = np.argsort(-somas, kind="stable")
+        ordenadas = somas[ordem]
+        novas = np.ones(len(ordem), dtype=bool)
+        novas[1:] = ordenadas[1:] != ordenadas[:-1]
+        posicoes = np.maximum.accumulate(np.where(novas, np.arange(1, len(ordem) + 1), 0))
+        medias = self._medias_exibidas()[ordem]
+        return [
+            {
+                "posicao": posicao,
+                "id": self.ids[indice],
+                "nome": self.nomes[indice],
+                "media": media,
+            }
+            for posicao, indice, media in zip(
+                posicoes.tolist(), ordem.tolist(), medias.tolist()
+            )
+        ]
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "total_estudantes": self.total_estudantes(),
+            "media_turma": self.media_turma(),
+            "medias": self._resumo(self._medias_individuais()),
+            "frequencia": self._resumo(self.frequencias),
+            "aprovacao": self.aprovacao(),
+            "faixas_histograma": list(FAIXAS_HISTOGRAMA),
+            "disciplinas": self.disciplinas_detalhadas(),
+            "ranking": self.ranking(),
+        }
@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from backend.model.estudante import Estudante
+
+# Estudantes guardados por processo (0 desliga o cache) e por quantos segundos
+# cada um vale. O TTL limita o tempo em que uma escrita feita por outro
+# processo (outro worker do uvicorn) passa despercebida; as rotas com ETag
+# conferem a versão da turma antes (ver CacheRelatorios.sincronizar)
+CACHE_ESTUDANTES_TAMANHO = int(os.getenv("CACHE_ESTUDANTES_TAMANHO", "1024"))
+CACHE_ESTUDANTES_TTL = float(os.getenv("CACHE_ESTUDANTES_TTL", "60"))
+
+
+class CacheEstudantes:
+    """Cache LRU + TTL dos estudantes lidos por id (obter_estudante_por_id).
+
+    Guarda o Estudante com a turma dele; como o id é único, um id guardado
+    em outra turma responde None sem consultar o banco. Leituras que não
+    acham o estudante não são guardadas.
+
+    Os serviços avisam das escritas depois do commit: criar guarda o
+    estudante criado; atualizar e remover descartam o id, e a próxima leitura
+    busca a versão nova. Uma leitura só é guardada se nenhuma escrita
+    aconteceu enquanto ela consultava o banco, para não guardar uma versão
+    antiga lida antes do commit.
+
+    Os Estudantes devolvidos são compartilhados entre as requisições e não
+    devem ser alterados.
+    """
+
+    def __init__(
+        self,
+        tamanho: int = CACHE_ESTUDANTES_TAMANHO,
+        ttl: float = CACHE_ESTUDANTES_TTL,
+        relogio: Callable[[], float] = time.monotonic,
+    ):
+        self.tamanho = tamanho
+        self.ttl = ttl
+        self._relogio = relogio
+        # id -> (expira_em, turma_id, estudante), do menos para o mais recente
+        self._entradas: "OrderedDict[str, Tuple[float, str, Estudante]]" = OrderedDict()
+        # Incrementada a cada escrita; ver _guardar
+        self._geracao = 0
+        self._contadores = {
+            "acertos": 0,
+            "faltas": 0,
+            "despejos": 0,
+            "expirados": 0,
+            "invalidacoes": 0,
+        }
+        self._lock = threading.Lock()
+
+    def _ler(self, estudante_id: str, turma_id: str) -> Tuple[bool, Optional[Estudante], int]:
+        with self._lock:
+            entrada = self._entradas.get(estudante_id)
+            if entrada is not None:
+                expira_em, turma_estudante, estudante = entrada
+                if expira_em > self._relogio():
+                    self._entradas.move_to_end(estudante_id)
+                    self._contadores["acertos"] += 1
+                    return True, estudante if turma_estudante == turma_id else None, 0
+                del self._entradas[estudante_id]
+                self._contadores["expirados"] += 1
+            self._contadores["faltas"] += 1
+            return False, None, self._geracao
+
+    def _guardar(
+        self, turma_id: str, estudante: Estudante, geracao: Optional[int] = None
+    ) -> None:
+        with self._lock:
+            if geracao is not None and geracao != self._geracao:
+                return
+            self._entradas[estudante.id] = (self._relogio() + self.ttl, turma_id, estudante)
+            self._entradas.move_to_end(estudante.id)
+            while len(self._entradas) > self.tamanho:
+                self._entradas.popitem(last=False)
+                self._contadores["despejos"] += 1
+
+    def obter(
+        self,
+        estudante_id: str,
+        turma_id: str,
+        carregar: Callable[[], Optional[Estudante]],
+    ) -> Optional[Estudante]:
+        if self.tamanho <= 0:
+            return carregar()
+        encontrado, estudante, geracao = self._ler(estudante_id, turma_id)
+        if encontrado:
+            return estudante
+        estudante = carregar()
+        if estudante is not None:
+            self._guardar(turma_id, estudante, geracao)
+        return estudante
+
+    async def obter_async(
+        self,
+        estudante_id: str,
+        turma_id: str,
+        carregar: Callable[[], Awaitable[Optional[Estudante]]],
+    ) -> Optional[Estudante]:
+        if self.tamanho <= 0:
+            return await carregar()
+        encontrado, estudante, geracao = self._ler(estudante_id, turma_id)
+        if encontrado:
+            return estudante
+        estudante = await carregar()
+        if estudante is not None:
+            self._guardar(turma_id, estudante, geracao)
+        return estudante
+
+    def estudante_criado(self, turma_id: str, estudante: Estudante) -> None:
+        """Guarda o estudante recém-criado (depois do commit)"""
+        if self.tamanho > 0:
+            with self._lock:
+                self._geracao += 1
+            self._guardar(turma_id, estudante)
+
+    def descartar(self, estudante_id: str) -> None:
+        """Esquece o estudante atualizado ou removido (depois do commit)"""
+        with self._lock:
+            self._geracao += 1
+            if self._entradas.pop(estudante_id, None) is not None:
+                self._contadores["invalidacoes"] += 1
+
+    def descartar_turma(self, turma_id: str) -> None:
+        """Esquece os estudantes da turma (removida ou alterada por outro processo)"""
+        with self._lock:
+            self._geracao += 1
+            for estudante_id in [
+                estudante_id
+                for estudante_id, (_, turma_estudante, _) in self._entradas.items()
+                if turma_estudante == turma_id
+            ]:
+                del self._entradas[estudante_id]
+                self._contadores["invalidacoes"] += 1
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._geracao += 1
+            self._contadores["invalidacoes"] += len(self._entradas)
+            self._entradas.clear()
+
+    def metricas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._contadores,
+                "estudantes": len(self._entradas),
+                "tamanho": self.tamanho,
+                "ttl_s": self.ttl,
+            }
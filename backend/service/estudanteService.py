@@ -1,273 +1,634 @@
-from typing import Any, Dict, List, Optional
+import base64
+import csv
+import io
+import json
+import os
+import re
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 from uuid import uuid4
 
+from pydantic import ValidationError
+
 from backend.model.estudante import AtualizarEstudante, CriarEstudante, Estudante
-from backend.database.db import get_cursor
+from backend.model.turma import TURMA_PADRAO
+from backend.database.armazenamentoNotas import arredondar_nota
+from backend.database.db import DB_REPLICA_JANELA_ESCRITA
+from backend.database.repositorio import (
+    FK_TURMA,
+    INDICE_NOME_UNICO,
+    Repositorio,
+    ViolacaoChaveEstrangeira,
+    ViolacaoUnicidade,
+    arredondar_frequencia,
+    normalizar_nome,
+    repositorio_configurado,
+)
+from backend.service.analiseTurma import AnaliseTurma
+from backend.service.relatorioService import (
+    AgregadosTurma,
+    CacheRelatorios,
+    SECOES_PAINEL,
+    arredondar_media,
+    centesimos,
+    media_centesimos,
+    media_notas,
+)
 
-TOTAL_DISCIPLINAS = 5
+# Monta e valida um modelo Pydantic por estudante nas listagens da API e
+# revalida a resposta pelo response_model. Desligado (padrão), as listagens
+# vão das linhas do banco direto para o orjson
+VALIDACAO_ESTRITA = os.getenv("VALIDACAO_ESTRITA", "false").lower() in ("1", "true", "sim")
 
+TAMANHO_LOTE_EXPORTACAO = 1000
 
-class EstudanteService:
-    def __init__(self):
-        pass  # Não precisa mais do dicionário em memória
-
-    def _nome_em_uso(self, nome: str, ignorar_id: Optional[str] = None) -> bool:
-        nome_normalizado = nome.strip().lower()
-        
-        with get_cursor() as cursor:
-            if ignorar_id:
-                cursor.execute(
-                    """
-                    SELECT COUNT(*) as count
-                    FROM estudantes
-                    WHERE LOWER(TRIM(nome)) = %s AND id != %s
-                    """,
-                    (nome_normalizado, ignorar_id)
-                )
-            else:
-                cursor.execute(
-                    """
-                    SELECT COUNT(*) as count
-                    FROM estudantes
-                    WHERE LOWER(TRIM(nome)) = %s
-                    """,
-                    (nome_normalizado,)
-                )
-            
-            result = cursor.fetchone()
-            return result["count"] > 0
-
-    def _buscar_notas_estudante(self, estudante_id: str) -> List[float]:
-        with get_cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT nota
-                FROM notas
-                WHERE estudante_id = %s
-                ORDER BY disciplina
-                """,
-                (estudante_id,)
+
+# Ordenações aceitas pela listagem paginada: campo da linha usado no cursor
+ORDENACOES = {"nome": "nome", "media": "media", "frequencia": "frequencia"}
+LIMITE_PADRAO = 50
+
+
+def novo_estudante(estudante_id: str, dados: Union[CriarEstudante, AtualizarEstudante]) -> Dict:
+    """Estudante como é passado ao repositório (Repositorio.inserir e atualizar)"""
+    return {"id": estudante_id, **dados.model_dump()}
+
+
+def estudante_gravado(
+    estudante_id: str, dados: Union[CriarEstudante, AtualizarEstudante]
+) -> Estudante:
+    """Estudante como ficou no banco, sem relê-lo: notas e frequência
+    arredondadas como nas colunas NUMERIC (todos os repositórios gravam assim)"""
+    return Estudante(
+        id=estudante_id,
+        nome=dados.nome,
+        notas=[arredondar_nota(nota) for nota in dados.notas],
+        frequencia=float(arredondar_frequencia(dados.frequencia)),
+    )
+
+
+def codificar_cursor(ordenar: str, decrescente: bool, valor: Any, estudante_id: str) -> str:
+    dados = json.dumps([ordenar, decrescente, str(valor), estudante_id])
+    return base64.urlsafe_b64encode(dados.encode("utf-8")).decode("ascii")
+
+
+def decodificar_cursor(cursor: str) -> Tuple[str, bool, str, str]:
+    try:
+        ordenar, decrescente, valor, estudante_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode("ascii"))
+        )
+    except (ValueError, TypeError) as erro:
+        raise ValueError("Cursor de paginação inválido.") from erro
+    return ordenar, decrescente, valor, estudante_id
+
+
+def conferir_ordenacao(ordenar: str) -> None:
+    if ordenar not in ORDENACOES:
+        raise ValueError(f"Ordenação inválida: {ordenar}.")
+
+
+def posicao_do_cursor(
+    cursor: Optional[str], ordenar: str, decrescente: bool
+) -> Optional[Tuple[str, str]]:
+    """(valor da coluna, id) do último estudante da página anterior, se houver cursor"""
+    if not cursor:
+        return None
+    ordenar_cursor, decrescente_cursor, valor, ultimo_id = decodificar_cursor(cursor)
+    if (ordenar_cursor, decrescente_cursor) != (ordenar, decrescente):
+        raise ValueError("Cursor de paginação não corresponde à ordenação pedida.")
+    return valor, ultimo_id
+
+
+def montar_pagina(
+    rows: List[Dict],
+    limite: int,
+    ordenar: str = "nome",
+    decrescente: bool = False,
+    como_dict: bool = False,
+) -> Dict[str, Any]:
+    proximo_cursor = None
+    if len(rows) > limite:
+        rows = rows[:limite]
+        ultima = rows[-1]
+        proximo_cursor = codificar_cursor(
+            ordenar, decrescente, ultima[ORDENACOES[ordenar]], str(ultima["id"])
+        )
+    converter = row_para_dict if como_dict else row_para_estudante
+    return {
+        "estudantes": [converter(row) for row in rows],
+        "proximo_cursor": proximo_cursor,
+    }
+
+
+# Violação do índice único em (turma_id, LOWER(TRIM(nome))) (INDICE_NOME_UNICO)
+ERRO_NOME_DUPLICADO = "Já existe um estudante com esse nome."
+
+# Violação da chave estrangeira de estudantes.turma_id (FK_TURMA)
+ERRO_TURMA_INEXISTENTE = "Turma não encontrada."
+
+
+class QuantidadeNotasInvalida(ValueError):
+    """O número de notas não corresponde às disciplinas da turma"""
+
+
+def conferir_notas(disciplinas: Sequence[str], notas: List[float]) -> None:
+    """Uma nota por disciplina do catálogo; sem catálogo, a turma não existe"""
+    if not disciplinas:
+        raise LookupError(ERRO_TURMA_INEXISTENTE)
+    if len(notas) != len(disciplinas):
+        raise QuantidadeNotasInvalida(
+            f"A turma tem {len(disciplinas)} disciplinas: informe "
+            f"{len(disciplinas)} notas (recebidas {len(notas)})."
+        )
+
+
+@contextmanager
+def nome_unico():
+    """Traduz a violação do índice de nome único para o ValueError do serviço"""
+    try:
+        yield
+    except ViolacaoUnicidade as erro:
+        if erro.restricao != INDICE_NOME_UNICO:
+            raise
+        raise ValueError(ERRO_NOME_DUPLICADO) from erro
+
+
+@contextmanager
+def turma_existente():
+    """Traduz a violação da chave estrangeira da turma para LookupError"""
+    try:
+        yield
+    except ViolacaoChaveEstrangeira as erro:
+        if erro.restricao != FK_TURMA:
+            raise
+        raise LookupError(ERRO_TURMA_INEXISTENTE) from erro
+
+
+def validar_importacao(
+    linhas: List[Dict[str, Any]], disciplinas: Sequence[str]
+) -> Tuple[List[Dict[str, Any]], Dict[str, tuple]]:
+    """Valida as linhas de uma importação, sem consultar o banco.
+
+    Devolve um resultado por linha (com o erro das recusadas) e as válidas
+    por nome normalizado: nome -> (índice da linha, estudante). Nomes que já
+    existem na turma ficam para quem chama conferir.
+    """
+    resultados: List[Dict[str, Any]] = []
+    validos: Dict[str, tuple] = {}
+    for indice, linha in enumerate(linhas):
+        resultados.append({"linha": indice + 1})
+        try:
+            estudante = CriarEstudante.model_validate(linha)
+            conferir_notas(disciplinas, estudante.notas)
+        except ValidationError as erro:
+            resultados[indice].update(status="erro", erro="; ".join(
+                detalhe["msg"] for detalhe in erro.errors()
+            ))
+            continue
+        except QuantidadeNotasInvalida as erro:
+            resultados[indice].update(status="erro", erro=str(erro))
+            continue
+
+        nome_normalizado = normalizar_nome(estudante.nome)
+        if nome_normalizado in validos:
+            resultados[indice].update(
+                status="erro",
+                erro=f"Nome repetido no lote (linha {validos[nome_normalizado][0] + 1}).",
             )
-            resultados = cursor.fetchall()
-            return [float(row["nota"]) for row in resultados]
-
-    def _criar_notas_estudante(self, estudante_id: str, notas: List[float]) -> None:
-        with get_cursor() as cursor:
-            for disciplina, nota in enumerate(notas, start=1):
-                cursor.execute(
-                    """
-                    INSERT INTO notas (estudante_id, disciplina, nota)
-                    VALUES (%s, %s, %s)
-                    ON CONFLICT (estudante_id, disciplina)
-                    DO UPDATE SET nota = EXCLUDED.nota
-                    """,
-                    (estudante_id, disciplina, nota)
-                )
-
-    def _atualizar_notas_estudante(self, estudante_id: str, notas: List[float]) -> None:
-        with get_cursor() as cursor:
-            cursor.execute(
-                "DELETE FROM notas WHERE estudante_id = %s",
-                (estudante_id,)
+            continue
+        validos[nome_normalizado] = (indice, estudante)
+    return resultados, validos
+
+
+# Colunas do CSV de importação além de nota1..notaN (id e media vêm da exportação)
+COLUNAS_CSV = ("id", "nome", "frequencia", "media")
+
+
+def ler_csv_estudantes(conteudo: str) -> List[Dict[str, Any]]:
+    """Converte um CSV com cabeçalho nome,nota1..notaN,frequencia em linhas
+    (uma coluna de nota por disciplina da turma)
+
+    Os valores continuam como texto; a validação acontece na importação.
+    Aceita também as colunas id e media da exportação (ignoradas); outra
+    coluna é recusada com ValueError.
+    """
+    leitor = csv.DictReader(io.StringIO(conteudo))
+    posicoes = {}
+    desconhecidas = []
+    for coluna in leitor.fieldnames or []:
+        nota = re.fullmatch(r"nota(\d+)", coluna)
+        if nota:
+            posicoes[coluna] = int(nota.group(1))
+        elif coluna not in COLUNAS_CSV:
+            desconhecidas.append(coluna)
+    if desconhecidas:
+        raise ValueError(
+            f"Colunas desconhecidas: {', '.join(desconhecidas)}. "
+            f"Aceitas: {', '.join(COLUNAS_CSV)} e nota1..notaN."
+        )
+    colunas_notas = sorted(posicoes, key=posicoes.get)
+    return [
+        {
+            "nome": linha.get("nome"),
+            "notas": [linha[coluna] for coluna in colunas_notas if linha.get(coluna)],
+            "frequencia": linha.get("frequencia"),
+        }
+        for linha in leitor
+    ]
+
+
+def row_para_estudante(row: Dict) -> Estudante:
+    return Estudante(
+        id=str(row["id"]),
+        nome=row["nome"],
+        notas=[float(nota) for nota in row["notas"]],
+        frequencia=float(row["frequencia"])
+    )
+
+
+def row_para_dict(row: Dict) -> Dict[str, Any]:
+    """Mesmos campos de row_para_estudante, sem montar nem validar o modelo.
+
+    Para as leituras que só serializam o resultado: os CHECKs de schema.sql
+    já garantem notas e frequência nos limites.
+    """
+    return {
+        "id": str(row["id"]),
+        "nome": row["nome"],
+        "notas": [float(nota) for nota in row["notas"]],
+        "frequencia": float(row["frequencia"]),
+    }
+
+
+def row_para_exportacao(row: Dict) -> Dict[str, Any]:
+    """row_para_dict com a média do estudante, calculada linha a linha"""
+    linha = row_para_dict(row)
+    linha["media"] = arredondar_media(media_centesimos(
+        sum(centesimos(nota) for nota in linha["notas"]), len(linha["notas"])
+    ))
+    return linha
+
+
+def escrever_csv_estudantes(
+    linhas: List[Dict[str, Any]], total_notas: Optional[int] = None
+) -> str:
+    """Linhas da exportação em CSV, no mesmo formato lido por ler_csv_estudantes
+    (id e media a mais, ignorados na importação). Com total_notas (o número de
+    disciplinas da turma), começa pelo cabeçalho."""
+    saida = io.StringIO()
+    escritor = csv.writer(saida, lineterminator="\n")
+    if total_notas is not None:
+        escritor.writerow(
+            ["id", "nome"]
+            + [f"nota{i}" for i in range(1, total_notas + 1)]
+            + ["frequencia", "media"]
+        )
+    for linha in linhas:
+        escritor.writerow(
+            [linha["id"], linha["nome"], *linha["notas"], linha["frequencia"], linha["media"]]
+        )
+    return saida.getvalue()
+
+
+def media_exibida(media) -> float:
+    """Média exata vinda do repositório, arredondada (0.0 sem estudantes ou notas)"""
+    return arredondar_media(media) if media is not None else 0.0
+
+
+def resposta_medias_por_disciplina(
+    disciplinas: Sequence[str], medias: Sequence
+) -> List[Dict[str, float]]:
+    """Repositorio.medias_por_disciplina na ordem do catálogo, com os nomes"""
+    return [
+        {"disciplina": nome, "media": media_exibida(media)}
+        for nome, media in zip(disciplinas, medias)
+    ]
+
+
+def resposta_acima_da_media(rows: Iterable[Dict]) -> List[Dict[str, Any]]:
+    return [
+        {"id": str(row["id"]), "nome": row["nome"], "media": arredondar_media(row["media"])}
+        for row in rows
+    ]
+
+
+def resposta_baixa_frequencia(rows: Iterable[Dict]) -> List[Dict[str, Any]]:
+    return [
+        {"id": str(row["id"]), "nome": row["nome"], "frequencia": float(row["frequencia"])}
+        for row in rows
+    ]
+
+
+class EstudanteService:
+    """Regras dos estudantes (validação, cache e relatórios) sobre um
+    Repositorio: o do PostgreSQL ou um dos embutidos (ver BANCO_DADOS)"""
+
+    def __init__(
+        self,
+        repositorio: Optional[Repositorio] = None,
+        cache: Optional[CacheRelatorios] = None,
+    ):
+        self._repositorio = repositorio or repositorio_configurado()
+        # Relatórios calculados, válidos enquanto não houver escrita
+        self._cache = cache or CacheRelatorios()
+
+    def _agregados(self, turma_id: str) -> AgregadosTurma:
+        def carregar():
+            with self._leitura(turma_id) as leitura:
+                disciplinas = self._disciplinas(turma_id, leitura)
+                rows = leitura.listar(turma_id)
+            return AgregadosTurma.a_partir_de(
+                [row_para_estudante(row) for row in rows], disciplinas
             )
-        self._criar_notas_estudante(estudante_id, notas)
-
-    def _row_para_estudante(self, row: Dict) -> Estudante:
-        estudante_id = str(row["id"])
-        notas = self._buscar_notas_estudante(estudante_id)
-        
-        return Estudante(
-            id=estudante_id,
-            nome=row["nome"],
-            notas=notas,
-            frequencia=float(row["frequencia"])
+
+        return self._cache.obter_agregados(turma_id, carregar)
+
+    def _leitura(self, turma_id: str, snapshot: bool = False):
+        """Leitura roteada para as réplicas (ver Repositorio.leitura).
+
+        Logo depois de uma escrita na turma a leitura fica no primário: a
+        réplica ainda pode não ter a escrita, e o resultado iria para o cache
+        com a versão nova.
+        """
+        return self._repositorio.leitura(
+            primario=self._cache.escrita_recente(turma_id, DB_REPLICA_JANELA_ESCRITA),
+            snapshot=snapshot,
         )
 
-    def criar_estudante(self, dados_estudante: CriarEstudante) -> Estudante:
-        if self._nome_em_uso(dados_estudante.nome):
-            raise ValueError("Já existe um estudante com esse nome.")
+    # Os helpers recebem o repositório da transação ou da leitura da operação
+    # pública que os chamou, para que cada operação rode em uma única conexão
+
+    def _disciplinas(
+        self, turma_id: str, repositorio: Optional[Repositorio] = None
+    ) -> Tuple[str, ...]:
+        """Catálogo da turma (vazio se ela não existe); consultado uma vez por turma"""
+        repositorio = repositorio or self._repositorio
+        return self._cache.obter_disciplinas(turma_id, lambda: repositorio.disciplinas(turma_id))
+
+    def _carregar_analise(self, turma_id: str) -> AnaliseTurma:
+        """Estudantes da turma direto das linhas para as matrizes de AnaliseTurma,
+        sem montar um modelo por estudante; uma leitura só, então todas as
+        seções saem do mesmo snapshot"""
+        with self._leitura(turma_id, snapshot=True) as leitura:
+            disciplinas = self._disciplinas(turma_id, leitura)
+            rows = leitura.listar(turma_id)
+        return AnaliseTurma.a_partir_de(rows, disciplinas)
 
+    def criar_estudante(
+        self, dados_estudante: CriarEstudante, turma_id: str = TURMA_PADRAO
+    ) -> Estudante:
+        """A unicidade do nome vem do índice (ou da regra igual dos embutidos),
+        sem consulta antes da escrita"""
         estudante_id = str(uuid4())
-        
-        with get_cursor() as cursor:
-            cursor.execute(
-                """
-                INSERT INTO estudantes (id, nome, frequencia)
-                VALUES (%s, %s, %s)
-                """,
-                (estudante_id, dados_estudante.nome, dados_estudante.frequencia)
+        inicio = self._cache.iniciar_escrita(turma_id)
+
+        with nome_unico(), turma_existente(), self._repositorio.transacao() as repositorio:
+            conferir_notas(self._disciplinas(turma_id, repositorio), dados_estudante.notas)
+            versao = repositorio.inserir(
+                turma_id, [novo_estudante(estudante_id, dados_estudante)]
             )
-        
-        self._criar_notas_estudante(estudante_id, dados_estudante.notas)
-        
-        return self.obter_estudante_por_id(estudante_id)
-
-    def listar_estudantes(self) -> List[Estudante]:
-        with get_cursor() as cursor:
-            cursor.execute("SELECT id, nome, frequencia FROM estudantes ORDER BY nome")
-            rows = cursor.fetchall()
-            
-            estudantes = []
-            for row in rows:
-                estudantes.append(self._row_para_estudante(row))
-            
-            return estudantes
-
-    def obter_estudante_por_id(self, estudante_id: str) -> Optional[Estudante]:
-        with get_cursor() as cursor:
-            cursor.execute(
-                "SELECT id, nome, frequencia FROM estudantes WHERE id = %s",
-                (estudante_id,)
+
+        estudante = estudante_gravado(estudante_id, dados_estudante)
+        self._cache.versao_gravada(turma_id, versao)
+        self._cache.estudante_criado(turma_id, estudante, inicio)
+        return estudante
+
+    def listar_estudantes(
+        self, como_dict: bool = False, turma_id: str = TURMA_PADRAO
+    ) -> Union[List[Estudante], List[Dict[str, Any]]]:
+        """como_dict=True devolve dicts no lugar dos modelos (ver row_para_dict)"""
+        with self._leitura(turma_id) as leitura:
+            rows = leitura.listar(turma_id)
+        converter = row_para_dict if como_dict else row_para_estudante
+        return [converter(row) for row in rows]
+
+    def listar_estudantes_paginado(
+        self,
+        limite: int = LIMITE_PADRAO,
+        como_dict: bool = False,
+        turma_id: str = TURMA_PADRAO,
+        cursor: Optional[str] = None,
+        ordenar: str = "nome",
+        decrescente: bool = False,
+        **filtros: Any,
+    ) -> Dict[str, Any]:
+        """Página da listagem com filtros e ordenação (ver Repositorio.pagina)"""
+        conferir_ordenacao(ordenar)
+        apos = posicao_do_cursor(cursor, ordenar, decrescente)
+        with self._leitura(turma_id) as leitura:
+            rows = leitura.pagina(
+                turma_id,
+                limite + 1,  # uma linha a mais indica que há próxima página
+                ordenar=ordenar,
+                decrescente=decrescente,
+                apos=apos,
+                **filtros,
             )
-            row = cursor.fetchone()
-            
-            if not row:
-                return None
-            
-            return self._row_para_estudante(row)
+        return montar_pagina(rows, limite, ordenar, decrescente, como_dict)
+
+    def obter_estudante_por_id(
+        self, estudante_id: str, turma_id: str = TURMA_PADRAO
+    ) -> Optional[Estudante]:
+        """Servido pelo cache de estudantes quando possível (ver CacheEstudantes)"""
+        def carregar():
+            with self._leitura(turma_id) as leitura:
+                row = leitura.obter(estudante_id, turma_id)
+            return row_para_estudante(row) if row else None
+
+        return self._cache.estudantes.obter(estudante_id, turma_id, carregar)
+
+    def versao_dados(self, turma_id: str = TURMA_PADRAO) -> Optional[int]:
+        """Versão dos dados da turma no banco (None se ela não existe), base dos
+        ETags da API. Lida do primário: uma réplica atrasada daria a versão de
+        antes de uma escrita já vista pelo cache. Sincroniza o cache (ver
+        CacheRelatorios.sincronizar)"""
+        with self._repositorio.leitura(primario=True) as leitura:
+            versao = leitura.versao(turma_id)
+        self._cache.sincronizar(turma_id, versao)
+        return versao
+
+    def listar_disciplinas(self, turma_id: str = TURMA_PADRAO) -> Tuple[str, ...]:
+        """Disciplinas da turma, na ordem das notas (vazio se a turma não existe)"""
+        return self._disciplinas(turma_id)
 
     def atualizar_estudante(
-        self, estudante_id: str, dados_estudante: AtualizarEstudante
+        self,
+        estudante_id: str,
+        dados_estudante: AtualizarEstudante,
+        turma_id: str = TURMA_PADRAO,
     ) -> Optional[Estudante]:
-        estudante_existente = self.obter_estudante_por_id(estudante_id)
-        if not estudante_existente:
-            return None
-
-        if self._nome_em_uso(dados_estudante.nome, ignorar_id=estudante_id):
-            raise ValueError("Já existe um estudante com esse nome.")
-
-        with get_cursor() as cursor:
-            cursor.execute(
-                """
-                UPDATE estudantes
-                SET nome = %s, frequencia = %s
-                WHERE id = %s
-                """,
-                (dados_estudante.nome, dados_estudante.frequencia, estudante_id)
+        """A existência do estudante vem da própria escrita (Repositorio.atualizar)"""
+        with nome_unico(), self._repositorio.transacao() as repositorio:
+            try:
+                conferir_notas(self._disciplinas(turma_id, repositorio), dados_estudante.notas)
+            except (LookupError, QuantidadeNotasInvalida):
+                # Para um estudante inexistente a resposta continua sendo None
+                if not repositorio.obter(estudante_id, turma_id):
+                    return None
+                raise
+
+            versao = repositorio.atualizar(
+                estudante_id, turma_id, novo_estudante(estudante_id, dados_estudante)
             )
-        
-        # Atualizar notas
-        self._atualizar_notas_estudante(estudante_id, dados_estudante.notas)
-        
-        return self.obter_estudante_por_id(estudante_id)
-
-    def remover_estudante(self, estudante_id: str) -> bool:
-        with get_cursor() as cursor:
-            cursor.execute("SELECT id FROM estudantes WHERE id = %s", (estudante_id,))
-            if not cursor.fetchone():
-                return False
-            
-            cursor.execute("DELETE FROM estudantes WHERE id = %s", (estudante_id,))
-            return True
+            if versao is None:
+                return None
+
+        self._cache.versao_gravada(turma_id, versao)
+        self._cache.estudante_alterado(turma_id, estudante_id)
+        return estudante_gravado(estudante_id, dados_estudante)
+
+    def remover_estudante(self, estudante_id: str, turma_id: str = TURMA_PADRAO) -> bool:
+        versao = self._repositorio.remover(estudante_id, turma_id)
+        if versao is None:
+            return False
+        self._cache.versao_gravada(turma_id, versao)
+        self._cache.estudante_alterado(turma_id, estudante_id)
+        return True
+
+    def importar_estudantes(
+        self, linhas: List[Dict[str, Any]], turma_id: str = TURMA_PADRAO
+    ) -> Dict[str, Any]:
+        """Importa uma turma inteira em uma transação, com um resultado por linha.
+
+        Linhas inválidas, com uma quantidade de notas diferente da de
+        disciplinas da turma ou com nome repetido (no lote ou no banco) são
+        rejeitadas individualmente; as demais são gravadas de uma vez (no
+        PostgreSQL, via COPY).
+        """
+        # Um nome gravado por outra requisição durante a importação faz a
+        # gravação violar o índice único; o lote inteiro é desfeito e vira ValueError
+        with nome_unico(), turma_existente(), self._repositorio.transacao() as repositorio:
+            disciplinas = self._disciplinas(turma_id, repositorio)
+            if not disciplinas:
+                raise LookupError(ERRO_TURMA_INEXISTENTE)
+
+            resultados, validos = validar_importacao(linhas, disciplinas)
+            if validos:
+                for nome in repositorio.nomes_existentes(turma_id, list(validos)):
+                    indice, _ = validos.pop(nome)
+                    resultados[indice].update(status="erro", erro=ERRO_NOME_DUPLICADO)
+
+            novos = []
+            for indice, estudante in validos.values():
+                estudante_id = str(uuid4())
+                novos.append(novo_estudante(estudante_id, estudante))
+                resultados[indice].update(status="importado", id=estudante_id)
+
+            if novos:
+                versao = repositorio.inserir(turma_id, novos)
+
+        if novos:
+            self._cache.versao_gravada(turma_id, versao)
+            self._cache.invalidar(turma_id)
+
+        return {
+            "total": len(linhas),
+            "importados": len(validos),
+            "erros": len(linhas) - len(validos),
+            "resultados": resultados,
+        }
+
+    def exportar_estudantes(
+        self, tamanho_lote: int = TAMANHO_LOTE_EXPORTACAO, turma_id: str = TURMA_PADRAO
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Todos os estudantes (com a média), em lotes (ver Repositorio.exportar).
+
+        Gerador: no PostgreSQL, a conexão fica ocupada até ele ser esgotado ou
+        fechado.
+        """
+        for rows in self._repositorio.exportar(turma_id, tamanho_lote):
+            yield [row_para_exportacao(row) for row in rows]
 
     def calcular_media_estudante(self, estudante: Estudante) -> float:
-        if not estudante.notas or len(estudante.notas) == 0:
-            return 0.0
-        return sum(estudante.notas) / len(estudante.notas)
-
-    def calcular_media_turma_por_disciplina(self) -> List[Dict[str, float]]:
-        with get_cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT 
-                    disciplina,
-                    AVG(nota) as media
-                FROM notas
-                GROUP BY disciplina
-                ORDER BY disciplina
-                """
+        return media_notas(estudante.notas)
+
+    def calcular_media_turma_por_disciplina(
+        self, usar_cache: bool = True, turma_id: str = TURMA_PADRAO
+    ) -> List[Dict[str, float]]:
+        if usar_cache:
+            return self._agregados(turma_id).medias_por_disciplina()
+
+        with self._leitura(turma_id) as leitura:
+            disciplinas = self._disciplinas(turma_id, leitura)
+            medias = leitura.medias_por_disciplina(turma_id)
+        return resposta_medias_por_disciplina(disciplinas, medias)
+
+    def calcular_media_turma(
+        self, usar_cache: bool = True, turma_id: str = TURMA_PADRAO
+    ) -> float:
+        if usar_cache:
+            return self._agregados(turma_id).media_turma()
+
+        with self._leitura(turma_id) as leitura:
+            return media_exibida(leitura.media_turma(turma_id))
+
+    def obter_estudantes_acima_da_media(
+        self, usar_cache: bool = True, turma_id: str = TURMA_PADRAO
+    ) -> List[Dict[str, Any]]:
+        if usar_cache:
+            return self._cache.obter(
+                turma_id,
+                "estudantes_acima_da_media",
+                lambda: self.obter_estudantes_acima_da_media(False, turma_id),
             )
-            resultados = cursor.fetchall()
-            
-            medias_dict = {}
-            for row in resultados:
-                disciplina = int(row["disciplina"])
-                media = float(row["media"])
-                medias_dict[disciplina] = round(media, 2)
-            
-            # Retornar em ordem (1 a 5), preenchendo com 0.0 se não houver notas
-            medias_por_disciplina = []
-            for i in range(1, TOTAL_DISCIPLINAS + 1):
-                medias_por_disciplina.append({
-                    "disciplina": f"Disciplina {i}",
-                    "media": medias_dict.get(i, 0.0)
-                })
-            
-            return medias_por_disciplina
-
-    def calcular_media_turma(self) -> float:
-        estudantes = self.listar_estudantes()
-        
-        if not estudantes:
-            return 0.0
-        
-        soma_medias = sum(
-            self.calcular_media_estudante(estudante) for estudante in estudantes
-        )
-        return round(soma_medias / len(estudantes), 2)
-
-    def obter_estudantes_acima_da_media(self) -> List[Dict[str, Any]]:
-        media_turma = self.calcular_media_turma()
-        estudantes = self.listar_estudantes()
-        
-        estudantes_acima = []
-        for estudante in estudantes:
-            media_estudante = self.calcular_media_estudante(estudante)
-            if media_estudante > media_turma:
-                estudantes_acima.append({
-                    "id": estudante.id,
-                    "nome": estudante.nome,
-                    "media": round(media_estudante, 2),
-                })
-        
-        return estudantes_acima
+
+        # Média e filtro lidos do mesmo snapshot
+        with self._leitura(turma_id, snapshot=True) as leitura:
+            media_turma = media_exibida(leitura.media_turma(turma_id))
+            rows = leitura.acima_da_media(turma_id, media_turma)
+        return resposta_acima_da_media(rows)
 
     def obter_estudantes_com_baixa_frequencia(
-        self, limite: float = 75.0
+        self, limite: float = 75.0, usar_cache: bool = True, turma_id: str = TURMA_PADRAO
     ) -> List[Dict[str, Any]]:
-        with get_cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT id, nome, frequencia
-                FROM estudantes
-                WHERE frequencia < %s
-                ORDER BY frequencia ASC
-                """,
-                (limite,)
+        if usar_cache:
+            return self._cache.obter(
+                turma_id,
+                ("estudantes_com_baixa_frequencia", limite),
+                lambda: self.obter_estudantes_com_baixa_frequencia(limite, False, turma_id),
             )
-            resultados = cursor.fetchall()
-            
-            return [
-                {
-                    "id": str(row["id"]),
-                    "nome": row["nome"],
-                    "frequencia": float(row["frequencia"]),
-                }
-                for row in resultados
-            ]
-
-    def gerar_relatorio(self) -> Dict[str, Any]:
-        estudantes = self.listar_estudantes()
-        
-        estudantes_com_medias = [
-            {
-                "id": estudante.id,
-                "nome": estudante.nome,
-                "notas": estudante.notas,
-                "frequencia": estudante.frequencia,
-                "media": round(self.calcular_media_estudante(estudante), 2),
-            }
-            for estudante in estudantes
-        ]
-        
-        return {
-            "total_estudantes": len(estudantes),
-            "estudantes": estudantes_com_medias,
-            "media_turma": self.calcular_media_turma(),
-            "medias_por_disciplina": self.calcular_media_turma_por_disciplina(),
-            "estudantes_acima_da_media": self.obter_estudantes_acima_da_media(),
-            "estudantes_com_baixa_frequencia": self.obter_estudantes_com_baixa_frequencia(),
-        }
+
+        with self._leitura(turma_id) as leitura:
+            return resposta_baixa_frequencia(leitura.baixa_frequencia(turma_id, limite))
+
+    def gerar_relatorio(
+        self, usar_cache: bool = True, turma_id: str = TURMA_PADRAO
+    ) -> Dict[str, Any]:
+        if usar_cache:
+            return self._cache.obter(
+                turma_id, "relatorio", lambda: self.gerar_relatorio(False, turma_id)
+            )
+        return self._carregar_analise(turma_id).gerar()
+
+    def gerar_painel(
+        self,
+        secoes: Iterable[str] = tuple(SECOES_PAINEL),
+        usar_cache: bool = True,
+        turma_id: str = TURMA_PADRAO,
+    ) -> Dict[str, Any]:
+        """Seções pedidas do painel (ver secoes_painel), calculadas juntas a
+        partir de uma única leitura, como em gerar_relatorio"""
+        secoes = tuple(secoes)
+        if usar_cache:
+            return self._cache.obter(
+                turma_id,
+                ("painel", secoes),
+                lambda: self.gerar_painel(secoes, False, turma_id),
+            )
+        return self._carregar_analise(turma_id).gerar_secoes(secoes)
+
+    def gerar_estatisticas(
+        self, usar_cache: bool = True, turma_id: str = TURMA_PADRAO
+    ) -> Dict[str, Any]:
+        """Estatísticas detalhadas da turma (ver AnaliseTurma.estatisticas):
+        mediana, desvio padrão e percentis, histogramas por disciplina,
+        aprovação e ranking"""
+        if usar_cache:
+            return self._cache.obter(
+                turma_id, "estatisticas", lambda: self.gerar_estatisticas(False, turma_id)
+            )
+        return self._carregar_analise(turma_id).estatisticas()
 
 
-estudante_service = EstudanteService()
+# Compartilhado com o serviço assíncrono, para que escritas feitas por
+# qualquer um dos dois invalidem os mesmos relatórios
+cache_relatorios = CacheRelatorios()
@@ -0,0 +1,293 @@
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+from uuid import uuid4
+
+from starlette.concurrency import run_in_threadpool
+
+from backend.database.armazenamentoNotas import ArmazenamentoNotas
+from backend.database.repositorioPostgresAsync import RepositorioPostgresAsync
+from backend.model.estudante import AtualizarEstudante, CriarEstudante, Estudante
+from backend.model.turma import TURMA_PADRAO
+from backend.service import estudanteService
+from backend.service.analiseTurma import AnaliseTurma
+from backend.service.estudanteService import (
+    LIMITE_PADRAO,
+    QuantidadeNotasInvalida,
+    TAMANHO_LOTE_EXPORTACAO,
+    cache_relatorios,
+    conferir_notas,
+    conferir_ordenacao,
+    estudante_gravado,
+    media_exibida,
+    montar_pagina,
+    nome_unico,
+    novo_estudante,
+    posicao_do_cursor,
+    resposta_acima_da_media,
+    resposta_baixa_frequencia,
+    resposta_medias_por_disciplina,
+    row_para_dict,
+    row_para_estudante,
+    row_para_exportacao,
+    turma_existente,
+)
+from backend.service.relatorioService import AgregadosTurma, CacheRelatorios, SECOES_PAINEL
+
+
+class EstudanteServiceAsync:
+    """Adaptador de EstudanteService para o pool assíncrono (psycopg 3).
+
+    As regras, a conversão das linhas e o cache (compartilhável com o
+    serviço síncrono no mesmo processo) são os de EstudanteService; aqui
+    ficam só as idas ao banco, aguardadas em RepositorioPostgresAsync, que
+    usa as mesmas queries de RepositorioPostgres. Cada método segue o do
+    serviço síncrono de mesmo nome.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[CacheRelatorios] = None,
+        armazenamento: Optional[ArmazenamentoNotas] = None,
+    ):
+        self._repositorio = RepositorioPostgresAsync(armazenamento)
+        self._cache = cache or CacheRelatorios()
+
+    async def _agregados(self, turma_id: str) -> AgregadosTurma:
+        async def carregar():
+            async with self._leitura(turma_id) as leitura:
+                disciplinas = await self._disciplinas(turma_id, leitura)
+                rows = await leitura.listar(turma_id)
+            return AgregadosTurma.a_partir_de(
+                [row_para_estudante(row) for row in rows], disciplinas
+            )
+
+        return await self._cache.obter_agregados_async(turma_id, carregar)
+
+    def _leitura(self, turma_id: str, snapshot: bool = False):
+        return self._repositorio.leitura(
+            primario=self._cache.escrita_recente(
+                turma_id, estudanteService.DB_REPLICA_JANELA_ESCRITA
+            ),
+            snapshot=snapshot,
+        )
+
+    async def _disciplinas(self, turma_id: str, repositorio=None) -> Tuple[str, ...]:
+        repositorio = repositorio or self._repositorio
+        return await self._cache.obter_disciplinas_async(
+            turma_id, lambda: repositorio.disciplinas(turma_id)
+        )
+
+    async def _carregar_analise(self, turma_id: str) -> AnaliseTurma:
+        async with self._leitura(turma_id, snapshot=True) as leitura:
+            disciplinas = await self._disciplinas(turma_id, leitura)
+            rows = await leitura.listar(turma_id)
+        return AnaliseTurma.a_partir_de(rows, disciplinas)
+
+    async def criar_estudante(
+        self, dados_estudante: CriarEstudante, turma_id: str = TURMA_PADRAO
+    ) -> Estudante:
+        estudante_id = str(uuid4())
+        inicio = self._cache.iniciar_escrita(turma_id)
+
+        with nome_unico(), turma_existente():
+            async with self._repositorio.transacao() as repositorio:
+                conferir_notas(
+                    await self._disciplinas(turma_id, repositorio), dados_estudante.notas
+                )
+                versao = await repositorio.inserir(
+                    turma_id, [novo_estudante(estudante_id, dados_estudante)]
+                )
+
+        estudante = estudante_gravado(estudante_id, dados_estudante)
+        self._cache.versao_gravada(turma_id, versao)
+        self._cache.estudante_criado(turma_id, estudante, inicio)
+        return estudante
+
+    async def listar_estudantes(
+        self, como_dict: bool = False, turma_id: str = TURMA_PADRAO
+    ) -> Union[List[Estudante], List[Dict[str, Any]]]:
+        async with self._leitura(turma_id) as leitura:
+            rows = await leitura.listar(turma_id)
+        converter = row_para_dict if como_dict else row_para_estudante
+        return [converter(row) for row in rows]
+
+    async def listar_estudantes_paginado(
+        self,
+        limite: int = LIMITE_PADRAO,
+        como_dict: bool = False,
+        turma_id: str = TURMA_PADRAO,
+        cursor: Optional[str] = None,
+        ordenar: str = "nome",
+        decrescente: bool = False,
+        **filtros: Any,
+    ) -> Dict[str, Any]:
+        conferir_ordenacao(ordenar)
+        apos = posicao_do_cursor(cursor, ordenar, decrescente)
+        async with self._leitura(turma_id) as leitura:
+            rows = await leitura.pagina(
+                turma_id, limite + 1, ordenar=ordenar, decrescente=decrescente, apos=apos,
+                **filtros,
+            )
+        return montar_pagina(rows, limite, ordenar, decrescente, como_dict)
+
+    async def obter_estudante_por_id(
+        self, estudante_id: str, turma_id: str = TURMA_PADRAO
+    ) -> Optional[Estudante]:
+        async def carregar():
+            async with self._leitura(turma_id) as leitura:
+                row = await leitura.obter(estudante_id, turma_id)
+            return row_para_estudante(row) if row else None
+
+        return await self._cache.estudantes.obter_async(estudante_id, turma_id, carregar)
+
+    async def versao_dados(self, turma_id: str = TURMA_PADRAO) -> Optional[int]:
+        async with self._repositorio.leitura(primario=True) as leitura:
+            versao = await leitura.versao(turma_id)
+        self._cache.sincronizar(turma_id, versao)
+        return versao
+
+    async def listar_disciplinas(self, turma_id: str = TURMA_PADRAO) -> Tuple[str, ...]:
+        return await self._disciplinas(turma_id)
+
+    async def atualizar_estudante(
+        self,
+        estudante_id: str,
+        dados_estudante: AtualizarEstudante,
+        turma_id: str = TURMA_PADRAO,
+    ) -> Optional[Estudante]:
+        with nome_unico():
+            async with self._repositorio.transacao() as repositorio:
+                try:
+                    conferir_notas(
+                        await self._disciplinas(turma_id, repositorio), dados_estudante.notas
+                    )
+                except (LookupError, QuantidadeNotasInvalida):
+                    if not await repositorio.obter(estudante_id, turma_id):
+                        return None
+                    raise
+
+                versao = await repositorio.atualizar(
+                    estudante_id, turma_id, novo_estudante(estudante_id, dados_estudante)
+                )
+                if versao is None:
+                    return None
+
+        self._cache.versao_gravada(turma_id, versao)
+        self._cache.estudante_alterado(turma_id, estudante_id)
+        return estudante_gravado(estudante_id, dados_estudante)
+
+    async def remover_estudante(self, estudante_id: str, turma_id: str = TURMA_PADRAO) -> bool:
+        versao = await self._repositorio.remover(estudante_id, turma_id)
+        if versao is None:
+            return False
+        self._cache.versao_gravada(turma_id, versao)
+        self._cache.estudante_alterado(turma_id, estudante_id)
+        return True
+
+    async def exportar_estudantes(
+        self, tamanho_lote: int = TAMANHO_LOTE_EXPORTACAO, turma_id: str = TURMA_PADRAO
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        async for rows in self._repositorio.exportar(turma_id, tamanho_lote):
+            yield [row_para_exportacao(row) for row in rows]
+
+    async def calcular_media_turma_por_disciplina(
+        self, usar_cache: bool = True, turma_id: str = TURMA_PADRAO
+    ) -> List[Dict[str, float]]:
+        if usar_cache:
+            return (await self._agregados(turma_id)).medias_por_disciplina()
+
+        async with self._leitura(turma_id) as leitura:
+            disciplinas = await self._disciplinas(turma_id, leitura)
+            medias = await leitura.medias_por_disciplina(turma_id)
+        return resposta_medias_por_disciplina(disciplinas, medias)
+
+    async def calcular_media_turma(
+        self, usar_cache: bool = True, turma_id: str = TURMA_PADRAO
+    ) -> float:
+        if usar_cache:
+            return (await self._agregados(turma_id)).media_turma()
+
+        async with self._leitura(turma_id) as leitura:
+            return media_exibida(await leitura.media_turma(turma_id))
+
+    async def obter_estudantes_acima_da_media(
+        self, usar_cache: bool = True, turma_id: str = TURMA_PADRAO
+    ) -> List[Dict[str, Any]]:
+        if usar_cache:
+            return await self._cache.obter_async(
+                turma_id,
+                "estudantes_acima_da_media",
+                lambda: self.obter_estudantes_acima_da_media(False, turma_id),
+            )
+
+        async with self._leitura(turma_id, snapshot=True) as leitura:
+            media_turma = media_exibida(await leitura.media_turma(turma_id))
+            rows = await leitura.acima_da_media(turma_id, media_turma)
+        return resposta_acima_da_media(rows)
+
+    async def obter_estudantes_com_baixa_frequencia(
+        self, limite: float = 75.0, usar_cache: bool = True, turma_id: str = TURMA_PADRAO
+    ) -> List[Dict[str, Any]]:
+        if usar_cache:
+            return await self._cache.obter_async(
+                turma_id,
+                ("estudantes_com_baixa_frequencia", limite),
+                lambda: self.obter_estudantes_com_baixa_frequencia(limite, False, turma_id),
+            )
+
+        async with self._leitura(turma_id) as leitura:
+            return resposta_baixa_frequencia(await leitura.baixa_frequencia(turma_id, limite))
+
+    async def gerar_relatorio(
+        self, usar_cache: bool = True, turma_id: str = TURMA_PADRAO
+    ) -> Dict[str, Any]:
+        if usar_cache:
+            return await self._cache.obter_async(
+                turma_id, "relatorio", lambda: self.gerar_relatorio(False, turma_id)
+            )
+        return (await self._carregar_analise(turma_id)).gerar()
+
+    async def gerar_painel(
+        self,
+        secoes: Iterable[str] = tuple(SECOES_PAINEL),
+        usar_cache: bool = True,
+        turma_id: str = TURMA_PADRAO,
+    ) -> Dict[str, Any]:
+        secoes = tuple(secoes)
+        if usar_cache:
+            return await self._cache.obter_async(
+                turma_id,
+                ("painel", secoes),
+                lambda: self.gerar_painel(secoes, False, turma_id),
+            )
+        return (await self._carregar_analise(turma_id)).gerar_secoes(secoes)
+
+    async def gerar_estatisticas(
+        self, usar_cache: bool = True, turma_id: str = TURMA_PADRAO
+    ) -> Dict[str, Any]:
+        if usar_cache:
+            return await self._cache.obter_async(
+                turma_id, "estatisticas", lambda: self.gerar_estatisticas(False, turma_id)
+            )
+        return (await self._carregar_analise(turma_id)).estatisticas()
+
+
+class ServicoEmThreadpool:
+    """Expõe os métodos de um serviço síncrono como corrotinas.
+
+    Cada chamada roda no threadpool do Starlette, como acontecia com as rotas
+    `def`. Permite que as rotas `async def` usem o modo síncrono sem mudanças.
+    """
+
+    def __init__(self, servico):
+        self._servico = servico
+
+    def __getattr__(self, nome: str):
+        metodo = getattr(self._servico, nome)
+
+        async def executar(*args, **kwargs):
+            return await run_in_threadpool(metodo, *args, **kwargs)
+
+        return executar
+
+
+estudante_service_async = EstudanteServiceAsync(cache_relatorios)
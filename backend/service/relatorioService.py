@@ -0,0 +1,554 @@
+import math
+import threading
+import time
+from decimal import ROUND_HALF_EVEN, ROUND_HALF_UP, Decimal
+from fractions import Fraction
+from uuid import uuid4
+from typing import (
+    Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple,
+    Union,
+)
+
+from backend.model.estudante import Estudante
+from backend.service.cacheEstudantes import CacheEstudantes
+
+LIMITE_FREQUENCIA = 75.0
+
+# Seções aceitas pelo painel (?include=) -> método de MotorRelatorio
+SECOES_PAINEL = {
+    "estudantes": "estudantes",
+    "total_estudantes": "total_estudantes",
+    "media_turma": "media_turma",
+    "medias_por_disciplina": "medias_por_disciplina",
+    "acima_da_media": "estudantes_acima_da_media",
+    "baixa_frequencia": "estudantes_com_baixa_frequencia",
+}
+
+
+CENTESIMO = Decimal("0.01")
+# estudantes.media e o AVG do banco guardam médias como 6.333... com erro na
+# 28ª casa; ajustadas antes a 15 casas, um empate exato (x.xx5) não vira
+# x.xx4999... e uma média que não é empate fica do mesmo lado
+_CASAS_EXATAS = Decimal("1e-15")
+
+
+def media_notas(notas: List[float]) -> float:
+    if not notas:
+        return 0.0
+    return sum(notas) / len(notas)
+
+
+def centesimos(nota: float) -> int:
+    """Nota (duas casas, como gravada) em centésimos inteiros"""
+    return int((Decimal(str(nota)) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def arredondar_media(valor: Union[Decimal, Fraction, int]) -> float:
+    """Média exata com duas casas, metade para cima (como o ROUND do PostgreSQL).
+
+    Todas as médias dos relatórios (turma, disciplinas e estudantes, em
+    MotorRelatorio, AgregadosTurma, AnaliseTurma, no SQL e nos repositórios)
+    passam por aqui, então o mesmo conjunto de notas dá o mesmo valor em
+    qualquer caminho. Fraction é exata; Decimal vem do banco.
+    """
+    if isinstance(valor, Fraction):
+        return math.floor(valor * 100 + Fraction(1, 2)) / 100
+    valor = Decimal(valor).quantize(_CASAS_EXATAS, rounding=ROUND_HALF_EVEN)
+    return float(valor.quantize(CENTESIMO, rounding=ROUND_HALF_UP))
+
+
+def media_centesimos(soma: int, quantidade: int) -> Fraction:
+    """Média exata, em unidades, de `quantidade` notas que somam `soma` centésimos"""
+    return Fraction(soma, 100 * quantidade) if quantidade else Fraction(0)
+
+
+def media_das_medias(somas_por_quantidade: Dict[int, int], total_estudantes: int) -> Fraction:
+    """Média exata das médias individuais. As somas dos estudantes (em
+    centésimos) vêm agrupadas pela quantidade de notas, então a soma das
+    médias é uma fração por grupo, não uma por estudante. Estudantes sem
+    notas entram com média 0, como em media_notas"""
+    if not total_estudantes:
+        return Fraction(0)
+    soma_medias = sum(
+        (
+            Fraction(soma, quantidade)
+            for quantidade, soma in somas_por_quantidade.items()
+            if quantidade
+        ),
+        Fraction(0),
+    )
+    return soma_medias / (100 * total_estudantes)
+
+
+def acima_da_media(soma: int, quantidade: int, media_turma: float) -> bool:
+    """Se a média exata de `quantidade` notas somando `soma` centésimos é
+    maior que a média da turma (já arredondada), comparando inteiros"""
+    return soma > round(media_turma * 100) * quantidade
+
+
+def nomes_disciplinas(disciplinas: Union[int, Sequence[str]]) -> Tuple[str, ...]:
+    """Catálogo de disciplinas da turma (um número N vira Disciplina 1..Disciplina N)"""
+    if isinstance(disciplinas, int):
+        return tuple(f"Disciplina {indice}" for indice in range(1, disciplinas + 1))
+    return tuple(disciplinas)
+
+
+def secoes_painel(include: Optional[str] = None) -> Tuple[str, ...]:
+    """Converte o parâmetro include ("a,b,c") nas seções do painel, na ordem
+    canônica e sem repetições. Vazio ou ausente seleciona todas."""
+    if not include or not include.strip():
+        return tuple(SECOES_PAINEL)
+
+    pedidas = {secao.strip() for secao in include.split(",") if secao.strip()}
+    desconhecidas = pedidas - set(SECOES_PAINEL)
+    if desconhecidas:
+        raise ValueError(
+            f"Seções desconhecidas: {', '.join(sorted(desconhecidas))}. "
+            f"Aceitas: {', '.join(SECOES_PAINEL)}."
+        )
+    return tuple(secao for secao in SECOES_PAINEL if secao in pedidas)
+
+
+class MotorRelatorio:
+    """Calcula as seções do relatório a partir de um único conjunto de estudantes.
+
+    Todas as seções saem dos mesmos dados em memória, então são sempre
+    consistentes entre si. Cada seção é calculada uma única vez (O(N)). As
+    médias são somadas em centésimos inteiros e arredondadas por
+    arredondar_media, como no SQL.
+    """
+
+    def __init__(
+        self,
+        estudantes: List[Estudante],
+        disciplinas: Union[int, Sequence[str]],
+        limite_frequencia: float = LIMITE_FREQUENCIA,
+    ):
+        self.estudantes_base = estudantes
+        self.disciplinas = nomes_disciplinas(disciplinas)
+        self.total_disciplinas = len(self.disciplinas)
+        self.limite_frequencia = limite_frequencia
+        self._somas: Optional[List[int]] = None
+        self._media_turma: Optional[float] = None
+
+    def _somas_individuais(self) -> List[int]:
+        """Soma das notas de cada estudante, em centésimos"""
+        if self._somas is None:
+            self._somas = [
+                sum(centesimos(nota) for nota in estudante.notas)
+                for estudante in self.estudantes_base
+            ]
+        return self._somas
+
+    def _media(self, estudante: Estudante, soma: int) -> float:
+        return arredondar_media(media_centesimos(soma, len(estudante.notas)))
+
+    def total_estudantes(self) -> int:
+        return len(self.estudantes_base)
+
+    def estudantes(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "id": estudante.id,
+                "nome": estudante.nome,
+                "notas": estudante.notas,
+                "frequencia": estudante.frequencia,
+                "media": self._media(estudante, soma),
+            }
+            for estudante, soma in zip(self.estudantes_base, self._somas_individuais())
+        ]
+
+    def media_turma(self) -> float:
+        if self._media_turma is None:
+            somas_por_quantidade: Dict[int, int] = {}
+            for estudante, soma in zip(self.estudantes_base, self._somas_individuais()):
+                quantidade = len(estudante.notas)
+                somas_por_quantidade[quantidade] = somas_por_quantidade.get(quantidade, 0) + soma
+            self._media_turma = arredondar_media(
+                media_das_medias(somas_por_quantidade, self.total_estudantes())
+            )
+        return self._media_turma
+
+    def medias_por_disciplina(self) -> List[Dict[str, Any]]:
+        somas = [0] * self.total_disciplinas
+        contagens = [0] * self.total_disciplinas
+        for estudante in self.estudantes_base:
+            for indice, nota in enumerate(estudante.notas[: self.total_disciplinas]):
+                somas[indice] += centesimos(nota)
+                contagens[indice] += 1
+
+        return [
+            {
+                "disciplina": disciplina,
+                "media": arredondar_media(media_centesimos(somas[indice], contagens[indice])),
+            }
+            for indice, disciplina in enumerate(self.disciplinas)
+        ]
+
+    def estudantes_acima_da_media(self) -> List[Dict[str, Any]]:
+        media_turma = self.media_turma()
+        return [
+            {
+                "id": estudante.id,
+                "nome": estudante.nome,
+                "media": self._media(estudante, soma),
+            }
+            for estudante, soma in zip(self.estudantes_base, self._somas_individuais())
+            if acima_da_media(soma, len(estudante.notas), media_turma)
+        ]
+
+    def estudantes_com_baixa_frequencia(self) -> List[Dict[str, Any]]:
+        abaixo = [
+            estudante
+            for estudante in self.estudantes_base
+            if estudante.frequencia < self.limite_frequencia
+        ]
+        abaixo.sort(key=lambda estudante: estudante.frequencia)
+        return [
+            {
+                "id": estudante.id,
+                "nome": estudante.nome,
+                "frequencia": estudante.frequencia,
+            }
+            for estudante in abaixo
+        ]
+
+    def gerar(self) -> Dict[str, Any]:
+        return {
+            "total_estudantes": self.total_estudantes(),
+            "estudantes": self.estudantes(),
+            "media_turma": self.media_turma(),
+            "medias_por_disciplina": self.medias_por_disciplina(),
+            "estudantes_acima_da_media": self.estudantes_acima_da_media(),
+            "estudantes_com_baixa_frequencia": self.estudantes_com_baixa_frequencia(),
+        }
+
+    def gerar_secoes(self, secoes: Iterable[str]) -> Dict[str, Any]:
+        """Só as seções pedidas (nomes de SECOES_PAINEL); as demais não são calculadas"""
+        return {secao: getattr(self, SECOES_PAINEL[secao])() for secao in secoes}
+
+
+class AgregadosTurma:
+    """Somas da turma mantidas incrementalmente a cada escrita.
+
+    Guarda soma e contagem de notas por disciplina, a soma das notas dos
+    estudantes por quantidade de notas e o número de estudantes, o suficiente
+    para responder média da turma e médias por disciplina sem reler os dados.
+    As somas são em centésimos inteiros, exatas entre escritas, e os
+    resultados iguais aos de MotorRelatorio.
+    """
+
+    def __init__(self, disciplinas: Union[int, Sequence[str]]):
+        self.disciplinas = nomes_disciplinas(disciplinas)
+        self.total_disciplinas = len(self.disciplinas)
+        self.somas = [0] * self.total_disciplinas
+        self.contagens = [0] * self.total_disciplinas
+        self.somas_por_quantidade: Dict[int, int] = {}
+        self.total_estudantes = 0
+
+    @classmethod
+    def a_partir_de(
+        cls, estudantes: List[Estudante], disciplinas: Union[int, Sequence[str]]
+    ) -> "AgregadosTurma":
+        agregados = cls(disciplinas)
+        for estudante in estudantes:
+            agregados.adicionar(estudante.notas)
+        return agregados
+
+    def _aplicar(self, notas: List[float], sinal: int) -> None:
+        notas_centesimos = [centesimos(nota) for nota in notas]
+        for indice, nota in enumerate(notas_centesimos[: self.total_disciplinas]):
+            self.somas[indice] += sinal * nota
+            self.contagens[indice] += sinal
+        if notas_centesimos:
+            quantidade = len(notas_centesimos)
+            self.somas_por_quantidade[quantidade] = (
+                self.somas_por_quantidade.get(quantidade, 0) + sinal * sum(notas_centesimos)
+            )
+        self.total_estudantes += sinal
+
+    def adicionar(self, notas: List[float]) -> None:
+        self._aplicar(notas, 1)
+
+    def remover(self, notas: List[float]) -> None:
+        self._aplicar(notas, -1)
+
+    def media_turma(self) -> float:
+        return arredondar_media(media_das_medias(self.somas_por_quantidade, self.total_estudantes))
+
+    def medias_por_disciplina(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "disciplina": disciplina,
+                "media": arredondar_media(
+                    media_centesimos(self.somas[indice], self.contagens[indice])
+                ),
+            }
+            for indice, disciplina in enumerate(self.disciplinas)
+        ]
+
+
+class CacheRelatorios:
+    """Cache de relatórios por turma, indexado pela versão dos dados da turma.
+
+    Toda escrita incrementa a versão da turma (depois do commit), o que
+    descarta as entradas dela calculadas antes; as outras turmas continuam
+    válidas. Enquanto os dados não mudam, as leituras são O(1). O cache é por
+    processo: as escritas de outros processos só são vistas quando a versão
+    dos dados no banco (turmas.versao) é conferida com sincronizar(), o que
+    as rotas com ETag fazem a cada requisição.
+
+    Guarda também o catálogo de disciplinas de cada turma, que não muda depois
+    de criado e por isso não depende da versão. Quem precisa saber das
+    escritas (ex.: os snapshots de relatório) se registra com ao_invalidar().
+
+    Os estudantes lidos por id ficam em `estudantes` (ver CacheEstudantes),
+    compartilhado pelos serviços que usam este cache.
+    """
+
+    def __init__(self, estudantes: Optional[CacheEstudantes] = None):
+        # Incrementada por invalidar() sem turma: descarta todas as turmas
+        self.epoca = 0
+        self._versoes: Dict[str, int] = {}
+        # Diferencia as versões de processos distintos (todos começam em 0)
+        self.instancia = uuid4().hex[:12]
+        # Última versão dos dados de cada turma vista no banco
+        self._versoes_banco: Dict[str, Optional[int]] = {}
+        self._entradas: Dict[Tuple[str, Hashable], Tuple[Tuple[int, int], Any]] = {}
+        # Agregados com a versão em que foram guardados
+        self._agregados: Dict[str, Tuple[Tuple[int, int], AgregadosTurma]] = {}
+        self._disciplinas: Dict[str, Tuple[str, ...]] = {}
+        self._ouvintes: List[Callable[[Optional[str]], None]] = []
+        # Instante (monotonic) da última escrita em cada turma e em todas
+        self._escritas: Dict[str, float] = {}
+        self._escrita_geral = float("-inf")
+        self.estudantes = estudantes or CacheEstudantes()
+        self._lock = threading.Lock()
+
+    def _versao(self, turma_id: str) -> Tuple[int, int]:
+        return self.epoca, self._versoes.get(turma_id, 0)
+
+    def etiqueta_versao(self, turma_id: str) -> str:
+        """Identificador da versão dos dados da turma neste processo"""
+        with self._lock:
+            epoca, versao = self._versao(turma_id)
+        return f"{self.instancia}-{epoca}-{versao}"
+
+    def _ler(self, turma_id: str, chave: Hashable) -> Tuple[bool, Any, Tuple[int, int]]:
+        with self._lock:
+            versao = self._versao(turma_id)
+            entrada = self._entradas.get((turma_id, chave))
+            if entrada is not None and entrada[0] == versao:
+                return True, entrada[1], versao
+            return False, None, versao
+
+    def _guardar(
+        self, turma_id: str, chave: Hashable, versao: Tuple[int, int], valor: Any
+    ) -> None:
+        with self._lock:
+            # Só guarda se nenhuma escrita na turma aconteceu durante o cálculo
+            if versao == self._versao(turma_id):
+                self._entradas[(turma_id, chave)] = (versao, valor)
+
+    def _ler_agregados(self, turma_id: str) -> Tuple[Optional[AgregadosTurma], Tuple[int, int]]:
+        with self._lock:
+            guardados = self._agregados.get(turma_id)
+            return (guardados[1] if guardados else None), self._versao(turma_id)
+
+    def _guardar_agregados(
+        self, turma_id: str, versao: Tuple[int, int], agregados: AgregadosTurma
+    ) -> None:
+        with self._lock:
+            if versao == self._versao(turma_id):
+                self._agregados[turma_id] = (versao, agregados)
+
+    def obter(self, turma_id: str, chave: Hashable, calcular: Callable[[], Any]) -> Any:
+        encontrado, valor, versao = self._ler(turma_id, chave)
+        if encontrado:
+            return valor
+        valor = calcular()
+        self._guardar(turma_id, chave, versao, valor)
+        return valor
+
+    async def obter_async(
+        self, turma_id: str, chave: Hashable, calcular: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        encontrado, valor, versao = self._ler(turma_id, chave)
+        if encontrado:
+            return valor
+        valor = await calcular()
+        self._guardar(turma_id, chave, versao, valor)
+        return valor
+
+    def obter_agregados(
+        self, turma_id: str, carregar: Callable[[], AgregadosTurma]
+    ) -> AgregadosTurma:
+        agregados, versao = self._ler_agregados(turma_id)
+        if agregados is not None:
+            return agregados
+        agregados = carregar()
+        self._guardar_agregados(turma_id, versao, agregados)
+        return agregados
+
+    async def obter_agregados_async(
+        self, turma_id: str, carregar: Callable[[], Awaitable[AgregadosTurma]]
+    ) -> AgregadosTurma:
+        agregados, versao = self._ler_agregados(turma_id)
+        if agregados is not None:
+            return agregados
+        agregados = await carregar()
+        self._guardar_agregados(turma_id, versao, agregados)
+        return agregados
+
+    def _guardar_disciplinas(self, turma_id: str, disciplinas: Tuple[str, ...]) -> None:
+        # Turma inexistente (catálogo vazio) não é guardada: pode ser criada depois
+        if disciplinas:
+            with self._lock:
+                self._disciplinas[turma_id] = disciplinas
+
+    def obter_disciplinas(
+        self, turma_id: str, carregar: Callable[[], Tuple[str, ...]]
+    ) -> Tuple[str, ...]:
+        disciplinas = self._disciplinas.get(turma_id)
+        if disciplinas is None:
+            disciplinas = carregar()
+            self._guardar_disciplinas(turma_id, disciplinas)
+        return disciplinas
+
+    async def obter_disciplinas_async(
+        self, turma_id: str, carregar: Callable[[], Awaitable[Tuple[str, ...]]]
+    ) -> Tuple[str, ...]:
+        disciplinas = self._disciplinas.get(turma_id)
+        if disciplinas is None:
+            disciplinas = await carregar()
+            self._guardar_disciplinas(turma_id, disciplinas)
+        return disciplinas
+
+    def marcar_escrita(self, turma_id: str) -> None:
+        """Registra uma escrita que não muda os relatórios (ex.: turma criada)"""
+        self._escritas[turma_id] = time.monotonic()
+
+    def escrita_recente(self, turma_id: str, janela: float) -> bool:
+        """Se houve escrita na turma nos últimos `janela` segundos (usado para
+        ler do primário enquanto as réplicas podem estar atrasadas)"""
+        if janela <= 0:
+            return False
+        ultima = max(self._escritas.get(turma_id, float("-inf")), self._escrita_geral)
+        return time.monotonic() - ultima < janela
+
+    def sincronizar(self, turma_id: str, versao: Optional[int]) -> None:
+        """Confere a versão dos dados da turma lida do banco. Se não é a última
+        vista por este processo, houve uma escrita que ele não fez: ver
+        _escrita_externa"""
+        with self._lock:
+            if turma_id in self._versoes_banco and self._versoes_banco[turma_id] == versao:
+                return
+            self._versoes_banco[turma_id] = versao
+        self._escrita_externa(turma_id)
+
+    def versao_gravada(self, turma_id: str, versao: int) -> None:
+        """Versão do banco depois de uma escrita deste processo, que os outros
+        métodos já aplicaram ao cache. Se ela não segue a última vista, outra
+        escrita aconteceu antes sem ser vista, e a turma é descartada"""
+        with self._lock:
+            anterior = self._versoes_banco.get(turma_id)
+            # Sem versão vista, quem descarta a turma é a primeira sincronizar()
+            if anterior is None or anterior == versao:
+                return
+            self._versoes_banco[turma_id] = versao
+            if versao == anterior + 1:
+                return
+        self._escrita_externa(turma_id)
+
+    def versao_vista(self, turma_id: str) -> Optional[int]:
+        """Última versão do banco vista para a turma (por sincronizar ou pelas
+        escritas deste processo); None se nenhuma foi vista"""
+        with self._lock:
+            return self._versoes_banco.get(turma_id)
+
+    def _escrita_externa(self, turma_id: str) -> None:
+        """Descarta a turma como depois de uma escrita local (inclusive a
+        leitura no primário por DB_REPLICA_JANELA_ESCRITA, enquanto as réplicas
+        alcançam) e também os estudantes dela: não se sabe quais mudaram"""
+        self.estudantes.descartar_turma(turma_id)
+        self.invalidar(turma_id)
+
+    def ao_invalidar(self, ouvinte: Callable[[Optional[str]], None]) -> None:
+        """Chama ouvinte(turma_id) depois de cada nova versão da turma
+        (turma_id None quando todas são descartadas). Roda na thread da
+        escrita, então deve ser rápido."""
+        self._ouvintes.append(ouvinte)
+
+    def _avisar(self, turma_id: Optional[str]) -> None:
+        for ouvinte in self._ouvintes:
+            ouvinte(turma_id)
+
+    def _nova_versao(self, turma_id: str) -> None:
+        self._versoes[turma_id] = self._versoes.get(turma_id, 0) + 1
+        self._escritas[turma_id] = time.monotonic()
+        for chave in [chave for chave in self._entradas if chave[0] == turma_id]:
+            del self._entradas[chave]
+
+    def iniciar_escrita(self, turma_id: str) -> Tuple[int, int]:
+        """Nova versão da turma antes de uma escrita; o valor devolvido vai
+        para estudante_adicionado depois do commit.
+
+        Agregados carregados durante a escrita (que podem já ver o estudante
+        gravado) ficam com uma versão a partir desta e não são incrementados.
+        """
+        with self._lock:
+            self._nova_versao(turma_id)
+            return self._versao(turma_id)
+
+    def estudante_adicionado(
+        self, turma_id: str, notas: List[float], inicio: Tuple[int, int]
+    ) -> None:
+        """Soma o estudante aos agregados guardados antes de `inicio` (ver
+        iniciar_escrita); os guardados depois são descartados"""
+        with self._lock:
+            self._nova_versao(turma_id)
+            guardados = self._agregados.get(turma_id)
+            if guardados is not None:
+                if guardados[0] < inicio:
+                    guardados[1].adicionar(notas)
+                else:
+                    del self._agregados[turma_id]
+        self._avisar(turma_id)
+
+    def estudante_criado(
+        self, turma_id: str, estudante: Estudante, inicio: Tuple[int, int]
+    ) -> None:
+        """Depois de gravar um estudante novo: agregados (ver
+        estudante_adicionado) e cache de estudantes"""
+        self.estudante_adicionado(turma_id, estudante.notas, inicio)
+        self.estudantes.estudante_criado(turma_id, estudante)
+
+    def estudante_alterado(self, turma_id: str, estudante_id: str) -> None:
+        """Depois de atualizar ou remover um estudante"""
+        self.invalidar(turma_id)
+        self.estudantes.descartar(estudante_id)
+
+    def invalidar(self, turma_id: Optional[str] = None) -> None:
+        """Descarta os relatórios da turma (ou de todas, sem turma)"""
+        with self._lock:
+            if turma_id is None:
+                self.epoca += 1
+                self._escrita_geral = time.monotonic()
+                self._entradas.clear()
+                self._agregados.clear()
+                self._disciplinas.clear()
+                self._versoes_banco.clear()
+                self.estudantes.limpar()
+            else:
+                self._nova_versao(turma_id)
+                self._agregados.pop(turma_id, None)
+        self._avisar(turma_id)
+
+    def turma_removida(self, turma_id: str) -> None:
+        """Descarta tudo da turma, inclusive o catálogo de disciplinas (que
+        invalidar() mantém, por não mudar com as escritas): sem ele, a turma
+        removida volta a ser percebida pelo catálogo vazio"""
+        with self._lock:
+            self._disciplinas.pop(turma_id, None)
+        self.estudantes.descartar_turma(turma_id)
+        self.invalidar(turma_id)
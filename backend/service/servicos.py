@@ -0,0 +1,24 @@
+# Serviços do processo, sobre o banco escolhido por BANCO_DADOS (ver
+# backend/database/repositorio.py)
+
+from typing import Optional
+
+from backend.database.repositorio import banco_configurado, repositorio_configurado
+from backend.service.estudanteService import EstudanteService, cache_relatorios
+from backend.service.relatorioService import CacheRelatorios
+from backend.service.turmaService import TurmaService
+
+BANCO_DADOS = banco_configurado()
+
+
+def criar_estudante_service(cache: Optional[CacheRelatorios] = None) -> EstudanteService:
+    """Serviço de estudantes do banco configurado, sobre o repositório do processo"""
+    return EstudanteService(repositorio_configurado(), cache)
+
+
+def criar_turma_service(cache: Optional[CacheRelatorios] = None) -> TurmaService:
+    return TurmaService(repositorio_configurado(), cache)
+
+
+estudante_service = criar_estudante_service(cache_relatorios)
+turma_service = criar_turma_service(cache_relatorios)
@@ -0,0 +1,261 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import orjson
+
+from backend.database.repositorio import (
+    Repositorio,
+    ViolacaoChaveEstrangeira,
+    repositorio_configurado,
+)
+from backend.service.estudanteService import (
+    ERRO_TURMA_INEXISTENTE,
+    EstudanteService,
+    cache_relatorios,
+)
+from backend.service.relatorioService import CacheRelatorios
+from backend.service.servicos import estudante_service
+
+logger = logging.getLogger(__name__)
+
+# Idade máxima (s) de um snapshot: o timer recalcula os mais velhos sem o
+# cache de relatórios, o que também cobre escritas feitas por outros
+# processos ou direto no banco, que este processo não vê. 0 desliga o timer
+SNAPSHOT_INTERVALO = float(os.getenv("SNAPSHOT_INTERVALO", "300"))
+# Espera (s) depois da primeira escrita numa turma antes de recalcular, para
+# que uma rajada de escritas gere um recálculo só
+SNAPSHOT_ATRASO = float(os.getenv("SNAPSHOT_ATRASO", "2"))
+
+
+class SnapshotRelatorio:
+    """Relatório de uma turma já serializado, com o instante em que foi gerado
+    e a versão dos dados (turmas.versao) que ele reflete"""
+
+    __slots__ = ("turma_id", "conteudo", "gerado_em", "versao")
+
+    def __init__(self, turma_id: str, conteudo: bytes, gerado_em: datetime, versao: int):
+        self.turma_id = turma_id
+        self.conteudo = conteudo
+        self.gerado_em = gerado_em
+        self.versao = versao
+
+
+class SnapshotsRelatorios:
+    """Mantém o relatório de cada turma pré-calculado por uma thread em segundo plano.
+
+    Uma turma entra aqui no primeiro pedido do snapshot dela (calculado na
+    hora). Depois disso, cada escrita na turma (avisada pelo cache de
+    relatórios) agenda um recálculo para SNAPSHOT_ATRASO segundos depois, e o
+    timer recalcula os snapshots mais velhos que SNAPSHOT_INTERVALO. As
+    leituras devolvem o último snapshot da memória, sem consultar o banco.
+
+    Os snapshots também são gravados no repositório (ver
+    Repositorio.gravar_snapshot), de onde outros processos (e este, depois de
+    reiniciar) partem sem recalcular. Cada processo roda o seu próprio gerador.
+    """
+
+    def __init__(
+        self,
+        service: Optional[EstudanteService] = None,
+        cache: Optional[CacheRelatorios] = None,
+        intervalo: float = SNAPSHOT_INTERVALO,
+        atraso: float = SNAPSHOT_ATRASO,
+        repositorio: Optional[Repositorio] = None,
+    ):
+        self._service = service or estudante_service
+        self._cache = cache or cache_relatorios
+        self._repositorio = repositorio or repositorio_configurado()
+        self.intervalo = intervalo
+        self.atraso = atraso
+        self._memoria: Dict[str, SnapshotRelatorio] = {}
+        # turma -> instante (monotonic) da primeira escrita ainda não recalculada
+        self._pendentes: Dict[str, float] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._parar = False
+        self._cache.ao_invalidar(self.agendar)
+
+    def agendar(self, turma_id: Optional[str] = None) -> None:
+        """Agenda o recálculo da turma (ou de todas, sem turma) se ela tem snapshot"""
+        with self._cond:
+            turmas = list(self._memoria) if turma_id is None else [turma_id]
+            for turma in turmas:
+                if turma in self._memoria:
+                    self._pendentes.setdefault(turma, time.monotonic())
+            self._cond.notify()
+
+    def pendente(self, turma_id: str) -> bool:
+        with self._cond:
+            return turma_id in self._pendentes
+
+    def recalcular(self, turma_id: str, usar_cache: bool = True) -> SnapshotRelatorio:
+        """Gera o relatório da turma agora, grava e devolve o snapshot.
+        usar_cache=False recalcula sem o cache de relatórios"""
+        # Versão lida antes do cálculo (e o cache sincronizado com ela): uma
+        # escrita durante o cálculo deixa o snapshot marcado como desatualizado
+        versao = self._service.versao_dados(turma_id)
+        if versao is None:
+            self.descartar(turma_id)
+            raise LookupError(ERRO_TURMA_INEXISTENTE)
+        relatorio = self._service.gerar_relatorio(usar_cache=usar_cache, turma_id=turma_id)
+        snapshot = SnapshotRelatorio(
+            turma_id, orjson.dumps(relatorio), datetime.now(timezone.utc), versao
+        )
+        try:
+            self._repositorio.gravar_snapshot(
+                turma_id, snapshot.conteudo.decode("utf-8"), snapshot.gerado_em, versao
+            )
+        except ViolacaoChaveEstrangeira as erro:
+            self.descartar(turma_id)
+            raise LookupError(ERRO_TURMA_INEXISTENTE) from erro
+
+        with self._cond:
+            atual = self._memoria.get(turma_id)
+            if atual is None or atual.gerado_em < snapshot.gerado_em:
+                self._memoria[turma_id] = snapshot
+        return snapshot
+
+    def em_memoria(self, turma_id: str) -> Optional[SnapshotRelatorio]:
+        """Último snapshot da turma neste processo, sem acessar o banco (O(1))"""
+        return self._memoria.get(turma_id)
+
+    def obter(self, turma_id: str, recalcular: bool = False) -> SnapshotRelatorio:
+        """Último snapshot da turma: da memória, do banco ou calculado na hora.
+        recalcular=True ignora os existentes e gera um novo, sem o cache de
+        relatórios."""
+        if not recalcular:
+            snapshot = self.em_memoria(turma_id) or self._carregar(turma_id)
+            if snapshot is not None:
+                return snapshot
+        return self.recalcular(turma_id, usar_cache=not recalcular)
+
+    def _carregar(self, turma_id: str) -> Optional[SnapshotRelatorio]:
+        row = self._repositorio.obter_snapshot(turma_id)
+        if row is None:
+            return None
+
+        snapshot = SnapshotRelatorio(
+            turma_id, row["conteudo"].encode("utf-8"), row["gerado_em"], row["versao"]
+        )
+        with self._cond:
+            self._memoria.setdefault(turma_id, snapshot)
+            # Gerado em outra versão dos dados (ou sem versão vista ainda):
+            # serve este e recalcula em segundo plano
+            if snapshot.versao != self._cache.versao_vista(turma_id):
+                self._pendentes.setdefault(turma_id, time.monotonic())
+                self._cond.notify()
+        return snapshot
+
+    def descartar(self, turma_id: str) -> None:
+        with self._cond:
+            self._memoria.pop(turma_id, None)
+            self._pendentes.pop(turma_id, None)
+
+    def limpar(self) -> None:
+        """Esquece os snapshots da memória (os gravados no repositório ficam)"""
+        with self._cond:
+            self._memoria.clear()
+            self._pendentes.clear()
+
+    def atualizado(self, snapshot: SnapshotRelatorio) -> bool:
+        """Gerado na última versão dos dados vista por este processo"""
+        return snapshot.versao == self._cache.versao_vista(snapshot.turma_id)
+
+    def corpo(self, snapshot: SnapshotRelatorio) -> bytes:
+        """JSON da resposta: metadados do snapshot e o relatório, copiado como
+        está (sem desserializar)"""
+        metadados = orjson.dumps({
+            "turma_id": snapshot.turma_id,
+            "gerado_em": snapshot.gerado_em.isoformat(),
+            "idade_segundos": round(
+                (datetime.now(timezone.utc) - snapshot.gerado_em).total_seconds(), 3
+            ),
+            "atualizado": self.atualizado(snapshot),
+            "recalculo_agendado": self.pendente(snapshot.turma_id),
+        })
+        return metadados[:-1] + b',"relatorio":' + snapshot.conteudo + b"}"
+
+    # Thread em segundo plano
+
+    def iniciar(self) -> None:
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._parar = False
+            self._thread = threading.Thread(
+                target=self._executar, name="snapshots-relatorios", daemon=True
+            )
+            self._thread.start()
+
+    def parar(self) -> None:
+        with self._cond:
+            thread, self._thread = self._thread, None
+            self._parar = True
+            self._cond.notify()
+        if thread is not None:
+            thread.join()
+
+    def _proximas(self, proximo_timer: float) -> List[str]:
+        """Espera até haver turmas a recalcular (ou o timer vencer) e as devolve;
+        lista vazia quando é a vez do timer ou ao parar"""
+        with self._cond:
+            while not self._parar:
+                agora = time.monotonic()
+                prontas = [
+                    turma for turma, desde in self._pendentes.items()
+                    if agora - desde >= self.atraso
+                ]
+                if prontas:
+                    for turma in prontas:
+                        del self._pendentes[turma]
+                    return prontas
+                if self.intervalo and agora >= proximo_timer:
+                    return []
+
+                prazos = [desde + self.atraso for desde in self._pendentes.values()]
+                if self.intervalo:
+                    prazos.append(proximo_timer)
+                self._cond.wait(min(prazos) - agora if prazos else None)
+            return []
+
+    def _vencidas(self) -> List[str]:
+        vencidas = self._repositorio.snapshots_vencidos(self.intervalo)
+        with self._cond:
+            # Também as que só estão na memória (carregadas antes de outro
+            # processo regravar o snapshot)
+            agora = datetime.now(timezone.utc)
+            vencidas += [
+                turma for turma, snapshot in self._memoria.items()
+                if (agora - snapshot.gerado_em).total_seconds() >= self.intervalo
+                and turma not in vencidas
+            ]
+        return vencidas
+
+    def _executar(self) -> None:
+        proximo_timer = time.monotonic() + self.intervalo
+        while True:
+            turmas = self._proximas(proximo_timer)
+            if self._parar:
+                return
+            try:
+                # Pelo timer, sem o cache: ele não vê as escritas de fora da API
+                pelo_timer = not turmas
+                if pelo_timer:
+                    proximo_timer = time.monotonic() + self.intervalo
+                    turmas = self._vencidas()
+                for turma_id in turmas:
+                    try:
+                        self.recalcular(turma_id, usar_cache=not pelo_timer)
+                    except LookupError:
+                        pass  # turma removida: recalcular já descartou o snapshot
+            except Exception:
+                # Um erro (ex.: banco fora do ar) não derruba a thread; o
+                # próximo aviso ou o timer tentam de novo
+                logger.exception("Falha ao recalcular snapshots de relatório")
+
+
+snapshots_relatorios = SnapshotsRelatorios()
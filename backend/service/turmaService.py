@@ -0,0 +1,84 @@
+from contextlib import contextmanager
+from typing import List, Optional
+from uuid import uuid4
+
+from backend.database.repositorio import (
+    FK_PERIODO,
+    INDICE_PERIODO_UNICO,
+    INDICE_TURMA_UNICA,
+    Repositorio,
+    ViolacaoChaveEstrangeira,
+    ViolacaoUnicidade,
+    repositorio_configurado,
+)
+from backend.model.turma import TURMA_PADRAO, CriarPeriodo, CriarTurma, Periodo, Turma
+from backend.service.relatorioService import CacheRelatorios
+
+ERRO_PERIODO_DUPLICADO = "Já existe um período com esse nome."
+ERRO_TURMA_DUPLICADA = "Já existe uma turma com esse nome no período."
+ERRO_PERIODO_INEXISTENTE = "Período não encontrado."
+ERRO_REMOVER_TURMA_PADRAO = "A turma padrão não pode ser removida."
+
+
+@contextmanager
+def restricoes_turma():
+    """Traduz as violações de unicidade para ValueError e a do período para LookupError"""
+    try:
+        yield
+    except ViolacaoUnicidade as erro:
+        if erro.restricao == INDICE_PERIODO_UNICO:
+            raise ValueError(ERRO_PERIODO_DUPLICADO) from erro
+        if erro.restricao == INDICE_TURMA_UNICA:
+            raise ValueError(ERRO_TURMA_DUPLICADA) from erro
+        raise
+    except ViolacaoChaveEstrangeira as erro:
+        if erro.restricao != FK_PERIODO:
+            raise
+        raise LookupError(ERRO_PERIODO_INEXISTENTE) from erro
+
+
+class TurmaService:
+    """Períodos e turmas sobre um Repositorio (ver EstudanteService)"""
+
+    def __init__(
+        self,
+        repositorio: Optional[Repositorio] = None,
+        cache: Optional[CacheRelatorios] = None,
+    ):
+        self._repositorio = repositorio or repositorio_configurado()
+        # Mesmo cache do serviço de estudantes: remover uma turma descarta os
+        # relatórios dela
+        self._cache = cache or CacheRelatorios()
+
+    def criar_periodo(self, dados_periodo: CriarPeriodo) -> Periodo:
+        periodo = Periodo(nome=dados_periodo.nome)
+        with restricoes_turma():
+            self._repositorio.criar_periodo(periodo)
+        return periodo
+
+    def listar_periodos(self) -> List[Periodo]:
+        return self._repositorio.listar_periodos()
+
+    def criar_turma(self, dados_turma: CriarTurma) -> Turma:
+        turma = Turma(id=str(uuid4()), **dados_turma.model_dump())
+        with restricoes_turma():
+            self._repositorio.criar_turma(turma)
+        # As leituras da turma nova ficam no primário até as réplicas a terem
+        self._cache.marcar_escrita(turma.id)
+        return turma
+
+    def listar_turmas(self, periodo_id: Optional[str] = None) -> List[Turma]:
+        return self._repositorio.listar_turmas(periodo_id)
+
+    def obter_turma(self, turma_id: str) -> Optional[Turma]:
+        return self._repositorio.obter_turma(turma_id)
+
+    def remover_turma(self, turma_id: str) -> bool:
+        """Remove a turma com seus estudantes e notas"""
+        if turma_id == TURMA_PADRAO:
+            raise ValueError(ERRO_REMOVER_TURMA_PADRAO)
+
+        removida = self._repositorio.remover_turma(turma_id)
+        if removida:
+            self._cache.turma_removida(turma_id)
+        return removida
@@ -1,11 +1,47 @@
+from contextlib import contextmanager
+
 import pytest
-from backend.service.estudanteService import EstudanteService
+
+from backend.database import db
+from backend.database.armazenamentoNotas import ArmazenamentoLinhas
+from backend.database.metricas import encerrar_medicao, iniciar_medicao, medicao_atual
+from backend.database.repositorio import repositorio_configurado
+from backend.database.repositorioPostgres import RepositorioPostgres
+from backend.service.estudanteService import EstudanteService, cache_relatorios
+from backend.service.servicos import BANCO_DADOS, criar_estudante_service
+from backend.service.snapshotService import snapshots_relatorios
 from backend.model.estudante import CriarEstudante, AtualizarEstudante
 
 
+def pytest_collection_modifyitems(config, items):
+    # Os testes marcados com postgres medem o SQL, o pool ou o driver
+    # assíncrono; com os bancos embutidos eles não se aplicam
+    if BANCO_DADOS == "postgres":
+        return
+    pular = pytest.mark.skip(reason=f"depende do PostgreSQL (BANCO_DADOS={BANCO_DADOS})")
+    for item in items:
+        if "postgres" in item.keywords:
+            item.add_marker(pular)
+
+
+@pytest.fixture(autouse=True)
+def banco_limpo():
+    # Em qualquer BANCO_DADOS, cada teste parte de um banco novo (só a turma
+    # padrão, vazia) e sem nada dos testes anteriores no cache do processo
+    repositorio_configurado().limpar()
+    cache_relatorios.invalidar()
+    snapshots_relatorios.limpar()
+
+
 @pytest.fixture
 def service():
-    return EstudanteService()
+    return criar_estudante_service()
+
+
+@pytest.fixture
+def service_linhas():
+    # Para os testes que dependem da tabela notas, em qualquer ARMAZENAMENTO_NOTAS
+    return EstudanteService(RepositorioPostgres(ArmazenamentoLinhas()))
 
 
 @pytest.fixture
@@ -34,3 +70,54 @@ def estudante_baixa_frequencia():
         frequencia=70.0
     )
 
+
+
+class ContadorQueries:
+    def __init__(self, medicao):
+        self._medicao = medicao
+
+    @property
+    def total(self):
+        return self._medicao.consultas
+
+    def zerar(self):
+        self._medicao.consultas = 0
+
+
+@pytest.fixture
+def contador_queries():
+    # Conta os comandos SQL executados pelos cursores instrumentados, com a
+    # mesma medição que o middleware de métricas faz por requisição
+    token = iniciar_medicao()
+    yield ContadorQueries(medicao_atual())
+    encerrar_medicao(token)
+
+
+class ContadorTransacoes:
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    def zerar(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+
+@pytest.fixture
+def contador_transacoes(monkeypatch):
+    # Cada get_connection() é um checkout do pool e termina em COMMIT ou ROLLBACK
+    contador = ContadorTransacoes()
+    get_connection_original = db.get_connection
+
+    @contextmanager
+    def get_connection_contador():
+        try:
+            with get_connection_original() as conn:
+                yield conn
+        except Exception:
+            contador.rollbacks += 1
+            raise
+        contador.commits += 1
+
+    monkeypatch.setattr(db, "get_connection", get_connection_contador)
+    return contador
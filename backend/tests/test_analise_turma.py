@@ -0,0 +1,147 @@
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+from backend.model.estudante import CriarEstudante, Estudante
+from backend.service.analiseTurma import AnaliseTurma
+from backend.service.relatorioService import SECOES_PAINEL, MotorRelatorio
+from main import app
+
+
+def _como_dicts(estudantes):
+    return [estudante.model_dump() for estudante in estudantes]
+
+
+@pytest.fixture
+def estudantes():
+    return [
+        Estudante(id="1", nome="Ana", notas=[7.5, 8.0, 6.5, 9.0, 7.0], frequencia=85.0),
+        Estudante(id="2", nome="Bruno", notas=[8.5, 9.0, 7.5, 8.5, 9.0], frequencia=70.0),
+        Estudante(id="3", nome="Carla", notas=[5.0, 6.0, 5.5, 6.0, 5.0], frequencia=60.0),
+        Estudante(id="4", nome="Davi", notas=[7.5, 8.0, 6.5, 9.0, 7.0], frequencia=95.0),
+    ]
+
+
+@pytest.fixture
+def analise(estudantes):
+    return AnaliseTurma.a_partir_de(_como_dicts(estudantes), 5)
+
+
+class TestAnaliseTurma:
+
+    @pytest.mark.parametrize("semente", [1, 2, 3])
+    def test_mesmos_resultados_que_o_motor(self, semente):
+        # Notas de duas casas como as do banco, com médias que caem exatamente
+        # no meio do arredondamento (ex.: 2.675)
+        gerador = random.Random(semente)
+        estudantes = [
+            Estudante(
+                id=str(indice),
+                nome=f"Aluno {indice:04d}",
+                notas=[round(gerador.uniform(0, 10), 2) for _ in range(5)],
+                frequencia=round(gerador.uniform(40, 100), 2),
+            )
+            for indice in range(2000)
+        ]
+        analise = AnaliseTurma.a_partir_de(_como_dicts(estudantes), 5)
+
+        assert analise.gerar() == MotorRelatorio(estudantes, 5).gerar()
+
+    def test_secoes_do_painel(self, estudantes, analise):
+        secoes = tuple(SECOES_PAINEL)
+
+        assert analise.gerar_secoes(secoes) == MotorRelatorio(estudantes, 5).gerar_secoes(secoes)
+        assert list(analise.gerar_secoes(("media_turma",))) == ["media_turma"]
+
+    def test_estatisticas_das_medias(self, analise):
+        # Médias: 7.6, 8.5, 5.5, 7.6
+        estatisticas = analise.estatisticas()
+
+        assert estatisticas["medias"]["mediana"] == 7.6
+        assert estatisticas["medias"]["minimo"] == 5.5
+        assert estatisticas["medias"]["maximo"] == 8.5
+        assert estatisticas["medias"]["desvio_padrao"] == 1.1
+        assert estatisticas["medias"]["percentis"]["p10"] == 6.13
+        assert estatisticas["frequencia"]["mediana"] == 77.5
+
+    def test_aprovacao(self, analise):
+        # Carla reprova por nota e por frequência; Bruno só por frequência
+        assert analise.aprovacao() == {
+            "aprovados": 2,
+            "reprovados": 2,
+            "reprovados_por_nota": 1,
+            "reprovados_por_frequencia": 2,
+        }
+
+    def test_aprovacao_no_limite_da_media(self):
+        # Média exatamente 6.0: aprovado (a soma em float daria 5.999...)
+        analise = AnaliseTurma.a_partir_de(
+            [{"id": "1", "nome": "Eva", "notas": [5.9, 6.1, 6.2, 5.8, 6.0], "frequencia": 75.0}], 5
+        )
+
+        assert analise.aprovacao()["aprovados"] == 1
+
+    def test_disciplinas_e_histograma(self, analise):
+        [primeira, segunda, *_] = analise.disciplinas_detalhadas()
+
+        assert primeira["disciplina"] == "Disciplina 1"
+        # 28.5 / 4 = 7.125: metade para cima
+        assert primeira["media"] == 7.13
+        assert primeira["mediana"] == 7.5
+        # Notas 7.5, 8.5, 5.0, 7.5
+        assert primeira["histograma"] == [0, 0, 0, 0, 0, 1, 0, 2, 1, 0]
+        assert primeira["aprovados"] == 3
+        # Nota 6.0 conta como aprovada e cai na faixa 6-7
+        assert segunda["aprovados"] == 4
+        assert segunda["histograma"][6] == 1
+
+    def test_nota_dez_na_ultima_faixa(self):
+        analise = AnaliseTurma.a_partir_de(
+            [{"id": "1", "nome": "Eva", "notas": [10.0, 9.99], "frequencia": 90.0}],
+            ["Português", "Matemática"],
+        )
+
+        assert [d["histograma"][-1] for d in analise.disciplinas_detalhadas()] == [1, 1]
+
+    def test_ranking_com_empates(self, analise):
+        ranking = analise.ranking()
+
+        assert [(r["posicao"], r["nome"]) for r in ranking] == [
+            (1, "Bruno"), (2, "Ana"), (2, "Davi"), (4, "Carla")
+        ]
+        assert ranking[0]["media"] == 8.5
+
+    def test_turma_vazia(self):
+        analise = AnaliseTurma.a_partir_de([], ["Português", "Matemática"])
+        estatisticas = analise.estatisticas()
+
+        assert analise.gerar() == MotorRelatorio([], ["Português", "Matemática"]).gerar()
+        assert estatisticas["total_estudantes"] == 0
+        assert estatisticas["medias"]["mediana"] == 0.0
+        assert estatisticas["ranking"] == []
+        assert [d["histograma"] for d in estatisticas["disciplinas"]] == [[0] * 10] * 2
+
+
+class TestEstatisticasService:
+
+    def test_relatorio_e_estatisticas_do_banco(self, service):
+        for indice, notas in enumerate([[7.5, 8.0, 6.5, 9.0, 7.0], [5.0, 6.0, 5.5, 6.0, 5.0]]):
+            service.criar_estudante(CriarEstudante(
+                nome=f"Aluno {indice}", notas=notas, frequencia=80.0
+            ))
+
+        estatisticas = service.gerar_estatisticas(usar_cache=False)
+
+        assert service.gerar_relatorio(usar_cache=False) == MotorRelatorio(
+            service.listar_estudantes(), 5
+        ).gerar()
+        assert estatisticas["aprovacao"]["aprovados"] == 1
+        assert [r["nome"] for r in estatisticas["ranking"]] == ["Aluno 0", "Aluno 1"]
+        assert service.gerar_estatisticas() == estatisticas
+
+    def test_rota_estatisticas(self):
+        with TestClient(app) as cliente:
+            resposta = cliente.get("/api/relatorios/estatisticas")
+
+            assert resposta.status_code == 200
+            assert set(resposta.json()) >= {"medias", "aprovacao", "disciplinas", "ranking"}
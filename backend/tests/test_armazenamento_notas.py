@@ -0,0 +1,224 @@
+import csv
+import io
+import random
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from backend.database.armazenamentoNotas import (
+    ArmazenamentoCompacto,
+    ArmazenamentoLinhas,
+    arredondar_nota,
+)
+from backend.database.db import get_cursor, init_db
+from backend.database.migracaoNotas import migrar
+from backend.database.repositorioPostgres import RepositorioPostgres
+from backend.model.estudante import AtualizarEstudante, CriarEstudante
+from backend.model.turma import CriarPeriodo, CriarTurma
+from backend.service.estudanteService import EstudanteService, QuantidadeNotasInvalida
+from backend.service.relatorioService import CacheRelatorios, MotorRelatorio
+from backend.service.turmaService import TurmaService
+from main import app
+
+pytestmark = pytest.mark.postgres
+
+
+@pytest.fixture(params=[ArmazenamentoLinhas, ArmazenamentoCompacto], ids=["linhas", "compacto"])
+def armazenamento(request):
+    return request.param()
+
+
+@pytest.fixture
+def cache():
+    return CacheRelatorios()
+
+
+@pytest.fixture
+def turma(cache):
+    # Turma com catálogo próprio (3 disciplinas), removida no final
+    turma_service = TurmaService(cache=cache)
+    periodo = turma_service.criar_periodo(CriarPeriodo(nome=f"A{uuid4().hex[:8]}"))
+    yield turma_service.criar_turma(CriarTurma(
+        periodo_id=periodo.id, nome="Turma", disciplinas=["Português", "Matemática", "Física"]
+    ))
+    with get_cursor() as cursor:
+        cursor.execute("DELETE FROM periodos WHERE id = %s", (periodo.id,))
+
+
+def _criar_estudantes(service, quantidade=30, total_notas=5, **kwargs):
+    gerador = random.Random(11)
+    return [
+        service.criar_estudante(CriarEstudante(
+            nome=f"Aluno {i:02d}",
+            notas=[round(gerador.uniform(0, 10), 2) for _ in range(total_notas)],
+            frequencia=round(gerador.uniform(40, 100), 2),
+        ), **kwargs)
+        for i in range(quantidade)
+    ]
+
+
+class TestArmazenamentoNotas:
+
+    def test_crud_e_listagens(self, cache, armazenamento):
+        service = EstudanteService(RepositorioPostgres(armazenamento), cache)
+        criados = _criar_estudantes(service)
+
+        assert service.listar_estudantes() == sorted(criados, key=lambda e: e.nome)
+        assert service.obter_estudante_por_id(criados[0].id) == criados[0]
+
+        atualizado = service.atualizar_estudante(criados[0].id, AtualizarEstudante(
+            nome="Aluno atualizado", notas=[10.0, 9.5, 9.0, 8.5, 8.0], frequencia=99.0
+        ))
+        assert atualizado.notas == [10.0, 9.5, 9.0, 8.5, 8.0]
+
+        pagina = service.listar_estudantes_paginado(5, ordenar="media", decrescente=True)
+        assert pagina["estudantes"][0] == atualizado
+        assert len(pagina["estudantes"]) == 5
+
+        assert service.remover_estudante(atualizado.id) is True
+        assert service.obter_estudante_por_id(atualizado.id) is None
+
+    def test_relatorios_sql_iguais_ao_motor(self, cache, armazenamento):
+        service = EstudanteService(RepositorioPostgres(armazenamento), cache)
+        _criar_estudantes(service)
+        motor = MotorRelatorio(service.listar_estudantes(), 5)
+
+        assert service.calcular_media_turma(usar_cache=False) == motor.media_turma()
+        assert service.calcular_media_turma_por_disciplina(usar_cache=False) == motor.medias_por_disciplina()
+        assert service.obter_estudantes_acima_da_media(usar_cache=False) == motor.estudantes_acima_da_media()
+        assert service.gerar_relatorio(usar_cache=False) == motor.gerar()
+
+    def test_notas_arredondadas_como_numeric(self, cache, armazenamento):
+        service = EstudanteService(RepositorioPostgres(armazenamento), cache)
+        estudante = service.criar_estudante(CriarEstudante(
+            nome="Arredondamento", notas=[7.125, 8.333, 6.5, 9.999, 0.004], frequencia=80.0
+        ))
+
+        assert estudante.notas == [7.13, 8.33, 6.5, 10.0, 0.0]
+        assert arredondar_nota(7.125) == 7.13
+
+    def test_importacao_e_exportacao(self, cache, armazenamento):
+        service = EstudanteService(RepositorioPostgres(armazenamento), cache)
+        resultado = service.importar_estudantes([
+            {"nome": "Ana", "notas": [7, 8, 9, 10, 6], "frequencia": 90},
+            {"nome": "Bia", "notas": [7, 8, 9], "frequencia": 90},  # faltam notas
+        ])
+
+        assert [r["status"] for r in resultado["resultados"]] == ["importado", "erro"]
+        assert "5 notas" in resultado["resultados"][1]["erro"]
+        [lote] = list(service.exportar_estudantes())
+        assert lote[0]["notas"] == [7.0, 8.0, 9.0, 10.0, 6.0]
+        assert lote[0]["media"] == 8.0
+
+    def test_mesmos_resultados_nos_dois_modos(self, cache):
+        # Os dois layouts convivem no banco; cada serviço só vê as notas do seu
+        relatorios = []
+        for armazenamento in (ArmazenamentoLinhas(), ArmazenamentoCompacto()):
+            service = EstudanteService(RepositorioPostgres(armazenamento), CacheRelatorios())
+            ids = [estudante.id for estudante in _criar_estudantes(service)]
+            relatorio = service.gerar_relatorio(usar_cache=False)
+            for estudante in relatorio["estudantes"] + relatorio["estudantes_acima_da_media"]:
+                estudante.pop("id")
+            for estudante in relatorio["estudantes_com_baixa_frequencia"]:
+                estudante.pop("id")
+            relatorios.append(relatorio)
+            with get_cursor() as cursor:
+                cursor.execute("DELETE FROM estudantes WHERE id = ANY(%s)", (ids,))
+
+        assert relatorios[0] == relatorios[1]
+
+    def test_migracao_entre_modos(self, cache):
+        linhas = EstudanteService(RepositorioPostgres(ArmazenamentoLinhas()), CacheRelatorios())
+        compacto = EstudanteService(RepositorioPostgres(ArmazenamentoCompacto()), CacheRelatorios())
+        criados = sorted(_criar_estudantes(linhas, 10), key=lambda e: e.nome)
+
+        # Sem --limpar nada é apagado: as instâncias no modo linhas seguem lendo
+        assert migrar(ArmazenamentoCompacto()) == 0
+        assert linhas.listar_estudantes() == criados
+        assert compacto.listar_estudantes() == criados
+
+        migrar(ArmazenamentoCompacto(), limpar=True)
+        with get_cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) AS total FROM notas")
+            assert cursor.fetchone()["total"] == 0
+        assert compacto.listar_estudantes() == criados
+
+        migrar(ArmazenamentoLinhas(), limpar=True)
+        assert linhas.listar_estudantes() == criados
+
+    def test_limpeza_recusada_com_notas_divergentes(self):
+        linhas = EstudanteService(RepositorioPostgres(ArmazenamentoLinhas()), CacheRelatorios())
+        criados = sorted(_criar_estudantes(linhas, 3), key=lambda e: e.nome)
+        migrar(ArmazenamentoCompacto())
+        with get_cursor() as cursor:
+            cursor.execute(
+                "UPDATE estudantes SET notas = notas[1:2] WHERE id = %s", (criados[0].id,)
+            )
+
+        with pytest.raises(RuntimeError, match="1 estudantes"):
+            migrar(ArmazenamentoCompacto(), limpar=True)
+        assert linhas.listar_estudantes() == criados
+
+    def test_inicializacao_nao_migra(self):
+        linhas = EstudanteService(RepositorioPostgres(ArmazenamentoLinhas()), CacheRelatorios())
+        criados = _criar_estudantes(linhas, 3)
+
+        init_db()
+
+        assert len(linhas.listar_estudantes()) == len(criados)
+        with get_cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) AS total FROM estudantes WHERE notas IS NOT NULL")
+            assert cursor.fetchone()["total"] == 0
+
+
+class TestCatalogoDisciplinas:
+
+    def test_notas_seguem_o_catalogo_da_turma(self, cache, armazenamento, turma):
+        service = EstudanteService(RepositorioPostgres(armazenamento), cache)
+        _criar_estudantes(service, 8, total_notas=3, turma_id=turma.id)
+
+        assert service.listar_disciplinas(turma.id) == ("Português", "Matemática", "Física")
+        medias = service.calcular_media_turma_por_disciplina(turma_id=turma.id)
+        assert [media["disciplina"] for media in medias] == ["Português", "Matemática", "Física"]
+        assert medias == service.calcular_media_turma_por_disciplina(
+            usar_cache=False, turma_id=turma.id
+        )
+        assert service.gerar_relatorio(turma_id=turma.id) == service.gerar_relatorio(
+            usar_cache=False, turma_id=turma.id
+        )
+
+    def test_quantidade_de_notas_diferente_do_catalogo(self, cache, armazenamento, turma):
+        service = EstudanteService(RepositorioPostgres(armazenamento), cache)
+        dados = CriarEstudante(nome="Eva", notas=[7.0] * 5, frequencia=80.0)
+
+        with pytest.raises(QuantidadeNotasInvalida, match="3 notas"):
+            service.criar_estudante(dados, turma_id=turma.id)
+        estudante = service.criar_estudante(dados)  # turma padrão: 5 disciplinas
+        with pytest.raises(QuantidadeNotasInvalida):
+            service.atualizar_estudante(estudante.id, AtualizarEstudante(
+                nome="Eva", notas=[7.0] * 3, frequencia=80.0
+            ))
+        with pytest.raises(LookupError):
+            service.criar_estudante(dados, turma_id="nao-existe")
+        assert service.listar_estudantes(turma_id=turma.id) == []
+
+    def test_api_por_catalogo(self, turma):
+        # O lifespan fecha o pool assíncrono (DB_MODO=async) no fim do teste
+        with TestClient(app) as cliente:
+            resposta = cliente.post(
+                f"/api/estudantes?turma_id={turma.id}",
+                json={"nome": "Caio", "notas": [7.0] * 5, "frequencia": 80.0},
+            )
+            assert resposta.status_code == 422
+            resposta = cliente.post(
+                f"/api/estudantes?turma_id={turma.id}",
+                json={"nome": "Caio", "notas": [7.0, 8.0, 9.0], "frequencia": 80.0},
+            )
+            assert resposta.status_code == 201
+
+            exportacao = cliente.get(f"/api/estudantes/exportar?formato=csv&turma_id={turma.id}")
+            [linha] = list(csv.DictReader(io.StringIO(exportacao.text)))
+            assert [coluna for coluna in linha if coluna.startswith("nota")] == ["nota1", "nota2", "nota3"]
+            assert cliente.get(f"/api/turmas/{turma.id}").json()["disciplinas"] == [
+                "Português", "Matemática", "Física"
+            ]
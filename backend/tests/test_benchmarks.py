@@ -0,0 +1,102 @@
+import json
+
+import pytest
+from backend.benchmarks import resultados, servico
+from backend.benchmarks.dados import popular_turma, remover_turma, turma_gerada
+from backend.benchmarks.importacao import gerar_linhas, iterar_linhas
+from backend.database.db import get_cursor
+
+
+def execucao(**medidas):
+    return {"benchmark": "carga_http", "medidas": medidas}
+
+
+class TestResultados:
+
+    def test_resumo_das_latencias(self):
+        resumo = resultados.resumir_latencias([i / 1000 for i in range(1, 101)])
+
+        assert resumo == {
+            "amostras": 100, "p50_ms": 50.5, "p95_ms": 96.0, "p99_ms": 100.0, "media_ms": 50.5,
+        }
+
+    def test_regressoes(self):
+        base = execucao(
+            relatorio={"p50_ms": 10.0, "p95_ms": 20.0, "requisicoes_por_segundo": 500.0},
+            obter={"p50_ms": 1.0, "p99_ms": 2.0, "erros": 0},
+        )
+        atual = execucao(
+            relatorio={"p50_ms": 10.5, "p95_ms": 30.0, "requisicoes_por_segundo": 400.0},
+            obter={"p50_ms": 1.2, "p99_ms": 9.0, "erros": 3},
+            nova={"p50_ms": 5.0},
+        )
+
+        linhas = resultados.comparar(base, atual, limite=0.1)
+
+        assert {(linha["medida"], linha["metrica"]): linha["regressao"] for linha in linhas} == {
+            ("relatorio", "p50_ms"): False,  # 5%, dentro do limite
+            ("relatorio", "p95_ms"): True,
+            ("relatorio", "requisicoes_por_segundo"): True,  # vazão caiu 20%
+            ("obter", "p50_ms"): False,  # 20%, mas só 0,2 ms: ruído
+        }
+
+    def test_base_de_outro_benchmark(self, tmp_path):
+        caminho = tmp_path / "base.json"
+        resultados.salvar(str(caminho), "servico", {"estudantes": 10}, {})
+
+        assert json.loads(caminho.read_text())["ambiente"]["python"]
+        with pytest.raises(ValueError, match="benchmark servico"):
+            resultados.conferir_base(str(caminho), execucao(), 0.1)
+
+    def test_sai_com_erro_na_regressao(self, tmp_path):
+        caminho = tmp_path / "base.json"
+        resultados.salvar(str(caminho), "carga_http", {}, {"painel": {"p50_ms": 10.0}})
+
+        resultados.conferir_base(str(caminho), execucao(painel={"p50_ms": 10.9}), 0.1)
+        with pytest.raises(SystemExit) as saida:
+            resultados.conferir_base(str(caminho), execucao(painel={"p50_ms": 12.0}), 0.1)
+        assert saida.value.code == 1
+
+
+class TestDados:
+
+    def test_linhas_reproduziveis(self):
+        assert list(iterar_linhas(50, semente=7)) == gerar_linhas(50, semente=7)
+        assert gerar_linhas(50, semente=7) != gerar_linhas(50, semente=8)
+
+    @pytest.mark.postgres
+    def test_turma_gerada_em_lotes(self):
+        gerada = popular_turma(25, semente=7, tamanho_lote=10)
+        try:
+            with get_cursor() as cursor:
+                cursor.execute(
+                    "SELECT nome, frequencia FROM estudantes WHERE turma_id = %s ORDER BY nome",
+                    (gerada.turma_id,),
+                )
+                rows = cursor.fetchall()
+        finally:
+            remover_turma(gerada.turma_id)
+
+        assert len(gerada.ids) == 25
+        assert [(row["nome"], float(row["frequencia"])) for row in rows] == [
+            (linha["nome"], linha["frequencia"]) for linha in gerar_linhas(25, semente=7)
+        ]
+
+
+@pytest.mark.postgres
+class TestMicrobenchmarks:
+
+    def test_todos_os_metodos_e_turma_limpa(self):
+        with turma_gerada(20) as gerada:
+            medidas = servico.executar(gerada.turma_id, gerada.ids, repeticoes=2)
+
+            with get_cursor() as cursor:
+                cursor.execute(
+                    "SELECT COUNT(*) AS total FROM estudantes WHERE turma_id = %s",
+                    (gerada.turma_id,),
+                )
+                assert cursor.fetchone()["total"] == 20
+
+        assert "EstudanteService.gerar_relatorio" in medidas
+        assert "EstudanteService.remover_estudante" in medidas
+        assert all(medida["amostras"] == 2 for medida in medidas.values())
@@ -0,0 +1,122 @@
+import pytest
+from backend.model.estudante import AtualizarEstudante, Estudante
+from backend.service.cacheEstudantes import CacheEstudantes
+from backend.service.relatorioService import CacheRelatorios
+from backend.service.servicos import criar_estudante_service
+
+
+def estudante(estudante_id, nome="Ana"):
+    return Estudante(id=estudante_id, nome=nome, notas=[7.0] * 5, frequencia=80.0)
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+@pytest.fixture
+def cache():
+    return CacheRelatorios()
+
+
+@pytest.fixture
+def service(cache):
+    return criar_estudante_service(cache)
+
+
+class TestCacheEstudantes:
+
+    def test_lru_despeja_o_menos_usado(self):
+        cache = CacheEstudantes(tamanho=2, ttl=60)
+        for estudante_id in ("a", "b"):
+            cache.obter(estudante_id, "padrao", lambda: estudante(estudante_id))
+        cache.obter("a", "padrao", lambda: None)  # "a" passa a ser o mais recente
+        cache.obter("c", "padrao", lambda: estudante("c"))
+
+        assert cache.obter("a", "padrao", lambda: None).id == "a"
+        assert cache.obter("b", "padrao", lambda: None) is None  # despejado
+        assert cache.metricas() == {
+            "acertos": 2, "faltas": 4, "despejos": 1, "expirados": 0, "invalidacoes": 0,
+            "estudantes": 2, "tamanho": 2, "ttl_s": 60,
+        }
+
+    def test_ttl(self):
+        relogio = Relogio()
+        cache = CacheEstudantes(tamanho=10, ttl=5, relogio=relogio)
+        cache.obter("a", "padrao", lambda: estudante("a"))
+
+        relogio.agora = 4.9
+        assert cache.obter("a", "padrao", lambda: estudante("a", "Outro")).nome == "Ana"
+        relogio.agora = 5.0
+        assert cache.obter("a", "padrao", lambda: estudante("a", "Outro")).nome == "Outro"
+        assert cache.metricas()["expirados"] == 1
+
+    def test_leitura_durante_escrita_nao_e_guardada(self):
+        cache = CacheEstudantes(tamanho=10, ttl=60)
+
+        def carregar_antes_do_commit():
+            # A escrita termina enquanto a leitura ainda consulta o banco
+            cache.descartar("a")
+            return estudante("a", "Antigo")
+
+        assert cache.obter("a", "padrao", carregar_antes_do_commit).nome == "Antigo"
+        assert cache.obter("a", "padrao", lambda: estudante("a", "Novo")).nome == "Novo"
+
+    def test_desligado(self):
+        cache = CacheEstudantes(tamanho=0)
+        cache.obter("a", "padrao", lambda: estudante("a"))
+
+        assert cache.obter("a", "padrao", lambda: None) is None
+        assert cache.metricas()["estudantes"] == 0
+
+
+class TestObterEstudanteComCache:
+
+    def test_leituras_repetidas_sem_consultas(self, service, cache, estudante_exemplo,
+                                              contador_queries):
+        criado = service.criar_estudante(estudante_exemplo)
+        contador_queries.zerar()
+
+        for _ in range(3):
+            assert service.obter_estudante_por_id(criado.id) == criado
+
+        assert contador_queries.total == 0
+        assert cache.estudantes.metricas()["acertos"] == 3
+
+    def test_outra_turma_e_inexistente(self, service, cache, estudante_exemplo):
+        criado = service.criar_estudante(estudante_exemplo)
+
+        assert service.obter_estudante_por_id(criado.id, turma_id="outra") is None
+        assert service.obter_estudante_por_id("nao-existe") is None
+        assert service.obter_estudante_por_id("nao-existe") is None
+        assert cache.estudantes.metricas()["faltas"] == 2  # inexistente não é guardado
+
+    def test_atualizar_e_remover_descartam(self, service, cache, estudante_exemplo):
+        criado = service.criar_estudante(estudante_exemplo)
+        service.atualizar_estudante(criado.id, AtualizarEstudante(
+            nome="João Atualizado", notas=[5.0] * 5, frequencia=60.0
+        ))
+
+        assert service.obter_estudante_por_id(criado.id).nome == "João Atualizado"
+
+        service.remover_estudante(criado.id)
+
+        assert service.obter_estudante_por_id(criado.id) is None
+        assert cache.estudantes.metricas()["invalidacoes"] == 2
+
+    def test_escrita_de_outro_processo_descarta_a_turma(self, service, estudante_exemplo):
+        criado = service.criar_estudante(estudante_exemplo)
+        service.versao_dados()
+        assert service.obter_estudante_por_id(criado.id) == criado
+
+        # Outro processo da API: mesmo banco, cache próprio
+        outro_processo = criar_estudante_service(CacheRelatorios())
+        outro_processo.atualizar_estudante(criado.id, AtualizarEstudante(
+            nome=criado.nome, notas=[10.0] * 5, frequencia=criado.frequencia
+        ))
+
+        service.versao_dados()
+        assert service.obter_estudante_por_id(criado.id).notas == [10.0] * 5
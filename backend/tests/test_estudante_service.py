@@ -1,6 +1,16 @@
+import math
+import random
+import threading
+from decimal import Decimal
+from fractions import Fraction
+
 import pytest
-from backend.service.estudanteService import EstudanteService
+from backend.database import db
+from backend.database.repositorioPostgres import RepositorioPostgres, media_para_gravar
+from backend.service.estudanteService import EstudanteService, ler_csv_estudantes
+from backend.service.relatorioService import MotorRelatorio
 from backend.model.estudante import CriarEstudante, AtualizarEstudante
+from backend.model.turma import DISCIPLINAS_PADRAO
 
 
 class TestEstudanteService:
@@ -45,6 +55,37 @@ class TestEstudanteService:
         assert estudante1 in estudantes
         assert estudante2 in estudantes
 
+    def test_listar_estudantes_como_dict(self, service, estudante_exemplo, estudante_exemplo_2):
+        service.criar_estudante(estudante_exemplo)
+        service.criar_estudante(estudante_exemplo_2)
+
+        estudantes = service.listar_estudantes(como_dict=True)
+
+        assert estudantes == [e.model_dump() for e in service.listar_estudantes()]
+
+    @pytest.mark.postgres
+    def test_listar_estudantes_quantidade_queries_constante(self, service, contador_queries):
+        # Benchmark de queries: a listagem não pode crescer com o número de estudantes
+        for i in range(3):
+            service.criar_estudante(CriarEstudante(
+                nome=f"Estudante {i}", notas=[7.0, 7.0, 7.0, 7.0, 7.0], frequencia=80.0
+            ))
+        contador_queries.zerar()
+        service.listar_estudantes()
+        queries_com_3 = contador_queries.total
+
+        for i in range(3, 20):
+            service.criar_estudante(CriarEstudante(
+                nome=f"Estudante {i}", notas=[7.0, 7.0, 7.0, 7.0, 7.0], frequencia=80.0
+            ))
+        contador_queries.zerar()
+        estudantes = service.listar_estudantes()
+
+        assert len(estudantes) == 20
+        assert all(estudante.notas == [7.0] * 5 for estudante in estudantes)
+        assert queries_com_3 == 1
+        assert contador_queries.total == 1
+
     def test_obter_estudante_por_id_existente(self, service, estudante_exemplo):
         estudante_criado = service.criar_estudante(estudante_exemplo)
         estudante_encontrado = service.obter_estudante_por_id(estudante_criado.id)
@@ -86,6 +127,31 @@ class TestEstudanteService:
         estudante = service.atualizar_estudante("id-inexistente", dados_atualizacao)
         assert estudante is None
 
+    def test_atualizar_notas_invalidas(self, service, estudante_exemplo):
+        estudante_criado = service.criar_estudante(estudante_exemplo)
+        dados_atualizacao = AtualizarEstudante(
+            nome="Nome Qualquer", notas=[8.0] * 6, frequencia=80.0
+        )
+
+        # A quantidade de notas só é erro para um estudante que existe
+        assert service.atualizar_estudante("id-inexistente", dados_atualizacao) is None
+        with pytest.raises(ValueError, match="5 disciplinas"):
+            service.atualizar_estudante(estudante_criado.id, dados_atualizacao)
+        assert service.listar_estudantes() == [estudante_criado]
+
+    def test_resposta_da_escrita_igual_a_releitura(self, service):
+        # Criação e atualização respondem com o que a própria escrita devolveu
+        criado = service.criar_estudante(CriarEstudante(
+            nome="Ana", notas=[7.555, 8.005, 6.5, 9.0, 7.0], frequencia=85.555
+        ))
+        assert service.listar_estudantes() == [criado]
+
+        atualizado = service.atualizar_estudante(criado.id, AtualizarEstudante(
+            nome="Ana Clara", notas=[1.005, 2.0, 3.333, 4.0, 5.0], frequencia=60.125
+        ))
+        assert service.listar_estudantes() == [atualizado]
+        assert atualizado.notas == [1.01, 2.0, 3.33, 4.0, 5.0]
+
     def test_atualizar_estudante_nome_duplicado(self, service, estudante_exemplo, estudante_exemplo_2):
         estudante1 = service.criar_estudante(estudante_exemplo)
         estudante2 = service.criar_estudante(estudante_exemplo_2)
@@ -207,3 +273,372 @@ class TestEstudanteService:
         assert "estudantes_com_baixa_frequencia" in relatorio
         assert len(relatorio["estudantes"]) == 2
 
+
+    @pytest.mark.postgres
+    def test_gerar_relatorio_leitura_unica(self, service, estudante_exemplo, estudante_exemplo_2,
+                                           estudante_baixa_frequencia, contador_queries):
+        service.criar_estudante(estudante_exemplo)
+        service.criar_estudante(estudante_exemplo_2)
+        service.criar_estudante(estudante_baixa_frequencia)
+
+        contador_queries.zerar()
+        relatorio = service.gerar_relatorio()
+
+        # SET TRANSACTION + SELECT, independente do número de estudantes
+        assert contador_queries.total == 2
+        assert relatorio["media_turma"] == service.calcular_media_turma()
+        assert relatorio["medias_por_disciplina"] == service.calcular_media_turma_por_disciplina()
+        assert relatorio["estudantes_acima_da_media"] == service.obter_estudantes_acima_da_media()
+        assert relatorio["estudantes_com_baixa_frequencia"] == service.obter_estudantes_com_baixa_frequencia()
+
+    @pytest.mark.postgres
+    def test_gerar_painel_leitura_unica(self, service, estudante_exemplo, estudante_exemplo_2,
+                                        estudante_baixa_frequencia, contador_queries):
+        service.criar_estudante(estudante_exemplo)
+        service.criar_estudante(estudante_exemplo_2)
+        service.criar_estudante(estudante_baixa_frequencia)
+
+        contador_queries.zerar()
+        painel = service.gerar_painel(("estudantes", "medias_por_disciplina", "baixa_frequencia"))
+
+        # Uma leitura para as três seções que antes eram três requisições
+        assert contador_queries.total == 2
+        assert set(painel) == {"estudantes", "medias_por_disciplina", "baixa_frequencia"}
+        assert [e["id"] for e in painel["estudantes"]] == [e.id for e in service.listar_estudantes()]
+        assert painel["medias_por_disciplina"] == service.calcular_media_turma_por_disciplina()
+        assert painel["baixa_frequencia"] == service.obter_estudantes_com_baixa_frequencia()
+
+    @pytest.mark.parametrize("semente", range(5))
+    def test_medias_iguais_em_todos_os_caminhos(self, service, semente):
+        # Turmas de 1 a 4 estudantes: a média da turma e as das disciplinas
+        # caem com frequência em x.xx5, onde somar em float arredonda diferente
+        gerador = random.Random(semente)
+        ids = []
+
+        def nota():
+            # Duas casas ou três (o banco arredonda para duas)
+            return gerador.choice((gerador.randrange(1001) / 100, gerador.randrange(10001) / 1000))
+
+        for passo in range(30):
+            if len(ids) < 4 and (not ids or gerador.random() < 0.7):
+                ids.append(service.criar_estudante(CriarEstudante(
+                    nome=f"Aluno {passo:02d}",
+                    notas=[nota() for _ in range(5)],
+                    frequencia=80.0,
+                )).id)
+            else:
+                service.remover_estudante(ids.pop(gerador.randrange(len(ids))))
+
+            estudantes = service.listar_estudantes()
+            motor = MotorRelatorio(estudantes, DISCIPLINAS_PADRAO)
+            relatorio = service.gerar_relatorio(usar_cache=False)
+            medias = [sum(Fraction(Decimal(str(nota))) for nota in e.notas) / 5 for e in estudantes]
+            media_exata = sum(medias, Fraction(0)) / len(medias) if medias else Fraction(0)
+
+            media_turma = math.floor(media_exata * 100 + Fraction(1, 2)) / 100
+            assert service.calcular_media_turma(usar_cache=False) == media_turma
+            assert service.calcular_media_turma() == media_turma
+            assert motor.media_turma() == relatorio["media_turma"] == media_turma
+
+            acima = service.obter_estudantes_acima_da_media(usar_cache=False)
+            assert [e["id"] for e in acima] == [
+                e.id for e, media in zip(estudantes, medias) if media > Fraction(str(media_turma))
+            ]
+            assert acima == service.obter_estudantes_acima_da_media()
+            assert acima == motor.estudantes_acima_da_media() == relatorio["estudantes_acima_da_media"]
+
+            por_disciplina = service.calcular_media_turma_por_disciplina(usar_cache=False)
+            assert por_disciplina == service.calcular_media_turma_por_disciplina()
+            assert por_disciplina == motor.medias_por_disciplina() == relatorio["medias_por_disciplina"]
+
+    def test_cache_relatorios_sem_queries_enquanto_dados_nao_mudam(self, service, estudante_exemplo,
+                                                                     contador_queries):
+        service.criar_estudante(estudante_exemplo)
+        service.gerar_relatorio()
+        service.calcular_media_turma()
+        service.obter_estudantes_acima_da_media()
+
+        contador_queries.zerar()
+        service.gerar_relatorio()
+        service.calcular_media_turma()
+        service.calcular_media_turma_por_disciplina()
+        service.obter_estudantes_acima_da_media()
+
+        assert contador_queries.total == 0
+
+    def test_cache_relatorios_igual_ao_calculo_sem_cache(self, service):
+        gerador = random.Random(7)
+        ids = []
+
+        def notas_aleatorias():
+            # Três casas: o banco arredonda para duas, e o cache tem que acompanhar
+            return [round(gerador.uniform(0, 10), 3) for _ in range(5)]
+
+        for passo in range(60):
+            operacao = gerador.choice(["criar", "criar", "atualizar", "remover"])
+            if operacao == "criar" or not ids:
+                estudante = service.criar_estudante(CriarEstudante(
+                    nome=f"Aluno {passo}",
+                    notas=notas_aleatorias(),
+                    frequencia=round(gerador.uniform(0, 100), 2),
+                ))
+                ids.append(estudante.id)
+            elif operacao == "atualizar":
+                estudante_id = gerador.choice(ids)
+                service.atualizar_estudante(estudante_id, AtualizarEstudante(
+                    nome=f"Aluno {passo} atualizado",
+                    notas=notas_aleatorias(),
+                    frequencia=round(gerador.uniform(0, 100), 2),
+                ))
+            else:
+                estudante_id = gerador.choice(ids)
+                ids.remove(estudante_id)
+                service.remover_estudante(estudante_id)
+
+            assert service.calcular_media_turma() == service.calcular_media_turma(usar_cache=False)
+            assert (service.calcular_media_turma_por_disciplina()
+                    == service.calcular_media_turma_por_disciplina(usar_cache=False))
+            assert (service.obter_estudantes_acima_da_media()
+                    == service.obter_estudantes_acima_da_media(usar_cache=False))
+            assert (service.obter_estudantes_com_baixa_frequencia()
+                    == service.obter_estudantes_com_baixa_frequencia(usar_cache=False))
+            assert service.gerar_relatorio() == service.gerar_relatorio(usar_cache=False)
+
+    @pytest.mark.postgres
+    def test_uma_transacao_por_operacao(self, service, estudante_exemplo, contador_transacoes):
+        estudante = service.criar_estudante(estudante_exemplo)
+        assert contador_transacoes.commits == 1
+
+        contador_transacoes.zerar()
+        service.atualizar_estudante(estudante.id, AtualizarEstudante(
+            nome="João Silva Santos", notas=[8.0, 8.5, 7.0, 9.5, 8.0], frequencia=90.0
+        ))
+        assert contador_transacoes.commits == 1
+
+        contador_transacoes.zerar()
+        service.obter_estudante_por_id(estudante.id)
+        service.listar_estudantes()
+        service.obter_estudantes_acima_da_media(usar_cache=False)
+        assert contador_transacoes.commits == 3
+
+        contador_transacoes.zerar()
+        service.remover_estudante(estudante.id)
+        assert contador_transacoes.commits == 1
+
+    @pytest.mark.postgres
+    def test_nome_duplicado_faz_rollback(self, service, estudante_exemplo, contador_transacoes):
+        service.criar_estudante(estudante_exemplo)
+        contador_transacoes.zerar()
+
+        with pytest.raises(ValueError):
+            service.criar_estudante(estudante_exemplo)
+
+        assert contador_transacoes.commits == 0
+        assert contador_transacoes.rollbacks == 1
+
+    @pytest.mark.postgres
+    def test_falha_ao_gravar_notas_nao_deixa_estudante_sem_notas(self, service, estudante_exemplo,
+                                                                  monkeypatch):
+        def falhar(*args, **kwargs):
+            raise RuntimeError("falha simulada")
+
+        monkeypatch.setattr(RepositorioPostgres, "_gravar_notas", falhar)
+
+        with pytest.raises(RuntimeError):
+            service.criar_estudante(estudante_exemplo)
+
+        assert service.listar_estudantes() == []
+
+    @pytest.mark.postgres
+    def test_importar_estudantes_relatorio_por_linha(self, service, estudante_exemplo, contador_queries):
+        service.criar_estudante(estudante_exemplo)
+        linhas = [
+            {"nome": "Ana", "notas": [7, 8, 9, 10, 6], "frequencia": 90},
+            {"nome": "joão silva", "notas": [7, 8, 9, 10, 6], "frequencia": 90},  # já existe
+            {"nome": "Bia", "notas": [7, 8, 9, 10, 11], "frequencia": 90},  # nota inválida
+            {"nome": " ANA ", "notas": [5, 5, 5, 5, 5], "frequencia": 50},  # repetido no lote
+            {"nome": "Caio", "notas": [6, 6, 6, 6, 6], "frequencia": 60},
+        ]
+
+        contador_queries.zerar()
+        resultado = service.importar_estudantes(linhas)
+
+        # Verificação de nomes, um COPY por tabela (estudantes e, no modo
+        # linhas, notas) e a nova versão da turma, nenhum comando por linha
+        copias = 2 if service._repositorio.armazenamento.nome == "linhas" else 1
+        assert contador_queries.total == 2 + copias
+        assert resultado["total"] == 5
+        assert resultado["importados"] == 2
+        assert resultado["erros"] == 3
+        assert [r["status"] for r in resultado["resultados"]] == [
+            "importado", "erro", "erro", "erro", "importado"
+        ]
+        assert "Já existe" in resultado["resultados"][1]["erro"]
+        assert "linha 1" in resultado["resultados"][3]["erro"]
+
+        estudantes = {e.nome: e for e in service.listar_estudantes()}
+        assert estudantes["Ana"].notas == [7.0, 8.0, 9.0, 10.0, 6.0]
+        assert estudantes["Caio"].id == resultado["resultados"][4]["id"]
+        assert service.calcular_media_turma() == service.calcular_media_turma(usar_cache=False)
+
+    def test_ler_csv_estudantes(self):
+        conteudo = "nome,nota1,nota2,nota3,nota4,nota5,frequencia\n\"Silva, Ana\",7,8,9,10,6,90\n"
+
+        linhas = ler_csv_estudantes(conteudo)
+
+        assert linhas == [{
+            "nome": "Silva, Ana",
+            "notas": ["7", "8", "9", "10", "6"],
+            "frequencia": "90",
+        }]
+        assert CriarEstudante.model_validate(linhas[0]).notas == [7.0, 8.0, 9.0, 10.0, 6.0]
+
+    def test_ler_csv_colunas_de_nota(self):
+        # Ordem pelo número (nota10 depois de nota2); id e media da exportação são ignorados
+        cabecalho = "id,nome," + ",".join(f"nota{i}" for i in range(10, 0, -1)) + ",frequencia,media"
+        conteudo = f"{cabecalho}\nx,Ana,10,9,8,7,6,5,4,3,2,1,90,5.5\n"
+
+        assert ler_csv_estudantes(conteudo)[0]["notas"] == [str(i) for i in range(1, 11)]
+
+    @pytest.mark.parametrize("coluna", ["notas", "nota_final", "Nota1", "email"])
+    def test_ler_csv_coluna_desconhecida(self, coluna):
+        with pytest.raises(ValueError, match=f"Colunas desconhecidas: {coluna}\\."):
+            ler_csv_estudantes(f"nome,nota1,{coluna},frequencia\nAna,7,8,90\n")
+
+    @pytest.mark.postgres
+    def test_atualizar_grava_so_notas_alteradas(self, service_linhas, estudante_exemplo,
+                                                 contador_queries):
+        service = service_linhas
+        estudante = service.criar_estudante(estudante_exemplo)
+
+        def versoes_notas():
+            with db.get_cursor() as cursor:
+                cursor.execute(
+                    "SELECT disciplina, xmin::text AS versao FROM notas WHERE estudante_id = %s",
+                    (estudante.id,)
+                )
+                return {row["disciplina"]: row["versao"] for row in cursor.fetchall()}
+
+        antes = versoes_notas()
+        contador_queries.zerar()
+        atualizado = service.atualizar_estudante(estudante.id, AtualizarEstudante(
+            nome=estudante.nome,
+            notas=[7.5, 8.0, 10.0, 9.0, 7.0],  # só a disciplina 3 muda
+            frequencia=estudante.frequencia,
+        ))
+        queries_atualizacao = contador_queries.total
+        depois = versoes_notas()
+
+        assert atualizado.notas == [7.5, 8.0, 10.0, 9.0, 7.0]
+        # UPDATE ... RETURNING e as notas em um comando só
+        assert queries_atualizacao == 2
+        assert [d for d in antes if antes[d] != depois[d]] == [3]
+
+    def _criar_turma(self, service, quantidade=23):
+        gerador = random.Random(3)
+        return [
+            service.criar_estudante(CriarEstudante(
+                nome=f"{gerador.choice(['Ana', 'Bruno', 'Carla'])} {i:02d}",
+                notas=[round(gerador.uniform(0, 10), 1) for _ in range(5)],
+                frequencia=round(gerador.uniform(40, 100), 0),
+            ))
+            for i in range(quantidade)
+        ]
+
+    def _todas_as_paginas(self, service, limite, **filtros):
+        estudantes, cursor, paginas = [], None, 0
+        while True:
+            pagina = service.listar_estudantes_paginado(limite, cursor=cursor, **filtros)
+            estudantes.extend(pagina["estudantes"])
+            paginas += 1
+            cursor = pagina["proximo_cursor"]
+            if cursor is None:
+                return estudantes, paginas
+
+    def test_paginacao_por_nome_percorre_todos(self, service):
+        self._criar_turma(service)
+
+        estudantes, paginas = self._todas_as_paginas(service, 5)
+
+        assert paginas == 5
+        assert estudantes == service.listar_estudantes()
+
+    def test_paginacao_como_dict(self, service):
+        self._criar_turma(service, 6)
+
+        pagina = service.listar_estudantes_paginado(4, como_dict=True, ordenar="media")
+        modelos = service.listar_estudantes_paginado(4, ordenar="media")
+
+        assert pagina["estudantes"] == [e.model_dump() for e in modelos["estudantes"]]
+        assert pagina["proximo_cursor"] == modelos["proximo_cursor"]
+
+    def test_paginacao_por_media_decrescente(self, service):
+        criados = self._criar_turma(service)
+
+        estudantes, _ = self._todas_as_paginas(service, 4, ordenar="media", decrescente=True)
+
+        medias = [media_para_gravar(e.notas) for e in estudantes]
+        assert len(estudantes) == len(criados)
+        assert medias == sorted(medias, reverse=True)
+
+    def test_paginacao_com_filtros(self, service):
+        criados = self._criar_turma(service)
+
+        estudantes, _ = self._todas_as_paginas(
+            service, 3, nome_prefixo="ana", frequencia_min=50, media_max=7,
+            ordenar="frequencia",
+        )
+
+        esperados = sorted(
+            (
+                e for e in criados
+                if e.nome.startswith("Ana") and e.frequencia >= 50
+                and media_para_gravar(e.notas) <= 7
+            ),
+            key=lambda e: (e.frequencia, e.id),
+        )
+        assert [e.id for e in estudantes] == [e.id for e in esperados]
+
+    def test_paginacao_cursor_invalido(self, service):
+        self._criar_turma(service, 3)
+        pagina = service.listar_estudantes_paginado(1)
+
+        with pytest.raises(ValueError, match="Cursor de paginação inválido"):
+            service.listar_estudantes_paginado(1, cursor="nao-e-um-cursor")
+        with pytest.raises(ValueError, match="não corresponde"):
+            service.listar_estudantes_paginado(1, cursor=pagina["proximo_cursor"], ordenar="media")
+
+    def test_criar_mesmo_nome_concorrente(self, service, contador_queries):
+        resultados = []
+        barreira = threading.Barrier(6)
+
+        def criar(indice):
+            barreira.wait()
+            try:
+                service.criar_estudante(CriarEstudante(
+                    nome=" Nome Disputado " if indice % 2 else "nome disputado",
+                    notas=[7.0, 7.0, 7.0, 7.0, 7.0],
+                    frequencia=80.0,
+                ))
+                resultados.append("criado")
+            except ValueError:
+                resultados.append("duplicado")
+
+        threads = [threading.Thread(target=criar, args=(i,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(resultados) == ["criado"] + ["duplicado"] * 5
+        assert len(service.listar_estudantes()) == 1
+
+    @pytest.mark.postgres
+    def test_criar_sem_consulta_de_nome(self, service_linhas, estudante_exemplo, contador_queries):
+        service = service_linhas
+        service.listar_disciplinas()  # catálogo da turma fica em cache
+        contador_queries.zerar()
+        service.criar_estudante(estudante_exemplo)
+
+        # INSERT ... RETURNING e notas: a unicidade vem do índice
+        assert contador_queries.total == 2
@@ -0,0 +1,84 @@
+import pytest
+import pytest_asyncio
+from backend.database.dbAsync import fechar_pool_async
+from backend.model.estudante import AtualizarEstudante, CriarEstudante
+from backend.service.estudanteServiceAsync import EstudanteServiceAsync
+
+pytestmark = pytest.mark.postgres
+
+
+@pytest_asyncio.fixture
+async def service_async():
+    yield EstudanteServiceAsync()
+    # O pool fica preso ao event loop de cada teste
+    await fechar_pool_async()
+
+
+class TestEstudanteServiceAsync:
+
+    @pytest.mark.asyncio
+    async def test_crud_completo(self, service_async, estudante_exemplo):
+        estudante = await service_async.criar_estudante(estudante_exemplo)
+        assert estudante.notas == [7.5, 8.0, 6.5, 9.0, 7.0]
+
+        with pytest.raises(ValueError, match="Já existe um estudante com esse nome"):
+            await service_async.criar_estudante(estudante_exemplo)
+
+        atualizado = await service_async.atualizar_estudante(estudante.id, AtualizarEstudante(
+            nome="João Silva Santos",
+            notas=[8.0, 8.5, 7.0, 9.5, 8.0],
+            frequencia=90.0
+        ))
+        assert atualizado.nome == "João Silva Santos"
+        assert atualizado.notas == [8.0, 8.5, 7.0, 9.5, 8.0]
+        assert await service_async.listar_estudantes() == [atualizado]
+
+        assert await service_async.remover_estudante(estudante.id) is True
+        assert await service_async.remover_estudante(estudante.id) is False
+        assert await service_async.obter_estudante_por_id(estudante.id) is None
+
+    @pytest.mark.asyncio
+    async def test_agregados_com_as_notas_gravadas(self, service_async):
+        await service_async.calcular_media_turma()  # agregados no cache antes da escrita
+        await service_async.criar_estudante(CriarEstudante(
+            nome="Ana", notas=[7.555, 8.0, 6.5, 9.0, 7.0], frequencia=85.0
+        ))
+
+        assert (await service_async.calcular_media_turma_por_disciplina()
+                == await service_async.calcular_media_turma_por_disciplina(usar_cache=False))
+        assert (await service_async.calcular_media_turma_por_disciplina())[0]["media"] == 7.56
+
+    @pytest.mark.asyncio
+    async def test_relatorios_iguais_ao_servico_sincrono(self, service_async, service, estudante_exemplo,
+                                                         estudante_exemplo_2, estudante_baixa_frequencia):
+        await service_async.criar_estudante(estudante_exemplo)
+        await service_async.criar_estudante(estudante_exemplo_2)
+        await service_async.criar_estudante(estudante_baixa_frequencia)
+
+        assert await service_async.gerar_relatorio() == service.gerar_relatorio()
+        assert await service_async.calcular_media_turma(usar_cache=False) == service.calcular_media_turma()
+        assert (await service_async.obter_estudantes_acima_da_media(usar_cache=False)
+                == service.obter_estudantes_acima_da_media())
+        assert (await service_async.calcular_media_turma_por_disciplina(usar_cache=False)
+                == service.calcular_media_turma_por_disciplina())
+        assert (await service_async.obter_estudantes_com_baixa_frequencia(usar_cache=False)
+                == service.obter_estudantes_com_baixa_frequencia())
+        assert await service_async.gerar_painel(usar_cache=False) == service.gerar_painel()
+        assert ([lote async for lote in service_async.exportar_estudantes(2)]
+                == list(service.exportar_estudantes(2)))
+
+    @pytest.mark.asyncio
+    async def test_paginacao_igual_ao_servico_sincrono(self, service_async, service, estudante_exemplo,
+                                                       estudante_exemplo_2, estudante_baixa_frequencia):
+        for estudante in (estudante_exemplo, estudante_exemplo_2, estudante_baixa_frequencia):
+            await service_async.criar_estudante(estudante)
+
+        pagina_async = await service_async.listar_estudantes_paginado(2, ordenar="media")
+        pagina = service.listar_estudantes_paginado(2, ordenar="media")
+        assert pagina_async == pagina
+
+        seguinte = await service_async.listar_estudantes_paginado(
+            2, cursor=pagina["proximo_cursor"], ordenar="media", media_min=5
+        )
+        assert [e.nome for e in seguinte["estudantes"]] == ["Maria Santos"]
+        assert seguinte["proximo_cursor"] is None
@@ -0,0 +1,115 @@
+import pytest
+from fastapi.testclient import TestClient
+from backend.model.estudante import CriarEstudante
+from backend.service.relatorioService import CacheRelatorios
+from backend.service.servicos import criar_estudante_service
+from main import app
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def payload():
+    return {"nome": "Teste ETag", "notas": [7.0, 8.0, 7.5, 8.5, 7.0], "frequencia": 85.0}
+
+
+ROTAS = [
+    "/api/estudantes",
+    "/api/relatorios",
+    "/api/relatorios/media-turma",
+    "/api/relatorios/medias-por-disciplina",
+    "/api/relatorios/estudantes-acima-da-media",
+    "/api/relatorios/estudantes-com-baixa-frequencia",
+    "/api/relatorios/estatisticas",
+    "/api/relatorios/snapshot",
+    "/api/painel?include=estudantes,media_turma",
+]
+
+
+class TestEtag:
+
+    @pytest.mark.parametrize("rota", ROTAS)
+    def test_304_quando_dados_nao_mudaram(self, client, rota):
+        resposta = client.get(rota)
+        etag = resposta.headers["etag"]
+
+        condicional = client.get(rota, headers={"If-None-Match": etag})
+
+        assert resposta.status_code == 200
+        assert condicional.status_code == 304
+        assert condicional.content == b""
+        assert condicional.headers["etag"] == etag
+
+    def test_304_nao_chama_o_servico(self, client, monkeypatch):
+        etag = client.get("/api/relatorios").headers["etag"]
+
+        def falhar(*args, **kwargs):
+            raise AssertionError("o serviço não deveria ser chamado")
+
+        monkeypatch.setattr("backend.service.servicos.estudante_service.gerar_relatorio", falhar)
+
+        assert client.get("/api/relatorios", headers={"If-None-Match": etag}).status_code == 304
+
+    def test_etag_muda_apos_escrita(self, client, payload):
+        etag_lista = client.get("/api/estudantes").headers["etag"]
+        criado = client.post("/api/estudantes", json=payload).json()
+
+        resposta = client.get("/api/estudantes", headers={"If-None-Match": etag_lista})
+
+        assert resposta.status_code == 200
+        assert resposta.headers["etag"] != etag_lista
+        assert any(e["id"] == criado["id"] for e in resposta.json())
+
+        etag_estudante = client.get(f"/api/estudantes/{criado['id']}").headers["etag"]
+        client.put(f"/api/estudantes/{criado['id']}", json={**payload, "frequencia": 50.0})
+        atualizado = client.get(
+            f"/api/estudantes/{criado['id']}", headers={"If-None-Match": etag_estudante}
+        )
+        assert atualizado.status_code == 200
+        assert atualizado.json()["frequencia"] == 50.0
+
+    def test_etag_muda_com_escrita_de_outro_processo(self, client, payload):
+        resposta = client.get("/api/relatorios")
+        etag = resposta.headers["etag"]
+        total = resposta.json()["total_estudantes"]
+
+        # Outro processo da API: mesmo banco, cache próprio
+        outro_processo = criar_estudante_service(CacheRelatorios())
+        outro_processo.criar_estudante(CriarEstudante(**payload))
+
+        atualizado = client.get("/api/relatorios", headers={"If-None-Match": etag})
+        assert atualizado.status_code == 200
+        assert atualizado.headers["etag"] != etag
+        assert atualizado.json()["total_estudantes"] == total + 1
+
+    @pytest.mark.parametrize("rota", [
+        "/api/relatorios?usar_cache=false",
+        "/api/relatorios/snapshot?recalcular=true",
+    ])
+    def test_recalculo_forcado_nao_responde_304(self, client, rota):
+        etag = client.get(rota).headers["etag"]
+
+        forcada = client.get(rota, headers={"If-None-Match": etag})
+
+        assert forcada.status_code == 200
+        assert forcada.headers["etag"] == etag
+
+    def test_snapshot_desatualizado_sem_etag(self, client, payload):
+        client.get("/api/relatorios/snapshot")
+        client.post("/api/estudantes", json=payload)
+
+        # Servido da memória enquanto o recálculo não roda
+        resposta = client.get("/api/relatorios/snapshot")
+
+        assert resposta.json()["atualizado"] is False
+        assert "etag" not in resposta.headers
+
+    def test_etag_depende_dos_parametros(self, client):
+        pagina = client.get("/api/estudantes?limite=10").headers["etag"]
+        lista = client.get("/api/estudantes").headers["etag"]
+
+        assert pagina != lista
+        assert client.get("/api/estudantes", headers={"If-None-Match": pagina}).status_code == 200
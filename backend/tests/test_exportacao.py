@@ -0,0 +1,78 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from backend.model.estudante import CriarEstudante
+from backend.service.estudanteService import ler_csv_estudantes
+from main import app
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def turma(service):
+    return [
+        service.criar_estudante(CriarEstudante(
+            nome=f"Exportação {i:02d}",
+            notas=[float(i % 11), 7.0, 6.5, 9.0, 7.5],
+            frequencia=50.0 + i,
+        ))
+        for i in range(7)
+    ]
+
+
+class TestExportacao:
+
+    def test_exporta_em_lotes(self, service, turma):
+        lotes = list(service.exportar_estudantes(tamanho_lote=3))
+
+        assert [len(lote) for lote in lotes] == [3, 3, 1]
+        linhas = [linha for lote in lotes for linha in lote]
+        assert [linha["id"] for linha in linhas] == [e.id for e in service.listar_estudantes()]
+        assert linhas[2]["notas"] == [2.0, 7.0, 6.5, 9.0, 7.5]
+        assert linhas[2]["media"] == 6.4
+
+    def test_sem_estudantes(self, service):
+        assert list(service.exportar_estudantes()) == []
+
+    def test_ndjson(self, client, service, turma):
+        resposta = client.get("/api/estudantes/exportar?lote=2")
+
+        assert resposta.status_code == 200
+        assert resposta.headers["content-type"] == "application/x-ndjson"
+        linhas = [json.loads(linha) for linha in resposta.text.splitlines()]
+        assert linhas == [linha for lote in service.exportar_estudantes() for linha in lote]
+
+    def test_csv_pode_ser_reimportado(self, client, turma):
+        resposta = client.get("/api/estudantes/exportar?formato=csv&lote=4")
+
+        assert resposta.status_code == 200
+        assert resposta.headers["content-type"].startswith("text/csv")
+        assert resposta.text.splitlines()[0] == "id,nome,nota1,nota2,nota3,nota4,nota5,frequencia,media"
+        linhas = ler_csv_estudantes(resposta.text)
+        assert [linha["nome"] for linha in linhas] == [e.nome for e in turma]
+        assert linhas[0]["notas"] == ["0.0", "7.0", "6.5", "9.0", "7.5"]
+
+    def test_importacao_fora_de_utf8(self, client):
+        csv = "nome,nota1,nota2,nota3,nota4,nota5,frequencia\nJoão,7,8,9,6,5,80\n"
+        resposta = client.post(
+            "/api/estudantes/importar",
+            content=csv.encode("latin-1"),
+            headers={"Content-Type": "text/csv"},
+        )
+
+        assert resposta.status_code == 400
+        assert resposta.json()["detail"].startswith("Conteúdo inválido para importação:")
+
+    def test_formato_invalido(self, client):
+        assert client.get("/api/estudantes/exportar?formato=xml").status_code == 422
+
+    @pytest.mark.parametrize("formato", ["ndjson", "csv"])
+    def test_turma_inexistente(self, client, formato):
+        resposta = client.get(f"/api/estudantes/exportar?formato={formato}&turma_id=nao-existe")
+
+        assert resposta.status_code == 404
+        assert resposta.json()["detail"] == "Turma não encontrada."
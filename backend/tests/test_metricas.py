@@ -0,0 +1,148 @@
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from backend.database import metricas
+from backend.database.armazenamentoNotas import armazenamento_configurado
+from backend.database.metricas import (
+    HTTP_CONSULTAS,
+    HTTP_REQUISICOES,
+    Contador,
+    Histograma,
+    encerrar_medicao,
+    iniciar_medicao,
+    medicao_atual,
+)
+from backend.model.estudante import CriarEstudante
+from main import app
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def _criar_estudantes(service, quantidade, prefixo="Aluno"):
+    for indice in range(quantidade):
+        service.criar_estudante(CriarEstudante(
+            nome=f"{prefixo} {indice}", notas=[7.0, 8.0, 9.0, 6.0, 5.0], frequencia=80.0
+        ))
+
+
+class TestFormatoPrometheus:
+
+    def test_histograma_com_baldes_cumulativos(self):
+        histograma = Histograma("teste_segundos", "Ajuda", ("rota",), baldes=(0.1, 1.0))
+        for valor in (0.05, 0.1, 0.5, 3.0):
+            histograma.observar(valor, rota="/a")
+
+        assert histograma.exportar() == [
+            "# HELP teste_segundos Ajuda",
+            "# TYPE teste_segundos histogram",
+            'teste_segundos_bucket{rota="/a",le="0.1"} 2',
+            'teste_segundos_bucket{rota="/a",le="1.0"} 3',
+            'teste_segundos_bucket{rota="/a",le="+Inf"} 4',
+            'teste_segundos_sum{rota="/a"} 3.65',
+            'teste_segundos_count{rota="/a"} 4',
+        ]
+
+    def test_contador_escapa_rotulos(self):
+        contador = Contador("teste_total", "Ajuda", ("rota",))
+        contador.incrementar(rota='a"b\\c')
+        contador.incrementar(2, rota='a"b\\c')
+
+        assert contador.exportar()[-1] == 'teste_total{rota="a\\"b\\\\c"} 3'
+
+
+@pytest.mark.postgres
+class TestInstrumentacaoBanco:
+
+    def test_listagem_executa_um_comando_independente_do_tamanho(self, service):
+        # Um N+1 apareceria aqui como um comando a mais por estudante
+        contagens = []
+        for quantidade in (2, 20):
+            _criar_estudantes(service, quantidade, prefixo=f"Turma de {quantidade}")
+            token = iniciar_medicao()
+            try:
+                service.listar_estudantes()
+                contagens.append(medicao_atual().consultas)
+            finally:
+                encerrar_medicao(token)
+
+        assert contagens == [1, 1]
+
+    def test_log_de_sql_lenta(self, service, monkeypatch, caplog):
+        monkeypatch.setattr(metricas, "SQL_LENTA_MS", 1e-6)
+        with caplog.at_level(logging.WARNING, logger="backend.sql_lenta"):
+            service.listar_estudantes()
+
+        [registro] = caplog.records
+        assert "SQL lenta" in registro.getMessage()
+        assert "FROM estudantes" in registro.getMessage()
+        assert "fora de requisição" in registro.getMessage()
+
+    def test_sem_log_abaixo_do_limite(self, service, caplog):
+        with caplog.at_level(logging.WARNING, logger="backend.sql_lenta"):
+            service.listar_estudantes()
+
+        assert caplog.records == []
+
+
+class TestMiddlewareMetricas:
+
+    @pytest.mark.postgres
+    def test_metricas_por_rota(self, client):
+        rotulos = {"metodo": "GET", "rota": "/api/estudantes/{estudante_id}"}
+        antes = HTTP_CONSULTAS.total(**rotulos)
+
+        assert client.get("/api/estudantes/nao-existe").status_code == 404
+
+        assert HTTP_CONSULTAS.total(**rotulos) == antes + 1
+        assert HTTP_CONSULTAS.soma(**rotulos) >= 1
+        assert HTTP_REQUISICOES.valor(status="404", **rotulos) >= 1
+
+    @pytest.mark.postgres
+    def test_endpoint_metrics(self, client):
+        client.get("/api/relatorios")
+        resposta = client.get("/metrics")
+
+        assert resposta.status_code == 200
+        assert resposta.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE http_requisicao_duracao_segundos histogram" in resposta.text
+        assert 'http_resposta_bytes_count{metodo="GET",rota="/api/relatorios"}' in resposta.text
+        assert "db_pool_espera_segundos_bucket" in resposta.text
+        # /metrics não mede a si mesma
+        assert 'rota="/metrics"' not in resposta.text
+
+    @pytest.mark.postgres
+    def test_escritas_sem_releitura(self, client):
+        # INSERT/UPDATE ... RETURNING (mais as notas, no modo linhas) e DELETE
+        # pelo número de linhas afetadas: nenhuma escrita relê o estudante
+        por_escrita = 2 if armazenamento_configurado().nome == "linhas" else 1
+        payload = {"nome": "Escrita", "notas": [7.0, 8.0, 9.0, 6.0, 5.0], "frequencia": 80.0}
+        # A primeira escrita na turma lê o catálogo de disciplinas, que fica em cache
+        client.post("/api/estudantes", json={**payload, "nome": "Catálogo"})
+
+        def comandos(metodo, rota, *args, **kwargs):
+            rotulos = {"metodo": metodo, "rota": rota}
+            antes = HTTP_CONSULTAS.soma(**rotulos)
+            resposta = client.request(metodo, *args, **kwargs)
+            return resposta, HTTP_CONSULTAS.soma(**rotulos) - antes
+
+        resposta, total = comandos("POST", "/api/estudantes", "/api/estudantes", json=payload)
+        assert resposta.status_code == 201
+        assert total == por_escrita
+
+        rota = "/api/estudantes/{estudante_id}"
+        caminho = f"/api/estudantes/{resposta.json()['id']}"
+        resposta, total = comandos("PUT", rota, caminho, json={**payload, "nome": "Editado"})
+        assert resposta.json()["nome"] == "Editado"
+        assert total == por_escrita
+
+        resposta, total = comandos("DELETE", rota, caminho)
+        assert resposta.status_code == 204
+        assert total == 1
+
+        resposta, total = comandos("DELETE", rota, caminho)
+        assert resposta.status_code == 404
+        assert total == 1
@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+from backend.database.db import DATABASE_URL, PoolConexoes, PoolEsgotado
+
+pytestmark = pytest.mark.postgres
+
+
+@pytest.fixture
+def pool():
+    pool = PoolConexoes(dsn=DATABASE_URL, minconn=1, maxconn=2, timeout=0.2)
+    yield pool
+    pool.closeall()
+
+
+class TestPoolConexoes:
+
+    def test_aquecer_abre_conexoes_minimas(self, pool):
+        pool.aquecer()
+
+        metricas = pool.metricas()
+        assert metricas["ociosas"] == 1
+        assert metricas["conexoes_criadas"] == 1
+
+    def test_pool_esgotado_levanta_apos_timeout(self, pool):
+        conn1 = pool.getconn()
+        conn2 = pool.getconn()
+
+        with pytest.raises(PoolEsgotado):
+            pool.getconn()
+
+        assert pool.metricas()["timeouts"] == 1
+        assert pool.metricas()["em_uso"] == 2
+        pool.putconn(conn1)
+        pool.putconn(conn2)
+
+    def test_checkout_espera_devolucao(self, pool):
+        pool.timeout = 5
+        conn1 = pool.getconn()
+        conn2 = pool.getconn()
+
+        threading.Timer(0.1, pool.putconn, args=(conn1,)).start()
+        conn3 = pool.getconn()
+
+        assert conn3 is conn1
+        assert pool.metricas()["tempo_espera_max_s"] >= 0.05
+        pool.putconn(conn2)
+        pool.putconn(conn3)
+
+    def test_conexao_fechada_e_substituida(self, pool):
+        pool.validar_apos = 0
+        conn = pool.getconn()
+        pool.putconn(conn)
+        conn.close()
+
+        nova = pool.getconn()
+
+        assert nova is not conn
+        assert not nova.closed
+        assert pool.metricas()["conexoes_descartadas"] == 1
+        pool.putconn(nova)
+
+    def test_conexao_reciclada_por_idade(self, pool):
+        pool.max_idade = 0.05
+        conn = pool.getconn()
+        time.sleep(0.1)
+        pool.putconn(conn)
+
+        assert pool.metricas()["conexoes_recicladas"] == 1
+        assert pool.metricas()["ociosas"] == 0
+        assert conn.closed
+
+    def test_uso_concorrente(self, pool):
+        pool.timeout = 10
+        erros = []
+
+        def trabalhar():
+            try:
+                for _ in range(20):
+                    conn = pool.getconn()
+                    with conn.cursor() as cursor:
+                        cursor.execute("SELECT 1")
+                    conn.commit()
+                    pool.putconn(conn)
+            except Exception as erro:
+                erros.append(erro)
+
+        threads = [threading.Thread(target=trabalhar) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        metricas = pool.metricas()
+        assert erros == []
+        assert metricas["checkouts"] == 160
+        assert metricas["em_uso"] == 0
+        assert metricas["ociosas"] <= 2
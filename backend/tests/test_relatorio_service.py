@@ -0,0 +1,188 @@
+import math
+import random
+from fractions import Fraction
+
+import pytest
+from backend.model.estudante import Estudante
+from backend.service.analiseTurma import AnaliseTurma
+from backend.service.relatorioService import (
+    SECOES_PAINEL,
+    AgregadosTurma,
+    CacheRelatorios,
+    MotorRelatorio,
+    secoes_painel,
+)
+
+
+@pytest.fixture
+def estudantes():
+    return [
+        Estudante(id="1", nome="Ana", notas=[7.5, 8.0, 6.5, 9.0, 7.0], frequencia=85.0),
+        Estudante(id="2", nome="Bruno", notas=[8.5, 9.0, 7.5, 8.5, 9.0], frequencia=70.0),
+        Estudante(id="3", nome="Carla", notas=[5.0, 6.0, 5.5, 6.0, 5.0], frequencia=60.0),
+    ]
+
+
+class TestMotorRelatorio:
+
+    def test_relatorio_vazio(self):
+        relatorio = MotorRelatorio([], 5).gerar()
+
+        assert relatorio["total_estudantes"] == 0
+        assert relatorio["media_turma"] == 0.0
+        assert all(media["media"] == 0.0 for media in relatorio["medias_por_disciplina"])
+        assert relatorio["estudantes_acima_da_media"] == []
+        assert relatorio["estudantes_com_baixa_frequencia"] == []
+
+    def test_secoes_consistentes(self, estudantes):
+        relatorio = MotorRelatorio(estudantes, 5).gerar()
+
+        # Médias: 7.6, 8.5, 5.5 -> turma 7.2
+        assert [e["media"] for e in relatorio["estudantes"]] == [7.6, 8.5, 5.5]
+        assert relatorio["media_turma"] == 7.2
+        assert [e["id"] for e in relatorio["estudantes_acima_da_media"]] == ["1", "2"]
+        assert relatorio["medias_por_disciplina"][0] == {"disciplina": "Disciplina 1", "media": 7.0}
+
+    def test_baixa_frequencia_ordenada(self, estudantes):
+        baixa = MotorRelatorio(estudantes, 5).estudantes_com_baixa_frequencia()
+
+        assert [e["id"] for e in baixa] == ["3", "2"]
+        assert baixa[0]["frequencia"] == 60.0
+
+    def test_media_no_meio_do_arredondamento(self):
+        # (4.92 + 4.93) / 2 = 4.925: em float, 4.9249999... viraria 4.92
+        estudantes = [
+            Estudante(id="1", nome="Ana", notas=[4.92], frequencia=80.0),
+            Estudante(id="2", nome="Bruno", notas=[4.93], frequencia=80.0),
+        ]
+        motor = MotorRelatorio(estudantes, 1)
+
+        assert motor.media_turma() == 4.93
+        assert motor.medias_por_disciplina()[0]["media"] == 4.93
+        assert motor.estudantes_acima_da_media() == []
+
+    @pytest.mark.parametrize("semente", range(4))
+    def test_mesmas_medias_em_todos_os_calculos(self, semente):
+        # Muitas turmas pequenas com notas de duas casas: médias em x.xx5 são
+        # frequentes. Motor, agregados e AnaliseTurma contra a conta exata
+        gerador = random.Random(semente)
+        for _ in range(500):
+            estudantes = [
+                Estudante(
+                    id=str(indice), nome=f"Aluno {indice}", frequencia=80.0,
+                    notas=[gerador.randrange(1001) / 100 for _ in range(3)],
+                )
+                for indice in range(gerador.randint(1, 6))
+            ]
+            medias = [sum(Fraction(str(nota)) for nota in e.notas) / 3 for e in estudantes]
+            exata = sum(medias) / len(medias)
+            media_turma = math.floor(exata * 100 + Fraction(1, 2)) / 100
+            acima = [e.id for e, media in zip(estudantes, medias) if media > Fraction(str(media_turma))]
+
+            motor = MotorRelatorio(estudantes, 3)
+            agregados = AgregadosTurma.a_partir_de(estudantes, 3)
+            analise = AnaliseTurma.a_partir_de([e.model_dump() for e in estudantes], 3)
+
+            assert motor.media_turma() == agregados.media_turma() == media_turma
+            assert analise.media_turma() == media_turma
+            assert [e["id"] for e in motor.estudantes_acima_da_media()] == acima
+            assert analise.estudantes_acima_da_media() == motor.estudantes_acima_da_media()
+            assert (motor.medias_por_disciplina() == agregados.medias_por_disciplina()
+                    == analise.medias_por_disciplina())
+            assert analise.estudantes() == motor.estudantes()
+
+    def test_gerar_secoes_apenas_as_pedidas(self, estudantes):
+        painel = MotorRelatorio(estudantes, 5).gerar_secoes(("media_turma", "baixa_frequencia"))
+
+        assert painel == {
+            "media_turma": 7.2,
+            "baixa_frequencia": MotorRelatorio(estudantes, 5).estudantes_com_baixa_frequencia(),
+        }
+
+
+class TestSecoesPainel:
+
+    def test_sem_include_retorna_todas(self):
+        assert secoes_painel(None) == tuple(SECOES_PAINEL)
+        assert secoes_painel(" ") == tuple(SECOES_PAINEL)
+
+    def test_ordem_canonica_sem_repeticoes(self):
+        assert secoes_painel("baixa_frequencia, estudantes,estudantes") == (
+            "estudantes", "baixa_frequencia"
+        )
+
+    def test_secao_desconhecida(self):
+        with pytest.raises(ValueError, match="xyz"):
+            secoes_painel("estudantes,xyz")
+
+
+class TestAgregadosNoCache:
+
+    def test_escrita_soma_aos_agregados_anteriores(self, estudantes):
+        cache = CacheRelatorios()
+        cache.obter_agregados("t", lambda: AgregadosTurma.a_partir_de(estudantes[:2], 5))
+
+        inicio = cache.iniciar_escrita("t")
+        cache.estudante_adicionado("t", estudantes[2].notas, inicio)
+
+        agregados = cache.obter_agregados("t", lambda: pytest.fail("recarregou"))
+        assert agregados.total_estudantes == 3
+        assert agregados.media_turma() == MotorRelatorio(estudantes, 5).media_turma()
+
+    def test_agregados_lidos_durante_a_escrita_sao_descartados(self, estudantes):
+        cache = CacheRelatorios()
+        inicio = cache.iniciar_escrita("t")
+        # Leitura concorrente, depois do commit e antes do aviso: já vê o estudante novo
+        cache.obter_agregados("t", lambda: AgregadosTurma.a_partir_de(estudantes, 5))
+
+        cache.estudante_adicionado("t", estudantes[2].notas, inicio)
+
+        agregados = cache.obter_agregados(
+            "t", lambda: AgregadosTurma.a_partir_de(estudantes, 5)
+        )
+        assert agregados.total_estudantes == 3
+
+
+class TestVersaoDoBanco:
+
+    def test_versao_nova_no_banco_descarta_a_turma(self):
+        cache = CacheRelatorios()
+        cache.sincronizar("t", 3)
+        cache.obter("t", "relatorio", lambda: "antes")
+        cache.obter("u", "relatorio", lambda: "outra")
+
+        cache.sincronizar("t", 3)
+        assert cache.obter("t", "relatorio", lambda: "depois") == "antes"
+
+        # Escrita de outro processo
+        cache.sincronizar("t", 4)
+        assert cache.obter("t", "relatorio", lambda: "depois") == "depois"
+        assert cache.obter("u", "relatorio", lambda: "recalculado") == "outra"
+
+    def test_escrita_local_nao_descarta_de_novo(self, estudantes):
+        cache = CacheRelatorios()
+        cache.sincronizar("t", 3)
+        cache.obter_agregados("t", lambda: AgregadosTurma.a_partir_de(estudantes[:2], 5))
+
+        inicio = cache.iniciar_escrita("t")
+        cache.versao_gravada("t", 4)
+        cache.estudante_adicionado("t", estudantes[2].notas, inicio)
+        cache.sincronizar("t", 4)
+
+        agregados = cache.obter_agregados("t", lambda: pytest.fail("recarregou"))
+        assert agregados.total_estudantes == 3
+
+    def test_escrita_de_outro_processo_antes_da_local(self, estudantes):
+        cache = CacheRelatorios()
+        cache.sincronizar("t", 3)
+        cache.obter_agregados("t", lambda: AgregadosTurma.a_partir_de(estudantes[:1], 5))
+
+        # A versão 4 foi gravada por outro processo e não foi vista
+        inicio = cache.iniciar_escrita("t")
+        cache.versao_gravada("t", 5)
+        cache.estudante_adicionado("t", estudantes[2].notas, inicio)
+
+        agregados = cache.obter_agregados(
+            "t", lambda: AgregadosTurma.a_partir_de(estudantes, 5)
+        )
+        assert agregados.total_estudantes == 3
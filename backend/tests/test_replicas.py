@@ -0,0 +1,219 @@
+import os
+import time
+
+import pytest
+import pytest_asyncio
+from fastapi.testclient import TestClient
+from backend.controller.estudanteController import DB_MODO
+from backend.database import db, dbAsync
+from backend.database.dbAsync import (
+    configurar_replicas_async,
+    fechar_pool_async,
+    get_cursor_leitura_async,
+    metricas_replicas_async,
+)
+from backend.database.metricas import DB_LEITURAS
+from backend.database.replicas import SeletorReplicas
+from backend.service import estudanteService
+from main import app
+
+# Sem um servidor em recuperação, o próprio primário faz o papel de réplica:
+# o roteamento aparece nos pools, não nos dados. Com DATABASE_REPLICA_TESTE
+# (uma réplica de DATABASE_URL por streaming), roda também o teste da réplica real
+REPLICA_TESTE = os.getenv("DATABASE_REPLICA_TESTE")
+URL_FORA_DO_AR = "postgresql://postgres:@/postgres?host=/tmp/replica-inexistente"
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+@pytest.fixture
+def replicas(monkeypatch):
+    """Configura as réplicas do teste; sem janela de escrita, as leituras
+    vão para as réplicas logo depois das escritas"""
+    monkeypatch.setattr(estudanteService, "DB_REPLICA_JANELA_ESCRITA", 0)
+
+    def configurar(*urls, **opcoes):
+        db.configurar_replicas(list(urls), **opcoes)
+        return db.get_replicas()
+
+    yield configurar
+    db.configurar_replicas(db.DATABASE_REPLICA_URLS)
+
+
+def checkouts(pool):
+    return pool.metricas()["checkouts"]
+
+
+class TestSeletorReplicas:
+
+    def test_rodizio(self):
+        seletor = SeletorReplicas(3)
+
+        assert [seletor.ordem() for _ in range(4)] == [
+            [0, 1, 2], [1, 2, 0], [2, 0, 1], [0, 1, 2],
+        ]
+
+    def test_menos_ocupada(self):
+        seletor = SeletorReplicas(3, "menos_ocupada")
+
+        assert seletor.ordem([4, 0, 2]) == [1, 2, 0]
+
+    def test_replica_que_falhou_fica_de_fora_pela_pausa(self):
+        relogio = Relogio()
+        seletor = SeletorReplicas(2, pausa=30, relogio=relogio)
+        seletor.falhou(0)
+
+        assert seletor.ordem() == [1]
+        assert seletor.fora_do_ar() == [0]
+        relogio.agora = 30
+        assert sorted(seletor.ordem()) == [0, 1]
+
+    def test_selecao_invalida(self):
+        with pytest.raises(ValueError, match="DB_REPLICA_SELECAO inválida"):
+            SeletorReplicas(2, "aleatoria")
+
+
+@pytest.mark.postgres
+class TestLeituraEmReplicas:
+
+    def test_leituras_na_replica_escritas_no_primario(self, replicas, service, estudante_exemplo):
+        (replica,), _ = replicas(db.DATABASE_URL)
+        primario = db.get_pool()
+
+        antes_primario = checkouts(primario)
+        estudante = service.criar_estudante(estudante_exemplo)
+        assert checkouts(primario) == antes_primario + 1
+        assert checkouts(replica) == 0
+
+        antes_primario = checkouts(primario)
+        assert service.listar_estudantes() == [estudante]
+        assert service.obter_estudante_por_id(estudante.id) == estudante  # cache
+        service.gerar_relatorio()
+        service.calcular_media_turma(usar_cache=False)
+
+        assert checkouts(replica) == 3
+        assert checkouts(primario) == antes_primario
+
+    def test_rodizio_entre_replicas(self, replicas, service):
+        pools, _ = replicas(db.DATABASE_URL, db.DATABASE_URL)
+        for _ in range(4):
+            service.listar_estudantes()
+
+        assert [checkouts(pool) for pool in pools] == [2, 2]
+
+    def test_escrita_recente_le_do_primario(self, replicas, service, estudante_exemplo,
+                                            monkeypatch):
+        (replica,), _ = replicas(db.DATABASE_URL)
+        monkeypatch.setattr(estudanteService, "DB_REPLICA_JANELA_ESCRITA", 60)
+        service.criar_estudante(estudante_exemplo)
+
+        service.listar_estudantes()
+        assert service.listar_estudantes(turma_id="outra") == []
+
+        # Só a turma sem escrita recente foi para a réplica
+        assert checkouts(replica) == 1
+
+    def test_replica_fora_do_ar(self, replicas, service, estudante_exemplo):
+        pools, seletor = replicas(URL_FORA_DO_AR, db.DATABASE_URL, pausa=30)
+        estudante = service.criar_estudante(estudante_exemplo)
+
+        assert service.listar_estudantes() == [estudante]
+        assert seletor.fora_do_ar() == [0]
+        assert service.listar_estudantes() == [estudante]
+        assert checkouts(pools[1]) == 2
+
+    def test_sem_replica_disponivel_le_do_primario(self, replicas, service, estudante_exemplo):
+        replicas(URL_FORA_DO_AR)
+        estudante = service.criar_estudante(estudante_exemplo)
+        antes = DB_LEITURAS.valor(destino="reserva")
+
+        assert service.listar_estudantes() == [estudante]
+        assert service.listar_estudantes() == [estudante]
+        assert DB_LEITURAS.valor(destino="reserva") == antes + 2
+
+    @pytest.mark.skipif(DB_MODO == "async", reason="a API usa os pools assíncronos")
+    def test_cabecalho_le_do_primario(self, replicas):
+        (replica,), _ = replicas(db.DATABASE_URL)
+        client = TestClient(app)
+
+        assert client.get("/api/estudantes").status_code == 200
+        assert checkouts(replica) == 1
+
+        primario = {"X-Consistencia-Leitura": "primario"}
+        assert client.get("/api/estudantes", headers=primario).status_code == 200
+        assert client.get("/api/estudantes/nao-existe", headers=primario).status_code == 404
+        assert checkouts(replica) == 1
+
+    @pytest.mark.skipif(not REPLICA_TESTE, reason="sem DATABASE_REPLICA_TESTE")
+    def test_replica_real(self, replicas, service, estudante_exemplo, monkeypatch):
+        replicas(REPLICA_TESTE)
+        monkeypatch.setattr(estudanteService, "DB_REPLICA_JANELA_ESCRITA", 60)
+        estudante = service.criar_estudante(estudante_exemplo)
+
+        # Dentro da janela, a leitura vai para o primário e vê a escrita
+        assert service.listar_estudantes() == [estudante]
+
+        with db.get_cursor() as cursor:
+            cursor.execute("SELECT pg_current_wal_lsn()::text AS lsn")
+            lsn = cursor.fetchone()["lsn"]
+        with db.get_cursor_leitura() as cursor:
+            cursor.execute("SELECT pg_is_in_recovery() AS replica")
+            assert cursor.fetchone()["replica"] is True
+            prazo = time.monotonic() + 10
+            while True:
+                cursor.execute(
+                    "SELECT pg_last_wal_replay_lsn() >= %s::pg_lsn AS em_dia", (lsn,)
+                )
+                if cursor.fetchone()["em_dia"] or time.monotonic() > prazo:
+                    break
+                time.sleep(0.05)
+
+        monkeypatch.setattr(estudanteService, "DB_REPLICA_JANELA_ESCRITA", 0)
+        assert service.listar_estudantes() == [estudante]
+        with pytest.raises(Exception, match="read-only transaction"):
+            with db.get_cursor_leitura() as cursor:
+                cursor.execute("DELETE FROM estudantes")
+
+
+@pytest_asyncio.fixture
+async def replicas_async(monkeypatch):
+    # Pools abertos por outros testes ficam presos a event loops já fechados
+    monkeypatch.setattr(dbAsync, "_pool_async", None)
+    monkeypatch.setattr(dbAsync, "_replicas_async", None)
+    yield configurar_replicas_async
+    await fechar_pool_async()
+
+
+@pytest.mark.postgres
+class TestLeituraEmReplicasAsync:
+
+    @pytest.mark.asyncio
+    async def test_replica_fora_do_ar(self, replicas_async):
+        await replicas_async([URL_FORA_DO_AR, db.DATABASE_URL], timeout=0.5)
+
+        for _ in range(2):
+            async with get_cursor_leitura_async() as cursor:
+                await cursor.execute("SELECT 1 AS um")
+                assert (await cursor.fetchone())["um"] == 1
+
+        metricas = metricas_replicas_async()
+        assert metricas["fora_do_ar"] == [0]
+        assert metricas["pools"][1]["requests_num"] == 2
+
+    @pytest.mark.asyncio
+    async def test_primario_quando_pedido(self, replicas_async):
+        await replicas_async([db.DATABASE_URL])
+        antes = DB_LEITURAS.valor(destino="primario")
+
+        async with get_cursor_leitura_async(primario=True, snapshot=True) as cursor:
+            await cursor.execute("SHOW transaction_isolation")
+            assert (await cursor.fetchone())["transaction_isolation"] == "repeatable read"
+
+        assert DB_LEITURAS.valor(destino="primario") == antes + 1
+        assert metricas_replicas_async()["pools"][0].get("requests_num", 0) == 0
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from backend.database.repositorio import ViolacaoChaveEstrangeira, banco_configurado
+from backend.database.repositorioMemoria import RepositorioMemoria
+from backend.database.repositorioSqlite import RepositorioSqlite
+from backend.model.estudante import AtualizarEstudante, CriarEstudante
+from backend.model.turma import TURMA_PADRAO
+from backend.service.estudanteService import EstudanteService
+from backend.service.relatorioService import CacheRelatorios
+
+
+@pytest.fixture(params=["memoria", "sqlite"])
+def repositorio(request):
+    # Repositórios próprios, fora do configurado por BANCO_DADOS
+    return RepositorioMemoria() if request.param == "memoria" else RepositorioSqlite()
+
+
+@pytest.fixture
+def service(repositorio):
+    return EstudanteService(repositorio, CacheRelatorios())
+
+
+class TestRepositorios:
+
+    def test_importar_estudantes_relatorio_por_linha(self, service):
+        service.criar_estudante(CriarEstudante(
+            nome="João Silva", notas=[7.5, 8.0, 6.5, 9.0, 7.0], frequencia=85.0
+        ))
+        linhas = [
+            {"nome": "Ana", "notas": [7, 8, 9, 10, 6], "frequencia": 90},
+            {"nome": "JOÃO SILVA", "notas": [7, 8, 9, 10, 6], "frequencia": 90},  # já existe
+            {"nome": "Bia", "notas": [7, 8, 9, 10, 11], "frequencia": 90},  # nota inválida
+            {"nome": " ana ", "notas": [5, 5, 5, 5, 5], "frequencia": 50},  # repetido no lote
+            {"nome": "Caio", "notas": [6, 6, 6, 6, 6], "frequencia": 60},
+        ]
+
+        resultado = service.importar_estudantes(linhas)
+
+        assert [r["status"] for r in resultado["resultados"]] == [
+            "importado", "erro", "erro", "erro", "importado"
+        ]
+        assert resultado["importados"] == 2
+        assert [e.nome for e in service.listar_estudantes()] == ["Ana", "Caio", "João Silva"]
+
+    def test_agregados_mantidos_a_cada_escrita(self, service):
+        service.calcular_media_turma()  # agregados no cache antes das escritas
+        ana = service.criar_estudante(CriarEstudante(
+            nome="Ana", notas=[7.555, 8.0, 6.5, 9.0, 7.0], frequencia=85.0
+        ))
+        # Somada com a nota gravada (7.56), não com a enviada
+        assert (service.calcular_media_turma_por_disciplina()
+                == service.calcular_media_turma_por_disciplina(usar_cache=False))
+        assert service.calcular_media_turma_por_disciplina()[0]["media"] == 7.56
+
+        bia = service.criar_estudante(CriarEstudante(
+            nome="Bia", notas=[10.0, 9.0, 7.5, 8.5, 9.0], frequencia=70.0
+        ))
+        service.atualizar_estudante(ana.id, AtualizarEstudante(
+            nome="Ana", notas=[5.0, 5.0, 5.0, 5.0, 5.0], frequencia=60.0
+        ))
+        service.criar_estudante(CriarEstudante(
+            nome="Caio", notas=[6.0, 6.0, 6.0, 6.0, 6.0], frequencia=90.0
+        ))
+        service.remover_estudante(bia.id)
+
+        # Sem cache: direto das somas do repositório, iguais ao recálculo
+        assert service.calcular_media_turma(usar_cache=False) == 5.5
+        assert [m["media"] for m in service.calcular_media_turma_por_disciplina(False)] == [5.5] * 5
+        assert service.obter_estudantes_acima_da_media(False) == [
+            {"id": service.listar_estudantes()[1].id, "nome": "Caio", "media": 6.0}
+        ]
+        assert service.obter_estudante_por_id(ana.id).notas == [5.0] * 5
+
+    def test_notas_arredondadas_como_no_postgres(self, service):
+        estudante = service.criar_estudante(CriarEstudante(
+            nome="Ana", notas=[7.555, 8.005, 6.5, 9.0, 7.0], frequencia=85.555
+        ))
+
+        assert estudante.notas == [7.56, 8.01, 6.5, 9.0, 7.0]
+        assert estudante.frequencia == 85.56
+
+    def test_snapshots(self, repositorio):
+        agora = datetime.now(timezone.utc)
+        repositorio.gravar_snapshot(TURMA_PADRAO, "{}", agora, 3)
+        # Um cálculo mais lento não sobrescreve o mais novo
+        repositorio.gravar_snapshot(TURMA_PADRAO, "antigo", agora - timedelta(seconds=1), 2)
+
+        assert repositorio.obter_snapshot(TURMA_PADRAO) == {
+            "conteudo": "{}", "gerado_em": agora, "versao": 3
+        }
+        assert repositorio.snapshots_vencidos(60) == []
+        assert repositorio.snapshots_vencidos(0) == [TURMA_PADRAO]
+        with pytest.raises(ViolacaoChaveEstrangeira):
+            repositorio.gravar_snapshot("nao-existe", "{}", agora, 0)
+
+        repositorio.limpar()
+        assert repositorio.obter_snapshot(TURMA_PADRAO) is None
+
+    def test_sqlite_em_arquivo(self, tmp_path):
+        caminho = str(tmp_path / "estudantes.sqlite3")
+        service = EstudanteService(RepositorioSqlite(caminho))
+        criado = service.criar_estudante(CriarEstudante(
+            nome="Ana", notas=[7.0, 8.0, 9.0, 6.0, 5.0], frequencia=80.0
+        ))
+
+        # Outro processo abrindo o mesmo arquivo
+        reaberto = EstudanteService(RepositorioSqlite(caminho))
+
+        assert reaberto.listar_estudantes() == [criado]
+
+    def test_banco_invalido(self, monkeypatch):
+        monkeypatch.setenv("BANCO_DADOS", "oracle")
+
+        with pytest.raises(ValueError, match="BANCO_DADOS inválido"):
+            banco_configurado()
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from backend.controller import estudanteController
+from backend.controller.respostaJson import RespostaJSON
+from backend.model.estudante import Estudante, PaginaEstudantes
+from main import app
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+class TestRespostaJSON:
+
+    def test_serializa_modelos_aninhados(self):
+        estudante = Estudante(id="1", nome="Ana", notas=[7.5, 8.0, 6.5, 9.0, 7.0], frequencia=85.0)
+        pagina = PaginaEstudantes(estudantes=[estudante], proximo_cursor=None)
+
+        corpo = json.loads(RespostaJSON(pagina).body)
+
+        assert corpo == json.loads(pagina.model_dump_json())
+
+    def test_tipo_desconhecido(self):
+        with pytest.raises(TypeError):
+            RespostaJSON({"valor": object()})
+
+    @pytest.mark.parametrize("rota", [
+        "/api/estudantes",
+        "/api/estudantes?limite=1&ordenar=media",
+        "/api/painel",
+    ])
+    def test_mesmo_corpo_no_modo_estrito(self, client, monkeypatch, rota):
+        for i, frequencia in enumerate([85.0, 60.0]):
+            client.post("/api/estudantes", json={
+                "nome": f"Resposta {i}", "notas": [7.0, 8.0, 6.5, 9.0, 7.5], "frequencia": frequencia,
+            })
+
+        rapida = client.get(rota)
+        monkeypatch.setattr(estudanteController, "VALIDACAO_ESTRITA", True)
+        estrita = client.get(rota)
+
+        assert rapida.status_code == estrita.status_code == 200
+        assert rapida.json() == estrita.json()
+        assert rapida.headers["etag"] == estrita.headers["etag"]
@@ -0,0 +1,186 @@
+import time
+from uuid import uuid4
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+from backend.model.estudante import AtualizarEstudante, CriarEstudante
+from backend.model.turma import CriarPeriodo, CriarTurma
+from backend.service.relatorioService import CacheRelatorios
+from backend.service.servicos import criar_estudante_service, criar_turma_service
+from backend.service.snapshotService import SnapshotsRelatorios
+from main import app
+
+
+@pytest.fixture
+def cache():
+    return CacheRelatorios()
+
+
+@pytest.fixture
+def service(cache):
+    return criar_estudante_service(cache)
+
+
+@pytest.fixture
+def turma(cache):
+    turma_service = criar_turma_service(cache)
+    periodo = turma_service.criar_periodo(CriarPeriodo(nome=f"S{uuid4().hex[:8]}"))
+    return turma_service.criar_turma(CriarTurma(periodo_id=periodo.id, nome="Turma"))
+
+
+@pytest.fixture
+def snapshots(service, cache):
+    gerador = SnapshotsRelatorios(service, cache, intervalo=0, atraso=0.05)
+    yield gerador
+    gerador.parar()
+
+
+def _criar(service, turma, nome, notas=(7.0, 8.0, 9.0, 6.0, 5.0)):
+    return service.criar_estudante(
+        CriarEstudante(nome=nome, notas=list(notas), frequencia=80.0), turma_id=turma.id
+    )
+
+
+def _esperar(condicao, limite=5.0):
+    fim = time.monotonic() + limite
+    while not condicao():
+        assert time.monotonic() < fim, "tempo esgotado"
+        time.sleep(0.02)
+
+
+class TestSnapshotsRelatorios:
+
+    def test_primeiro_pedido_calcula_e_os_seguintes_vem_da_memoria(self, service, snapshots, turma):
+        _criar(service, turma, "Ana")
+
+        snapshot = snapshots.obter(turma.id)
+        corpo = orjson.loads(snapshots.corpo(snapshot))
+
+        assert snapshots.obter(turma.id) is snapshot
+        assert snapshots.em_memoria(turma.id) is snapshot
+        assert corpo["relatorio"] == service.gerar_relatorio(usar_cache=False, turma_id=turma.id)
+        assert corpo["atualizado"] is True
+        assert corpo["recalculo_agendado"] is False
+        assert corpo["idade_segundos"] >= 0
+
+    def test_escrita_agenda_recalculo_em_segundo_plano(self, service, snapshots, turma):
+        _criar(service, turma, "Ana")
+        antigo = snapshots.obter(turma.id)
+
+        _criar(service, turma, "Bia")
+        corpo = orjson.loads(snapshots.corpo(snapshots.em_memoria(turma.id)))
+        assert corpo["atualizado"] is False
+        assert corpo["recalculo_agendado"] is True
+
+        snapshots.iniciar()
+        _esperar(lambda: snapshots.em_memoria(turma.id) is not antigo)
+        corpo = orjson.loads(snapshots.corpo(snapshots.em_memoria(turma.id)))
+        assert corpo["relatorio"]["total_estudantes"] == 2
+        assert corpo["atualizado"] is True
+
+    def test_rajada_de_escritas_gera_um_recalculo(self, service, cache, turma):
+        gerador = SnapshotsRelatorios(service, cache, intervalo=0, atraso=0.3)
+        calculos = []
+        recalcular = gerador.recalcular
+        gerador.recalcular = (
+            lambda turma_id, **opcoes: calculos.append(turma_id) or recalcular(turma_id, **opcoes)
+        )
+        gerador.obter(turma.id)
+        gerador.iniciar()
+        try:
+            for indice in range(5):
+                _criar(service, turma, f"Aluno {indice}")
+            _esperar(lambda: not gerador.pendente(turma.id) and len(calculos) > 1)
+            time.sleep(0.1)
+        finally:
+            gerador.parar()
+
+        assert len(calculos) == 2
+        assert orjson.loads(gerador.em_memoria(turma.id).conteudo)["total_estudantes"] == 5
+
+    def test_recalcular_forcado(self, service, snapshots, turma):
+        antigo = snapshots.obter(turma.id)
+        _criar(service, turma, "Ana")
+
+        novo = snapshots.obter(turma.id, recalcular=True)
+
+        assert novo.gerado_em > antigo.gerado_em
+        assert orjson.loads(novo.conteudo)["total_estudantes"] == 1
+
+    def test_outro_processo_parte_do_snapshot_gravado(self, service, snapshots, turma):
+        snapshot = snapshots.obter(turma.id)
+        # Outro processo: cache próprio, então não sabe se houve escrita depois
+        outro = SnapshotsRelatorios(service, CacheRelatorios(), intervalo=0)
+
+        carregado = outro.obter(turma.id)
+
+        assert carregado.gerado_em == snapshot.gerado_em
+        assert carregado.conteudo == snapshot.conteudo
+        assert outro.pendente(turma.id)
+
+    def test_snapshot_gravado_na_versao_atual(self, snapshots, turma):
+        snapshots.obter(turma.id)
+        cache = CacheRelatorios()
+        service = criar_estudante_service(cache)
+        outro = SnapshotsRelatorios(service, cache, intervalo=0)
+
+        service.versao_dados(turma.id)  # como a rota, para o ETag
+        carregado = outro.obter(turma.id)
+
+        assert not outro.pendente(turma.id)
+        assert orjson.loads(outro.corpo(carregado))["atualizado"] is True
+
+    def test_recalculo_ve_escrita_de_outro_processo(self, service, snapshots, turma):
+        ana = _criar(service, turma, "Ana", notas=[5.0] * 5)
+        snapshots.obter(turma.id)
+
+        # Outro processo da API: mesmo banco, cache próprio
+        outro_processo = criar_estudante_service(CacheRelatorios())
+        outro_processo.atualizar_estudante(ana.id, AtualizarEstudante(
+            nome="Ana", notas=[9.0] * 5, frequencia=80.0
+        ), turma_id=turma.id)
+
+        corpo = orjson.loads(snapshots.corpo(snapshots.recalcular(turma.id)))
+        assert corpo["relatorio"]["media_turma"] == 9.0
+        assert corpo["atualizado"] is True
+
+    def test_timer_renova_snapshots_velhos(self, service, cache, turma):
+        gerador = SnapshotsRelatorios(service, cache, intervalo=0.2, atraso=0.05)
+        antigo = gerador.obter(turma.id)
+        gerador.iniciar()
+        try:
+            _esperar(lambda: gerador.em_memoria(turma.id) is not antigo)
+        finally:
+            gerador.parar()
+
+    def test_turma_inexistente(self, snapshots):
+        with pytest.raises(LookupError):
+            snapshots.obter("nao-existe")
+        assert snapshots.em_memoria("nao-existe") is None
+
+    def test_rota_snapshot(self, turma):
+        # Sem o lifespan: a rota não usa o pool assíncrono nem a thread
+        cliente = TestClient(app)
+        resposta = cliente.get(f"/api/relatorios/snapshot?turma_id={turma.id}")
+        forcada = cliente.get(f"/api/relatorios/snapshot?turma_id={turma.id}&recalcular=true")
+
+        assert resposta.status_code == 200
+        assert set(resposta.json()) == {
+            "turma_id", "gerado_em", "idade_segundos", "atualizado",
+            "recalculo_agendado", "relatorio",
+        }
+        assert forcada.json()["gerado_em"] > resposta.json()["gerado_em"]
+        assert cliente.get("/api/relatorios/snapshot?turma_id=nao-existe").status_code == 404
+
+    def test_rota_snapshot_de_turma_removida(self):
+        cliente = TestClient(app)
+        periodo = cliente.post("/api/periodos", json={"nome": f"S{uuid4().hex[:8]}"}).json()
+        turma = cliente.post("/api/turmas", json={"periodo_id": periodo["id"], "nome": "Turma"}).json()
+        assert cliente.get(f"/api/relatorios/snapshot?turma_id={turma['id']}").status_code == 200
+        assert cliente.delete(f"/api/turmas/{turma['id']}").status_code == 204
+
+        # Catálogo em cache da turma removida não pode gerar um relatório vazio
+        forcada = cliente.get(f"/api/relatorios/snapshot?turma_id={turma['id']}&recalcular=true")
+        assert forcada.status_code == 404
+        assert cliente.get(f"/api/relatorios/snapshot?turma_id={turma['id']}").status_code == 404
@@ -0,0 +1,108 @@
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from backend.model.estudante import CriarEstudante
+from backend.model.turma import TURMA_PADRAO, CriarPeriodo, CriarTurma
+from backend.service.relatorioService import CacheRelatorios
+from backend.service.servicos import criar_estudante_service, criar_turma_service
+from main import app
+
+
+@pytest.fixture
+def cache():
+    return CacheRelatorios()
+
+
+@pytest.fixture
+def turma_service(cache):
+    return criar_turma_service(cache)
+
+
+@pytest.fixture
+def periodo(turma_service):
+    # Removido, com as turmas e os estudantes, pela limpeza do conftest
+    return turma_service.criar_periodo(CriarPeriodo(nome=f"T{uuid4().hex[:8]}"))
+
+
+@pytest.fixture
+def turmas(turma_service, periodo):
+    return [
+        turma_service.criar_turma(CriarTurma(periodo_id=periodo.id, nome=nome))
+        for nome in ("Turma A", "Turma B")
+    ]
+
+
+class TestTurmaService:
+
+    def test_criar_e_listar(self, turma_service, periodo, turmas):
+        assert turma_service.listar_turmas(periodo.id) == turmas
+        assert turma_service.obter_turma(turmas[0].id) == turmas[0]
+        assert periodo in turma_service.listar_periodos()
+        assert turma_service.obter_turma(TURMA_PADRAO) is not None
+
+    def test_nomes_duplicados(self, turma_service, periodo, turmas):
+        with pytest.raises(ValueError, match="período"):
+            turma_service.criar_periodo(CriarPeriodo(nome=periodo.nome))
+        with pytest.raises(ValueError, match="turma"):
+            turma_service.criar_turma(CriarTurma(periodo_id=periodo.id, nome=" turma a "))
+
+    def test_periodo_inexistente(self, turma_service):
+        with pytest.raises(LookupError):
+            turma_service.criar_turma(CriarTurma(periodo_id="nao-existe", nome="X"))
+
+    def test_turma_padrao_nao_pode_ser_removida(self, turma_service):
+        with pytest.raises(ValueError):
+            turma_service.remover_turma(TURMA_PADRAO)
+
+    def test_estudantes_e_relatorios_por_turma(self, cache, turma_service, turmas):
+        service = criar_estudante_service(cache)
+        turma_a, turma_b = (turma.id for turma in turmas)
+        # O mesmo nome pode existir em turmas diferentes
+        ana_a = service.criar_estudante(
+            CriarEstudante(nome="Ana", notas=[9.0] * 5, frequencia=90.0), turma_id=turma_a
+        )
+        ana_b = service.criar_estudante(
+            CriarEstudante(nome="Ana", notas=[5.0] * 5, frequencia=60.0), turma_id=turma_b
+        )
+
+        assert service.listar_estudantes(turma_id=turma_a) == [ana_a]
+        assert service.obter_estudante_por_id(ana_b.id, turma_id=turma_a) is None
+        assert service.remover_estudante(ana_b.id, turma_id=turma_a) is False
+        assert service.calcular_media_turma(turma_id=turma_a) == 9.0
+        assert service.calcular_media_turma(usar_cache=False, turma_id=turma_b) == 5.0
+        assert service.gerar_relatorio(turma_id=turma_b)["estudantes_com_baixa_frequencia"] == [
+            {"id": ana_b.id, "nome": "Ana", "frequencia": 60.0}
+        ]
+        assert service.listar_estudantes() == []
+
+    def test_escrita_invalida_so_a_propria_turma(self, cache, turmas):
+        service = criar_estudante_service(cache)
+        turma_a, turma_b = (turma.id for turma in turmas)
+        versao_a = cache.etiqueta_versao(turma_a)
+
+        service.criar_estudante(
+            CriarEstudante(nome="Bruno", notas=[7.0] * 5, frequencia=80.0), turma_id=turma_b
+        )
+
+        assert cache.etiqueta_versao(turma_a) == versao_a
+        assert cache.etiqueta_versao(turma_b) != versao_a
+
+    def test_remover_turma_remove_estudantes(self, cache, turma_service, turmas):
+        service = criar_estudante_service(cache)
+        estudante = service.criar_estudante(
+            CriarEstudante(nome="Carla", notas=[7.0] * 5, frequencia=80.0), turma_id=turmas[0].id
+        )
+
+        assert turma_service.remover_turma(turmas[0].id) is True
+        assert turma_service.remover_turma(turmas[0].id) is False
+        assert service.obter_estudante_por_id(estudante.id, turma_id=turmas[0].id) is None
+
+    def test_api_turma_inexistente(self):
+        resposta = TestClient(app).post(
+            "/api/estudantes?turma_id=nao-existe",
+            json={"nome": "Diego", "notas": [7.0] * 5, "frequencia": 80.0},
+        )
+
+        assert resposta.status_code == 404
+        assert resposta.json()["detail"] == "Turma não encontrada."
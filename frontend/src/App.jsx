@@ -5,6 +5,15 @@ import EMAILJS_CONFIG from "./config/emailJsConfig";
 
 const API_BASE = import.meta.env.VITE_API_BASE || "http://127.0.0.1:8000/api";
 
+const SECOES_PAINEL = [
+  "estudantes",
+  "total_estudantes",
+  "media_turma",
+  "medias_por_disciplina",
+  "acima_da_media",
+  "baixa_frequencia",
+].join(",");
+
 const NOTAS_INICIAIS = ["", "", "", "", ""];
 
 const initialForm = {
@@ -88,27 +97,12 @@ export default function App() {
     return res.status === 204 ? null : res.json();
   }
 
-  async function carregarEstudantes() {
-    const data = await fetchJSON("/estudantes");
-    setEstudantes(data);
-  }
-
-  async function carregarRelatorio() {
-    const data = await fetchJSON("/relatorios");
-    setRelatorio(data);
-  }
-
-  async function carregarMediasPorDisciplina() {
-    const data = await fetchJSON("/relatorios/medias-por-disciplina");
-    setMediasPorDisciplina(data.medias_por_disciplina || []);
-  }
-
+  // Lista, relatórios e médias por disciplina em uma única requisição
   async function boot() {
-    await Promise.all([
-      carregarEstudantes(),
-      carregarRelatorio(),
-      carregarMediasPorDisciplina(),
-    ]);
+    const painel = await fetchJSON(`/painel?include=${SECOES_PAINEL}`);
+    setEstudantes(painel.estudantes);
+    setRelatorio(painel);
+    setMediasPorDisciplina(painel.medias_por_disciplina || []);
   }
 
   useEffect(() => {
@@ -492,13 +486,13 @@ export default function App() {
               />
               <StatCard
                 titulo="Acima da Média da Turma"
-                valor={relatorio.estudantes_acima_da_media.length}
+                valor={relatorio.acima_da_media.length}
                 icone="⭐"
                 cor="yellow"
               />
               <StatCard
                 titulo="Frequência &lt; 75%"
-                valor={relatorio.estudantes_com_baixa_frequencia.length}
+                valor={relatorio.baixa_frequencia.length}
                 icone="⚠️"
                 cor="red"
               />
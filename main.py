@@ -1,11 +1,39 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from backend.controller.consistenciaMiddleware import MiddlewareConsistencia
 from backend.controller.estudanteController import router as estudante_router
+from backend.controller.metricasMiddleware import MiddlewareMetricas
+from backend.controller.turmaController import router as turma_router
+from backend.database.db import aquecer_pool, metricas_pool, metricas_replicas
+from backend.database.dbAsync import (
+    fechar_pool_async,
+    metricas_pool_async,
+    metricas_replicas_async,
+)
+from backend.database.metricas import registro
+from backend.service.estudanteService import cache_relatorios
+from backend.service.servicos import BANCO_DADOS
+from backend.service.snapshotService import snapshots_relatorios
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if BANCO_DADOS == "postgres":
+        aquecer_pool()
+    snapshots_relatorios.iniciar()
+    yield
+    snapshots_relatorios.parar()
+    await fechar_pool_async()
+
 
 app = FastAPI(
     title="Sistema de Gestão Escolar API",
     description="API para gerenciamento de notas e frequência de alunos",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -14,9 +42,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
+app.add_middleware(MiddlewareConsistencia)
+# Adicionado por último, envolve os demais: mede também o tempo do CORS
+app.add_middleware(MiddlewareMetricas)
 
 app.include_router(estudante_router, prefix="/api", tags=["estudantes"])
+app.include_router(turma_router, prefix="/api", tags=["turmas"])
 
 
 @app.get("/")
@@ -28,6 +61,28 @@ def read_root():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def obter_metricas():
+    """Métricas no formato de texto do Prometheus"""
+    return PlainTextResponse(
+        registro.exportar(), media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.get("/metricas/pool")
+def obter_metricas_pool():
+    return {
+        "sync": metricas_pool(),
+        "async": metricas_pool_async(),
+        "replicas": {"sync": metricas_replicas(), "async": metricas_replicas_async()},
+    }
+
+
+@app.get("/metricas/cache")
+def obter_metricas_cache():
+    return {"estudantes": cache_relatorios.estudantes.metricas()}
+
+
 if __name__ == "__main__":
     import uvicorn
 